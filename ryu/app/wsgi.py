@@ -107,19 +107,8 @@ class WebSocketRegistrationWrapper(object):
 
 
 class _AlreadyHandledResponse(Response):
-    # XXX: Eventlet API should not be used directly.
-    # https://github.com/benoitc/gunicorn/pull/2581
-    from packaging import version
-    import eventlet
-    if version.parse(eventlet.__version__) >= version.parse("0.30.3"):
-        import eventlet.wsgi
-        _ALREADY_HANDLED = getattr(eventlet.wsgi, "ALREADY_HANDLED", None)
-    else:
-        from eventlet.wsgi import ALREADY_HANDLED
-        _ALREADY_HANDLED = ALREADY_HANDLED
-
     def __call__(self, environ, start_response):
-        return self._ALREADY_HANDLED
+        return hub.ALREADY_HANDLED
 
 
 def websocket(name, path):
@@ -132,6 +121,7 @@ def websocket(name, path):
             #      This issue is caused by combined use:
             #       - webob.dec.wsgify()
             #       - eventlet.wsgi.HttpProtocol.handle_one_response()
+            #      (or the WSGI server of the asyncio hub)
             return _AlreadyHandledResponse()
         __websocket.routing_info = {
             'name': name,
@@ -36,6 +36,7 @@ from ryu.app import wsgi
 from ryu.controller.handler import register_instance, get_dependent_services
 from ryu.controller.controller import Datapath
 from ryu.controller import event
+from ryu.controller import shard
 from ryu.controller.event import EventRequestBase, EventReplyBase
 from ryu.lib import hub
 from ryu.ofproto import ofproto_protocol
@@ -143,6 +144,21 @@ class RyuApp(object):
     the intersection of their OFP_VERSIONS is used.
     """
 
+    OFP_SHARDING = shard.SHARD_LOCAL
+    """
+    How this RyuApp is run when ryu-manager runs several OpenFlow worker
+    processes (--ofp-workers).  See ryu.controller.shard.
+
+    ryu.controller.shard.SHARD_LOCAL (the default) instantiates the
+    RyuApp in every worker.  Each instance sees the datapaths served by
+    its own worker only.
+
+    ryu.controller.shard.SHARD_GLOBAL instantiates the RyuApp in the main
+    worker only.  It receives the events of all the datapaths; those
+    served by the other workers are represented by
+    ryu.controller.shard.RemoteDatapath.
+    """
+
     @classmethod
     def context_iteritems(cls):
         """
@@ -155,6 +171,11 @@ class RyuApp(object):
         self.name = self.__class__.__name__
         self.event_handlers = {}        # ev_cls -> handlers:list
         self.observers = {}     # ev_cls -> observer-name -> states:set
+        # Results of get_handlers()/get_observers() for a given state, so
+        # that dispatching an event is a single dict lookup.  They are
+        # flushed whenever handlers or observers are (un)registered.
+        self._handlers_cache = {}   # (ev_cls, state) -> handlers:list
+        self._observers_cache = {}  # (ev_cls, state) -> observer-names:list
         self.threads = []
         self.main_thread = None
         self.events = hub.Queue(128)
@@ -196,25 +217,30 @@ class RyuApp(object):
         assert callable(handler)
         self.event_handlers.setdefault(ev_cls, [])
         self.event_handlers[ev_cls].append(handler)
+        self._handlers_cache.clear()
 
     def unregister_handler(self, ev_cls, handler):
         assert callable(handler)
         self.event_handlers[ev_cls].remove(handler)
         if not self.event_handlers[ev_cls]:
             del self.event_handlers[ev_cls]
+        self._handlers_cache.clear()
 
     def register_observer(self, ev_cls, name, states=None):
         states = states or set()
         ev_cls_observers = self.observers.setdefault(ev_cls, {})
         ev_cls_observers.setdefault(name, set()).update(states)
+        self._observers_cache.clear()
 
     def unregister_observer(self, ev_cls, name):
         observers = self.observers.get(ev_cls, {})
         observers.pop(name)
+        self._observers_cache.clear()
 
     def unregister_observer_all_event(self, name):
         for observers in self.observers.values():
             observers.pop(name, None)
+        self._observers_cache.clear()
 
     def observe_event(self, ev_cls, states=None):
         brick = _lookup_service_brick_by_ev_cls(ev_cls)
@@ -237,9 +263,13 @@ class RyuApp(object):
                       The default is None.
         """
         ev_cls = ev.__class__
-        handlers = self.event_handlers.get(ev_cls, [])
         if state is None:
-            return handlers
+            return self.event_handlers.get(ev_cls, [])
+
+        try:
+            return self._handlers_cache[(ev_cls, state)]
+        except KeyError:
+            pass
 
         def test(h):
             if not hasattr(h, 'callers') or ev_cls not in h.callers:
@@ -252,14 +282,23 @@ class RyuApp(object):
                 return True
             return state in states
 
-        return filter(test, handlers)
+        handlers = [h for h in self.event_handlers.get(ev_cls, []) if test(h)]
+        self._handlers_cache[(ev_cls, state)] = handlers
+        return handlers
 
     def get_observers(self, ev, state):
+        ev_cls = ev.__class__
+        try:
+            return self._observers_cache[(ev_cls, state)]
+        except KeyError:
+            pass
+
         observers = []
-        for k, v in self.observers.get(ev.__class__, {}).items():
+        for k, v in self.observers.get(ev_cls, {}).items():
             if not state or not v or state in v:
                 observers.append(k)
 
+        self._observers_cache[(ev_cls, state)] = observers
         return observers
 
     def send_request(self, req):
@@ -506,10 +545,15 @@ class AppManager(object):
 
     def instantiate_apps(self, *args, **kwargs):
         for app_name, cls in self.applications_cls.items():
+            if not shard.is_app_runnable(cls):
+                LOG.info('app %s runs in the main worker only', app_name)
+                continue
             self._instantiate(app_name, cls, *args, **kwargs)
 
         self._update_bricks()
         self.report_bricks()
+        shard.start(self.applications_cls.values(),
+                    self.applications.values())
 
         threads = []
         for app in self.applications.values():
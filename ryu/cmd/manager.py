@@ -33,6 +33,7 @@ from ryu import version
 from ryu.app import wsgi
 from ryu.base.app_manager import AppManager
 from ryu.controller import controller
+from ryu.controller import shard
 from ryu.topology import switches
 
 
@@ -94,13 +95,18 @@ def main(args=None, prog=None):
     if not app_lists:
         app_lists = ['ryu.controller.ofp_handler']
 
+    # Fork OpenFlow worker processes, if requested, before any thread
+    # is spawned.
+    index = shard.fork_workers(CONF.ofp_workers)
+
     app_mgr = AppManager.get_instance()
     app_mgr.load_apps(app_lists)
     contexts = app_mgr.create_contexts()
     services = []
     services.extend(app_mgr.instantiate_apps(**contexts))
 
-    webapp = wsgi.start_service(app_mgr)
+    # Only the main worker serves the REST API.
+    webapp = wsgi.start_service(app_mgr) if index == 0 else None
     if webapp:
         thr = hub.spawn(webapp)
         services.append(thr)
@@ -112,6 +118,7 @@ def main(args=None, prog=None):
                      "Closing RYU application manager...")
     finally:
         app_mgr.close()
+        shard.stop_workers()
 
 
 if __name__ == "__main__":
@@ -25,6 +25,7 @@ The main component of OpenFlow controller.
 import contextlib
 import logging
 import random
+import time
 from socket import IPPROTO_TCP
 from socket import TCP_NODELAY
 from socket import SHUT_WR
@@ -44,6 +45,7 @@ from ryu.ofproto import ofproto_v1_0
 from ryu.ofproto import nx_match
 
 from ryu.controller import ofp_event
+from ryu.controller import shard
 from ryu.controller.handler import HANDSHAKE_DISPATCHER, DEAD_DISPATCHER
 
 from ryu.lib.dpid import dpid_to_str
@@ -54,6 +56,12 @@ LOG = logging.getLogger('ryu.controller.controller')
 DEFAULT_OFP_HOST = '0.0.0.0'
 DEFAULT_OFP_SW_CON_INTERVAL = 1
 
+# The length field of the OpenFlow header is 16 bits wide.
+_OFP_MAX_MSG_LEN = 0xffff
+# Size of the per-datapath receive buffer.  It must be able to hold at
+# least one maximum sized message following any unconsumed data.
+_RECV_BUF_SIZE = 2 * (_OFP_MAX_MSG_LEN + 1)
+
 CONF = cfg.CONF
 CONF.register_cli_opts([
     cfg.StrOpt('ofp-listen-host', default=DEFAULT_OFP_HOST,
@@ -86,7 +94,15 @@ CONF.register_opts([
     cfg.IntOpt('maximum-unreplied-echo-requests',
                default=0,
                min=0,
-               help='Maximum number of unreplied echo requests before datapath is disconnected.')
+               help='Maximum number of unreplied echo requests before datapath is disconnected.'),
+    cfg.BoolOpt('ofp-lazy-decode',
+                default=False,
+                help='Decode the match and the body of packet-in, flow stats '
+                     'and port stats messages only when they are accessed.'),
+    cfg.IntOpt('ofp-send-queue-size',
+               default=16,
+               min=1,
+               help='Maximum number of messages queued for sending to a datapath.')
 ])
 
 
@@ -146,9 +162,14 @@ class OpenFlowController(object):
     # entry point
     def __call__(self):
         # LOG.debug('call')
-        for address in CONF.ofp_switch_address_list:
-            addr = tuple(_split_addr(address))
-            self.spawn_client_loop(addr)
+        # With multiple workers, the main worker connects to the switches
+        # and hands the connections over to their owners.  All the workers
+        # listen on the same ports with SO_REUSEPORT, which is set by
+        # hub.StreamServer.
+        if shard.worker_index() == 0:
+            for address in CONF.ofp_switch_address_list:
+                addr = tuple(_split_addr(address))
+                self.spawn_client_loop(addr)
 
         self.server_loop(self.ofp_tcp_listen_port,
                          self.ofp_ssl_listen_port)
@@ -209,10 +230,74 @@ class OpenFlowController(object):
         server.serve_forever()
 
 
+class BarrierFuture(object):
+    """
+    The completion of a batch of messages sent by Datapath.send_batch.
+
+    The batch is terminated by a barrier request.  The future is done when
+    the barrier reply or the first OFPErrorMsg for one of the messages of
+    the batch arrives, or when the datapath disconnects.
+
+    An instance has the following attributes.
+
+    .. tabularcolumns:: |l|L|
+
+    ============ ==============================================================
+    Attribute    Description
+    ============ ==============================================================
+    xids         The set of XIDs of the messages of the batch.
+    barrier_xid  XID of the trailing barrier request.
+    reply        The barrier reply message, or None if it has not arrived.
+    errors       A list of OFPErrorMsg received for the messages of the batch.
+                 Errors which arrive after the future is done are still
+                 appended until the barrier reply arrives.
+    ============ ==============================================================
+    """
+
+    def __init__(self, xids, barrier_xid):
+        super(BarrierFuture, self).__init__()
+        self.xids = xids
+        self.barrier_xid = barrier_xid
+        self.reply = None
+        self.errors = []
+        self._event = hub.Event()
+
+    def done(self):
+        """
+        Returns True if the batch is complete or has failed.
+        """
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Waits for the completion of the batch.
+
+        Returns True if the future is done, False on timeout.
+        """
+        return self._event.wait(timeout=timeout)
+
+    def succeeded(self):
+        """
+        Returns True if the barrier reply arrived without any error.
+        """
+        return self.reply is not None and not self.errors
+
+    def _set_error(self, msg):
+        self.errors.append(msg)
+        self._event.set()
+
+    def _set_reply(self, msg):
+        self.reply = msg
+        self._event.set()
+
+    def _cancel(self):
+        self._event.set()
+
+
 def _deactivate(method):
-    def deactivate(self):
+    def deactivate(self, *args, **kwargs):
         try:
-            method(self)
+            method(self, *args, **kwargs)
         finally:
             try:
                 self.socket.close()
@@ -268,6 +353,19 @@ class Datapath(ofproto_protocol.ProtocolDesc):
     send_delete_all_flows                deprecated
     send_barrier                         Queue an OpenFlow barrier message to
                                          send to the switch.
+    send_batch(self, msgs)               Queue a list of OpenFlow messages
+                                         followed by a barrier request as a
+                                         single write and return a
+                                         BarrierFuture for its completion.
+    send_stats                           A dict of counters on the send path.
+                                         'flushes', 'msgs' and 'bytes' are
+                                         the totals written to the socket,
+                                         'last_flush_msgs' and
+                                         'last_flush_bytes' describe the
+                                         most recent write and
+                                         'blocked' and 'blocked_time' count
+                                         the senders which had to wait for
+                                         room in the send queue.
     send_nxt_set_flow_format             deprecated
     is_reserved_port                     deprecated
     ==================================== ======================================
@@ -282,24 +380,39 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         self.address = address
         self.is_active = True
 
-        # The limit is arbitrary. We need to limit queue size to
-        # prevent it from eating memory up.
-        self.send_q = hub.Queue(16)
+        # We need to limit queue size to prevent it from eating memory up.
+        self.send_q = hub.Queue(CONF.ofp_send_queue_size)
         self._send_q_sem = hub.BoundedSemaphore(self.send_q.maxsize)
+        self.send_stats = {
+            'flushes': 0,
+            'msgs': 0,
+            'bytes': 0,
+            'last_flush_msgs': 0,
+            'last_flush_bytes': 0,
+            'blocked': 0,
+            'blocked_time': 0.0,
+        }
 
         self.echo_request_interval = CONF.echo_request_interval
         self.max_unreplied_echo_requests = CONF.maximum_unreplied_echo_requests
         self.unreplied_echo_requests = []
 
         self.xid = random.randint(0, self.ofproto.MAX_XID)
+        # Outstanding batches sent by send_batch(), keyed by barrier XID
+        self._barrier_futures = {}
         self.id = None  # datapath_id is unknown yet
         self._ports = None
         self.flow_format = ofproto_v1_0.NXFF_OPENFLOW10
         self.ofp_brick = ryu.base.app_manager.lookup_service_brick('ofp_event')
         self.state = None  # for pylint
         self.set_state(HANDSHAKE_DISPATCHER)
+        # True once the connection is handed over to another worker
+        self._handed_off = False
 
     def _close_write(self):
+        if self._handed_off:
+            # The connection is served by another worker process.
+            return
         # Note: Close only further sends in order to wait for the switch to
         # disconnect this connection.
         try:
@@ -319,65 +432,84 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         ev.state = state
         if self.ofp_brick is not None:
             self.ofp_brick.send_event_to_observers(ev, state)
+        if self.id is not None and shard.is_forwarding():
+            shard.forward_state(self, state)
 
     # Low level socket handling layer
     @_deactivate
-    def _recv_loop(self):
-        buf = bytearray()
+    def _recv_loop(self, data=None):
+        # Messages are framed in a preallocated receive buffer: the socket
+        # writes into it with recv_into() at "tail" and complete messages
+        # are parsed in place from "head".  The unconsumed tail of the
+        # buffer is moved to the front only when it can no longer hold a
+        # maximum sized message, so each received byte is copied a bounded
+        # number of times regardless of how many messages a read carries.
+        buf = bytearray(_RECV_BUF_SIZE)
+        view = memoryview(buf)
+        head = tail = 0
         count = 0
-        min_read_len = remaining_read_len = ofproto_common.OFP_HEADER_SIZE
+        min_read_len = ofproto_common.OFP_HEADER_SIZE
+
+        # Data already received by another worker which handed the
+        # connection over to this one.
+        if data:
+            tail = len(data)
+            buf[:tail] = data
 
         while self.state != DEAD_DISPATCHER:
-            try:
-                read_len = min_read_len
-                if remaining_read_len > min_read_len:
-                    read_len = remaining_read_len
-                ret = self.socket.recv(read_len)
-            except SocketTimeout:
-                continue
-            except ssl.SSLError:
-                # eventlet throws SSLError (which is a subclass of IOError)
-                # on SSL socket read timeout; re-try the loop in this case.
-                continue
-            except (EOFError, IOError):
-                break
-
-            if not ret:
-                break
-
-            buf += ret
-            buf_len = len(buf)
-            while buf_len >= min_read_len:
-                (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
+            if data:
+                data = None
+            else:
+                try:
+                    ret = self.socket.recv_into(view[tail:])
+                except SocketTimeout:
+                    continue
+                except ssl.SSLError:
+                    # eventlet throws SSLError (which is a subclass of
+                    # IOError) on SSL socket read timeout; re-try the loop
+                    # in this case.
+                    continue
+                except (EOFError, IOError):
+                    break
+
+                if not ret:
+                    break
+
+                tail += ret
+
+            while tail - head >= min_read_len:
+                (version, msg_type, msg_len, xid) = ofproto_parser.header(
+                    buf, head)
                 if msg_len < min_read_len:
                     # Someone isn't playing nicely; log it, and try something sane.
                     LOG.debug("Message with invalid length %s received from switch at address %s",
                               msg_len, self.address)
                     msg_len = min_read_len
-                if buf_len < msg_len:
-                    remaining_read_len = (msg_len - buf_len)
+                if tail - head < msg_len:
                     break
 
                 msg = ofproto_parser.msg(
-                    self, version, msg_type, msg_len, xid, buf[:msg_len])
+                    self, version, msg_type, msg_len, xid, view, head)
                 # LOG.debug('queue msg %s cls %s', msg, msg.__class__)
+                if (msg and
+                        msg_type == self.ofproto.OFPT_FEATURES_REPLY and
+                        shard.handoff(self, msg.datapath_id,
+                                      view[head:tail])):
+                    self._handed_off = True
+                    return
+                if msg and self._barrier_futures:
+                    self._complete_batch(msg)
+                if self.id is not None and shard.is_forwarding():
+                    shard.forward_msg(self, view[head:head + msg_len])
                 if msg:
                     ev = ofp_event.ofp_msg_to_ev(msg)
                     if self.ofp_brick is not None:
                         self.ofp_brick.send_event_to_observers(ev, self.state)
-
-                        def dispatchers(x):
-                            return x.callers[ev.__class__].dispatchers
-
-                        handlers = [handler for handler in
-                                    self.ofp_brick.get_handlers(ev) if
-                                    self.state in dispatchers(handler)]
-                        for handler in handlers:
+                        for handler in self.ofp_brick.get_handlers(
+                                ev, self.state):
                             handler(ev)
 
-                buf = buf[msg_len:]
-                buf_len = len(buf)
-                remaining_read_len = min_read_len
+                head += msg_len
 
                 # We need to schedule other greenlets. Otherwise, ryu
                 # can't accept new switches or handle the existing
@@ -388,12 +520,42 @@ class Datapath(ofproto_protocol.ProtocolDesc):
                     count = 0
                     hub.sleep(0)
 
+            if head == tail:
+                head = tail = 0
+            elif _RECV_BUF_SIZE - head < _OFP_MAX_MSG_LEN:
+                # Move the partially received message to the front.
+                buf[:tail - head] = bytes(view[head:tail])
+                tail -= head
+                head = 0
+
+    def _flush(self, bufs):
+        # Write all the messages dequeued at once with a single system call.
+        buf = bufs[0] if len(bufs) == 1 else b''.join(bufs)
+        self.socket.sendall(buf)
+
+        stats = self.send_stats
+        stats['flushes'] += 1
+        stats['msgs'] += len(bufs)
+        stats['bytes'] += len(buf)
+        stats['last_flush_msgs'] = len(bufs)
+        stats['last_flush_bytes'] = len(buf)
+
     def _send_loop(self):
         try:
             while self.state != DEAD_DISPATCHER:
                 buf, close_socket = self.send_q.get()
                 self._send_q_sem.release()
-                self.socket.sendall(buf)
+                bufs = [buf]
+                # Drain everything which is already queued so that a burst
+                # of messages is coalesced into one write.
+                while not close_socket:
+                    try:
+                        buf, close_socket = self.send_q.get(block=False)
+                    except hub.QueueEmpty:
+                        break
+                    self._send_q_sem.release()
+                    bufs.append(buf)
+                self._flush(bufs)
                 if close_socket:
                     break
         except SocketTimeout:
@@ -420,7 +582,11 @@ class Datapath(ofproto_protocol.ProtocolDesc):
 
     def send(self, buf, close_socket=False):
         msg_enqueued = False
-        self._send_q_sem.acquire()
+        if not self._send_q_sem.acquire(blocking=False):
+            start = time.time()
+            self._send_q_sem.acquire()
+            self.send_stats['blocked'] += 1
+            self.send_stats['blocked_time'] += time.time() - start
         if self.send_q:
             self.send_q.put((buf, close_socket))
             msg_enqueued = True
@@ -445,6 +611,56 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         # LOG.debug('send_msg %s', msg)
         return self.send(msg.buf, close_socket=close_socket)
 
+    def send_batch(self, msgs):
+        """
+        Queues the given messages followed by a barrier request.
+
+        The messages, typically OFPFlowMod, OFPGroupMod and OFPMeterMod,
+        are serialized into one contiguous buffer which is queued as a
+        single entry of the send queue.  XIDs are assigned to the messages
+        whose xid is None.
+
+        Returns a BarrierFuture which is done when the barrier reply or an
+        OFPErrorMsg for one of the messages arrives.
+        """
+        bufs = []
+        xids = set()
+        for msg in msgs:
+            assert isinstance(msg, self.ofproto_parser.MsgBase)
+            if msg.xid is None:
+                self.set_xid(msg)
+            msg.serialize()
+            xids.add(msg.xid)
+            bufs.append(msg.buf)
+        barrier_request = self.ofproto_parser.OFPBarrierRequest(self)
+        self.set_xid(barrier_request)
+        barrier_request.serialize()
+        bufs.append(barrier_request.buf)
+
+        future = BarrierFuture(xids, barrier_request.xid)
+        self._barrier_futures[future.barrier_xid] = future
+        if not self.send(b''.join(bufs)):
+            del self._barrier_futures[future.barrier_xid]
+            future._cancel()
+        return future
+
+    def _complete_batch(self, msg):
+        if msg.msg_type == self.ofproto.OFPT_BARRIER_REPLY:
+            future = self._barrier_futures.pop(msg.xid, None)
+            if future is not None:
+                future._set_reply(msg)
+        elif msg.msg_type == self.ofproto.OFPT_ERROR:
+            for future in self._barrier_futures.values():
+                if msg.xid in future.xids:
+                    future._set_error(msg)
+                    break
+
+    def _cancel_batches(self):
+        futures = self._barrier_futures
+        self._barrier_futures = {}
+        for future in futures.values():
+            future._cancel()
+
     def _echo_request_loop(self):
         if not self.max_unreplied_echo_requests:
             return
@@ -462,22 +678,31 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         except ValueError:
             pass
 
-    def serve(self):
+    def serve(self, data=None):
+        """
+        Serves the connection until the datapath disconnects.
+
+        data is given when the connection is handed over from another
+        worker process (see ryu.controller.shard) and holds the bytes
+        received but not processed yet by that worker.
+        """
         send_thr = hub.spawn(self._send_loop)
 
-        # send hello message immediately
-        hello = self.ofproto_parser.OFPHello(self)
-        self.send_msg(hello)
+        if data is None:
+            # send hello message immediately
+            hello = self.ofproto_parser.OFPHello(self)
+            self.send_msg(hello)
 
         echo_thr = hub.spawn(self._echo_request_loop)
 
         try:
-            self._recv_loop()
+            self._recv_loop(data)
         finally:
             hub.kill(send_thr)
             hub.kill(echo_thr)
             hub.joinall([send_thr, echo_thr])
             self.is_active = False
+            self._cancel_batches()
 
     #
     # Utility methods for convenience
@@ -0,0 +1,465 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Keep a controller side shadow of the flow tables of switches and
+reconcile the switches with it when they reconnect.
+"""
+
+import logging
+import struct
+
+import six
+
+from ryu import utils
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller.handler import set_ev_cls
+from ryu.lib.dpid import dpid_to_str
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_5
+
+LOG = logging.getLogger('ryu.controller.flow_shadow')
+
+# The fields of ofp_flow_mod common to OpenFlow 1.3 or later.
+_FLOW_MOD_PACK_STR = '!QQBBHHHIIIH'
+_FLOW_MOD_COMMAND_OFFSET = 25
+_FLOW_MOD_BUFFER_ID_OFFSET = 32
+
+
+def _bitand(value, mask):
+    return six.binary_type(bytearray(
+        v & m for (v, m) in zip(bytearray(value), bytearray(mask))))
+
+
+def _parse_match(ofproto, buf, offset):
+    """
+    Returns the match fields in the wire format at offset of buf as a
+    dict of OXM number and (value, mask) pairs, and the length of
+    the match including the padding.
+    """
+    (_type, length) = struct.unpack_from('!HH', buf, offset)
+    fields = {}
+    end = offset + length
+    offset += 4
+    while offset < end:
+        (n, value, mask, field_len) = ofproto.oxm_parse(buf, offset)
+        if mask is not None:
+            value = _bitand(value, mask)
+        fields[n] = (value, mask)
+        offset += field_len
+    return fields, utils.round_up(length, 8)
+
+
+def _match_covers(filter_fields, fields):
+    """
+    Returns True if all packets matching fields match filter_fields,
+    i.e. a non-strict flow-mod with filter_fields applies to the entry.
+    """
+    for (n, (fv, fm)) in filter_fields.items():
+        if n not in fields:
+            return False
+        (v, m) = fields[n]
+        if fm is None:
+            if m is not None or v != fv:
+                return False
+        else:
+            if m is not None and _bitand(m, fm) != fm:
+                return False
+            if _bitand(v, fm) != fv:
+                return False
+    return True
+
+
+def _outputs(ofproto, instructions):
+    """
+    Returns the sets of the output ports and the groups of the actions
+    in the given serialized instructions.
+    """
+    ports = set()
+    groups = set()
+    offset = 0
+    while offset < len(instructions):
+        (inst_type, inst_len) = struct.unpack_from('!HH', instructions,
+                                                   offset)
+        if inst_type in (ofproto.OFPIT_WRITE_ACTIONS,
+                         ofproto.OFPIT_APPLY_ACTIONS):
+            act_offset = offset + ofproto.OFP_INSTRUCTION_ACTIONS_SIZE
+            while act_offset < offset + inst_len:
+                (act_type, act_len, arg) = struct.unpack_from(
+                    '!HHI', instructions, act_offset)
+                if act_type == ofproto.OFPAT_OUTPUT:
+                    ports.add(arg)
+                elif act_type == ofproto.OFPAT_GROUP:
+                    groups.add(arg)
+                act_offset += act_len
+        offset += inst_len
+    return ports, groups
+
+
+class FlowEntry(object):
+    """
+    A flow entry in the shadow.
+
+    An instance has the following attributes.
+
+    ============ ==========================================================
+    Attribute    Description
+    ============ ==========================================================
+    table_id     ID of the table
+    priority     Priority level of the flow entry
+    match        Dict of OXM field number and (value, mask) pair in the
+                 wire format.  mask is None for a field without mask.
+    cookie       Opaque controller-issued identifier
+    idle_timeout Idle time before discarding (seconds)
+    hard_timeout Max time before discarding (seconds)
+    flags        Bitmap of OFPFF_* flags
+    instructions Instructions in the wire format
+    ============ ==========================================================
+    """
+
+    def __init__(self, head, match, instructions):
+        (self.cookie, _cookie_mask, self.table_id, _command,
+         self.idle_timeout, self.hard_timeout, self.priority, _buffer_id,
+         _out_port, _out_group, self.flags) = struct.unpack_from(
+            _FLOW_MOD_PACK_STR, head, ofproto_v1_3.OFP_HEADER_SIZE)
+        # The fixed part and the match of an OFPFC_ADD flow-mod
+        self._head = head
+        self.match = match
+        self.instructions = instructions
+
+    @property
+    def key(self):
+        return (self.table_id, self.priority,
+                frozenset(self.match.items()))
+
+    def to_flow_mod(self, datapath):
+        """
+        Returns an OFPFlowMod instance which adds this flow entry.
+        """
+        buf = bytearray(self._head + self.instructions)
+        struct.pack_into('!H', buf, 2, len(buf))
+        msg = ofproto_parser.msg(
+            datapath, datapath.ofproto.OFP_VERSION,
+            datapath.ofproto.OFPT_FLOW_MOD, len(buf), 0,
+            six.binary_type(buf))
+        msg.xid = None
+        return msg
+
+
+class FlowTable(dict):
+    """
+    Shadow of the flow tables of a switch.
+
+    This is a dict of FlowEntry instances keyed by (table_id, priority,
+    match).
+    """
+
+    def __init__(self):
+        super(FlowTable, self).__init__()
+
+    def add(self, entry):
+        self[entry.key] = entry
+
+    def remove(self, key):
+        self.pop(key, None)
+
+    def select(self, ofproto, table_id, match, cookie, cookie_mask,
+               out_port=None, out_group=None, priority=None):
+        """
+        Returns a list of the flow entries a flow-mod with the given
+        values applies to.  If priority is given, the match is strict.
+        """
+        if priority is not None:
+            entry = self.get((table_id, priority,
+                              frozenset(match.items())))
+            entries = [] if entry is None else [entry]
+        else:
+            entries = [e for e in self.values()
+                       if (table_id == ofproto.OFPTT_ALL or
+                           e.table_id == table_id) and
+                       _match_covers(match, e.match)]
+        if cookie_mask:
+            entries = [e for e in entries
+                       if e.cookie & cookie_mask == cookie & cookie_mask]
+        if out_port not in (None, ofproto.OFPP_ANY):
+            entries = [e for e in entries
+                       if out_port in _outputs(ofproto, e.instructions)[0]]
+        if out_group not in (None, ofproto.OFPG_ANY):
+            entries = [e for e in entries
+                       if out_group in _outputs(ofproto, e.instructions)[1]]
+        return entries
+
+
+class EventFlowShadowReconciled(event.EventBase):
+    """
+    An event class to notify that the flow tables of a switch have been
+    reconciled with the shadow after the switch reconnected.
+
+    An instance has the following attributes.
+
+    ========= =================================================================
+    Attribute Description
+    ========= =================================================================
+    dp        A ryu.controller.controller.Datapath instance of the switch
+    added     Number of the flow entries added to the switch
+    modified  Number of the flow entries overwritten in the switch
+    deleted   Number of the flow entries deleted from the switch
+    ========= =================================================================
+    """
+
+    def __init__(self, dp, added, modified, deleted):
+        super(EventFlowShadowReconciled, self).__init__()
+        self.dp = dp
+        self.added = added
+        self.modified = modified
+        self.deleted = deleted
+
+
+class _Reconciliation(object):
+    def __init__(self, datapath, xid):
+        self.datapath = datapath
+        self.xid = xid
+        self.seen = set()
+        self.added = 0
+        self.modified = 0
+        self.deleted = 0
+
+
+class FlowShadow(app_manager.RyuApp):
+    """
+    FlowShadow application keeps a shadow of the flow tables of the
+    switches, OpenFlow 1.3 or later, from the flow-mods sent by
+    send_flow_mod() and the flow-removed messages.
+
+    When a switch which has a shadow reconnects, FlowShadow requests
+    the flow entries of the switch and compares them with the shadow
+    while the multipart replies are streamed in.  Only the differences
+    are sent: flow entries missing in the switch are added and different
+    ones are overwritten.
+    Flow entries with a timeout missing in the switch are forgotten
+    instead of added, since they may have timed out.
+
+    Only the flow entries with cookie & cookie_mask == cookie, the
+    attributes of this application, are reconciled, so that the flow
+    entries installed without FlowShadow can be excluded.  The flow
+    entries of the switch unknown to the shadow are deleted only if
+    cookie_mask is not zero, i.e. if the applications using FlowShadow
+    own a cookie space.  By default, they are left alone, as they can be
+    installed by other applications (e.g. table-miss flow entries).
+
+    EventFlowShadowReconciled is sent to the observers when done.
+
+    Usage Example::
+
+        # ...(snip)...
+        from ryu.controller import flow_shadow
+
+
+        class MyApp(app_manager.RyuApp):
+            _CONTEXTS = {
+                'flow_shadow': flow_shadow.FlowShadow,
+            }
+
+            def __init__(self, *args, **kwargs):
+                super(MyApp, self).__init__(*args, **kwargs)
+                self.flow_shadow = kwargs['flow_shadow']
+
+            def add_flow(self, datapath, priority, match, actions):
+                # ...(snip)...
+                mod = parser.OFPFlowMod(datapath=datapath, priority=priority,
+                                        match=match, instructions=inst)
+                self.flow_shadow.send_flow_mod(datapath, mod)
+    """
+
+    _EVENTS = [EventFlowShadowReconciled]
+
+    def __init__(self, *args, **kwargs):
+        super(FlowShadow, self).__init__(*args, **kwargs)
+        self.name = 'flow_shadow'
+        self.cookie = 0
+        self.cookie_mask = 0
+        self.tables = {}  # datapath_id => FlowTable
+        self._reconciliations = {}  # datapath_id => _Reconciliation
+
+    def get_table(self, dpid):
+        """
+        Returns the FlowTable instance for the given Datapath ID or None.
+        """
+        return self.tables.get(dpid)
+
+    def send_flow_mod(self, datapath, flow_mod):
+        """
+        Sends an OFPFlowMod instance to the switch and records it to the
+        shadow.
+        """
+        datapath.send_msg(flow_mod)
+        self.record_flow_mod(datapath, flow_mod.buf)
+
+    def record_flow_mod(self, datapath, buf):
+        """
+        Records a serialized flow-mod to the shadow.
+        """
+        ofproto = datapath.ofproto
+        assert ofproto.OFP_VERSION >= ofproto_v1_3.OFP_VERSION
+        table = self.tables.setdefault(datapath.id, FlowTable())
+
+        (cookie, cookie_mask, table_id, command, _idle_timeout,
+         _hard_timeout, priority, _buffer_id, out_port, out_group,
+         _flags) = struct.unpack_from(_FLOW_MOD_PACK_STR, buf,
+                                      ofproto.OFP_HEADER_SIZE)
+        match_offset = ofproto.OFP_FLOW_MOD_SIZE - ofproto.OFP_MATCH_SIZE
+        (match, match_len) = _parse_match(ofproto, buf, match_offset)
+        inst_offset = match_offset + match_len
+        instructions = six.binary_type(buf[inst_offset:])
+
+        if command == ofproto.OFPFC_ADD:
+            head = bytearray(buf[:inst_offset])
+            struct.pack_into('!I', head, 4, 0)
+            struct.pack_into('!B', head, _FLOW_MOD_COMMAND_OFFSET,
+                             ofproto.OFPFC_ADD)
+            struct.pack_into('!I', head, _FLOW_MOD_BUFFER_ID_OFFSET,
+                             ofproto.OFP_NO_BUFFER)
+            table.add(FlowEntry(six.binary_type(head), match, instructions))
+            return
+
+        strict = command in (ofproto.OFPFC_MODIFY_STRICT,
+                             ofproto.OFPFC_DELETE_STRICT)
+        if command in (ofproto.OFPFC_MODIFY, ofproto.OFPFC_MODIFY_STRICT):
+            for entry in table.select(ofproto, table_id, match, cookie,
+                                      cookie_mask,
+                                      priority=priority if strict else None):
+                entry.instructions = instructions
+        elif command in (ofproto.OFPFC_DELETE, ofproto.OFPFC_DELETE_STRICT):
+            for entry in table.select(ofproto, table_id, match, cookie,
+                                      cookie_mask, out_port, out_group,
+                                      priority=priority if strict else None):
+                table.remove(entry.key)
+
+    @set_ev_cls(ofp_event.EventOFPFlowRemoved, handler.MAIN_DISPATCHER)
+    def flow_removed_handler(self, ev):
+        msg = ev.msg
+        datapath = msg.datapath
+        table = self.tables.get(datapath.id)
+        if table is None:
+            return
+        buf = bytearray()
+        msg.match.serialize(buf, 0)
+        (match, _match_len) = _parse_match(datapath.ofproto, buf, 0)
+        table.remove((msg.table_id, msg.priority, frozenset(match.items())))
+
+    @set_ev_cls(ofp_event.EventOFPStateChange,
+                [handler.MAIN_DISPATCHER, handler.DEAD_DISPATCHER])
+    def state_change_handler(self, ev):
+        datapath = ev.datapath
+        if ev.state == handler.DEAD_DISPATCHER:
+            reconciliation = self._reconciliations.get(datapath.id)
+            if (reconciliation is not None and
+                    reconciliation.datapath is datapath):
+                del self._reconciliations[datapath.id]
+            return
+        if datapath.id not in self.tables:
+            return
+
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        if ofproto.OFP_VERSION >= ofproto_v1_5.OFP_VERSION:
+            req_cls = parser.OFPFlowDescStatsRequest
+        else:
+            req_cls = parser.OFPFlowStatsRequest
+        req = req_cls(datapath, 0, ofproto.OFPTT_ALL, ofproto.OFPP_ANY,
+                      ofproto.OFPG_ANY, self.cookie, self.cookie_mask,
+                      parser.OFPMatch())
+        datapath.set_xid(req)
+        self._reconciliations[datapath.id] = _Reconciliation(datapath,
+                                                             req.xid)
+        LOG.debug('FLOW_SHADOW: reconciling datapath %s',
+                  dpid_to_str(datapath.id))
+        datapath.send_msg(req)
+
+    @set_ev_cls([ofp_event.EventOFPFlowStatsReply,
+                 ofp_event.EventOFPFlowDescStatsReply],
+                handler.MAIN_DISPATCHER)
+    def flow_stats_reply_handler(self, ev):
+        msg = ev.msg
+        datapath = msg.datapath
+        reconciliation = self._reconciliations.get(datapath.id)
+        if (reconciliation is None or reconciliation.datapath is not datapath
+                or reconciliation.xid != msg.xid):
+            return
+
+        ofproto = datapath.ofproto
+        table = self.tables[datapath.id]
+        msgs = []
+        for stats in msg.body:
+            buf = bytearray()
+            stats.match.serialize(buf, 0)
+            (match, _match_len) = _parse_match(ofproto, buf, 0)
+            key = (stats.table_id, stats.priority, frozenset(match.items()))
+            reconciliation.seen.add(key)
+            entry = table.get(key)
+            if entry is None:
+                if not self.cookie_mask:
+                    # Not in the cookie space of FlowShadow
+                    continue
+                msgs.append(datapath.ofproto_parser.OFPFlowMod(
+                    datapath, table_id=stats.table_id,
+                    command=ofproto.OFPFC_DELETE_STRICT,
+                    priority=stats.priority, out_port=ofproto.OFPP_ANY,
+                    out_group=ofproto.OFPG_ANY, match=stats.match))
+                reconciliation.deleted += 1
+                continue
+            buf = bytearray()
+            for inst in stats.instructions:
+                inst.serialize(buf, len(buf))
+            if (entry.cookie != stats.cookie or
+                    entry.idle_timeout != stats.idle_timeout or
+                    entry.hard_timeout != stats.hard_timeout or
+                    entry.instructions != six.binary_type(buf)):
+                msgs.append(entry.to_flow_mod(datapath))
+                reconciliation.modified += 1
+
+        if not msg.flags & ofproto.OFPMPF_REPLY_MORE:
+            del self._reconciliations[datapath.id]
+            for (key, entry) in list(table.items()):
+                if key in reconciliation.seen:
+                    continue
+                if (self.cookie_mask and
+                        entry.cookie & self.cookie_mask !=
+                        self.cookie & self.cookie_mask):
+                    continue
+                if entry.idle_timeout or entry.hard_timeout:
+                    table.remove(key)
+                    continue
+                msgs.append(entry.to_flow_mod(datapath))
+                reconciliation.added += 1
+
+        if msgs:
+            datapath.send_batch(msgs)
+
+        if not msg.flags & ofproto.OFPMPF_REPLY_MORE:
+            LOG.info('FLOW_SHADOW: datapath %s reconciled: '
+                     'added %d, modified %d, deleted %d',
+                     dpid_to_str(datapath.id), reconciliation.added,
+                     reconciliation.modified, reconciliation.deleted)
+            self.send_event_to_observers(EventFlowShadowReconciled(
+                datapath, reconciliation.added, reconciliation.modified,
+                reconciliation.deleted))
+
+
+handler.register_service('ryu.controller.flow_shadow')
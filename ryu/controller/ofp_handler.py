@@ -56,6 +56,7 @@ class OFPHandler(ryu.base.app_manager.RyuApp):
 
     def start(self):
         super(OFPHandler, self).start()
+        ofproto_parser.set_lazy_decode(self.CONF.ofp_lazy_decode)
         self.controller = OpenFlowController()
         return hub.spawn(self.controller)
 
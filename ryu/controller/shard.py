@@ -0,0 +1,419 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Multi-process OpenFlow controller.
+
+When ryu-manager is started with ``--ofp-workers N`` (N > 1), it forks
+N worker processes before instantiating Ryu applications.
+
+- Every worker listens on the OpenFlow ports.  The listen sockets are
+  opened with SO_REUSEPORT, so the kernel spreads new connections among
+  the workers.
+- Datapaths are pinned to workers by datapath ID (``dpid % N``).  When a
+  worker receives the features reply of a datapath owned by another
+  worker, it hands the connection (the file descriptor and the bytes
+  received so far) over to the owner, which carries on the handshake.
+- Applications declare with ``RyuApp.OFP_SHARDING`` whether they are
+  shard-local (the default: instantiated in every worker and seeing the
+  datapaths of that worker only) or need a global view.  Global
+  applications are instantiated in worker 0 only.  The other workers
+  forward the state changes of and the messages from their datapaths to
+  worker 0, where they are delivered to the global applications with a
+  RemoteDatapath, whose send_msg() forwards the message back to the
+  owner of the datapath.
+- The workers talk to each other over Unix domain datagram sockets
+  created before forking.
+
+Connections over TLS can't be handed over and stay in the worker which
+accepted them.
+"""
+
+import contextlib
+import logging
+import os
+import pickle
+import random
+import signal
+import socket
+import ssl
+import struct
+
+from ryu import cfg
+from ryu.lib import hub
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+
+import ryu.base.app_manager
+from ryu.controller import ofp_event
+from ryu.controller.handler import CONFIG_DISPATCHER, DEAD_DISPATCHER
+
+LOG = logging.getLogger('ryu.controller.shard')
+
+CONF = cfg.CONF
+CONF.register_cli_opts([
+    cfg.IntOpt('ofp-workers', default=1, min=1,
+               help='number of worker processes which share OpenFlow '
+                    'datapaths (default 1)'),
+])
+
+SHARD_LOCAL = 'local'
+SHARD_GLOBAL = 'global'
+
+# Message types exchanged between the workers
+_MSG_DATAPATH = 'datapath'  # hand over a connection to its owner
+_MSG_STATE = 'state'        # state change of a datapath, to worker 0
+_MSG_OFP = 'ofp'            # message from a datapath, to worker 0
+_MSG_SEND = 'send'          # message to a datapath, to its owner
+
+# Large enough for a maximum sized OpenFlow message or for the receive
+# buffer handed over with a connection.
+_CHANNEL_BUF_SIZE = 4 * 0x10000
+
+_worker_index = 0
+_worker_count = 1
+_channels = []      # sending end of the channel to each worker
+_inbox = None       # receiving end of the channel to this worker
+_children = []      # pids of the workers forked by worker 0
+_forwarding = False
+_global_apps = set()
+
+# Datapaths of this worker known to worker 0, keyed by datapath ID
+_local_datapaths = {}
+# Datapaths of the other workers, in worker 0 only
+_remote_datapaths = {}
+
+
+def worker_index():
+    """
+    Returns the index of this worker process.  0 is the main process.
+    """
+    return _worker_index
+
+
+def worker_count():
+    """
+    Returns the number of worker processes.
+    """
+    return _worker_count
+
+
+def owner(dpid):
+    """
+    Returns the index of the worker which serves the given datapath.
+    """
+    return dpid % _worker_count
+
+
+def app_scope(app):
+    """
+    Returns SHARD_LOCAL or SHARD_GLOBAL for the given RyuApp class or
+    instance.
+    """
+    return getattr(app, 'OFP_SHARDING', SHARD_LOCAL)
+
+
+def is_app_runnable(app_cls):
+    """
+    Returns True if the given RyuApp class should be instantiated in this
+    worker.
+    """
+    return _worker_index == 0 or app_scope(app_cls) != SHARD_GLOBAL
+
+
+def fork_workers(count):
+    """
+    Forks count - 1 worker processes and returns the index of the calling
+    process among them.
+
+    This must be called before any thread is spawned.
+    """
+    global _worker_index, _worker_count, _channels, _inbox
+
+    if count <= 1:
+        return _worker_index
+
+    pairs = [socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+             for _ in range(count)]
+    index = 0
+    for i in range(1, count):
+        pid = hub.fork()
+        if pid == 0:
+            index = i
+            del _children[:]
+            break
+        _children.append(pid)
+
+    _worker_index = index
+    _worker_count = count
+    _channels = [send_sock for _recv_sock, send_sock in pairs]
+    for i, (recv_sock, _send_sock) in enumerate(pairs):
+        if i == index:
+            _inbox = recv_sock
+        else:
+            recv_sock.close()
+    LOG.info('OpenFlow worker %d/%d started (pid %d)',
+             index, count, os.getpid())
+    return index
+
+
+def stop_workers():
+    """
+    Terminates the worker processes forked by this process.
+    """
+    for pid in _children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+    del _children[:]
+
+
+def start(app_clses, apps):
+    """
+    Starts serving the channel from the other workers.
+
+    app_clses is the list of the loaded RyuApp classes and apps is the
+    list of the RyuApp instances of this worker.
+    """
+    global _forwarding
+
+    if _worker_count <= 1:
+        return None
+
+    _global_apps.clear()
+    _global_apps.update(app.name for app in apps
+                        if app_scope(app) == SHARD_GLOBAL)
+    _forwarding = (_worker_index != 0 and
+                   any(app_scope(cls) == SHARD_GLOBAL for cls in app_clses))
+    return hub.spawn(_serve_inbox)
+
+
+def _send(index, msg, fds=None):
+    data = pickle.dumps(msg, pickle.HIGHEST_PROTOCOL)
+    ancdata = []
+    if fds:
+        ancdata = [(socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                    struct.pack('%di' % len(fds), *fds))]
+    sock = _channels[index]
+    while True:
+        try:
+            sock.sendmsg([data], ancdata)
+            return True
+        except (BlockingIOError, InterruptedError):
+            hub.wait_write(sock.fileno())
+        except socket.error as e:
+            LOG.error('Failed to send %s to worker %d: %s', msg[0], index, e)
+            return False
+
+
+def _recv():
+    fd_size = struct.calcsize('i')
+    while True:
+        try:
+            data, ancdata, _flags, _addr = _inbox.recvmsg(
+                _CHANNEL_BUF_SIZE, socket.CMSG_SPACE(fd_size))
+            break
+        except (BlockingIOError, InterruptedError):
+            hub.wait_read(_inbox.fileno())
+
+    fds = []
+    for level, type_, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+            n = len(cmsg_data) // fd_size
+            fds.extend(struct.unpack('%di' % n, cmsg_data[:n * fd_size]))
+    return pickle.loads(data), fds
+
+
+def _serve_inbox():
+    handlers = {
+        _MSG_DATAPATH: _handle_datapath,
+        _MSG_STATE: _handle_state,
+        _MSG_OFP: _handle_ofp,
+        _MSG_SEND: _handle_send,
+    }
+    while True:
+        msg, fds = _recv()
+        try:
+            handlers[msg[0]](fds, *msg[1:])
+        except Exception:
+            LOG.exception('Error while handling %s from another worker',
+                          msg[0])
+
+
+#
+# Hand over of connections
+#
+def handoff(datapath, dpid, data):
+    """
+    Hands the connection to the given datapath over to its owner if it
+    is not served by this worker.
+
+    data is the content of the receive buffer, starting at the features
+    reply.  Returns True if the connection has been handed over, in which
+    case the caller must stop serving it without closing the connection.
+    """
+    if _worker_count <= 1:
+        return False
+    index = owner(dpid)
+    if index == _worker_index:
+        return False
+    if isinstance(datapath.socket, ssl.SSLSocket):
+        LOG.warning('datapath %016x over TLS stays in worker %d instead of '
+                    'worker %d', dpid, _worker_index, index)
+        return False
+
+    msg = (_MSG_DATAPATH, int(datapath.socket.family),
+           datapath.ofproto.OFP_VERSION, datapath.address, bytes(data))
+    if not _send(index, msg, fds=[datapath.socket.fileno()]):
+        return False
+    LOG.debug('datapath %016x handed over to worker %d', dpid, index)
+    return True
+
+
+def _handle_datapath(fds, family, version, address, data):
+    sock = socket.socket(family, socket.SOCK_STREAM, fileno=fds[0])
+    hub.spawn(_serve_datapath, sock, address, version, data)
+
+
+def _serve_datapath(sock, address, version, data):
+    # Imported here to avoid circular import.
+    from ryu.controller import controller
+
+    with contextlib.closing(controller.Datapath(sock, address)) as datapath:
+        datapath.set_version(version)
+        datapath.set_state(CONFIG_DISPATCHER)
+        try:
+            datapath.serve(data)
+        except:
+            LOG.error('Error in the datapath from %s', address)
+            raise
+
+
+#
+# Forwarding to global applications
+#
+def is_forwarding():
+    """
+    Returns True if the datapaths of this worker must be reported to the
+    global applications in worker 0.
+    """
+    return _forwarding
+
+
+def forward_state(datapath, state):
+    """
+    Reports a state change of a datapath of this worker to worker 0.
+    """
+    if state == DEAD_DISPATCHER:
+        _local_datapaths.pop(datapath.id, None)
+    else:
+        _local_datapaths[datapath.id] = datapath
+    _send(0, (_MSG_STATE, datapath.id, datapath.ofproto.OFP_VERSION,
+              datapath.address, state))
+
+
+def forward_msg(datapath, buf):
+    """
+    Forwards a message received from a datapath of this worker to
+    worker 0.
+    """
+    _send(0, (_MSG_OFP, datapath.id, bytes(buf)))
+
+
+def _send_to_global_apps(ev, state):
+    brick = ryu.base.app_manager.lookup_service_brick('ofp_event')
+    if brick is None:
+        return
+    for name in brick.get_observers(ev, state):
+        if name in _global_apps:
+            brick.send_event(name, ev, state)
+
+
+def _handle_state(_fds, dpid, version, address, state):
+    datapath = _remote_datapaths.get(dpid)
+    if datapath is None:
+        if state == DEAD_DISPATCHER:
+            return
+        datapath = RemoteDatapath(dpid, version, address, owner(dpid))
+        _remote_datapaths[dpid] = datapath
+    datapath.state = state
+    if state == DEAD_DISPATCHER:
+        del _remote_datapaths[dpid]
+        datapath.is_active = False
+
+    ev = ofp_event.EventOFPStateChange(datapath)
+    ev.state = state
+    _send_to_global_apps(ev, state)
+
+
+def _handle_ofp(_fds, dpid, buf):
+    datapath = _remote_datapaths.get(dpid)
+    if datapath is None:
+        return
+    (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
+    msg = ofproto_parser.msg(datapath, version, msg_type, msg_len, xid, buf)
+    if msg:
+        _send_to_global_apps(ofp_event.ofp_msg_to_ev(msg), datapath.state)
+
+
+def _handle_send(_fds, dpid, buf):
+    datapath = _local_datapaths.get(dpid)
+    if datapath is None:
+        LOG.debug('datapath %016x is gone; message from worker 0 dropped',
+                  dpid)
+        return
+    datapath.send(buf)
+
+
+class RemoteDatapath(ofproto_protocol.ProtocolDesc):
+    """
+    A datapath served by another worker process, as seen by the global
+    applications in worker 0.
+
+    It provides the subset of the attributes and methods of
+    ryu.controller.controller.Datapath which makes sense across
+    processes: id, address, state, is_active, ofproto, ofproto_parser,
+    set_xid, send_msg and send_barrier.
+    """
+
+    def __init__(self, dpid, version, address, worker):
+        super(RemoteDatapath, self).__init__(version)
+        self.id = dpid
+        self.address = address
+        self.worker = worker
+        self.state = None
+        self.is_active = True
+        self.xid = random.randint(0, self.ofproto.MAX_XID)
+
+    def send(self, buf, close_socket=False):
+        return _send(self.worker, (_MSG_SEND, self.id, bytes(buf)))
+
+    def set_xid(self, msg):
+        self.xid += 1
+        self.xid &= self.ofproto.MAX_XID
+        msg.set_xid(self.xid)
+        return self.xid
+
+    def send_msg(self, msg, close_socket=False):
+        assert isinstance(msg, self.ofproto_parser.MsgBase)
+        if msg.xid is None:
+            self.set_xid(msg)
+        msg.serialize()
+        return self.send(msg.buf)
+
+    def send_barrier(self):
+        barrier_request = self.ofproto_parser.OFPBarrierRequest(self)
+        return self.send_msg(barrier_request)
@@ -55,6 +55,7 @@ from ryu.lib.packet import ipv4
 from ryu.lib.packet import udp
 from ryu.lib.packet import bfd
 from ryu.lib.packet import arp
+from ryu.lib.packet import packet_template
 from ryu.lib.packet.arp import ARP_REQUEST, ARP_REPLY
 
 LOG = logging.getLogger(__name__)
@@ -182,6 +183,9 @@ class BFDSession(object):
         self.ipv4_id = random.randint(0, UINT16_MAX)
         self.src_port = src_port
         self.dst_port = BFD_CONTROL_UDP_PORT
+        # Ethernet/IPv4/UDP headers of the BFD Control packets, serialized
+        # at the first transmission.
+        self._packet_template = None
 
         if dst_mac == "FF:FF:FF:FF:FF:FF" or dst_ip == "255.255.255.255":
             self._remote_addr_config = False
@@ -483,17 +487,30 @@ class BFDSession(object):
         dst_port = self.dst_port
 
         # Construct BFD Control packet
-        data = BFDPacket.bfd_packet(
-            src_mac=src_mac, dst_mac=dst_mac,
-            src_ip=src_ip, dst_ip=dst_ip, ipv4_id=ipv4_id,
-            src_port=src_port, dst_port=dst_port,
-            diag=diag, state=state, flags=flags, detect_mult=detect_mult,
+        bfd_pkt = bfd.bfd(
+            ver=1, diag=diag, state=state, flags=flags,
+            detect_mult=detect_mult,
             my_discr=my_discr, your_discr=your_discr,
             desired_min_tx_interval=desired_min_tx_interval,
             required_min_rx_interval=required_min_rx_interval,
             required_min_echo_rx_interval=required_min_echo_rx_interval,
             auth_cls=auth_cls)
 
+        template = self._packet_template
+        if template is None:
+            template = self._packet_template = \
+                packet_template.PacketTemplate(BFDPacket.bfd_headers(
+                    src_mac=src_mac, dst_mac=dst_mac,
+                    src_ip=src_ip, dst_ip=dst_ip, ipv4_id=ipv4_id,
+                    src_port=src_port, dst_port=dst_port))
+        else:
+            # The remote address may have been learned.
+            template.set_eth_dst(dst_mac)
+            template.set_ip_dst(dst_ip)
+            template.set_ip_id(ipv4_id)
+        template.set_payload(bfd_pkt.serialize(None, None))
+        data = six.binary_type(template.data)
+
         # Prepare for a datapath
         datapath = self.datapath
         ofproto = datapath.ofproto
@@ -531,6 +548,29 @@ class BFDPacket(object):
         """
         Generate BFD packet with Ethernet/IPv4/UDP encapsulated.
         """
+        pkt = BFDPacket.bfd_headers(src_mac, dst_mac, src_ip, dst_ip,
+                                    ipv4_id, src_port, dst_port)
+
+        # BFD payload
+        bfd_pkt = bfd.bfd(
+            ver=1, diag=diag, state=state, flags=flags,
+            detect_mult=detect_mult,
+            my_discr=my_discr, your_discr=your_discr,
+            desired_min_tx_interval=desired_min_tx_interval,
+            required_min_rx_interval=required_min_rx_interval,
+            required_min_echo_rx_interval=required_min_echo_rx_interval,
+            auth_cls=auth_cls)
+        pkt.add_protocol(bfd_pkt)
+
+        pkt.serialize()
+        return pkt.data
+
+    @staticmethod
+    def bfd_headers(src_mac, dst_mac, src_ip, dst_ip, ipv4_id,
+                    src_port, dst_port):
+        """
+        Generate Ethernet/IPv4/UDP headers of BFD packet.
+        """
         # Generate ethernet header first.
         pkt = packet.Packet()
         eth_pkt = ethernet.ethernet(dst_mac, src_mac, ETH_TYPE_IP)
@@ -546,20 +586,7 @@ class BFDPacket(object):
         # UDP encapsulation
         udp_pkt = udp.udp(src_port=src_port, dst_port=dst_port)
         pkt.add_protocol(udp_pkt)
-
-        # BFD payload
-        bfd_pkt = bfd.bfd(
-            ver=1, diag=diag, state=state, flags=flags,
-            detect_mult=detect_mult,
-            my_discr=my_discr, your_discr=your_discr,
-            desired_min_tx_interval=desired_min_tx_interval,
-            required_min_rx_interval=required_min_rx_interval,
-            required_min_echo_rx_interval=required_min_echo_rx_interval,
-            auth_cls=auth_cls)
-        pkt.add_protocol(bfd_pkt)
-
-        pkt.serialize()
-        return pkt.data
+        return pkt
 
     @staticmethod
     def bfd_parse(data):
@@ -21,7 +21,8 @@ from ryu.lib import ip
 
 # We don't bother to use cfg.py because monkey patch needs to be
 # called very early. Instead, we use an environment variable to
-# select the type of hub.
+# select the type of hub: "eventlet" (default), "asyncio" or "uvloop"
+# (asyncio with the uvloop event loop).
 HUB_TYPE = os.getenv('RYU_HUB_TYPE', 'eventlet')
 
 LOG = logging.getLogger('ryu.lib.hub')
@@ -33,6 +34,7 @@ if HUB_TYPE == 'eventlet':
     # https://github.com/eventlet/eventlet/issues/401
     eventlet.sleep()
     import eventlet.event
+    import eventlet.hubs
     import eventlet.queue
     import eventlet.semaphore
     import eventlet.timeout
@@ -104,6 +106,19 @@ if HUB_TYPE == 'eventlet':
             except TaskExit:
                 pass
 
+    def fork():
+        pid = os.fork()
+        if pid == 0:
+            # The child must not share the poller of the parent's hub.
+            eventlet.hubs.use_hub()
+        return pid
+
+    def wait_read(fileno, timeout=None):
+        eventlet.hubs.trampoline(fileno, read=True, timeout=timeout)
+
+    def wait_write(fileno, timeout=None):
+        eventlet.hubs.trampoline(fileno, write=True, timeout=timeout)
+
     Queue = eventlet.queue.LightQueue
     QueueEmpty = eventlet.queue.Empty
     Semaphore = eventlet.semaphore.Semaphore
@@ -198,6 +213,10 @@ if HUB_TYPE == 'eventlet':
 
     WebSocketWSGI = websocket.WebSocketWSGI
 
+    # XXX: Eventlet API should not be used directly.
+    # https://github.com/benoitc/gunicorn/pull/2581
+    ALREADY_HANDLED = getattr(eventlet.wsgi, "ALREADY_HANDLED", None)
+
     Timeout = eventlet.timeout.Timeout
 
     class Event(object):
@@ -237,3 +256,37 @@ if HUB_TYPE == 'eventlet':
                     pass
 
             return self._cond
+
+elif HUB_TYPE in ('asyncio', 'uvloop'):
+    import socket
+
+    from ryu.lib import hub_asyncio
+
+    getcurrent = hub_asyncio.getcurrent
+    patch = hub_asyncio.patch
+    sleep = hub_asyncio.sleep
+    listen = hub_asyncio.listen
+    connect = hub_asyncio.connect
+    spawn = hub_asyncio.spawn
+    spawn_after = hub_asyncio.spawn_after
+    kill = hub_asyncio.kill
+    joinall = hub_asyncio.joinall
+    fork = hub_asyncio.fork
+    wait_read = hub_asyncio.wait_read
+    wait_write = hub_asyncio.wait_write
+
+    Queue = hub_asyncio.Queue
+    QueueEmpty = hub_asyncio.QueueEmpty
+    Semaphore = hub_asyncio.Semaphore
+    BoundedSemaphore = hub_asyncio.BoundedSemaphore
+    TaskExit = hub_asyncio.TaskExit
+
+    StreamServer = hub_asyncio.StreamServer
+    StreamClient = hub_asyncio.StreamClient
+    LoggingWrapper = hub_asyncio.LoggingWrapper
+    WSGIServer = hub_asyncio.WSGIServer
+    WebSocketWSGI = hub_asyncio.WebSocketWSGI
+    ALREADY_HANDLED = hub_asyncio.ALREADY_HANDLED
+
+    Timeout = hub_asyncio.Timeout
+    Event = hub_asyncio.Event
@@ -0,0 +1,1168 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+asyncio backend of ryu.lib.hub
+
+This module is used by ryu.lib.hub when RYU_HUB_TYPE is "asyncio" or
+"uvloop"; applications should not import it directly.
+
+Ryu applications are written in a blocking style, so green threads are
+still greenlets here.  Each OS thread has one hub greenlet which runs an
+asyncio event loop (a uvloop loop for "uvloop").  A green thread which
+blocks registers a callback (a timer, a file descriptor watch or a wake
+up from another green thread) on the loop and switches to the hub; the
+callback switches back to it.  No monkey patching is done unless patch()
+is called, which replaces only socket.socket, select.select, time.sleep
+and the socket class used by ssl.SSLContext.
+"""
+
+import asyncio
+import base64
+import collections
+import errno
+import hashlib
+import logging
+import os
+import select
+import socket
+import ssl
+import struct
+import threading
+import time
+import traceback
+from wsgiref import handlers as wsgi_handlers
+from wsgiref import simple_server
+
+import greenlet
+import six
+
+from ryu.lib import ip
+
+
+LOG = logging.getLogger('ryu.lib.hub')
+
+USE_UVLOOP = os.getenv('RYU_HUB_TYPE') == 'uvloop'
+
+_original_socket = socket.socket
+_original_select = select.select
+
+_local = threading.local()
+# Hubs which were running when the process forked. They are kept
+# referenced so that their greenlets are never collected (and so never
+# resumed) in the child.
+_abandoned_hubs = []
+
+getcurrent = greenlet.getcurrent
+TaskExit = greenlet.GreenletExit
+
+
+class _Hub(object):
+    def __init__(self):
+        if USE_UVLOOP:
+            import uvloop
+            self.loop = uvloop.new_event_loop()
+        else:
+            self.loop = asyncio.new_event_loop()
+        self.thread_id = threading.get_ident()
+        root = getcurrent()
+        while root.parent is not None:
+            root = root.parent
+        self.greenlet = greenlet.greenlet(self._run, parent=root)
+        # (fd, read) -> _Waiter of the green thread waiting on it
+        self.fd_waiters = {}
+
+    def _run(self):
+        while True:
+            self.loop.run_forever()
+
+    def switch(self):
+        if getcurrent() is self.greenlet:
+            raise RuntimeError('Cannot block in the hub')
+        return self.greenlet.switch()
+
+    def call_soon(self, callback, *args):
+        if threading.get_ident() == self.thread_id:
+            return self.loop.call_soon(callback, *args)
+        return self.loop.call_soon_threadsafe(callback, *args)
+
+
+def _get_hub():
+    hub = getattr(_local, 'hub', None)
+    if hub is None or hub.greenlet.dead:
+        hub = _local.hub = _Hub()
+    return hub
+
+
+class _Waiter(object):
+    """One blocking operation of a green thread.
+
+    switch() and throw() are called from the hub, and only the first of
+    them resumes the green thread; later ones are no-ops, which makes
+    stale timers and wake ups harmless.
+    """
+
+    __slots__ = ('hub', 'greenlet', 'woken')
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.greenlet = getcurrent()
+        self.woken = False
+
+    def switch(self, value=None):
+        g = self.greenlet
+        if g is not None:
+            self.greenlet = None
+            g.switch(value)
+
+    def throw(self, exc):
+        g = self.greenlet
+        if g is not None:
+            self.greenlet = None
+            g.throw(exc)
+
+    def wake(self):
+        self.woken = True
+        self.hub.call_soon(self.switch, True)
+
+    def wait(self, timeout=None):
+        """Switches to the hub until woken up.
+
+        Returns False if the timeout expired.
+        """
+        timer = None
+        if timeout is not None:
+            timer = self.hub.loop.call_later(max(timeout, 0),
+                                             self.switch, False)
+        try:
+            return self.hub.switch()
+        finally:
+            self.greenlet = None
+            if timer is not None:
+                timer.cancel()
+
+
+def _wake_one(waiters):
+    while waiters:
+        waiter = waiters.popleft()
+        if waiter.greenlet is not None and not waiter.woken:
+            waiter.wake()
+            return True
+    return False
+
+
+def _block(waiters, deadline):
+    """Waits on the given queue of waiters until woken up.
+
+    Returns False if the deadline (in time.monotonic()) passed.
+    """
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            return False
+    waiter = _Waiter(_get_hub())
+    waiters.append(waiter)
+    woken = False
+    try:
+        woken = waiter.wait(timeout)
+        return woken
+    finally:
+        if not woken:
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+            if waiter.woken:
+                # Pass the wake up which was not consumed to the next one.
+                _wake_one(waiters)
+
+
+def _deadline(timeout):
+    if timeout is None:
+        return None
+    return time.monotonic() + timeout
+
+
+class GreenThread(greenlet.greenlet):
+    def __init__(self, hub, func, args, kwargs):
+        greenlet.greenlet.__init__(self, parent=hub.greenlet)
+        self._hub = hub
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._killed = False
+        self._result = None
+        self._exc = None
+        self._observers = []
+        self._links = []
+        self._start_handle = None
+
+    def run(self):
+        try:
+            if self._killed:
+                raise TaskExit()
+            self._result = self._func(*self._args, **self._kwargs)
+        except BaseException as e:
+            self._exc = e
+        finally:
+            self._func = self._args = self._kwargs = None
+            self._start_handle = None
+            observers, self._observers = self._observers, None
+            for waiter in observers:
+                waiter.wake()
+            links, self._links = self._links, None
+            for func, args, kwargs in links:
+                try:
+                    func(self, *args, **kwargs)
+                except Exception:
+                    LOG.error('hub: uncaught exception in link: %s',
+                              traceback.format_exc())
+
+    def link(self, func, *curried_args, **curried_kwargs):
+        """Calls func(thread, *curried_args, **curried_kwargs) on exit."""
+        if self._links is None:
+            func(self, *curried_args, **curried_kwargs)
+        else:
+            self._links.append((func, curried_args, curried_kwargs))
+
+    def unlink(self, func, *curried_args, **curried_kwargs):
+        if self._links:
+            try:
+                self._links.remove((func, curried_args, curried_kwargs))
+                return True
+            except ValueError:
+                pass
+        return False
+
+    def wait(self):
+        if self._observers is not None:
+            waiter = _Waiter(_get_hub())
+            self._observers.append(waiter)
+            try:
+                waiter.wait()
+            finally:
+                if self._observers is not None and \
+                        waiter in self._observers:
+                    self._observers.remove(waiter)
+        if self._exc is not None:
+            raise self._exc
+        return self._result
+
+    def kill(self, *throw_args):
+        if self.dead:
+            return
+        if not self:
+            # Not started yet; start it right now only to exit.
+            if not self._killed:
+                self._killed = True
+                if self._start_handle is not None:
+                    self._start_handle.cancel()
+                self._start_handle = self._hub.call_soon(self.switch)
+            return
+        throw_args = throw_args or (TaskExit,)
+        current = getcurrent()
+        if current is self:
+            raise throw_args[0]
+        hub = self._hub
+        if current is hub.greenlet:
+            self.throw(*throw_args)
+            return
+        # Run the victim until it exits or blocks, then come back.
+        waiter = _Waiter(hub)
+        handle = hub.loop.call_soon(waiter.switch)
+        try:
+            self.throw(*throw_args)
+        finally:
+            waiter.greenlet = None
+            handle.cancel()
+
+    def cancel(self, *throw_args):
+        """Kills the thread only if it has not started running yet."""
+        if not self:
+            self.kill(*throw_args)
+
+
+def _spawn(seconds, func, args, kwargs):
+    hub = _get_hub()
+    thread = GreenThread(hub, func, args, kwargs)
+    if seconds:
+        thread._start_handle = hub.loop.call_later(seconds, thread.switch)
+    else:
+        thread._start_handle = hub.call_soon(thread.switch)
+    return thread
+
+
+def _launcher(raise_error):
+    def _launch(func, *args, **kwargs):
+        # Mimic gevent's default raise_error=False behaviour
+        # by not propagating an exception to the joiner.
+        try:
+            return func(*args, **kwargs)
+        except TaskExit:
+            pass
+        except BaseException as e:
+            if raise_error:
+                raise e
+            # Log uncaught exception.
+            # Note: this is an intentional divergence from gevent
+            # behaviour; gevent silently ignores such exceptions.
+            LOG.error('hub: uncaught exception: %s',
+                      traceback.format_exc())
+    return _launch
+
+
+def spawn(*args, **kwargs):
+    raise_error = kwargs.pop('raise_error', False)
+    return _spawn(0, _launcher(raise_error), args, kwargs)
+
+
+def spawn_after(seconds, *args, **kwargs):
+    raise_error = kwargs.pop('raise_error', False)
+    return _spawn(seconds, _launcher(raise_error), args, kwargs)
+
+
+def kill(thread):
+    thread.kill()
+
+
+def joinall(threads):
+    for t in threads:
+        # This try-except is necessary when killing an inactive
+        # greenthread.
+        try:
+            t.wait()
+        except TaskExit:
+            pass
+
+
+def sleep(seconds=0):
+    hub = _get_hub()
+    waiter = _Waiter(hub)
+    if seconds > 0:
+        handle = hub.loop.call_later(seconds, waiter.switch)
+    else:
+        handle = hub.loop.call_soon(waiter.switch)
+    try:
+        hub.switch()
+    finally:
+        waiter.greenlet = None
+        handle.cancel()
+
+
+def fork():
+    pid = os.fork()
+    if pid == 0:
+        # The child must not share the poller of the parent's hub.
+        hub = getattr(_local, 'hub', None)
+        if hub is not None:
+            _abandoned_hubs.append(hub)
+            del _local.hub
+        asyncio.events._set_running_loop(None)
+    return pid
+
+
+def _wait_fd(fileno, read, timeout=None):
+    hub = _get_hub()
+    waiter = _Waiter(hub)
+    key = (fileno, read)
+    if read:
+        hub.loop.add_reader(fileno, waiter.switch, True)
+    else:
+        hub.loop.add_writer(fileno, waiter.switch, True)
+    hub.fd_waiters[key] = waiter
+    try:
+        if not waiter.wait(timeout):
+            raise socket.timeout('timed out')
+    finally:
+        if hub.fd_waiters.get(key) is waiter:
+            del hub.fd_waiters[key]
+            if read:
+                hub.loop.remove_reader(fileno)
+            else:
+                hub.loop.remove_writer(fileno)
+
+
+def wait_read(fileno, timeout=None):
+    _wait_fd(fileno, True, timeout)
+
+
+def wait_write(fileno, timeout=None):
+    _wait_fd(fileno, False, timeout)
+
+
+def _notify_close(fileno):
+    # Stop watching a file descriptor being closed, as the number may be
+    # reused soon. Like eventlet, green threads waiting on it are not
+    # woken up.
+    hub = getattr(_local, 'hub', None)
+    if hub is None:
+        return
+    for read in (True, False):
+        waiter = hub.fd_waiters.pop((fileno, read), None)
+        if waiter is None:
+            continue
+        if read:
+            hub.loop.remove_reader(fileno)
+        else:
+            hub.loop.remove_writer(fileno)
+
+
+class Timeout(BaseException):
+    """Raises an exception in the current green thread after `seconds`.
+
+    The timer starts on construction. If `exception` is None (or False)
+    the Timeout instance itself is raised; with False, leaving the
+    ``with`` block by the timeout is not an error.
+    """
+
+    def __init__(self, seconds=None, exception=None):
+        super(Timeout, self).__init__(seconds)
+        self.seconds = seconds
+        self.exception = exception
+        self.timer = None
+        self.start()
+
+    def start(self):
+        self.cancel()
+        if self.seconds is not None:
+            hub = _get_hub()
+            self.timer = hub.loop.call_later(self.seconds, self._fire,
+                                             getcurrent())
+        return self
+
+    def _fire(self, g):
+        self.timer = None
+        if g.dead:
+            return
+        exc = self.exception
+        if exc is None or isinstance(exc, bool):
+            exc = self
+        g.throw(exc)
+
+    @property
+    def pending(self):
+        return self.timer is not None
+
+    def cancel(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def __str__(self):
+        if self.seconds is None:
+            return ''
+        return '%s second%s' % (self.seconds,
+                                '' if self.seconds == 1 else 's')
+
+    def __enter__(self):
+        if not self.pending:
+            self.start()
+        return self
+
+    def __exit__(self, typ, value, tb):
+        self.cancel()
+        if value is self and self.exception is False:
+            return True
+
+
+class QueueEmpty(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Queue(object):
+    """Queue of eventlet LightQueue semantics.
+
+    If `maxsize` is None or negative the queue is unbounded.
+    """
+
+    def __init__(self, maxsize=None):
+        if maxsize is not None and maxsize < 0:
+            maxsize = None
+        self.maxsize = maxsize
+        self.queue = collections.deque()
+        self._getters = collections.deque()
+        self._putters = collections.deque()
+
+    def qsize(self):
+        return len(self.queue)
+
+    def empty(self):
+        return not self.queue
+
+    def full(self):
+        return self.maxsize is not None and len(self.queue) >= self.maxsize
+
+    def _has_getter(self):
+        return any(w.greenlet is not None and not w.woken
+                   for w in self._getters)
+
+    def put(self, item, block=True, timeout=None):
+        deadline = None
+        while self.full() and not self._has_getter():
+            if not block:
+                raise QueueFull()
+            if deadline is None:
+                deadline = _deadline(timeout)
+            if not _block(self._putters, deadline):
+                raise QueueFull()
+        self.queue.append(item)
+        if self._getters:
+            _wake_one(self._getters)
+
+    def put_nowait(self, item):
+        self.put(item, False)
+
+    def get(self, block=True, timeout=None):
+        deadline = None
+        while not self.queue:
+            if not block:
+                raise QueueEmpty()
+            if deadline is None:
+                deadline = _deadline(timeout)
+            if not _block(self._getters, deadline):
+                raise QueueEmpty()
+        item = self.queue.popleft()
+        if self._putters:
+            _wake_one(self._putters)
+        return item
+
+    def get_nowait(self):
+        return self.get(False)
+
+
+class Semaphore(object):
+    def __init__(self, value=1):
+        if value < 0:
+            raise ValueError('Semaphore must be initialized with a '
+                             'non-negative value')
+        self.counter = value
+        self._waiters = collections.deque()
+
+    def locked(self):
+        return self.counter <= 0
+
+    @property
+    def balance(self):
+        return self.counter - len(self._waiters)
+
+    def acquire(self, blocking=True, timeout=None):
+        deadline = None
+        while self.counter <= 0:
+            if not blocking:
+                return False
+            if deadline is None:
+                deadline = _deadline(timeout)
+            if not _block(self._waiters, deadline):
+                return False
+        self.counter -= 1
+        return True
+
+    def release(self, blocking=True):
+        self.counter += 1
+        if self._waiters:
+            _wake_one(self._waiters)
+        return True
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, typ, val, tb):
+        self.release()
+
+
+class BoundedSemaphore(Semaphore):
+    def __init__(self, value=1):
+        super(BoundedSemaphore, self).__init__(value)
+        self.original_counter = value
+
+    def release(self, blocking=True):
+        if self.counter >= self.original_counter:
+            raise ValueError('Semaphore released too many times')
+        return super(BoundedSemaphore, self).release(blocking)
+
+
+class Event(object):
+    def __init__(self):
+        self._waiters = collections.deque()
+        self._cond = False
+
+    def is_set(self):
+        return self._cond
+
+    def set(self):
+        self._cond = True
+        waiters, self._waiters = self._waiters, collections.deque()
+        for waiter in waiters:
+            if waiter.greenlet is not None:
+                waiter.wake()
+
+    def clear(self):
+        self._cond = False
+
+    def wait(self, timeout=None):
+        deadline = _deadline(timeout)
+        while not self._cond:
+            if not _block(self._waiters, deadline):
+                break
+        return self._cond
+
+
+class _GreenIO(object):
+    """Cooperative blocking for socket.socket and ssl.SSLSocket.
+
+    The underlying socket is always non-blocking; the timeout set by
+    the user is emulated by waiting on the hub.
+    """
+
+    _hub_timeout = None
+
+    def settimeout(self, timeout):
+        if timeout is not None:
+            timeout = float(timeout)
+            if timeout < 0.0:
+                raise ValueError('Timeout value out of range')
+        self._hub_timeout = timeout
+        super(_GreenIO, self).settimeout(0.0)
+
+    def gettimeout(self):
+        return self._hub_timeout
+
+    def setblocking(self, flag):
+        self.settimeout(None if flag else 0.0)
+
+    def getblocking(self):
+        return self._hub_timeout != 0.0
+
+    def _green_call(self, read, method, *args):
+        timeout = self._hub_timeout
+        if timeout == 0.0:
+            return method(self, *args)
+        deadline = _deadline(timeout)
+        while True:
+            try:
+                return method(self, *args)
+            except ssl.SSLWantReadError:
+                want_read = True
+            except ssl.SSLWantWriteError:
+                want_read = False
+            except (BlockingIOError, InterruptedError):
+                want_read = read
+            if deadline is None:
+                _wait_fd(self.fileno(), want_read)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout('timed out')
+                _wait_fd(self.fileno(), want_read, remaining)
+
+    def recv(self, *args):
+        return self._green_call(True, self._base.recv, *args)
+
+    def recv_into(self, *args):
+        return self._green_call(True, self._base.recv_into, *args)
+
+    def recvfrom(self, *args):
+        return self._green_call(True, self._base.recvfrom, *args)
+
+    def recvfrom_into(self, *args):
+        return self._green_call(True, self._base.recvfrom_into, *args)
+
+    def send(self, *args):
+        return self._green_call(False, self._base.send, *args)
+
+    def sendto(self, *args):
+        return self._green_call(False, self._base.sendto, *args)
+
+    def sendall(self, data, flags=0):
+        timeout = self._hub_timeout
+        deadline = _deadline(timeout)
+        with memoryview(data) as view, view.cast('B') as view:
+            total = len(view)
+            count = 0
+            while count < total:
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise socket.timeout('timed out')
+                    self._hub_timeout = remaining
+                try:
+                    count += self.send(view[count:], flags)
+                finally:
+                    self._hub_timeout = timeout
+
+    def connect(self, address):
+        timeout = self._hub_timeout
+        if timeout == 0.0:
+            return self._base.connect(self, address)
+        err = self._base.connect_ex(self, address)
+        if err in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            _wait_fd(self.fileno(), False, timeout)
+            err = self.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err and err != errno.EISCONN:
+            raise socket.error(err, os.strerror(err))
+
+    def connect_ex(self, address):
+        try:
+            self.connect(address)
+        except socket.timeout:
+            return errno.EAGAIN
+        except socket.error as e:
+            return e.errno
+        return 0
+
+    def _real_close(self, *args):
+        fileno = self.fileno()
+        if fileno >= 0:
+            _notify_close(fileno)
+        super(_GreenIO, self)._real_close(*args)
+
+
+class GreenSocket(_GreenIO, _original_socket):
+    _base = _original_socket
+
+    def __init__(self, family=-1, type=-1, proto=-1, fileno=None):
+        _original_socket.__init__(self, family, type, proto, fileno)
+        self.settimeout(socket.getdefaulttimeout())
+
+    def accept(self):
+        fd, addr = self._green_call(True, _original_socket._accept)
+        sock = GreenSocket(self.family, self.type, self.proto, fileno=fd)
+        return sock, addr
+
+
+class GreenSSLSocket(_GreenIO, ssl.SSLSocket):
+    _base = ssl.SSLSocket
+
+    def accept(self):
+        return self._green_call(True, ssl.SSLSocket.accept)
+
+    def read(self, *args):
+        return self._green_call(True, ssl.SSLSocket.read, *args)
+
+    def write(self, *args):
+        return self._green_call(False, ssl.SSLSocket.write, *args)
+
+    def do_handshake(self, *args):
+        return self._green_call(True, ssl.SSLSocket.do_handshake, *args)
+
+
+def _green_select(rlist, wlist, xlist, timeout=None):
+    if timeout is not None and timeout <= 0:
+        return _original_select(rlist, wlist, xlist, 0)
+    ready = _original_select(rlist, wlist, xlist, 0)
+    if any(ready):
+        return ready
+
+    def _fileno(obj):
+        return obj if isinstance(obj, six.integer_types) else obj.fileno()
+
+    hub = _get_hub()
+    waiter = _Waiter(hub)
+    readers = set(_fileno(obj) for obj in list(rlist) + list(xlist))
+    writers = set(_fileno(obj) for obj in wlist)
+    try:
+        for fd in readers:
+            hub.loop.add_reader(fd, waiter.switch, True)
+        for fd in writers:
+            hub.loop.add_writer(fd, waiter.switch, True)
+        waiter.wait(timeout)
+    finally:
+        waiter.greenlet = None
+        for fd in readers:
+            hub.loop.remove_reader(fd)
+        for fd in writers:
+            hub.loop.remove_writer(fd)
+    return _original_select(rlist, wlist, xlist, 0)
+
+
+def patch(**kwargs):
+    """Makes blocking socket, select and sleep calls cooperative.
+
+    Keyword arguments of eventlet.monkey_patch() are accepted for
+    compatibility; native threads are never patched.
+    """
+    socket.socket = GreenSocket
+    select.select = _green_select
+    time.sleep = sleep
+    ssl.SSLContext.sslsocket_class = GreenSSLSocket
+
+
+def listen(addr, family=socket.AF_INET, backlog=50, reuse_addr=True,
+           reuse_port=None):
+    sock = GreenSocket(family, socket.SOCK_STREAM)
+    if reuse_addr and family != socket.AF_UNIX:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port is None:
+        # Like eventlet.listen(), so that several processes can share
+        # the port (e.g. --ofp-workers), except for a random port.
+        reuse_port = family != socket.AF_UNIX and addr[1] != 0
+    if reuse_port and hasattr(socket, 'SO_REUSEPORT'):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        except socket.error as e:
+            # Defined but not supported by some platforms
+            if e.errno not in (errno.EINVAL, errno.ENOPROTOOPT):
+                raise
+    sock.bind(addr)
+    sock.listen(backlog)
+    return sock
+
+
+def connect(addr, family=socket.AF_INET, bind=None):
+    sock = GreenSocket(family, socket.SOCK_STREAM)
+    if bind is not None:
+        sock.bind(bind)
+    sock.connect(addr)
+    return sock
+
+
+def _create_connection(addr, timeout=None):
+    err = None
+    for res in socket.getaddrinfo(addr[0], addr[1], 0, socket.SOCK_STREAM):
+        af, socktype, proto, _, sa = res
+        sock = GreenSocket(af, socktype, proto)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(sa)
+            return sock
+        except socket.error as e:
+            err = e
+            sock.close()
+    raise err or socket.error('getaddrinfo returns an empty list')
+
+
+def _ssl_context(server_side=False, keyfile=None, certfile=None,
+                 cert_reqs=ssl.CERT_NONE, ssl_version=None, ca_certs=None,
+                 ciphers=None, ssl_ctx=None):
+    # The equivalent of ssl.wrap_socket(), which is gone in Python 3.12.
+    ctx = ssl_ctx
+    if ctx is None:
+        if ssl_version is None:
+            ssl_version = (ssl.PROTOCOL_TLS_SERVER if server_side
+                           else ssl.PROTOCOL_TLS_CLIENT)
+        ctx = ssl.SSLContext(ssl_version)
+    ctx.check_hostname = False
+    ctx.verify_mode = cert_reqs
+    if ca_certs:
+        ctx.load_verify_locations(ca_certs)
+    if certfile:
+        ctx.load_cert_chain(certfile, keyfile)
+    if ciphers:
+        ctx.set_ciphers(ciphers)
+    ctx.sslsocket_class = GreenSSLSocket
+    return ctx
+
+
+class StreamServer(object):
+    def __init__(self, listen_info, handle=None, backlog=None,
+                 spawn='default', **ssl_args):
+        assert backlog is None
+        assert spawn == 'default'
+
+        if ip.valid_ipv6(listen_info[0]):
+            self.server = listen(listen_info, family=socket.AF_INET6)
+        elif os.path.isdir(os.path.dirname(listen_info[0])):
+            # Case for Unix domain socket
+            self.server = listen(listen_info[0], family=socket.AF_UNIX)
+        else:
+            self.server = listen(listen_info)
+
+        if ssl_args:
+            ssl_args.setdefault('server_side', True)
+            if 'cert_reqs' not in ssl_args and 'ssl_ctx' in ssl_args:
+                ssl_args['cert_reqs'] = ssl_args['ssl_ctx'].verify_mode
+            server_side = ssl_args['server_side']
+            ctx = _ssl_context(**ssl_args)
+
+            def wrap_and_handle(sock, addr):
+                handle(ctx.wrap_socket(sock, server_side=server_side), addr)
+
+            self.handle = wrap_and_handle
+        else:
+            self.handle = handle
+
+    def serve_forever(self):
+        while True:
+            sock, addr = self.server.accept()
+            spawn(self.handle, sock, addr)
+
+
+class StreamClient(object):
+    def __init__(self, addr, timeout=None, **ssl_args):
+        assert ip.valid_ipv4(addr[0]) or ip.valid_ipv6(addr[0])
+        self.addr = addr
+        self.timeout = timeout
+        self.ssl_args = ssl_args
+        self._is_active = True
+
+    def connect(self):
+        try:
+            client = _create_connection(self.addr, timeout=self.timeout)
+        except socket.error:
+            return None
+
+        if self.ssl_args:
+            ctx = _ssl_context(**self.ssl_args)
+            client = ctx.wrap_socket(
+                client, server_side=self.ssl_args.get('server_side', False))
+
+        return client
+
+    def connect_loop(self, handle, interval):
+        while self._is_active:
+            sock = self.connect()
+            if sock:
+                handle(sock, self.addr)
+            sleep(interval)
+
+    def stop(self):
+        self._is_active = False
+
+
+class LoggingWrapper(object):
+    def write(self, message):
+        LOG.info(message.rstrip('\n'))
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+
+# Returned by a WSGI application which wrote the response to the socket
+# by itself (e.g. WebSocket).
+ALREADY_HANDLED = object()
+
+
+class _WSGIServerHandler(simple_server.ServerHandler):
+    def finish_response(self):
+        if self.result is ALREADY_HANDLED:
+            self.request_handler.close_connection = True
+            wsgi_handlers.SimpleHandler.close(self)
+            return
+        super(_WSGIServerHandler, self).finish_response()
+
+
+class _WSGIRequestHandler(simple_server.WSGIRequestHandler):
+    def get_environ(self):
+        env = super(_WSGIRequestHandler, self).get_environ()
+        env['ryu.hub.socket'] = self.connection
+        env['ryu.hub.input'] = self.rfile
+        return env
+
+    def get_stderr(self):
+        return self.server.logger
+
+    def log_message(self, format, *args):
+        self.server.logger.write('%s - - [%s] %s\n' % (
+            self.address_string(), self.log_date_time_string(),
+            format % args))
+
+    def address_string(self):
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return str(self.client_address)
+
+    def handle(self):
+        self.raw_requestline = self.rfile.readline(65537)
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            return
+
+        if not self.parse_request():
+            return
+
+        handler = _WSGIServerHandler(
+            self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+            multithread=False)
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+
+
+class WSGIServer(StreamServer):
+    def get_app(self):
+        return self.handle
+
+    def _handle_connection(self, sock, addr):
+        try:
+            _WSGIRequestHandler(sock, addr, self)
+        except socket.error as e:
+            if e.errno not in (errno.EPIPE, errno.ECONNRESET, errno.EBADF):
+                raise
+        finally:
+            sock.close()
+
+    def serve_forever(self):
+        self.logger = LoggingWrapper()
+        host, port = self.server.getsockname()[:2] \
+            if self.server.family != socket.AF_UNIX else ('', 0)
+        self.base_environ = {
+            'SERVER_NAME': host,
+            'GATEWAY_INTERFACE': 'CGI/1.1',
+            'SERVER_PORT': str(port),
+            'REMOTE_HOST': '',
+            'CONTENT_LENGTH': '',
+            'SCRIPT_NAME': '',
+        }
+        while True:
+            sock, addr = self.server.accept()
+            spawn(self._handle_connection, sock, addr)
+
+
+class WebSocket(object):
+    """Server side of a WebSocket connection (RFC 6455)."""
+
+    OP_CONT = 0x0
+    OP_TEXT = 0x1
+    OP_BINARY = 0x2
+    OP_CLOSE = 0x8
+    OP_PING = 0x9
+    OP_PONG = 0xa
+
+    def __init__(self, sock, rfile, environ):
+        self.socket = sock
+        self.environ = environ
+        self._rfile = rfile
+        self._sendlock = Semaphore()
+        self._closed = False
+
+    @staticmethod
+    def _frame(opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 0x10000:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        return header + payload
+
+    def _send_frame(self, opcode, payload):
+        frame = self._frame(opcode, payload)
+        with self._sendlock:
+            self.socket.sendall(frame)
+
+    def send(self, message):
+        if isinstance(message, six.text_type):
+            self._send_frame(self.OP_TEXT, message.encode('utf-8'))
+        else:
+            self._send_frame(self.OP_BINARY, bytes(message))
+
+    def _read(self, length):
+        data = self._rfile.read(length)
+        if len(data) < length:
+            raise EOFError()
+        return data
+
+    def _read_frame(self):
+        b0, b1 = struct.unpack('!BB', self._read(2))
+        length = b1 & 0x7f
+        if length == 126:
+            length, = struct.unpack('!H', self._read(2))
+        elif length == 127:
+            length, = struct.unpack('!Q', self._read(8))
+        mask = self._read(4) if b1 & 0x80 else None
+        payload = self._read(length)
+        if mask and length:
+            key = int.from_bytes((mask * (length // 4 + 1))[:length], 'big')
+            payload = (int.from_bytes(payload, 'big') ^ key).to_bytes(
+                length, 'big')
+        return b0 & 0x80, b0 & 0x0f, payload
+
+    def wait(self):
+        """Returns the next message, or None if the connection is closed.
+
+        Text messages are returned as str and binary ones as bytes.
+        """
+        fragments = []
+        msg_opcode = None
+        while not self._closed:
+            try:
+                fin, opcode, payload = self._read_frame()
+            except (EOFError, socket.error):
+                self._closed = True
+                return None
+            if opcode == self.OP_CLOSE:
+                self.close()
+                return None
+            elif opcode == self.OP_PING:
+                self._send_frame(self.OP_PONG, payload)
+                continue
+            elif opcode == self.OP_PONG:
+                continue
+            if opcode != self.OP_CONT:
+                msg_opcode = opcode
+            fragments.append(payload)
+            if fin:
+                message = b''.join(fragments)
+                if msg_opcode == self.OP_TEXT:
+                    return message.decode('utf-8')
+                return message
+        return None
+
+    def close(self, code=1000, reason=b''):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._send_frame(self.OP_CLOSE,
+                             struct.pack('!H', code) + reason)
+        except socket.error:
+            pass
+
+
+class WebSocketWSGI(object):
+    """Wraps a handler taking a WebSocket as a WSGI application."""
+
+    GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def __call__(self, environ, start_response):
+        upgrade = environ.get('HTTP_UPGRADE', '').lower()
+        connection = environ.get('HTTP_CONNECTION', '').lower()
+        key = environ.get('HTTP_SEC_WEBSOCKET_KEY')
+        if upgrade != 'websocket' or 'upgrade' not in connection or \
+                not key:
+            start_response('400 Bad Request', [('Connection', 'close')])
+            return []
+
+        accept = base64.b64encode(hashlib.sha1(
+            key.strip().encode('ascii') + self.GUID).digest())
+        sock = environ['ryu.hub.socket']
+        sock.sendall(b'HTTP/1.1 101 Switching Protocols\r\n'
+                     b'Upgrade: websocket\r\n'
+                     b'Connection: Upgrade\r\n'
+                     b'Sec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+        ws = WebSocket(sock, environ['ryu.hub.input'], environ)
+        try:
+            self.handler(ws)
+        except socket.error as e:
+            if e.errno not in (errno.EPIPE, errno.ECONNRESET, errno.EBADF):
+                raise
+        finally:
+            ws.close()
+        return ALREADY_HANDLED
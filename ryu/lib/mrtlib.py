@@ -19,7 +19,10 @@ Information Export Format [RFC6396].
 """
 
 import abc
+import bisect
 import logging
+import mmap
+import multiprocessing
 import struct
 import time
 
@@ -31,6 +34,7 @@ from ryu.lib import ip
 from ryu.lib import stringify
 from ryu.lib import type_desc
 from ryu.lib.packet import bgp
+from ryu.lib.packet import bgp_fastpath
 from ryu.lib.packet import ospf
 
 
@@ -1374,3 +1378,430 @@ class Writer(object):
 
     def __del__(self):
         self.close()
+
+
+class _PrefixFilter(object):
+    # Matches the prefixes equal to or more specific than the given ones.
+
+    def __init__(self, prefixes):
+        # {address bits: (sorted prefix lengths, {(network, length)})}
+        self._filters = {}
+        for prefix in prefixes:
+            addr, _, length = prefix.partition('/')
+            if ip.valid_ipv4(addr):
+                bits, addr = 32, ip.ipv4_to_int(addr)
+            else:
+                bits, addr = 128, ip.ipv6_to_int(addr)
+            length = int(length) if length else bits
+            lengths, networks = self._filters.setdefault(bits, ([], set()))
+            if length not in lengths:
+                lengths.append(length)
+                lengths.sort()
+            networks.add((addr >> (bits - length), length))
+
+    def match(self, bits, addr, length):
+        """Matches the prefix *length* bits long of int *addr*."""
+        lengths, networks = self._filters.get(bits, ((), ()))
+        for filter_length in lengths:
+            if filter_length > length:
+                break
+            if (addr >> (bits - filter_length), filter_length) in networks:
+                return True
+        return False
+
+    def match_bin(self, addr_len, buf, offset, length):
+        """Matches the prefix *length* bits long starting at buf[offset]
+        and encoded in as few octets as possible, like in NLRI.
+        """
+        size = (length + 7) // 8
+        addr = buf[offset:offset + size] + b'\x00' * (addr_len - size)
+        if addr_len == 4:
+            return self.match(32, type_desc.Int4.to_user(addr), length)
+        return self.match(128, type_desc.Int16.to_user(addr), length)
+
+    def match_text(self, prefix):
+        addr, _, length = prefix.partition('/')
+        if ':' in addr:
+            return self.match(128, ip.ipv6_to_int(addr), int(length))
+        return self.match(32, ip.ipv4_to_int(addr), int(length))
+
+
+class MmapReader(object):
+    """
+    Memory-mapped MRT format file reader.
+
+    Faster alternative to Reader for large uncompressed MRT files
+    (decompress the bzip2/gzip archives first).  The record boundaries
+    are found from the MRT headers only, so that the file can be indexed
+    in one pass, split into chunks read by several processes (see
+    map_records()) and the records filtered out before they are decoded.
+
+    ========= ================================================
+    Argument  Description
+    ========= ================================================
+    path      Path of the MRT format file.
+    start     Offset of the first record to read.
+    end       Offset after the last record to read
+              (default: end of the file).
+    types     Collection of the MRT types to read, or None
+              for all types.
+    peers     Collection of the peer IP addresses to read the
+              records of, or None for all peers.
+              Applies to the TABLE_DUMP, TABLE_DUMP_V2 RIB and
+              BGP4MP records, the other records are skipped.
+    prefixes  Collection of prefixes ('address/length') to read
+              the records of, or None for all prefixes.
+              A record is read if it carries one of the prefixes
+              or a more specific prefix.
+              Applies to the TABLE_DUMP, TABLE_DUMP_V2 RIB and
+              BGP4MP UPDATE records, the other records are
+              skipped.
+    ========= ================================================
+
+    The TABLE_DUMP_V2 PEER_INDEX_TABLE records are always read (unless
+    filtered by *types*), as they are needed to interpret the RIB
+    records.  A TABLE_DUMP_V2 RIB record matching *peers* is read with
+    all its RIB entries.
+
+    Example of Usage::
+
+        from ryu.lib import mrtlib
+
+        reader = mrtlib.MmapReader('updates.YYYYMMDD.hhmm',
+                                   prefixes=['192.0.2.0/24'])
+        for record in reader:
+            print(record)
+        reader.close()
+    """
+
+    _HEADER = struct.Struct(MrtCommonRecord._HEADER_FMT)
+    _UINT16 = struct.Struct('!H')
+
+    # (ADD-PATH or not, address length of the prefix) per TABLE_DUMP_V2
+    # RIB subtype
+    _TABLE_DUMP_V2_RIBS = {
+        TableDump2MrtRecord.SUBTYPE_RIB_IPV4_UNICAST: (False, 4),
+        TableDump2MrtRecord.SUBTYPE_RIB_IPV4_MULTICAST: (False, 4),
+        TableDump2MrtRecord.SUBTYPE_RIB_IPV6_UNICAST: (False, 16),
+        TableDump2MrtRecord.SUBTYPE_RIB_IPV6_MULTICAST: (False, 16),
+        TableDump2MrtRecord.SUBTYPE_RIB_IPV4_UNICAST_ADDPATH: (True, 4),
+        TableDump2MrtRecord.SUBTYPE_RIB_IPV4_MULTICAST_ADDPATH: (True, 4),
+        TableDump2MrtRecord.SUBTYPE_RIB_IPV6_UNICAST_ADDPATH: (True, 16),
+        TableDump2MrtRecord.SUBTYPE_RIB_IPV6_MULTICAST_ADDPATH: (True, 16),
+    }
+
+    _BGP4MP_AS4_SUBTYPES = (
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_MESSAGE_AS4,
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_STATE_CHANGE_AS4,
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_MESSAGE_AS4_LOCAL,
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_MESSAGE_AS4_ADDPATH,
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_MESSAGE_AS4_LOCAL_ADDPATH,
+    )
+    _BGP4MP_MESSAGE_SUBTYPES = (
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_MESSAGE,
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_MESSAGE_AS4,
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_MESSAGE_LOCAL,
+        Bgp4MpMrtRecord.SUBTYPE_BGP4MP_MESSAGE_AS4_LOCAL,
+    )
+
+    def __init__(self, path, start=0, end=None, types=None, peers=None,
+                 prefixes=None):
+        self._f = open(path, 'rb')
+        try:
+            self._buf = mmap.mmap(self._f.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file, which cannot be mapped.
+            self._buf = b''
+        self._size = len(self._buf)
+        self.start = start
+        self.end = self._size if end is None else min(end, self._size)
+        self._offsets = None
+        self._types = set(types) if types is not None else None
+        self._peers = None
+        if peers is not None:
+            self._peers = set(ip.text_to_bin(peer) for peer in peers)
+        self._prefixes = None
+        if prefixes is not None:
+            self._prefixes = _PrefixFilter(prefixes)
+        # Peer IP addresses of the current TABLE_DUMP_V2 PEER_INDEX_TABLE.
+        self._peer_index = None
+
+    def _record_len(self, offset):
+        # Returns the header and message lengths of the record at offset,
+        # or None if it is truncated.
+        if offset + MrtRecord.HEADER_SIZE > self._size:
+            return None
+        _, type_, _, length = self._HEADER.unpack_from(self._buf, offset)
+        if type_ in MrtRecord._EXT_TS_TYPES:
+            header_len = ExtendedTimestampMrtRecord.HEADER_SIZE
+        else:
+            header_len = MrtCommonRecord.HEADER_SIZE
+        if offset + header_len + length > self._size:
+            return None
+        return header_len, length
+
+    def _iter_offsets(self, start, end):
+        offset = start
+        while offset < end:
+            lengths = self._record_len(offset)
+            if lengths is None:
+                LOG.warning('Truncated MRT record at offset %d', offset)
+                return
+            yield offset
+            offset += lengths[0] + lengths[1]
+
+    def index(self):
+        """Returns the list of the offsets of all the records of the file.
+
+        The index is built on the first call by walking through the MRT
+        headers only.
+        """
+        if self._offsets is None:
+            self._offsets = list(self._iter_offsets(0, self._size))
+        return self._offsets
+
+    def chunks(self, count):
+        """Splits the file into at most *count* chunks of about the same
+        size, aligned on the record boundaries.
+
+        Returns a list of (start, end) offsets, which can be given to the
+        MmapReader instances reading each chunk.
+        """
+        offsets = self.index()
+        if not offsets:
+            return []
+        bounds = [0]
+        for i in range(1, count):
+            pos = bisect.bisect_left(offsets, self._size * i // count)
+            if pos < len(offsets) and offsets[pos] > bounds[-1]:
+                bounds.append(offsets[pos])
+        bounds.append(self._size)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _load_peer_index(self, before):
+        # Loads the last PEER_INDEX_TABLE before offset *before*, for
+        # chunks starting in the middle of a TABLE_DUMP_V2 file.
+        for offset in reversed(self.index()):
+            if offset >= before:
+                continue
+            _, type_, subtype, _ = self._HEADER.unpack_from(self._buf, offset)
+            if (type_ == MrtRecord.TYPE_TABLE_DUMP_V2 and
+                    subtype == TableDump2MrtRecord.SUBTYPE_PEER_INDEX_TABLE):
+                header_len, length = self._record_len(offset)
+                offset += header_len
+                self._set_peer_index(offset, offset + length)
+                return
+
+    def _set_peer_index(self, offset, end):
+        msg = TableDump2PeerIndexTableMrtMessage.parse(self._buf[offset:end])
+        self._peer_index = [ip.text_to_bin(peer.ip_addr)
+                            for peer in msg.peer_entries]
+
+    def _match_table_dump(self, offset, subtype):
+        if subtype == TableDumpMrtRecord.SUBTYPE_AFI_IPv4:
+            addr_len = 4
+        else:
+            addr_len = 16
+        # view_num, seq_num, prefix, prefix_len, status, originated_time,
+        # peer_ip
+        if self._prefixes is not None:
+            length = six.indexbytes(self._buf, offset + 4 + addr_len)
+            if not self._prefixes.match_bin(addr_len, self._buf, offset + 4,
+                                            length):
+                return False
+        if self._peers is not None:
+            peer_offset = offset + 4 + addr_len + 6
+            if (self._buf[peer_offset:peer_offset + addr_len] not in
+                    self._peers):
+                return False
+        return True
+
+    def _match_table_dump_v2(self, offset, end, subtype):
+        if subtype == TableDump2MrtRecord.SUBTYPE_PEER_INDEX_TABLE:
+            if self._peers is not None:
+                self._set_peer_index(offset, end)
+            return True
+        if subtype not in self._TABLE_DUMP_V2_RIBS:
+            return False
+        addpath, addr_len = self._TABLE_DUMP_V2_RIBS[subtype]
+
+        # seq_num, prefix_len, prefix, entry_count, rib_entries
+        length = six.indexbytes(self._buf, offset + 4)
+        if (self._prefixes is not None and
+                not self._prefixes.match_bin(addr_len, self._buf, offset + 5,
+                                             length)):
+            return False
+        if self._peers is None:
+            return True
+        if self._peer_index is None:
+            self._load_peer_index(offset)
+        if self._peer_index is None:
+            return False
+        offset += 5 + (length + 7) // 8
+        (entry_count,) = self._UINT16.unpack_from(self._buf, offset)
+        offset += 2
+        attr_len_offset = 10 if addpath else 6
+        for _ in range(entry_count):
+            (peer_index,) = self._UINT16.unpack_from(self._buf, offset)
+            if (peer_index < len(self._peer_index) and
+                    self._peer_index[peer_index] in self._peers):
+                return True
+            (attr_len,) = self._UINT16.unpack_from(self._buf,
+                                                   offset + attr_len_offset)
+            offset += attr_len_offset + 2 + attr_len
+        return False
+
+    def _match_bgp4mp(self, offset, end, subtype):
+        as4 = subtype in self._BGP4MP_AS4_SUBTYPES
+        offset += 8 if as4 else 4  # peer_as, local_as
+        # if_index, afi, peer_ip, local_ip, bgp_message
+        (afi,) = self._UINT16.unpack_from(self._buf, offset + 2)
+        addr_len = 4 if afi == Bgp4MpMessageMrtMessage.AFI_IPv4 else 16
+        offset += 4
+        if (self._peers is not None and
+                self._buf[offset:offset + addr_len] not in self._peers):
+            return False
+        if self._prefixes is None:
+            return True
+        if subtype not in self._BGP4MP_MESSAGE_SUBTYPES:
+            return False
+        offset += addr_len * 2
+        try:
+            update = bgp_fastpath.parse_update(
+                memoryview(self._buf)[offset:end], as4)
+        except (ValueError, struct.error, IndexError):
+            # Not an UPDATE message
+            return False
+        for prefixes in (update.nlri, update.withdrawn,
+                         update.mp_nlri, update.mp_withdrawn):
+            for prefix in prefixes:
+                if self._prefixes.match_text(prefix):
+                    return True
+        return False
+
+    def _match(self, offset, header_len, length):
+        _, type_, subtype, _ = self._HEADER.unpack_from(self._buf, offset)
+        if self._types is not None and type_ not in self._types:
+            return False
+        if self._peers is None and self._prefixes is None:
+            return True
+        offset += header_len
+        if type_ == MrtRecord.TYPE_TABLE_DUMP:
+            return self._match_table_dump(offset, subtype)
+        elif type_ == MrtRecord.TYPE_TABLE_DUMP_V2:
+            return self._match_table_dump_v2(offset, offset + length,
+                                             subtype)
+        elif type_ in (MrtRecord.TYPE_BGP4MP, MrtRecord.TYPE_BGP4MP_ET):
+            return self._match_bgp4mp(offset, offset + length, subtype)
+        return False
+
+    def __iter__(self):
+        for offset in self._iter_offsets(self.start, self.end):
+            header_len, length = self._record_len(offset)
+            if self._match(offset, header_len, length):
+                record, _ = MrtRecord.parse(
+                    self._buf[offset:offset + header_len + length])
+                yield record
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._f.close()
+
+    def __del__(self):
+        self.close()
+
+
+def _map_chunk(path, start, end, func, filters):
+    reader = MmapReader(path, start, end, **filters)
+    try:
+        if func is None:
+            return list(reader)
+        return [func(record) for record in reader]
+    finally:
+        reader.close()
+
+
+def _map_worker(conn, path, bounds, func, filters):
+    # Sends (True, results) per chunk, or (False, exception) on error.
+    try:
+        for start, end in bounds:
+            conn.send((True, _map_chunk(path, start, end, func, filters)))
+    except Exception as e:
+        conn.send((False, e))
+    finally:
+        conn.close()
+
+
+def map_records(path, func=None, processes=None, chunks=None, **filters):
+    """
+    Reads the MRT format file *path* with a pool of processes.
+
+    The file is split into *chunks* chunks (default: 4 per process), each
+    one read by a MmapReader of a worker process which applies *func* to
+    the records read.  Yields the results (or the records if *func* is
+    None) in the order of the file.
+
+    *func* must be picklable (e.g. a module level function), *processes*
+    is the number of worker processes (default: the number of CPUs) and
+    *filters* are the filter keyword arguments of MmapReader.
+
+    The worker processes are spawned, not forked, so that this can be
+    used after hub.patch(): the module of *func* is imported by them and
+    the main module of a script must be guarded by
+    ``if __name__ == '__main__':``.
+
+    Example of Usage::
+
+        from ryu.lib import mrtlib
+
+        def peer_as(record):
+            return record.message.peer_as
+
+        if __name__ == '__main__':
+            for asn in mrtlib.map_records(
+                    'updates.YYYYMMDD.hhmm', peer_as,
+                    types=[mrtlib.MrtRecord.TYPE_BGP4MP]):
+                print(asn)
+    """
+    processes = processes or multiprocessing.cpu_count()
+    reader = MmapReader(path)
+    try:
+        bounds = reader.chunks(chunks or processes * 4)
+    finally:
+        reader.close()
+    processes = min(processes, len(bounds))
+
+    try:
+        ctx = multiprocessing.get_context('spawn')
+    except AttributeError:
+        # Python 2
+        ctx = multiprocessing
+
+    # multiprocessing.Pool is not used, as its helper threads deadlock
+    # once threading is green-patched.  Instead, each worker reads every
+    # processes-th chunk and the results are received in the file order.
+    workers = []
+    try:
+        for i in range(processes):
+            conn, child_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_map_worker,
+                               args=(child_conn, path, bounds[i::processes],
+                                     func, filters))
+            proc.daemon = True
+            proc.start()
+            child_conn.close()
+            workers.append((proc, conn))
+
+        for i in range(len(bounds)):
+            ok, results = workers[i % processes][1].recv()
+            if not ok:
+                raise results
+            for result in results:
+                yield result
+    finally:
+        for proc, conn in workers:
+            conn.close()
+            proc.terminate()
+            proc.join()
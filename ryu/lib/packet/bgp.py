@@ -5227,13 +5227,17 @@ class BGPMessage(packet_base.PacketBase, TypeDisp):
         if len(buf) < cls._HDR_LEN:
             raise stream_parser.StreamParser.TooSmallException(
                 '%d < %d' % (len(buf), cls._HDR_LEN))
-        (marker, len_, type_) = struct.unpack_from(cls._HDR_PACK_STR,
-                                                   six.binary_type(buf))
+        (marker, len_, type_) = struct.unpack_from(cls._HDR_PACK_STR, buf)
         msglen = len_
         if len(buf) < msglen:
             raise stream_parser.StreamParser.TooSmallException(
                 '%d < %d' % (len(buf), msglen))
         binmsg = buf[cls._HDR_LEN:msglen]
+        if not isinstance(binmsg, six.binary_type):
+            # The caller may hand over a view onto its receive buffer.
+            # Parsed messages keep references to their data, so take
+            # exactly one copy of this message here.
+            binmsg = six.binary_type(binmsg)
         rest = buf[msglen:]
         subcls = cls._lookup_type(type_)
         kwargs = subcls.parser(binmsg)
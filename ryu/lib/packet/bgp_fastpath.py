@@ -0,0 +1,339 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fast path decoder of BGP UPDATE messages.
+
+ryu.lib.packet.bgp decodes every path attribute and prefix into a full
+object.  When only the IPv4/IPv6 unicast prefixes and the usual route
+attributes are needed (route collectors, MRT processing, ...), this module
+decodes an UPDATE message straight into a compact Update named tuple,
+which is several times faster.
+
+Messages using anything else (other address families, a 2 octets
+AS_PATH with AS4_PATH, malformed attributes, ...) are decoded by the
+generic parser and converted to the same named tuple, which then also
+carries the parsed BGPUpdate in its "msg" field.
+
+ADD-PATH encoded prefixes are not supported.
+
+Usage example::
+
+    from ryu.lib.packet import bgp_fastpath
+
+    update = bgp_fastpath.parse_update(buf)
+    for prefix in update.nlri:
+        print(prefix, update.next_hop, update.as_path)
+"""
+
+import collections
+import socket
+import struct
+
+import six
+
+from ryu.lib.packet import bgp
+
+
+Update = collections.namedtuple('Update', [
+    'withdrawn',     # list of the withdrawn IPv4 prefixes
+    'nlri',          # list of the advertised IPv4 prefixes
+    'origin',        # ORIGIN value or None
+    'as_path',       # tuple of AS numbers, an AS_SET is a nested tuple
+    'next_hop',      # NEXT_HOP address or None
+    'med',           # MULTI_EXIT_DISC value or None
+    'local_pref',    # LOCAL_PREF value or None
+    'communities',   # tuple of COMMUNITIES values
+    'mp_next_hop',   # MP_REACH_NLRI (first) next hop address or None
+    'mp_nlri',       # list of the prefixes of MP_REACH_NLRI
+    'mp_withdrawn',  # list of the prefixes of MP_UNREACH_NLRI
+    'msg',           # BGPUpdate if the generic parser was used, or None
+])
+
+_HDR = struct.Struct('!16sHB')
+_HDR_LEN = _HDR.size
+_UINT16 = struct.Struct('!H')
+_UINT32 = struct.Struct('!I')
+_ATTR_HDR = struct.Struct('!BBB')
+_ATTR_HDR_EXT = struct.Struct('!BBH')
+_MP_HDR = struct.Struct('!HBB')
+_SEG_HDR = struct.Struct('!BB')
+
+_AS_SET = 1
+_AS_SEQUENCE = 2
+
+_MARKER = b'\xff' * 16
+
+_ATTR_FLAG_EXTENDED_LENGTH = bgp.BGP_ATTR_FLAG_EXTENDED_LENGTH
+
+_ATTR_TYPE_ORIGIN = bgp.BGP_ATTR_TYPE_ORIGIN
+_ATTR_TYPE_AS_PATH = bgp.BGP_ATTR_TYPE_AS_PATH
+_ATTR_TYPE_NEXT_HOP = bgp.BGP_ATTR_TYPE_NEXT_HOP
+_ATTR_TYPE_MULTI_EXIT_DISC = bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC
+_ATTR_TYPE_LOCAL_PREF = bgp.BGP_ATTR_TYPE_LOCAL_PREF
+_ATTR_TYPE_COMMUNITIES = bgp.BGP_ATTR_TYPE_COMMUNITIES
+_ATTR_TYPE_MP_REACH_NLRI = bgp.BGP_ATTR_TYPE_MP_REACH_NLRI
+_ATTR_TYPE_MP_UNREACH_NLRI = bgp.BGP_ATTR_TYPE_MP_UNREACH_NLRI
+_ATTR_TYPE_AS4_PATH = bgp.BGP_ATTR_TYPE_AS4_PATH
+
+_AFI_IPV4 = bgp.RF_IPv4_UC.afi
+_AFI_IPV6 = bgp.RF_IPv6_UC.afi
+_SAFI_UNICAST = bgp.RF_IPv4_UC.safi
+
+# (address length, text converter) per AFI
+_AFIS = {
+    _AFI_IPV4: (4, socket.inet_ntoa),
+    _AFI_IPV6: (16, lambda addr: socket.inet_ntop(socket.AF_INET6, addr)),
+}
+
+# Structs unpacking the AS numbers of an AS_PATH segment, per AS number
+# size and count.
+_AS_STRUCTS = {
+    2: [struct.Struct('!%dH' % count) for count in range(256)],
+    4: [struct.Struct('!%dI' % count) for count in range(256)],
+}
+
+# Prefixes repeat a lot across UPDATE messages, so the text form of the
+# recently seen ones is cached, keyed by AFI and encoded prefix.
+_PREFIX_CACHE_SIZE = 1 << 16
+_prefix_cache = {}
+
+
+class _Unusual(Exception):
+    # Raised when the generic parser has to be used.
+    pass
+
+
+def _parse_prefixes(buf, offset, end, afi):
+    """Returns the list of the prefixes in buf[offset:end]."""
+    addr_len, to_text = _AFIS[afi]
+    cache = _prefix_cache
+    prefixes = []
+    while offset < end:
+        length = six.indexbytes(buf, offset)
+        size = (length + 7) // 8
+        if length > addr_len * 8 or offset + 1 + size > end:
+            raise _Unusual()
+        key = (afi, bytes(buf[offset:offset + 1 + size]))
+        prefix = cache.get(key)
+        if prefix is None:
+            addr = key[1][1:] + b'\x00' * (addr_len - size)
+            prefix = '%s/%d' % (to_text(addr), length)
+            if len(cache) >= _PREFIX_CACHE_SIZE:
+                cache.clear()
+            cache[key] = prefix
+        prefixes.append(prefix)
+        offset += 1 + size
+    return prefixes
+
+
+def _parse_as_path(buf, offset, end, as_size):
+    structs = _AS_STRUCTS[as_size]
+    as_path = []
+    while offset < end:
+        seg_type, count = _SEG_HDR.unpack_from(buf, offset)
+        offset += 2
+        asns = structs[count].unpack_from(buf, offset)
+        offset += count * as_size
+        if seg_type == _AS_SEQUENCE:
+            as_path.extend(asns)
+        elif seg_type == _AS_SET:
+            as_path.append(tuple(sorted(asns)))
+        else:
+            raise _Unusual()
+    if offset != end:
+        raise _Unusual()
+    return tuple(as_path)
+
+
+def _parse_mp_reach(buf, offset, end):
+    if end - offset < _MP_HDR.size:
+        raise _Unusual()
+    afi, safi, nh_len = _MP_HDR.unpack_from(buf, offset)
+    if safi != _SAFI_UNICAST or afi not in _AFIS:
+        raise _Unusual()
+    addr_len, to_text = _AFIS[afi]
+    offset += _MP_HDR.size
+    # Only the first (global) address of the next hop is reported.
+    if nh_len not in (addr_len, addr_len * 2):
+        raise _Unusual()
+    next_hop = to_text(bytes(buf[offset:offset + addr_len]))
+    # Skips the next hop and the reserved octet.
+    offset += nh_len + 1
+    if offset > end:
+        raise _Unusual()
+    return next_hop, _parse_prefixes(buf, offset, end, afi)
+
+
+def _parse_mp_unreach(buf, offset, end):
+    if end - offset < 3:
+        raise _Unusual()
+    afi, safi = struct.unpack_from('!HB', buf, offset)
+    if safi != _SAFI_UNICAST or afi not in _AFIS:
+        raise _Unusual()
+    return _parse_prefixes(buf, offset + 3, end, afi)
+
+
+def _parse_fast(buf, as_size):
+    marker, msg_len, msg_type = _HDR.unpack_from(buf)
+    if (marker != _MARKER or msg_type != bgp.BGP_MSG_UPDATE or
+            msg_len > len(buf)):
+        raise _Unusual()
+    end = msg_len
+
+    offset = _HDR_LEN
+    withdrawn_len, = _UINT16.unpack_from(buf, offset)
+    offset += 2
+    withdrawn = _parse_prefixes(buf, offset, offset + withdrawn_len,
+                                _AFI_IPV4)
+    offset += withdrawn_len
+
+    attrs_len, = _UINT16.unpack_from(buf, offset)
+    offset += 2
+    attrs_end = offset + attrs_len
+    if attrs_end > end:
+        raise _Unusual()
+
+    origin = next_hop = med = local_pref = mp_next_hop = None
+    as_path = communities = ()
+    mp_nlri = []
+    mp_withdrawn = []
+    while offset < attrs_end:
+        flags, attr_type, attr_len = _ATTR_HDR.unpack_from(buf, offset)
+        if flags & _ATTR_FLAG_EXTENDED_LENGTH:
+            flags, attr_type, attr_len = _ATTR_HDR_EXT.unpack_from(buf,
+                                                                   offset)
+            offset += _ATTR_HDR_EXT.size
+        else:
+            offset += _ATTR_HDR.size
+        value_end = offset + attr_len
+        if value_end > attrs_end:
+            raise _Unusual()
+
+        if attr_type == _ATTR_TYPE_AS_PATH:
+            as_path = _parse_as_path(buf, offset, value_end, as_size)
+        elif attr_type == _ATTR_TYPE_ORIGIN:
+            if attr_len != 1:
+                raise _Unusual()
+            origin = six.indexbytes(buf, offset)
+        elif attr_type == _ATTR_TYPE_NEXT_HOP:
+            if attr_len != 4:
+                raise _Unusual()
+            next_hop = socket.inet_ntoa(bytes(buf[offset:value_end]))
+        elif attr_type == _ATTR_TYPE_MULTI_EXIT_DISC:
+            if attr_len != 4:
+                raise _Unusual()
+            med, = _UINT32.unpack_from(buf, offset)
+        elif attr_type == _ATTR_TYPE_LOCAL_PREF:
+            if attr_len != 4:
+                raise _Unusual()
+            local_pref, = _UINT32.unpack_from(buf, offset)
+        elif attr_type == _ATTR_TYPE_COMMUNITIES:
+            if attr_len % 4:
+                raise _Unusual()
+            communities = struct.unpack_from('!%dI' % (attr_len // 4),
+                                             buf, offset)
+        elif attr_type == _ATTR_TYPE_MP_REACH_NLRI:
+            mp_next_hop, mp_nlri = _parse_mp_reach(buf, offset, value_end)
+        elif attr_type == _ATTR_TYPE_MP_UNREACH_NLRI:
+            mp_withdrawn = _parse_mp_unreach(buf, offset, value_end)
+        elif attr_type == _ATTR_TYPE_AS4_PATH and as_size == 2:
+            # AS_PATH has to be merged with AS4_PATH.
+            raise _Unusual()
+        offset = value_end
+
+    nlri = _parse_prefixes(buf, attrs_end, end, _AFI_IPV4)
+    return Update(withdrawn, nlri, origin, as_path, next_hop, med,
+                  local_pref, communities, mp_next_hop, mp_nlri,
+                  mp_withdrawn, None)
+
+
+def _flatten_as_path(path_seg_list):
+    as_path = []
+    for seg in path_seg_list:
+        if isinstance(seg, set):
+            as_path.append(tuple(sorted(seg)))
+        else:
+            as_path.extend(seg)
+    return as_path
+
+
+def _merge_as4_path(as_path, as4_path):
+    # RFC 6793 section 4.2.3: AS4_PATH replaces the trailing part of
+    # AS_PATH, unless it is the longer one.
+    if len(as4_path) > len(as_path):
+        return as_path
+    return as_path[:len(as_path) - len(as4_path)] + as4_path
+
+
+def _from_update(msg, as4):
+    pattrs = msg.pathattr_map
+    origin = pattrs.get(bgp.BGP_ATTR_TYPE_ORIGIN)
+    as_path = pattrs.get(bgp.BGP_ATTR_TYPE_AS_PATH)
+    as_path = _flatten_as_path(as_path.path_seg_list) if as_path else []
+    as4_path = pattrs.get(bgp.BGP_ATTR_TYPE_AS4_PATH)
+    if as4_path and not as4:
+        as_path = _merge_as4_path(
+            as_path, _flatten_as_path(as4_path.path_seg_list))
+    next_hop = pattrs.get(bgp.BGP_ATTR_TYPE_NEXT_HOP)
+    med = pattrs.get(bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC)
+    local_pref = pattrs.get(bgp.BGP_ATTR_TYPE_LOCAL_PREF)
+    communities = pattrs.get(bgp.BGP_ATTR_TYPE_COMMUNITIES)
+
+    mp_next_hop = None
+    mp_nlri = []
+    mp_withdrawn = []
+    mp_reach = pattrs.get(bgp.BGP_ATTR_TYPE_MP_REACH_NLRI)
+    if (mp_reach and mp_reach.safi == _SAFI_UNICAST and
+            mp_reach.afi in _AFIS):
+        mp_next_hop = mp_reach.next_hop
+        mp_nlri = [nlri.prefix for nlri in mp_reach.nlri]
+    mp_unreach = pattrs.get(bgp.BGP_ATTR_TYPE_MP_UNREACH_NLRI)
+    if (mp_unreach and mp_unreach.safi == _SAFI_UNICAST and
+            mp_unreach.afi in _AFIS):
+        mp_withdrawn = [nlri.prefix for nlri in mp_unreach.withdrawn_routes]
+
+    return Update(
+        [nlri.prefix for nlri in msg.withdrawn_routes],
+        [nlri.prefix for nlri in msg.nlri],
+        origin.value if origin else None,
+        tuple(as_path),
+        next_hop.value if next_hop else None,
+        med.value if med else None,
+        local_pref.value if local_pref else None,
+        tuple(communities.communities) if communities else (),
+        mp_next_hop, mp_nlri, mp_withdrawn, msg)
+
+
+def parse_update(buf, as4=True):
+    """Decodes the BGP UPDATE message (including its header) in *buf*
+    into an Update named tuple.
+
+    *buf* can be bytes, bytearray or a memoryview.  *as4* tells whether
+    the AS numbers are encoded in 4 octets (four-octet AS number
+    capability negotiated, MRT *_AS4 records) or in 2 octets.
+
+    Raises ValueError if *buf* is not an UPDATE message, or the
+    exceptions of the generic parser if it is malformed.
+    """
+    try:
+        return _parse_fast(buf, 4 if as4 else 2)
+    except (_Unusual, struct.error, IndexError, KeyError):
+        pass
+
+    msg, _, _ = bgp.BGPMessage.parser(buf)
+    if not isinstance(msg, bgp.BGPUpdate):
+        raise ValueError('Not an UPDATE message: %s' % msg)
+    return _from_update(msg, as4)
@@ -0,0 +1,269 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Extraction of the commonly used header fields of an Ethernet frame.
+
+Many packet-in handlers only need a few fields, like the MAC addresses,
+the IP addresses or the L4 ports.  extract() reads them from the raw frame
+with precompiled structs, without building the protocol class instances
+of packet.Packet.
+"""
+
+import collections
+import socket
+import struct
+
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import in_proto
+
+
+class HeaderFields(collections.namedtuple('HeaderFields', [
+        'eth_dst', 'eth_src', 'eth_type', 'vlan_vid',
+        'ip_src', 'ip_dst', 'ip_proto', 'l4_src', 'l4_dst',
+        'arp_op', 'arp_spa', 'arp_tpa'])):
+    """Header fields of an Ethernet frame.
+
+    The fields which are not found in the frame are None.
+
+    ============== ==========================================================
+    Attribute      Description
+    ============== ==========================================================
+    eth_dst        Destination MAC address
+    eth_src        Source MAC address
+    eth_type       Ethertype of the payload (after the VLAN tags, if any)
+    vlan_vid       VLAN ID of the outermost VLAN tag
+    ip_src         Source IPv4 or IPv6 address
+    ip_dst         Destination IPv4 or IPv6 address
+    ip_proto       Protocol of the payload (after the IPv6 extension
+                   headers, if any)
+    l4_src         TCP, UDP or SCTP source port, ICMP or ICMPv6 type
+    l4_dst         TCP, UDP or SCTP destination port, ICMP or ICMPv6 code
+    arp_op         ARP opcode
+    arp_spa        ARP sender IPv4 address
+    arp_tpa        ARP target IPv4 address
+    ============== ==========================================================
+    """
+
+    __slots__ = ()
+
+
+(_ETH_DST, _ETH_SRC, _ETH_TYPE, _VLAN_VID,
+ _IP_SRC, _IP_DST, _IP_PROTO, _L4_SRC, _L4_DST,
+ _ARP_OP, _ARP_SPA, _ARP_TPA) = range(len(HeaderFields._fields))
+
+_ETH = struct.Struct('!6s6sH')
+_VLAN = struct.Struct('!HH')
+# version/IHL, flags/fragment offset, protocol, src, dst
+_IPV4 = struct.Struct('!B5xHxB2x4s4s')
+# version/traffic class/flow label, next header, src, dst
+_IPV6 = struct.Struct('!I2xBx16s16s')
+_IPV6_EXT = struct.Struct('!BB')
+_IPV6_FRAG = struct.Struct('!2xH')
+# opcode, sender HA, sender PA, target HA, target PA
+_ARP = struct.Struct('!6xH6s4s6s4s')
+_PORTS = struct.Struct('!HH')
+_ICMP = struct.Struct('!BB')
+
+_VLAN_TYPES = (ether_types.ETH_TYPE_8021Q, ether_types.ETH_TYPE_8021AD)
+_IPV6_EXT_HEADERS = (in_proto.IPPROTO_HOPOPTS, in_proto.IPPROTO_ROUTING,
+                     in_proto.IPPROTO_FRAGMENT, in_proto.IPPROTO_AH,
+                     in_proto.IPPROTO_DSTOPTS)
+_PORTS_PROTOS = (in_proto.IPPROTO_TCP, in_proto.IPPROTO_UDP,
+                 in_proto.IPPROTO_SCTP)
+_ICMP_PROTOS = (in_proto.IPPROTO_ICMP, in_proto.IPPROTO_ICMPV6)
+
+_MAC_FORMAT = ':'.join(['%02x'] * 6)
+
+
+def _decode(buf):
+    """Returns the list of the raw field values of the frame *buf*, with
+    the addresses as bytes, or None if *buf* is too short.
+    """
+    try:
+        eth_dst, eth_src, eth_type = _ETH.unpack_from(buf)
+    except struct.error:
+        return None
+    fields = [eth_dst, eth_src, eth_type, None,
+              None, None, None, None, None,
+              None, None, None]
+    offset = _ETH.size
+    # A truncated header ends the decoding, keeping the fields found in
+    # the previous headers.
+    try:
+        while eth_type in _VLAN_TYPES:
+            tci, eth_type = _VLAN.unpack_from(buf, offset)
+            offset += _VLAN.size
+            if fields[_VLAN_VID] is None:
+                fields[_VLAN_VID] = tci & 0x0fff
+            fields[_ETH_TYPE] = eth_type
+
+        if eth_type == ether_types.ETH_TYPE_IP:
+            (ver_ihl, frag, proto,
+             fields[_IP_SRC], fields[_IP_DST]) = _IPV4.unpack_from(buf, offset)
+            fields[_IP_PROTO] = proto
+            if frag & 0x1fff:
+                # Not the first fragment, there is no L4 header.
+                return fields
+            offset += (ver_ihl & 0xf) << 2
+
+        elif eth_type == ether_types.ETH_TYPE_IPV6:
+            (_, proto,
+             fields[_IP_SRC], fields[_IP_DST]) = _IPV6.unpack_from(buf, offset)
+            offset += _IPV6.size
+            fields[_IP_PROTO] = proto
+            while proto in _IPV6_EXT_HEADERS:
+                nxt, length = _IPV6_EXT.unpack_from(buf, offset)
+                if proto == in_proto.IPPROTO_FRAGMENT:
+                    frag, = _IPV6_FRAG.unpack_from(buf, offset)
+                    if frag & 0xfff8:
+                        fields[_IP_PROTO] = nxt
+                        return fields
+                    offset += 8
+                elif proto == in_proto.IPPROTO_AH:
+                    offset += (length + 2) << 2
+                else:
+                    offset += (length + 1) << 3
+                proto = fields[_IP_PROTO] = nxt
+
+        elif eth_type == ether_types.ETH_TYPE_ARP:
+            (fields[_ARP_OP], _, fields[_ARP_SPA],
+             _, fields[_ARP_TPA]) = _ARP.unpack_from(buf, offset)
+            return fields
+
+        else:
+            return fields
+
+        if proto in _PORTS_PROTOS:
+            fields[_L4_SRC], fields[_L4_DST] = _PORTS.unpack_from(buf, offset)
+        elif proto in _ICMP_PROTOS:
+            fields[_L4_SRC], fields[_L4_DST] = _ICMP.unpack_from(buf, offset)
+    except struct.error:
+        pass
+    return fields
+
+
+def _mac_to_text(mac):
+    return _MAC_FORMAT % tuple(bytearray(mac))
+
+
+def _ip_to_text(ip):
+    if len(ip) == 4:
+        return socket.inet_ntoa(ip)
+    return socket.inet_ntop(socket.AF_INET6, ip)
+
+
+def extract(buf):
+    """Extracts the header fields of the Ethernet frame *buf*.
+
+    *buf* is the raw frame, like the data of a packet-in message, as bytes,
+    bytearray or any other buffer object.
+    The addresses are returned as human readable strings, like the ones of
+    the protocol classes of this library.
+
+    Returns a HeaderFields instance, or None if *buf* is shorter than an
+    Ethernet header.
+    """
+    fields = _decode(buf)
+    if fields is None:
+        return None
+    fields[_ETH_DST] = _mac_to_text(fields[_ETH_DST])
+    fields[_ETH_SRC] = _mac_to_text(fields[_ETH_SRC])
+    for i in (_IP_SRC, _IP_DST, _ARP_SPA, _ARP_TPA):
+        if fields[i] is not None:
+            fields[i] = _ip_to_text(fields[i])
+    return HeaderFields(*fields)
+
+
+# Numpy dtype of the array returned by extract_batch().
+BATCH_DTYPE = [
+    ('eth_dst', '<u8'),
+    ('eth_src', '<u8'),
+    ('eth_type', '<u2'),
+    ('vlan_vid', '<i2'),
+    ('ip_src', 'u1', (16,)),
+    ('ip_dst', 'u1', (16,)),
+    ('ip_proto', '<i2'),
+    ('l4_src', '<i4'),
+    ('l4_dst', '<i4'),
+    ('arp_op', '<i4'),
+    ('arp_spa', '<u4'),
+    ('arp_tpa', '<u4'),
+]
+
+_UINT32 = struct.Struct('!I')
+_UINT64 = struct.Struct('!Q')
+_IPV4_MAPPED_PREFIX = b'\x00' * 10 + b'\xff\xff'
+_IPV6_UNSPECIFIED = b'\x00' * 16
+
+
+def _mac_to_int(mac):
+    return _UINT64.unpack(b'\x00\x00' + mac)[0]
+
+
+def _ip_to_16_bytes(ip):
+    if ip is None:
+        return _IPV6_UNSPECIFIED
+    elif len(ip) == 4:
+        return _IPV4_MAPPED_PREFIX + ip
+    return ip
+
+
+def extract_batch(frames):
+    """Extracts the header fields of each Ethernet frame of the sequence
+    *frames* into a numpy structured array of BATCH_DTYPE.
+
+    The fields are stored as numbers:
+
+    - The MAC addresses are 48-bit integers.
+    - The IP addresses are arrays of 16 bytes, in network byte order.
+      IPv4 addresses are stored as IPv4-mapped IPv6 addresses
+      (::ffff:a.b.c.d) and missing addresses as the unspecified address
+      (::).
+    - The ARP addresses are 32-bit integers, 0 if missing.
+    - The other missing fields are -1.
+
+    The row of a frame shorter than an Ethernet header has its eth_type
+    set to 0.
+
+    This requires numpy, which is imported when this is called.
+    """
+    import numpy
+
+    decoded = [_decode(buf) for buf in frames]
+    array = numpy.zeros(len(decoded), dtype=BATCH_DTYPE)
+    valid = [i for i, fields in enumerate(decoded) if fields is not None]
+    decoded = [decoded[i] for i in valid]
+    if not decoded:
+        return array
+
+    columns = list(zip(*decoded))
+    rows = array[valid]
+    rows['eth_dst'] = [_mac_to_int(mac) for mac in columns[_ETH_DST]]
+    rows['eth_src'] = [_mac_to_int(mac) for mac in columns[_ETH_SRC]]
+    rows['eth_type'] = columns[_ETH_TYPE]
+    for name, i in (('vlan_vid', _VLAN_VID), ('ip_proto', _IP_PROTO),
+                    ('l4_src', _L4_SRC), ('l4_dst', _L4_DST),
+                    ('arp_op', _ARP_OP)):
+        rows[name] = [-1 if v is None else v for v in columns[i]]
+    for name, i in (('ip_src', _IP_SRC), ('ip_dst', _IP_DST)):
+        rows[name] = numpy.frombuffer(
+            b''.join([_ip_to_16_bytes(ip) for ip in columns[i]]),
+            dtype='u1').reshape(-1, 16)
+    for name, i in (('arp_spa', _ARP_SPA), ('arp_tpa', _ARP_TPA)):
+        rows[name] = [0 if ip is None else _UINT32.unpack(ip)[0]
+                      for ip in columns[i]]
+    array[valid] = rows
+    return array
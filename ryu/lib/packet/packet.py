@@ -39,6 +39,16 @@ for _, m in mod:
 PKT_CLS_DICT = dict(cls_list)
 
 
+def _is_padding(buf):
+    # Same as "not six.binary_type(buf).strip(b'\x00')", but copies buf
+    # only if it starts and ends with a zero byte.
+    if not len(buf):
+        return True
+    if six.indexbytes(buf, 0) or six.indexbytes(buf, -1):
+        return False
+    return not six.binary_type(buf).strip(b'\x00')
+
+
 class Packet(StringifyMixin):
     """A packet decoder/encoder class.
 
@@ -51,12 +61,21 @@ class Packet(StringifyMixin):
     The payload is a bytearray.  They are iterated in on-wire order.
 
     *data* should be omitted when encoding a packet.
+
+    When decoding, *max_depth* limits the number of decoded protocol
+    headers and *stop_at* (a protocol class or a tuple of them) stops
+    decoding after the first header of the given protocol.  The data
+    which is not decoded is kept as the payload.  For example, the
+    following only decodes the ethernet header and the IPv4 or ARP one::
+
+        pkt = packet.Packet(data, stop_at=(ipv4.ipv4, arp.arp))
     """
 
     # Ignore data field when outputting json representation.
     _base_attributes = ['data']
 
-    def __init__(self, data=None, protocols=None, parse_cls=ethernet.ethernet):
+    def __init__(self, data=None, protocols=None, parse_cls=ethernet.ethernet,
+                 max_depth=None, stop_at=None):
         super(Packet, self).__init__()
         self.data = data
         if protocols is None:
@@ -64,13 +83,15 @@ class Packet(StringifyMixin):
         else:
             self.protocols = protocols
         if self.data:
-            self._parser(parse_cls)
+            self._parser(parse_cls, max_depth, stop_at)
 
-    def _parser(self, cls):
+    def _parser(self, cls, max_depth=None, stop_at=None):
         rest_data = self.data
         while cls:
+            if max_depth is not None and len(self.protocols) >= max_depth:
+                break
             # Ignores an empty buffer
-            if not six.binary_type(rest_data).strip(b'\x00'):
+            if _is_padding(rest_data):
                 break
             try:
                 proto, cls, rest_data = cls.parser(rest_data)
@@ -78,8 +99,10 @@ class Packet(StringifyMixin):
                 break
             if proto:
                 self.protocols.append(proto)
+                if stop_at is not None and isinstance(proto, stop_at):
+                    break
         # If rest_data is all padding, we ignore rest_data
-        if rest_data and six.binary_type(rest_data).strip(b'\x00'):
+        if rest_data and not _is_padding(rest_data):
             self.protocols.append(rest_data)
 
     def serialize(self):
@@ -178,6 +201,92 @@ class Packet(StringifyMixin):
     __repr__ = __str__  # note: str(list) uses __repr__ for elements
 
 
+class PacketView(Packet):
+    """A packet decoder which decodes the headers on demand.
+
+    *data* is a bytes-like object to describe a raw datagram to decode.
+    Protocol headers are decoded in on-wire order, only as far as needed:
+    get_protocol(), iteration and indexing stop as soon as they find the
+    requested header, and the other methods decode the whole packet.
+    The headers are decoded from memoryview slices of *data*, so it is
+    never copied, but the payload and some fields of the decoded headers
+    (options, data, ...) are memoryview of *data*, which must not be
+    modified while they are used.
+    """
+
+    def __init__(self, data, parse_cls=ethernet.ethernet):
+        # Packet.__init__ would decode the whole packet.
+        super(Packet, self).__init__()
+        self.data = data
+        self._protocols = []
+        self._next_cls = parse_cls
+        self._rest_data = memoryview(data)
+
+    @property
+    def protocols(self):
+        while self._decode_next():
+            pass
+        return self._protocols
+
+    def _decode_next(self):
+        # Runs one step of Packet._parser().  Returns False once the whole
+        # packet is decoded.
+        if self._rest_data is None:
+            return False
+        cls = self._next_cls
+        rest_data = self._rest_data
+        if cls and not _is_padding(rest_data):
+            try:
+                try:
+                    proto, cls, rest_data = cls.parser(rest_data)
+                except (AttributeError, TypeError):
+                    # This parser needs bytes.
+                    proto, cls, rest_data = cls.parser(
+                        six.binary_type(rest_data))
+            except struct.error:
+                pass
+            else:
+                if proto:
+                    self._protocols.append(proto)
+                if cls:
+                    self._next_cls = cls
+                    self._rest_data = rest_data
+                    return True
+        self._rest_data = None
+        # If rest_data is all padding, we ignore rest_data
+        if rest_data and not _is_padding(rest_data):
+            self._protocols.append(rest_data)
+        return True
+
+    def _iter_protocols(self):
+        i = 0
+        while True:
+            while i < len(self._protocols):
+                yield self._protocols[i]
+                i += 1
+            if not self._decode_next():
+                return
+
+    def get_protocol(self, protocol):
+        if isinstance(protocol, packet_base.PacketBase):
+            protocol = protocol.__class__
+        assert issubclass(protocol, packet_base.PacketBase)
+        for p in self._iter_protocols():
+            if isinstance(p, protocol):
+                return p
+        return None
+
+    def __iter__(self):
+        return self._iter_protocols()
+
+    def __getitem__(self, idx):
+        if isinstance(idx, int) and idx >= 0:
+            while len(self._protocols) <= idx and self._decode_next():
+                pass
+            return self._protocols[idx]
+        return self.protocols[idx]
+
+
 # XXX: Hack for preventing recursive import
 def _PacketBase__div__(self, trailer):
     pkt = Packet()
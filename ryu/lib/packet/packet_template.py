@@ -0,0 +1,402 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Packet templates for sending many packets which only differ in a few
+fields.
+
+A PacketTemplate serializes a prototype packet once.  Its setters write
+the new value of a field into the serialized data and update the
+checksums covering the field incrementally (RFC1624), instead of
+serializing all the headers again.
+"""
+
+import binascii
+import socket
+import struct
+
+import six
+
+from ryu.lib import addrconv
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import in_proto
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet_base
+from ryu.lib.packet import packet_utils
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+
+_UINT16 = struct.Struct('!H')
+_BYTE_PAIR = struct.Struct('!BB')
+_IPV4_PSEUDO_HEADER = struct.Struct('!4s4sxBH')
+_IPV6_PSEUDO_HEADER = struct.Struct('!16s16sI3xB')
+
+# Offsets of the fields in their header
+_ETH_DST_OFFSET = 0
+_ETH_SRC_OFFSET = 6
+_VLAN_TCI_OFFSET = 0
+_IPV4_TOTAL_LENGTH_OFFSET = 2
+_IPV4_ID_OFFSET = 4
+_IPV4_TTL_OFFSET = 8
+_IPV4_CSUM_OFFSET = 10
+_IPV4_SRC_OFFSET = 12
+_IPV4_DST_OFFSET = 16
+_IPV6_PAYLOAD_LENGTH_OFFSET = 4
+_IPV6_HOP_LIMIT_OFFSET = 7
+_IPV6_SRC_OFFSET = 8
+_IPV6_DST_OFFSET = 24
+_L4_SRC_OFFSET = 0
+_L4_DST_OFFSET = 2
+_UDP_LENGTH_OFFSET = 4
+_UDP_CSUM_OFFSET = 6
+_TCP_CSUM_OFFSET = 16
+_ARP_SRC_MAC_OFFSET = 8
+_ARP_SRC_IP_OFFSET = 14
+_ARP_DST_MAC_OFFSET = 18
+_ARP_DST_IP_OFFSET = 24
+
+
+def _mac_to_bin(mac):
+    # Faster than addrconv for the usual 'xx:xx:xx:xx:xx:xx' format.
+    try:
+        buf = binascii.unhexlify(mac.replace(':', ''))
+        if len(buf) == 6:
+            return buf
+    except (TypeError, ValueError):
+        pass
+    return addrconv.mac.text_to_bin(mac)
+
+
+class PacketTemplate(object):
+    """Serialized packet whose fields can be rewritten in place.
+
+    *pkt* is the prototype packet.Packet, which is serialized once.
+    ``data`` is the bytearray of the serialized packet, updated by the
+    setters.  It is modified in place, so a copy of it must be made to
+    keep the packet as it is (e.g. ``bytes(template.data)``).
+
+    The setters rewrite the field of the first header of the protocol in
+    the packet and raise ValueError if there is no such header.  The
+    checksums of the IPv4 header and of the TCP or UDP header are updated
+    accordingly.
+
+    The payload is the data following the last Ethernet, VLAN, ARP, IPv4,
+    IPv6, TCP or UDP header of the packet.
+
+    Example::
+
+        pkt = packet.Packet()
+        pkt.add_protocol(ethernet.ethernet(dst, src, ETH_TYPE_IP))
+        pkt.add_protocol(ipv4.ipv4(proto=inet.IPPROTO_UDP, src=src_ip,
+                                   dst=dst_ip))
+        pkt.add_protocol(udp.udp(src_port=src_port, dst_port=dst_port))
+        template = PacketTemplate(pkt)
+        for dst_ip in dst_ips:
+            template.set_ip_dst(dst_ip)
+            datapath.send_packet_out(actions=actions, data=template.data)
+    """
+
+    def __init__(self, pkt):
+        self.data = bytearray()
+        # (protocol class, offset of the header) tuples
+        self._headers = []
+        self._payload_offset = 0
+        # Length of the padding of the Ethernet frame, at the end of data
+        self._padding = 0
+
+        protocols = pkt.protocols[::-1]
+        for i, p in enumerate(protocols):
+            if isinstance(p, packet_base.PacketBase):
+                if i == len(protocols) - 1:
+                    prev = None
+                else:
+                    prev = protocols[i + 1]
+                length = len(self.data)
+                hdr = p.serialize(self.data, prev)
+                self._padding += len(self.data) - length
+            else:
+                hdr = six.binary_type(p)
+            self.data = bytearray(hdr + self.data)
+            self._headers.insert(0, (type(p), len(hdr)))
+
+        offset = 0
+        for i, (cls, length) in enumerate(self._headers):
+            self._headers[i] = (cls, offset)
+            offset += length
+            if cls in (ethernet.ethernet, vlan.vlan, vlan.svlan, arp.arp,
+                       ipv4.ipv4, ipv6.ipv6, tcp.tcp, udp.udp):
+                self._payload_offset = offset
+
+        self._eth = self._find(ethernet.ethernet)
+        self._vlan = self._find(vlan.vlan, vlan.svlan)
+        self._arp = self._find(arp.arp)
+        self._ip = self._find(ipv4.ipv4, ipv6.ipv6)
+        self._l4 = self._find(tcp.tcp, udp.udp)
+        # The IP header of the pseudo header of the L4 checksum
+        self._l4_ip = None
+        if self._l4 is not None:
+            for cls, offset in self._headers:
+                if offset >= self._l4[1]:
+                    break
+                if cls in (ipv4.ipv4, ipv6.ipv6):
+                    self._l4_ip = (cls, offset)
+
+    def _find(self, *classes):
+        for cls, offset in self._headers:
+            if cls in classes:
+                return cls, offset
+        return None
+
+    @staticmethod
+    def _header(header, name):
+        if header is None:
+            raise ValueError('no %s header in the packet' % name)
+        return header
+
+    def _l4_csum_offset(self):
+        # Returns the offset of the L4 checksum, or None if there is none.
+        if self._l4 is None or self._l4_ip is None:
+            return None
+        cls, offset = self._l4
+        if cls is udp.udp:
+            csum_offset = offset + _UDP_CSUM_OFFSET
+            if (self._l4_ip[0] is ipv4.ipv4 and
+                    not _UINT16.unpack_from(self.data, csum_offset)[0]):
+                # The checksum of UDP over IPv4 is optional.
+                return None
+            return csum_offset
+        return offset + _TCP_CSUM_OFFSET
+
+    def _update_csum(self, csum_offset, old, new):
+        csum, = _UINT16.unpack_from(self.data, csum_offset)
+        csum = packet_utils.checksum_update(csum, old, new)
+        if not csum and self._is_udp_csum(csum_offset):
+            # Zero means no checksum for UDP, its one's complement is sent.
+            csum = 0xffff
+        _UINT16.pack_into(self.data, csum_offset, csum)
+
+    def _is_udp_csum(self, csum_offset):
+        return (self._l4 is not None and self._l4[0] is udp.udp and
+                csum_offset == self._l4[1] + _UDP_CSUM_OFFSET)
+
+    def _ip_csum_offset(self):
+        if self._ip is None or self._ip[0] is not ipv4.ipv4:
+            return None
+        return self._ip[1] + _IPV4_CSUM_OFFSET
+
+    def _write(self, offset, value, csum_offsets=()):
+        """Writes *value*, whose offset is even from the start of the
+        headers covered by the checksums at *csum_offsets*.
+        """
+        end = offset + len(value)
+        old = bytes(self.data[offset:end])
+        if old == value:
+            return
+        self.data[offset:end] = value
+        for csum_offset in csum_offsets:
+            if csum_offset is not None:
+                self._update_csum(csum_offset, old, value)
+
+    def _write_ip_addr(self, field_offset, addr):
+        cls, offset = self._header(self._ip, 'IP')
+        if cls is ipv4.ipv4:
+            value = socket.inet_aton(addr)
+            csum_offsets = [offset + _IPV4_CSUM_OFFSET]
+        else:
+            value = socket.inet_pton(socket.AF_INET6, addr)
+            csum_offsets = []
+        if self._l4_ip == self._ip:
+            # Covered by the pseudo header.
+            csum_offsets.append(self._l4_csum_offset())
+        self._write(offset + field_offset[cls], value, csum_offsets)
+
+    def set_eth_src(self, mac):
+        """Sets the source MAC address of the Ethernet header."""
+        _, offset = self._header(self._eth, 'Ethernet')
+        self._write(offset + _ETH_SRC_OFFSET, _mac_to_bin(mac))
+
+    def set_eth_dst(self, mac):
+        """Sets the destination MAC address of the Ethernet header."""
+        _, offset = self._header(self._eth, 'Ethernet')
+        self._write(offset + _ETH_DST_OFFSET, _mac_to_bin(mac))
+
+    def set_vlan_vid(self, vid):
+        """Sets the VLAN ID of the (outermost) VLAN tag."""
+        _, offset = self._header(self._vlan, 'VLAN')
+        offset += _VLAN_TCI_OFFSET
+        tci, = _UINT16.unpack_from(self.data, offset)
+        self._write(offset, _UINT16.pack((tci & 0xf000) | (vid & 0x0fff)))
+
+    def set_ip_src(self, addr):
+        """Sets the source address of the IPv4 or IPv6 header."""
+        self._write_ip_addr({ipv4.ipv4: _IPV4_SRC_OFFSET,
+                             ipv6.ipv6: _IPV6_SRC_OFFSET}, addr)
+
+    def set_ip_dst(self, addr):
+        """Sets the destination address of the IPv4 or IPv6 header."""
+        self._write_ip_addr({ipv4.ipv4: _IPV4_DST_OFFSET,
+                             ipv6.ipv6: _IPV6_DST_OFFSET}, addr)
+
+    def set_ip_ttl(self, ttl):
+        """Sets the TTL of the IPv4 header or the hop limit of the IPv6
+        header.
+        """
+        cls, offset = self._header(self._ip, 'IP')
+        if cls is ipv6.ipv6:
+            self.data[offset + _IPV6_HOP_LIMIT_OFFSET] = ttl
+            return
+        # The TTL is written with the protocol, as the 16-bit word covered
+        # by the checksum.
+        offset += _IPV4_TTL_OFFSET
+        _, proto = _BYTE_PAIR.unpack_from(self.data, offset)
+        self._write(offset, _BYTE_PAIR.pack(ttl, proto),
+                    [self._ip_csum_offset()])
+
+    def set_ip_id(self, identification):
+        """Sets the identification of the IPv4 header."""
+        cls, offset = self._header(self._ip, 'IP')
+        if cls is not ipv4.ipv4:
+            raise ValueError('no IPv4 header in the packet')
+        self._write(offset + _IPV4_ID_OFFSET, _UINT16.pack(identification),
+                    [self._ip_csum_offset()])
+
+    def set_l4_src(self, port):
+        """Sets the source port of the TCP or UDP header."""
+        _, offset = self._header(self._l4, 'TCP or UDP')
+        self._write(offset + _L4_SRC_OFFSET, _UINT16.pack(port),
+                    [self._l4_csum_offset()])
+
+    def set_l4_dst(self, port):
+        """Sets the destination port of the TCP or UDP header."""
+        _, offset = self._header(self._l4, 'TCP or UDP')
+        self._write(offset + _L4_DST_OFFSET, _UINT16.pack(port),
+                    [self._l4_csum_offset()])
+
+    def _write_arp(self, field_offset, value):
+        _, offset = self._header(self._arp, 'ARP')
+        self._write(offset + field_offset, value)
+
+    def set_arp_src_mac(self, mac):
+        """Sets the sender hardware address of the ARP header."""
+        self._write_arp(_ARP_SRC_MAC_OFFSET, _mac_to_bin(mac))
+
+    def set_arp_src_ip(self, addr):
+        """Sets the sender protocol address of the ARP header."""
+        self._write_arp(_ARP_SRC_IP_OFFSET, socket.inet_aton(addr))
+
+    def set_arp_dst_mac(self, mac):
+        """Sets the target hardware address of the ARP header."""
+        self._write_arp(_ARP_DST_MAC_OFFSET, _mac_to_bin(mac))
+
+    def set_arp_dst_ip(self, addr):
+        """Sets the target protocol address of the ARP header."""
+        self._write_arp(_ARP_DST_IP_OFFSET, socket.inet_aton(addr))
+
+    def _end(self):
+        return len(self.data) - self._padding
+
+    @property
+    def payload(self):
+        """The payload, without the padding of the Ethernet frame."""
+        return self.data[self._payload_offset:self._end()]
+
+    def set_payload(self, payload):
+        """Replaces the payload.
+
+        If the length changes, the lengths of the IPv4, IPv6 and UDP headers
+        are updated and the TCP or UDP checksum is computed again.
+        """
+        start = self._payload_offset
+        end = self._end()
+        old = bytes(self.data[start:end])
+        delta = len(payload) - len(old)
+        if not delta:
+            self.data[start:end] = payload
+            csum_offset = self._l4_csum_offset()
+            if csum_offset is None:
+                return
+            elif (start - self._l4[1]) % 2:
+                # Not aligned on the 16-bit words of the checksum.
+                self._l4_csum()
+            else:
+                if len(old) % 2:
+                    # Padded as for the checksum computation.
+                    old += b'\x00'
+                    payload = bytes(payload) + b'\x00'
+                self._update_csum(csum_offset, old, bytes(payload))
+            return
+
+        self.data[start:] = payload
+        self._padding = 0
+        for cls, offset in self._headers:
+            if offset >= start:
+                break
+            if cls is ipv4.ipv4:
+                offset += _IPV4_TOTAL_LENGTH_OFFSET
+                length, = _UINT16.unpack_from(self.data, offset)
+                self._write(offset, _UINT16.pack(length + delta),
+                            [offset - _IPV4_TOTAL_LENGTH_OFFSET +
+                             _IPV4_CSUM_OFFSET])
+            elif cls is ipv6.ipv6:
+                offset += _IPV6_PAYLOAD_LENGTH_OFFSET
+                length, = _UINT16.unpack_from(self.data, offset)
+                _UINT16.pack_into(self.data, offset, length + delta)
+            elif cls is udp.udp:
+                offset += _UDP_LENGTH_OFFSET
+                length, = _UINT16.unpack_from(self.data, offset)
+                _UINT16.pack_into(self.data, offset, length + delta)
+        self._l4_csum()
+
+        if self._eth is not None:
+            # Pads the frame as ethernet.serialize() does.
+            length = len(self.data) - self._eth[1] - ethernet.ethernet._MIN_LEN
+            self._padding = max(
+                ethernet.ethernet._MIN_PAYLOAD_LEN - length, 0)
+            self.data.extend(b'\x00' * self._padding)
+
+    def _l4_csum(self):
+        # Computes the TCP or UDP checksum from scratch.
+        csum_offset = self._l4_csum_offset()
+        if csum_offset is None:
+            return
+        cls, offset = self._l4_ip
+        if cls is ipv4.ipv4:
+            src = self.data[offset + _IPV4_SRC_OFFSET:
+                            offset + _IPV4_SRC_OFFSET + 4]
+            dst = self.data[offset + _IPV4_DST_OFFSET:
+                            offset + _IPV4_DST_OFFSET + 4]
+        else:
+            src = self.data[offset + _IPV6_SRC_OFFSET:
+                            offset + _IPV6_SRC_OFFSET + 16]
+            dst = self.data[offset + _IPV6_DST_OFFSET:
+                            offset + _IPV6_DST_OFFSET + 16]
+        l4_cls, l4_offset = self._l4
+        proto = (in_proto.IPPROTO_TCP if l4_cls is tcp.tcp
+                 else in_proto.IPPROTO_UDP)
+        _UINT16.pack_into(self.data, csum_offset, 0)
+        segment = self.data[l4_offset:self._end()]
+        if cls is ipv4.ipv4:
+            pseudo_header = _IPV4_PSEUDO_HEADER.pack(
+                bytes(src), bytes(dst), proto, len(segment))
+        else:
+            pseudo_header = _IPV6_PSEUDO_HEADER.pack(
+                bytes(src), bytes(dst), len(segment), proto)
+        csum = packet_utils.checksum(pseudo_header + segment)
+        if not csum and l4_cls is udp.udp:
+            csum = 0xffff
+        _UINT16.pack_into(self.data, csum_offset, csum)
@@ -13,9 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import array
+import binascii
 import six
-import socket
 import struct
 from ryu.lib import addrconv
 
@@ -25,15 +24,50 @@ def carry_around_add(a, b):
     return (c & 0xffff) + (c >> 16)
 
 
-def checksum(data):
-    data = six.binary_type(data)    # input can be bytearray.
+if six.PY3:
+    def _to_int(data):
+        return int.from_bytes(data, 'big')
+else:
+    def _to_int(data):
+        return int(binascii.hexlify(data) or b'0', 16)
+
+
+def _sum16(data):
+    # 2**16 is 1 modulo 0xffff, so the data read as a big-endian integer
+    # has the same remainder as the sum of its 16-bit words.
     if len(data) % 2:
-        data += b'\x00'
+        return (_to_int(data) << 8) % 0xffff
+    return _to_int(data) % 0xffff
+
+
+def _checksum(s, *data):
+    # s is the one's complement sum of the words of data modulo 0xffff.
+    # It is 0 either for a sum of 0xffff or if all the words are zero.
+    if s:
+        return 0xffff - s
+    elif any(any(bytearray(d)) for d in data):
+        return 0
+    return 0xffff
+
+
+def checksum(data):
+    """
+    Internet checksum (RFC1071) of data (bytes or bytearray)
+    """
+    return _checksum(_sum16(data), data)
+
 
-    s = sum(array.array('H', data))
-    s = (s & 0xffff) + (s >> 16)
-    s += (s >> 16)
-    return socket.ntohs(~s & 0xffff)
+def checksum_update(csum, old, new):
+    """
+    Incremental update of the Internet checksum (RFC1624)
+
+    Returns the checksum of the data whose checksum was csum, when the
+    bytes old are replaced with new.  old and new have the same even
+    length and start at an even offset of the checksummed data.
+    """
+    # HC' = ~(~HC + ~m + m') (RFC1624 Eqn. 3)
+    s = ((~csum & 0xffff) - _to_int(old) + _to_int(new)) % 0xffff
+    return 0xffff - s if s else 0
 
 
 # avoid circular import
@@ -96,8 +130,10 @@ def checksum_ip(ipvx, length, payload):
     else:
         raise ValueError('Unknown IP version %d' % ipvx.version)
 
-    buf = header + payload
-    return checksum(buf)
+    # The pseudo header has an even length, so the payload does not need
+    # to be copied after it.
+    return _checksum((_sum16(header) + _sum16(payload)) % 0xffff,
+                     header, payload)
 
 
 _MODX = 4102
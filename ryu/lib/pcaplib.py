@@ -35,12 +35,54 @@ Reference source: http://wiki.wireshark.org/Development/LibpcapFileFormat
                 +---------------------+
                 |          ...        |
                 +---------------------+
+
+The pcapng format is read and written by MmapReader and FileWriter.
+Reference source: https://github.com/pcapng/pcapng
+
+
+                  pcapng File Format
+
+                +---------------------+
+                | Section Header Blk  |
+                +---------------------+
+                | Interface Desc Blk  |
+                +---------------------+
+                | Enhanced Packet Blk |
+                +---------------------+
+                |          ...        |
+                +---------------------+
 """
 
+import logging
+import mmap
+import os
 import struct
 import sys
 import time
 
+import six
+
+from ryu.lib.packet import header_fields
+
+LOG = logging.getLogger(__name__)
+
+# Nanosecond resolution PCAP magic numbers
+MAGIC_NUMBER_NSEC_IDENTICAL = b'\xa1\xb2\x3c\x4d'  # Big Endian
+MAGIC_NUMBER_NSEC_SWAPPED = b'\x4d\x3c\xb2\xa1'    # Little Endian
+
+# pcapng block types
+PCAPNG_BLOCK_SHB = 0x0a0d0d0a    # Section Header Block
+PCAPNG_BLOCK_IDB = 0x00000001    # Interface Description Block
+PCAPNG_BLOCK_PB = 0x00000002     # Packet Block (obsolete)
+PCAPNG_BLOCK_SPB = 0x00000003    # Simple Packet Block
+PCAPNG_BLOCK_EPB = 0x00000006    # Enhanced Packet Block
+
+PCAPNG_BYTE_ORDER_MAGIC = 0x1a2b3c4d
+PCAPNG_OPT_ENDOFOPT = 0
+PCAPNG_OPT_IF_TSRESOL = 9
+
+LINKTYPE_ETHERNET = 1
+
 
 class PcapFileHdr(object):
     """
@@ -230,9 +272,14 @@ class Reader(object):
 
     def next(self):
         try:
+            # Slices the record only, not the whole rest of the file.
             pkt_hdr, pkt_data = PcapPktHdr.parser(
-                self._pcap_body[self._next_pos:], self._file_byteorder)
-            self._next_pos += pkt_hdr.incl_len + PcapPktHdr.PKT_HDR_SIZE
+                self._pcap_body[self._next_pos:
+                                self._next_pos + PcapPktHdr.PKT_HDR_SIZE],
+                self._file_byteorder)
+            pkt_pos = self._next_pos + PcapPktHdr.PKT_HDR_SIZE
+            pkt_data = self._pcap_body[pkt_pos:pkt_pos + pkt_hdr.incl_len]
+            self._next_pos = pkt_pos + pkt_hdr.incl_len
 
         except IndexError:
             raise StopIteration()
@@ -320,3 +367,457 @@ class Writer(object):
 
     def __del__(self):
         self._f.close()
+
+
+class MmapReader(object):
+    """
+    Memory-mapped PCAP and pcapng file reader
+
+    Faster alternative to Reader for large capture files.  The file is
+    mapped into memory instead of being read, and the packet data are
+    yielded as memoryview objects referring to the mapping, so that no
+    data is copied until the packets are decoded.  Both the PCAP
+    (microsecond and nanosecond resolution, either byte order) and
+    the pcapng formats are detected from the magic number.
+
+    ========= ================================================
+    Argument  Description
+    ========= ================================================
+    path      Path of the PCAP or pcapng file.
+    match     Dictionary of the header_fields.HeaderFields
+              field names and the values (or collections of
+              values) the packets must match, or None for all
+              packets (e.g. ``{'ip_proto': 6, 'l4_dst': [80,
+              443]}``).  The values are compared with the ones
+              returned by ryu.lib.packet.header_fields.extract(),
+              and only the Ethernet frames can match.
+    ========= ================================================
+
+    The yielded memoryview objects refer to the mapped file: release
+    them (or convert them with ``bytes()``) before calling close(),
+    otherwise the file is unmapped when they are garbage collected.
+
+    Example of Usage::
+
+        from ryu.lib import pcaplib
+        from ryu.lib.packet import packet
+
+        reader = pcaplib.MmapReader('capture.pcapng',
+                                    match={'l4_dst': 179})
+        for ts, buf in reader:
+            pkt = packet.Packet(bytes(buf))
+            print("%f, %s" % (ts, pkt))
+        reader.close()
+    """
+
+    _PCAPNG_BLOCK_HDR_SIZE = 8
+    _PCAPNG_BLOCK_MIN_SIZE = 12
+
+    def __init__(self, path, match=None):
+        self._f = open(path, 'rb')
+        try:
+            self._buf = mmap.mmap(self._f.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            self._buf = b''
+        try:
+            self._view = memoryview(self._buf)
+        except TypeError:
+            # mmap objects do not support memoryview on Python 2,
+            # the packet data are then sliced out of the mapping.
+            self._view = self._buf
+        self._match = self._compile_match(match)
+
+        self.pcap_header = None
+        self.network = None
+        magic = self._buf[:4]
+        if magic == struct.pack('!I', PCAPNG_BLOCK_SHB):
+            self.format = 'pcapng'
+        elif magic in (MAGIC_NUMBER_NSEC_IDENTICAL,
+                       MAGIC_NUMBER_NSEC_SWAPPED):
+            self.format = 'pcap-nsec'
+        else:
+            self.format = 'pcap'
+        if self.format != 'pcapng':
+            if len(self._buf) < PcapFileHdr.FILE_HDR_SIZE:
+                self.close()
+                raise struct.error('Invalid pcap file.')
+            endian = '>' if magic in (PcapFileHdr.MAGIC_NUMBER_IDENTICAL,
+                                      MAGIC_NUMBER_NSEC_IDENTICAL) else '<'
+            self.pcap_header = PcapFileHdr(*struct.unpack_from(
+                endian + PcapFileHdr._FILE_HDR_FMT, self._buf))
+            if magic in (MAGIC_NUMBER_NSEC_IDENTICAL,
+                         MAGIC_NUMBER_NSEC_SWAPPED):
+                self.pcap_header.magic = magic
+            elif magic not in (PcapFileHdr.MAGIC_NUMBER_IDENTICAL,
+                               PcapFileHdr.MAGIC_NUMBER_SWAPPED):
+                self.close()
+                raise struct.error('Invalid byte ordered pcap file.')
+            self.network = self.pcap_header.network
+            self._endian = endian
+
+    @staticmethod
+    def _compile_match(match):
+        if not match:
+            return None
+        compiled = []
+        for name, values in match.items():
+            if name not in header_fields.HeaderFields._fields:
+                raise ValueError('Unknown header field: %s' % name)
+            if (isinstance(values, (six.string_types, six.integer_types))
+                    or values is None):
+                values = [values]
+            compiled.append((header_fields.HeaderFields._fields.index(name),
+                             frozenset(values)))
+        return compiled
+
+    def _matches(self, linktype, buf):
+        if linktype != LINKTYPE_ETHERNET:
+            return False
+        fields = header_fields.extract(buf)
+        if fields is None:
+            return False
+        for index, values in self._match:
+            if fields[index] not in values:
+                return False
+        return True
+
+    def __iter__(self):
+        if self.format == 'pcapng':
+            records = self._iter_pcapng()
+        else:
+            records = self._iter_pcap()
+        if self._match is None:
+            for ts, _, buf in records:
+                yield ts, buf
+        else:
+            for ts, linktype, buf in records:
+                if self._matches(linktype, buf):
+                    yield ts, buf
+
+    def _iter_pcap(self):
+        buf = self._buf
+        view = self._view
+        size = len(buf)
+        linktype = self.network
+        hdr = struct.Struct(self._endian + PcapPktHdr._PKT_HDR_FMT)
+        hdr_size = hdr.size
+        if self.format == 'pcap-nsec':
+            divisor = 1e9
+        else:
+            divisor = 1e6
+
+        offset = PcapFileHdr.FILE_HDR_SIZE
+        while offset + hdr_size <= size:
+            ts_sec, ts_frac, incl_len, _ = hdr.unpack_from(buf, offset)
+            start = offset + hdr_size
+            offset = start + incl_len
+            if offset > size:
+                LOG.warning('Truncated packet record at offset %d',
+                            start - hdr_size)
+                return
+            yield ts_sec + ts_frac / divisor, linktype, view[start:offset]
+
+    @staticmethod
+    def _pcapng_tsresol(buf, offset, end, endian):
+        # Returns the divisor of the timestamps of the interface from
+        # the if_tsresol option (microseconds by default).
+        opt = struct.Struct(endian + 'HH')
+        while offset + opt.size <= end:
+            code, length = opt.unpack_from(buf, offset)
+            if code == PCAPNG_OPT_ENDOFOPT:
+                break
+            if code == PCAPNG_OPT_IF_TSRESOL and length >= 1:
+                resol = six.indexbytes(buf, offset + opt.size)
+                if resol & 0x80:
+                    return float(2 ** (resol & 0x7f))
+                return float(10 ** resol)
+            offset += opt.size + (length + 3) // 4 * 4
+        return 1e6
+
+    def _iter_pcapng(self):
+        buf = self._buf
+        view = self._view
+        size = len(buf)
+        shb_type = struct.pack('!I', PCAPNG_BLOCK_SHB)
+        endian = None
+        interfaces = []
+
+        offset = 0
+        while offset + self._PCAPNG_BLOCK_MIN_SIZE <= size:
+            if buf[offset:offset + 4] == shb_type:
+                # A new section, which can have another byte order.
+                bom = buf[offset + 8:offset + 12]
+                if bom == struct.pack('>I', PCAPNG_BYTE_ORDER_MAGIC):
+                    endian = '>'
+                elif bom == struct.pack('<I', PCAPNG_BYTE_ORDER_MAGIC):
+                    endian = '<'
+                else:
+                    raise struct.error('Invalid byte ordered pcapng file.')
+                block_hdr = struct.Struct(endian + 'II')
+                idb = struct.Struct(endian + 'HHI')
+                epb = struct.Struct(endian + 'IIIII')
+                pb = struct.Struct(endian + 'HHIIII')
+                spb = struct.Struct(endian + 'I')
+                interfaces = []
+            elif endian is None:
+                raise struct.error('Invalid pcapng file.')
+
+            block_type, block_len = block_hdr.unpack_from(buf, offset)
+            if (block_len < self._PCAPNG_BLOCK_MIN_SIZE
+                    or offset + block_len > size):
+                LOG.warning('Truncated pcapng block at offset %d', offset)
+                return
+            body = offset + self._PCAPNG_BLOCK_HDR_SIZE
+            end = offset + block_len - 4
+            offset += block_len
+
+            if block_type == PCAPNG_BLOCK_IDB:
+                linktype, _, snaplen = idb.unpack_from(buf, body)
+                interfaces.append((linktype, snaplen, self._pcapng_tsresol(
+                    buf, body + idb.size, end, endian)))
+                if self.network is None:
+                    self.network = linktype
+                continue
+            elif block_type == PCAPNG_BLOCK_EPB:
+                (if_id, ts_high, ts_low,
+                 caplen, _) = epb.unpack_from(buf, body)
+                data = body + epb.size
+            elif block_type == PCAPNG_BLOCK_PB:
+                (if_id, _, ts_high, ts_low,
+                 caplen, _) = pb.unpack_from(buf, body)
+                data = body + pb.size
+            elif block_type == PCAPNG_BLOCK_SPB:
+                # No captured length nor timestamp, the snapshot length
+                # of the first interface truncates the original length.
+                if_id = ts_high = ts_low = 0
+                caplen, = spb.unpack_from(buf, body)
+                data = body + spb.size
+                if interfaces and interfaces[0][1]:
+                    caplen = min(caplen, interfaces[0][1])
+            else:
+                continue
+
+            if if_id >= len(interfaces) or data + caplen > end:
+                LOG.warning('Invalid pcapng packet block at offset %d',
+                            offset - block_len)
+                continue
+            linktype, _, divisor = interfaces[if_id]
+            yield (((ts_high << 32) | ts_low) / divisor, linktype,
+                   view[data:data + caplen])
+
+    def batches(self, size):
+        """
+        Yields the lists of at most *size* (timestamp, packet data)
+        tuples, e.g. to be passed to header_fields.extract_batch().
+        """
+        batch = []
+        for record in self:
+            batch.append(record)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def close(self):
+        if not hasattr(self, '_f'):
+            # Failed to open the file
+            return
+        if isinstance(self._view, memoryview):
+            self._view.release()
+        if isinstance(self._buf, mmap.mmap):
+            try:
+                self._buf.close()
+            except BufferError:
+                # Some packet data are still referred to, the mapping
+                # is closed when they are released.
+                pass
+        self._f.close()
+
+    def __del__(self):
+        self.close()
+
+
+class FileWriter(object):
+    """
+    Buffered PCAP and pcapng file writer with rotation
+
+    Alternative to Writer for capturing the packets at high rate.  The
+    records are packed with precompiled structs and gathered in memory,
+    then written to the file in one call per *flush_size* bytes, so
+    that the writes seldom block the caller (e.g. the packet-in
+    handlers of a RyuApp).  The file can be rotated when it reaches
+    *max_bytes*, as logging.handlers.RotatingFileHandler does.
+
+    ============ ==================================================
+    Argument     Description
+    ============ ==================================================
+    path         Path of the file to write.
+    snaplen      Max length of captured packets (in octets)
+    network      Data link type. (e.g. 1 for Ethernet,
+                 see `tcpdump.org`_ for details)
+    pcapng       True to write the pcapng format instead of
+                 the PCAP format.
+    flush_size   Number of bytes buffered before being written
+                 to the file.
+    max_bytes    Size of the file (in octets) at which it is
+                 rotated, or 0 for no rotation.
+    backup_count Number of rotated files kept as *path*.1,
+                 *path*.2, ... (the file is truncated instead
+                 if 0).
+    ============ ==================================================
+
+    .. _tcpdump.org: http://www.tcpdump.org/linktypes.html
+
+    The buffered records are written by flush() and close(), call
+    flush() periodically (e.g. from a hub thread) to bound the delay.
+
+    Example of usage::
+
+        ...
+        from ryu.lib import pcaplib
+
+
+        class SimpleSwitch13(app_manager.RyuApp):
+            OFP_VERSIONS = [ofproto_v1_3.OFP_VERSION]
+
+            def __init__(self, *args, **kwargs):
+                super(SimpleSwitch13, self).__init__(*args, **kwargs)
+                self.mac_to_port = {}
+
+                # Keep the last 10 files of 100MB
+                self.pcap_writer = pcaplib.FileWriter(
+                    'packet-in.pcapng', pcapng=True,
+                    max_bytes=100 * 1024 * 1024, backup_count=10)
+
+            ...
+
+            @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
+            def _packet_in_handler(self, ev):
+                # Dump the packet data into pcapng file
+                self.pcap_writer.write_pkt(ev.msg.data)
+
+                ...
+    """
+
+    DEFAULT_FLUSH_SIZE = 64 * 1024
+
+    # Native byte order, as the writers of libpcap
+    _PKT_HDR = struct.Struct('=' + PcapPktHdr._PKT_HDR_FMT)
+    _PCAPNG_SHB = struct.Struct('=IIIHHqI')
+    _PCAPNG_IDB = struct.Struct('=IIHHII')
+    _PCAPNG_EPB = struct.Struct('=IIIIIII')
+    _PCAPNG_BLOCK_LEN = struct.Struct('=I')
+    _PADDING = (b'', b'\x00\x00\x00', b'\x00\x00', b'\x00')
+
+    def __init__(self, path, snaplen=65535, network=1, pcapng=False,
+                 flush_size=DEFAULT_FLUSH_SIZE, max_bytes=0,
+                 backup_count=0):
+        self.path = path
+        self.snaplen = snaplen
+        self.network = network
+        self.pcapng = pcapng
+        self.flush_size = flush_size
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._f = None
+        self._buffer = []
+        self._buffered = 0
+        self._file_size = 0
+        self._header_size = 0
+        self._open()
+
+    def _file_hdr(self):
+        if not self.pcapng:
+            return PcapFileHdr(snaplen=self.snaplen,
+                               network=self.network).serialize()
+
+        shb = self._PCAPNG_SHB.pack(
+            PCAPNG_BLOCK_SHB, self._PCAPNG_SHB.size, PCAPNG_BYTE_ORDER_MAGIC,
+            1, 0, -1,   # version 1.0, unspecified section length
+            self._PCAPNG_SHB.size)
+        idb = self._PCAPNG_IDB.pack(
+            PCAPNG_BLOCK_IDB, self._PCAPNG_IDB.size, self.network, 0,
+            self.snaplen, self._PCAPNG_IDB.size)
+        return shb + idb
+
+    def _open(self):
+        # Unbuffered, as the records are buffered by this writer.
+        self._f = open(self.path, 'wb', 0)
+        hdr = self._file_hdr()
+        self._f.write(hdr)
+        self._header_size = self._file_size = len(hdr)
+
+    def _rotate(self):
+        self.flush()
+        self._f.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = '%s.%d' % (self.path, i)
+                dst = '%s.%d' % (self.path, i + 1)
+                if os.path.exists(src):
+                    if os.path.exists(dst):
+                        os.remove(dst)
+                    os.rename(src, dst)
+            dst = self.path + '.1'
+            if os.path.exists(dst):
+                os.remove(dst)
+            os.rename(self.path, dst)
+        self._open()
+
+    def write_pkt(self, buf, ts=None):
+        ts = time.time() if ts is None else ts
+
+        # Copies the mutable buffers, which can be modified before
+        # being flushed.
+        if isinstance(buf, memoryview):
+            buf = buf.tobytes()
+        elif not isinstance(buf, six.binary_type):
+            buf = six.binary_type(buf)
+
+        # Check the max length of captured packets
+        orig_len = len(buf)
+        if orig_len > self.snaplen:
+            buf = buf[:self.snaplen]
+        buf_len = len(buf)
+
+        usec = int(round(ts * 1e6))
+        if self.pcapng:
+            padding = self._PADDING[buf_len % 4]
+            block_len = self._PCAPNG_EPB.size + buf_len + len(padding) + 4
+            records = (self._PCAPNG_EPB.pack(
+                PCAPNG_BLOCK_EPB, block_len, 0, usec >> 32,
+                usec & 0xffffffff, buf_len, orig_len),
+                buf, padding, self._PCAPNG_BLOCK_LEN.pack(block_len))
+        else:
+            block_len = self._PKT_HDR.size + buf_len
+            sec, usec = divmod(usec, 1000000)
+            records = (self._PKT_HDR.pack(sec, usec, buf_len, orig_len),
+                       buf)
+
+        if (self.max_bytes and self._file_size > self._header_size
+                and self._file_size + block_len > self.max_bytes):
+            self._rotate()
+
+        self._buffer.extend(records)
+        self._buffered += block_len
+        self._file_size += block_len
+        if self._buffered >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._f.write(b''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def close(self):
+        if getattr(self, '_f', None) is None or self._f.closed:
+            return
+        self.flush()
+        self._f.close()
+
+    def __del__(self):
+        self.close()
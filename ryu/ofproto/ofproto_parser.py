@@ -19,14 +19,18 @@ import six
 import base64
 import collections
 import logging
+import re
 import struct
 import functools
 
+import netaddr
+
 from ryu import exception
 from ryu import utils
 from ryu.lib import stringify
 
 from ryu.ofproto import ofproto_common
+from ryu.ofproto import ofproto_v1_3
 
 LOG = logging.getLogger('ryu.ofproto.ofproto_parser')
 
@@ -35,11 +39,14 @@ if six.PY3:
     buffer = bytes
 
 
-def header(buf):
-    assert len(buf) >= ofproto_common.OFP_HEADER_SIZE
+def header(buf, offset=0):
+    assert len(buf) - offset >= ofproto_common.OFP_HEADER_SIZE
     # LOG.debug('len %d bufsize %d', len(buf), ofproto.OFP_HEADER_SIZE)
+    # Note: struct.unpack_from() accepts any object supporting the buffer
+    # protocol, so the header can be decoded from a bytearray or a
+    # memoryview in place without copying the rest of the buffer.
     return struct.unpack_from(ofproto_common.OFP_HEADER_PACK_STR,
-                              six.binary_type(buf))
+                              buf, offset)
 
 
 _MSG_PARSERS = {}
@@ -52,13 +59,20 @@ def register_msg_parser(version):
     return register
 
 
-def msg(datapath, version, msg_type, msg_len, xid, buf):
+def msg(datapath, version, msg_type, msg_len, xid, buf, offset=0):
     exp = None
     try:
-        assert len(buf) >= msg_len
+        assert len(buf) - offset >= msg_len
     except AssertionError as e:
         exp = e
 
+    if offset or not isinstance(buf, six.binary_type):
+        # The caller may hand over a view onto its receive buffer.
+        # Parsed messages keep references to their data (e.g. msg.buf,
+        # OFPPacketIn.data) beyond the lifetime of that buffer, so take
+        # exactly one copy of this message here.
+        buf = six.binary_type(buf[offset:offset + msg_len])
+
     msg_parser = _MSG_PARSERS.get(version)
     if msg_parser is None:
         raise exception.OFPUnknownVersion(version=version)
@@ -175,6 +189,57 @@ def ofp_instruction_from_jsondict(dp, jsonlist, encap=True):
     return result
 
 
+_lazy_decode = False
+
+
+def set_lazy_decode(enabled):
+    """
+    Enables or disables lazy decoding of received messages.
+
+    When enabled, parsers of the messages which support it (see
+    LazyDecodeMixin) keep the raw buffer and decode some attributes only
+    when they are first accessed.
+    """
+    global _lazy_decode
+    _lazy_decode = enabled
+
+
+def is_lazy_decode():
+    return _lazy_decode
+
+
+class LazyDecodeMixin(object):
+    """
+    Mixin for classes whose attributes can be decoded on demand.
+
+    A parser calls _set_lazy() instead of assigning an attribute.  The
+    given decoder is called with the given arguments when the attribute
+    is first accessed, and its result is stored as an ordinary instance
+    attribute.  The attribute is visible to dir(), so stringify and JSON
+    conversion decode and show it as usual.
+    """
+
+    def _set_lazy(self, name, decoder, *args):
+        self.__dict__.pop(name, None)
+        self.__dict__.setdefault('_lazy_attrs', {})[name] = (decoder, args)
+
+    def __getattr__(self, name):
+        # Called only when name is not found in the usual places.
+        lazy_attrs = self.__dict__.get('_lazy_attrs')
+        if lazy_attrs and name in lazy_attrs:
+            decoder, args = lazy_attrs.pop(name)
+            value = decoder(*args)
+            setattr(self, name, value)
+            return value
+        raise AttributeError("'%s' object has no attribute '%s'" %
+                             (self.__class__.__name__, name))
+
+    def __dir__(self):
+        names = list(super(LazyDecodeMixin, self).__dir__())
+        names.extend(self.__dict__.get('_lazy_attrs', ()))
+        return names
+
+
 class StringifyMixin(stringify.StringifyMixin):
     _class_prefixes = ["OFP", "ONF", "MT", "NX"]
 
@@ -295,3 +360,175 @@ def msg_str_attr(msg_, buf, attr_list=None):
             buf += ' %s %s' % (attr, val)
 
     return buf
+
+
+# Names of the fields of ofp_flow_mod in order of OFP_FLOW_MOD_PACK_STR0.
+# 'importance' exists only in OpenFlow 1.4 or later.
+_FLOW_MOD_FIELDS = ('cookie', 'cookie_mask', 'table_id', 'command',
+                    'idle_timeout', 'hard_timeout', 'priority', 'buffer_id',
+                    'out_port', 'out_group', 'flags', 'importance')
+
+_UINT32 = struct.Struct('!I')
+
+
+class _StampedMsg(MsgBase):
+    """
+    A message serialized by FlowModTemplate.stamp().
+
+    serialize() only fills the xid in the already serialized buf.
+    """
+
+    def __init__(self, datapath, msg_type, buf):
+        super(_StampedMsg, self).__init__(datapath)
+        self.version = datapath.ofproto.OFP_VERSION
+        self.msg_type = msg_type
+        self.msg_len = len(buf)
+        self.buf = buf
+
+    def serialize(self):
+        if self.xid is None:
+            self.xid = 0
+        _UINT32.pack_into(self.buf, 4, self.xid)
+
+
+class FlowModTemplate(object):
+    """
+    Pre-serialized flow-mod message for OpenFlow 1.3 or later.
+
+    The given OFPFlowMod instance is serialized once, and the offsets of
+    its fixed fields, its match fields and the ports of its output
+    actions are recorded.
+    stamp() copies the serialized bytes and writes the given values into
+    them in place, which is much cheaper than building and serializing
+    an OFPFlowMod for each of many flows which differ only in a few
+    values.
+
+    stamp() takes the following keyword arguments.  The fields not given
+    keep the values of the template.
+
+    ============= ========================================================
+    Argument      Description
+    ============= ========================================================
+    match         Dict of match field values.  Only the fields of the
+                  template match can be given, masked if and only if they
+                  are masked in the template.  Experimenter fields can
+                  not be given.
+    output        Port of the output action for a template with one
+                  output action, or a list of ports, one for each output
+                  action in order of the instructions and actions.
+    (others)      Fields of OFPFlowMod, e.g. cookie, priority and
+                  idle_timeout.
+    ============= ========================================================
+
+    ValueError is raised for a value which does not fit the template.
+
+    Example::
+
+        template = ofproto_parser.FlowModTemplate(parser.OFPFlowMod(
+            datapath, priority=10,
+            match=parser.OFPMatch(in_port=1, eth_dst='00:00:00:00:00:00'),
+            instructions=[parser.OFPInstructionActions(
+                ofp.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(1)])]))
+
+        for (in_port, eth_dst, out_port) in hosts:
+            datapath.send_msg(template.stamp(
+                cookie=in_port, output=out_port,
+                match={'in_port': in_port, 'eth_dst': eth_dst}))
+    """
+
+    def __init__(self, flow_mod):
+        datapath = flow_mod.datapath
+        ofproto = datapath.ofproto
+        if ofproto.OFP_VERSION < ofproto_v1_3.OFP_VERSION:
+            raise ValueError('FlowModTemplate requires OpenFlow 1.3 or later')
+        flow_mod.serialize()
+        self.datapath = datapath
+        self._msg_type = flow_mod.msg_type
+        self._buf = bytearray(flow_mod.buf)
+
+        self._fields = {}
+        offset = ofproto.OFP_HEADER_SIZE
+        names = iter(_FLOW_MOD_FIELDS)
+        for (count, fmt) in re.findall(r'(\d*)([a-zA-Z])',
+                                       ofproto.OFP_FLOW_MOD_PACK_STR0):
+            st = struct.Struct('!' + count + fmt)
+            if fmt != 'x':
+                self._fields[next(names)] = (st, offset)
+            offset += st.size
+
+        self._match_fields = {}
+        codecs = ofproto._oxm_field_codecs
+        offset = ofproto.OFP_FLOW_MOD_SIZE - ofproto.OFP_MATCH_SIZE
+        (_type, match_len) = struct.unpack_from('!HH', self._buf, offset)
+        end = offset + match_len
+        offset += 4
+        while offset < end:
+            (header, ) = _UINT32.unpack_from(self._buf, offset)
+            if header in codecs:
+                (codec, masked) = codecs[header]
+                self._match_fields[codec.name] = (offset, codec, header)
+            offset += 4 + (header & 0xff)
+
+        self._outputs = []
+        offset = utils.round_up(end, 8)
+        while offset < len(self._buf):
+            (inst_type, inst_len) = struct.unpack_from('!HH', self._buf,
+                                                       offset)
+            if inst_type in (ofproto.OFPIT_WRITE_ACTIONS,
+                             ofproto.OFPIT_APPLY_ACTIONS):
+                act_offset = offset + ofproto.OFP_INSTRUCTION_ACTIONS_SIZE
+                while act_offset < offset + inst_len:
+                    (act_type, act_len) = struct.unpack_from(
+                        '!HH', self._buf, act_offset)
+                    if act_type == ofproto.OFPAT_OUTPUT:
+                        self._outputs.append(act_offset + 4)
+                    act_offset += act_len
+            offset += inst_len
+
+    def stamp(self, match=None, output=None, **kwargs):
+        """
+        Returns a new message made from the template with the given
+        values.  The message can be sent by Datapath.send_msg() or
+        Datapath.send_batch() like OFPFlowMod.
+        """
+        buf = bytearray(self._buf)
+        for (k, v) in kwargs.items():
+            try:
+                (st, offset) = self._fields[k]
+            except KeyError:
+                raise ValueError('unknown flow-mod field: %s' % k)
+            try:
+                st.pack_into(buf, offset, v)
+            except struct.error as e:
+                raise ValueError('%s: %s' % (k, e))
+        if match:
+            for (k, uv) in match.items():
+                try:
+                    (offset, codec, header) = self._match_fields[k]
+                except KeyError:
+                    raise ValueError('%s is not in the template match' % k)
+                try:
+                    values = codec.values(uv)
+                    if values is not None and values[0] == header:
+                        if len(values) == 2:
+                            codec.struct.pack_into(buf, offset, *values)
+                        else:
+                            codec.struct_w.pack_into(buf, offset, *values)
+                        continue
+                except (TypeError, ValueError, struct.error,
+                        netaddr.AddrFormatError):
+                    pass
+                raise ValueError('%s does not fit the template match: '
+                                 '%s' % (k, uv))
+        if output is not None:
+            if isinstance(output, six.integer_types):
+                output = [output]
+            if len(output) != len(self._outputs):
+                raise ValueError('the template has %d output actions' %
+                                 len(self._outputs))
+            for (offset, port) in zip(self._outputs, output):
+                try:
+                    _UINT32.pack_into(buf, offset, port)
+                except struct.error as e:
+                    raise ValueError('output: %s' % e)
+        return _StampedMsg(self.datapath, self._msg_type, buf)
@@ -71,6 +71,11 @@ def _set_msg_type(msg_type):
     return _set_cls_msg_type
 
 
+def _match_length(buf, offset):
+    # The length field of ofp_match, without decoding the match itself
+    return struct.unpack_from('!HH', buf, offset)[1]
+
+
 def _register_parser(cls):
     '''class decorator to register msg parser'''
     assert cls.cls_msg_type is not None
@@ -724,7 +729,7 @@ class FlowWildcards(object):
         return not self.wildcards & (1 << shift)
 
 
-class OFPMatch(StringifyMixin):
+class OFPMatch(ofproto_parser.LazyDecodeMixin, StringifyMixin):
     """
     Flow Match Structure
 
@@ -1036,7 +1041,7 @@ class OFPMatch(StringifyMixin):
         self.fields.append(OFPMatchField.make(header, value, mask))
 
     def _composed_with_old_api(self):
-        return (self.fields and not self._fields2) or \
+        return (not self._fields2 and self.fields) or \
             self._wc.__dict__ != FlowWildcards().__dict__
 
     def serialize(self, buf, offset):
@@ -1049,14 +1054,10 @@ class OFPMatch(StringifyMixin):
         if self._composed_with_old_api():
             return self.serialize_old(buf, offset)
 
-        fields = [ofproto.oxm_from_user(k, uv) for (k, uv)
-                  in self._fields2]
-
         hdr_pack_str = '!HH'
         field_offset = offset + struct.calcsize(hdr_pack_str)
-        for (n, value, mask) in fields:
-            field_offset += ofproto.oxm_serialize(n, value, mask, buf,
-                                                  field_offset)
+        field_offset += ofproto.oxm_serialize_fields(self._fields2, buf,
+                                                     field_offset)
 
         length = field_offset - offset
         msg_pack_into(hdr_pack_str, buf, offset,
@@ -1319,17 +1320,13 @@ class OFPMatch(StringifyMixin):
 
         exc = None
         residue = None
-        # XXXcompat
-        try:
-            cls.parser_old(match, buf, offset, length)
-        except struct.error as e:
-            exc = e
+        fields_offset = offset
+        fields_length = length
 
         fields = []
         try:
             while length > 0:
-                n, value, mask, field_len = ofproto.oxm_parse(buf, offset)
-                k, uv = ofproto.oxm_to_user(n, value, mask)
+                k, uv, field_len = ofproto.oxm_parse_to_user(buf, offset)
                 fields.append((k, uv))
                 offset += field_len
                 length -= field_len
@@ -1337,10 +1334,27 @@ class OFPMatch(StringifyMixin):
             exc = e
             residue = buf[offset:]
         match._fields2 = fields
-        if exc is not None:
+
+        # XXXcompat
+        if exc is None:
+            # OFPMatch.fields is decoded when it is first accessed since
+            # only the old API uses it.
+            match._set_lazy('fields', cls._parser_old_fields,
+                            buf, fields_offset, fields_length)
+        else:
+            try:
+                cls.parser_old(match, buf, fields_offset, fields_length)
+            except struct.error:
+                pass
             raise exception.OFPTruncatedMessage(match, residue, exc)
         return match
 
+    @classmethod
+    def _parser_old_fields(cls, buf, offset, length):
+        match = OFPMatch()
+        cls.parser_old(match, buf, offset, length)
+        return match.fields
+
     @staticmethod
     def parser_old(match, buf, offset, length):
         while length > 0:
@@ -2260,7 +2274,7 @@ class MTIPv6ExtHdr(OFPMatchField):
 
 @_register_parser
 @_set_msg_type(ofproto.OFPT_PACKET_IN)
-class OFPPacketIn(MsgBase):
+class OFPPacketIn(ofproto_parser.LazyDecodeMixin, MsgBase):
     """
     Packet-In message
 
@@ -2328,10 +2342,15 @@ class OFPPacketIn(MsgBase):
             ofproto.OFP_PACKET_IN_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, ofproto.OFP_PACKET_IN_SIZE -
-                                    ofproto.OFP_MATCH_SIZE)
+        offset = ofproto.OFP_PACKET_IN_SIZE - ofproto.OFP_MATCH_SIZE
+        if ofproto_parser.is_lazy_decode():
+            msg._set_lazy('match', OFPMatch.parser, msg.buf, offset)
+            match_len = _match_length(msg.buf, offset)
+        else:
+            msg.match = OFPMatch.parser(msg.buf, offset)
+            match_len = msg.match.length
 
-        match_len = utils.round_up(msg.match.length, 8)
+        match_len = utils.round_up(match_len, 8)
         msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
                             ofproto.OFP_MATCH_SIZE + match_len + 2):]
 
@@ -3940,20 +3959,29 @@ class OFPMultipartReply(MsgBase):
         msg.type = type_
         msg.flags = flags
 
-        if stats_type_cls is not None:
-            offset = ofproto.OFP_MULTIPART_REPLY_SIZE
-            body = []
-            while offset < msg_len:
-                b = stats_type_cls.cls_stats_body_cls.parser(msg.buf, offset)
-                body.append(b)
-                offset += b.length if hasattr(b, 'length') else b.len
-
-            if stats_type_cls.cls_body_single_struct:
-                msg.body = body[0]
-            else:
-                msg.body = body
+        if stats_type_cls is None:
+            pass
+        elif (ofproto_parser.is_lazy_decode() and
+              issubclass(stats_type_cls, ofproto_parser.LazyDecodeMixin)):
+            msg._set_lazy('body', cls._parser_body, stats_type_cls,
+                          msg.buf, msg_len)
+        else:
+            msg.body = cls._parser_body(stats_type_cls, msg.buf, msg_len)
         return msg
 
+    @staticmethod
+    def _parser_body(stats_type_cls, buf, msg_len):
+        offset = ofproto.OFP_MULTIPART_REPLY_SIZE
+        body = []
+        while offset < msg_len:
+            b = stats_type_cls.cls_stats_body_cls.parser(buf, offset)
+            body.append(b)
+            offset += b.length if hasattr(b, 'length') else b.len
+
+        if stats_type_cls.cls_body_single_struct:
+            return body[0]
+        return body
+
 
 class OFPDescStats(ofproto_parser.namedtuple('OFPDescStats', (
         'mfr_desc', 'hw_desc', 'sw_desc', 'serial_num', 'dp_desc'))):
@@ -4038,7 +4066,7 @@ class OFPDescStatsReply(OFPMultipartReply):
         super(OFPDescStatsReply, self).__init__(datapath, **kwargs)
 
 
-class OFPFlowStats(StringifyMixin):
+class OFPFlowStats(ofproto_parser.LazyDecodeMixin, StringifyMixin):
     def __init__(self, table_id=None, duration_sec=None, duration_nsec=None,
                  priority=None, idle_timeout=None, hard_timeout=None,
                  flags=None, cookie=None, packet_count=None,
@@ -4072,21 +4100,34 @@ class OFPFlowStats(StringifyMixin):
             ofproto.OFP_FLOW_STATS_0_PACK_STR, buf, offset)
         offset += ofproto.OFP_FLOW_STATS_0_SIZE
 
-        flow_stats.match = OFPMatch.parser(buf, offset)
-        match_length = utils.round_up(flow_stats.match.length, 8)
+        if ofproto_parser.is_lazy_decode():
+            flow_stats._set_lazy('match', OFPMatch.parser, buf, offset)
+            match_length = _match_length(buf, offset)
+        else:
+            flow_stats.match = OFPMatch.parser(buf, offset)
+            match_length = flow_stats.match.length
+        match_length = utils.round_up(match_length, 8)
         inst_length = (flow_stats.length - (ofproto.OFP_FLOW_STATS_SIZE -
                                             ofproto.OFP_MATCH_SIZE +
                                             match_length))
         offset += match_length
+        if ofproto_parser.is_lazy_decode():
+            flow_stats._set_lazy('instructions', cls._parser_instructions,
+                                 buf, offset, inst_length)
+        else:
+            flow_stats.instructions = cls._parser_instructions(
+                buf, offset, inst_length)
+        return flow_stats
+
+    @staticmethod
+    def _parser_instructions(buf, offset, inst_length):
         instructions = []
         while inst_length > 0:
             inst = OFPInstruction.parser(buf, offset)
             instructions.append(inst)
             offset += inst.len
             inst_length -= inst.len
-
-        flow_stats.instructions = instructions
-        return flow_stats
+        return instructions
 
 
 class OFPFlowStatsRequestBase(OFPMultipartRequest):
@@ -4162,7 +4203,7 @@ class OFPFlowStatsRequest(OFPFlowStatsRequestBase):
 @OFPMultipartReply.register_stats_type()
 @_set_stats_type(ofproto.OFPMP_FLOW, OFPFlowStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
-class OFPFlowStatsReply(OFPMultipartReply):
+class OFPFlowStatsReply(ofproto_parser.LazyDecodeMixin, OFPMultipartReply):
     """
     Individual flow statistics reply message
 
@@ -4420,7 +4461,7 @@ class OFPPortStatsRequest(OFPMultipartRequest):
 @OFPMultipartReply.register_stats_type()
 @_set_stats_type(ofproto.OFPMP_PORT_STATS, OFPPortStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
-class OFPPortStatsReply(OFPMultipartReply):
+class OFPPortStatsReply(ofproto_parser.LazyDecodeMixin, OFPMultipartReply):
     """
     Port statistics reply message
 
@@ -44,6 +44,11 @@ def _set_msg_type(msg_type):
     return _set_cls_msg_type
 
 
+def _match_length(buf, offset):
+    # The length field of ofp_match, without decoding the match itself
+    return struct.unpack_from('!HH', buf, offset)[1]
+
+
 def _register_parser(cls):
     '''class decorator to register msg parser'''
     assert cls.cls_msg_type is not None
@@ -784,8 +789,7 @@ class OFPMatch(StringifyMixin):
 
         fields = []
         while length > 0:
-            n, value, mask, field_len = ofproto.oxm_parse(buf, offset)
-            k, uv = ofproto.oxm_to_user(n, value, mask)
+            k, uv, field_len = ofproto.oxm_parse_to_user(buf, offset)
             fields.append((k, uv))
             offset += field_len
             length -= field_len
@@ -798,14 +802,10 @@ class OFPMatch(StringifyMixin):
         the buf.
         Returns the output length.
         """
-        fields = [ofproto.oxm_from_user(k, uv) for (k, uv)
-                  in self._fields2]
-
         hdr_pack_str = '!HH'
         field_offset = offset + struct.calcsize(hdr_pack_str)
-        for (n, value, mask) in fields:
-            field_offset += ofproto.oxm_serialize(n, value, mask, buf,
-                                                  field_offset)
+        field_offset += ofproto.oxm_serialize_fields(self._fields2, buf,
+                                                     field_offset)
 
         length = field_offset - offset
         msg_pack_into(hdr_pack_str, buf, offset, ofproto.OFPMT_OXM, length)
@@ -1158,7 +1158,7 @@ class OFPBundlePropExperimenter(OFPPropCommonExperimenter4ByteData):
 
 @_register_parser
 @_set_msg_type(ofproto.OFPT_PACKET_IN)
-class OFPPacketIn(MsgBase):
+class OFPPacketIn(ofproto_parser.LazyDecodeMixin, MsgBase):
     """
     Packet-In message
 
@@ -1235,10 +1235,15 @@ class OFPPacketIn(MsgBase):
             ofproto.OFP_PACKET_IN_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, ofproto.OFP_PACKET_IN_SIZE -
-                                    ofproto.OFP_MATCH_SIZE)
+        offset = ofproto.OFP_PACKET_IN_SIZE - ofproto.OFP_MATCH_SIZE
+        if ofproto_parser.is_lazy_decode():
+            msg._set_lazy('match', OFPMatch.parser, msg.buf, offset)
+            match_len = _match_length(msg.buf, offset)
+        else:
+            msg.match = OFPMatch.parser(msg.buf, offset)
+            match_len = msg.match.length
 
-        match_len = utils.round_up(msg.match.length, 8)
+        match_len = utils.round_up(match_len, 8)
         msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
                             ofproto.OFP_MATCH_SIZE + match_len + 2):]
 
@@ -1652,18 +1657,26 @@ class OFPMultipartReply(MsgBase):
         msg.type = type_
         msg.flags = flags
 
+        if (ofproto_parser.is_lazy_decode() and
+                issubclass(stats_type_cls, ofproto_parser.LazyDecodeMixin)):
+            msg._set_lazy('body', cls._parser_body, stats_type_cls,
+                          msg.buf, msg_len)
+        else:
+            msg.body = cls._parser_body(stats_type_cls, msg.buf, msg_len)
+        return msg
+
+    @staticmethod
+    def _parser_body(stats_type_cls, buf, msg_len):
         offset = ofproto.OFP_MULTIPART_REPLY_SIZE
         body = []
         while offset < msg_len:
-            b = stats_type_cls.cls_stats_body_cls.parser(msg.buf, offset)
+            b = stats_type_cls.cls_stats_body_cls.parser(buf, offset)
             body.append(b)
             offset += b.length if hasattr(b, 'length') else b.len
 
         if stats_type_cls.cls_body_single_struct:
-            msg.body = body[0]
-        else:
-            msg.body = body
-        return msg
+            return body[0]
+        return body
 
 
 class OFPDescStats(ofproto_parser.namedtuple('OFPDescStats', (
@@ -3440,7 +3453,7 @@ class OFPExperimenterStatsReply(OFPMultipartReply):
         super(OFPExperimenterStatsReply, self).__init__(datapath, **kwargs)
 
 
-class OFPFlowStats(StringifyMixin):
+class OFPFlowStats(ofproto_parser.LazyDecodeMixin, StringifyMixin):
     def __init__(self, table_id=None, duration_sec=None, duration_nsec=None,
                  priority=None, idle_timeout=None, hard_timeout=None,
                  flags=None, importance=None, cookie=None, packet_count=None,
@@ -3476,21 +3489,34 @@ class OFPFlowStats(StringifyMixin):
             ofproto.OFP_FLOW_STATS_0_PACK_STR, buf, offset)
         offset += ofproto.OFP_FLOW_STATS_0_SIZE
 
-        flow_stats.match = OFPMatch.parser(buf, offset)
-        match_length = utils.round_up(flow_stats.match.length, 8)
+        if ofproto_parser.is_lazy_decode():
+            flow_stats._set_lazy('match', OFPMatch.parser, buf, offset)
+            match_length = _match_length(buf, offset)
+        else:
+            flow_stats.match = OFPMatch.parser(buf, offset)
+            match_length = flow_stats.match.length
+        match_length = utils.round_up(match_length, 8)
         inst_length = (flow_stats.length - (ofproto.OFP_FLOW_STATS_SIZE -
                                             ofproto.OFP_MATCH_SIZE +
                                             match_length))
         offset += match_length
+        if ofproto_parser.is_lazy_decode():
+            flow_stats._set_lazy('instructions', cls._parser_instructions,
+                                 buf, offset, inst_length)
+        else:
+            flow_stats.instructions = cls._parser_instructions(
+                buf, offset, inst_length)
+        return flow_stats
+
+    @staticmethod
+    def _parser_instructions(buf, offset, inst_length):
         instructions = []
         while inst_length > 0:
             inst = OFPInstruction.parser(buf, offset)
             instructions.append(inst)
             offset += inst.len
             inst_length -= inst.len
-
-        flow_stats.instructions = instructions
-        return flow_stats
+        return instructions
 
 
 class OFPFlowStatsRequestBase(OFPMultipartRequest):
@@ -3566,7 +3592,7 @@ class OFPFlowStatsRequest(OFPFlowStatsRequestBase):
 @OFPMultipartReply.register_stats_type()
 @_set_stats_type(ofproto.OFPMP_FLOW, OFPFlowStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
-class OFPFlowStatsReply(OFPMultipartReply):
+class OFPFlowStatsReply(ofproto_parser.LazyDecodeMixin, OFPMultipartReply):
     """
     Individual flow statistics reply message
 
@@ -3832,7 +3858,7 @@ class OFPPortStatsPropExperimenter(OFPPropCommonExperimenter4ByteData):
     pass
 
 
-class OFPPortStats(StringifyMixin):
+class OFPPortStats(ofproto_parser.LazyDecodeMixin, StringifyMixin):
     def __init__(self, length=None, port_no=None, duration_sec=None,
                  duration_nsec=None, rx_packets=None, tx_packets=None,
                  rx_bytes=None, tx_bytes=None, rx_dropped=None,
@@ -3859,15 +3885,26 @@ class OFPPortStats(StringifyMixin):
          tx_packets, rx_bytes, tx_bytes, rx_dropped, tx_dropped,
          rx_errors, tx_errors) = struct.unpack_from(
             ofproto.OFP_PORT_STATS_PACK_STR, buf, offset)
-        props = []
         rest = buf[offset + ofproto.OFP_PORT_STATS_SIZE:offset + length]
+        if ofproto_parser.is_lazy_decode():
+            stats = cls(length, port_no, duration_sec, duration_nsec,
+                        rx_packets, tx_packets, rx_bytes, tx_bytes,
+                        rx_dropped, tx_dropped, rx_errors, tx_errors)
+            stats._set_lazy('properties', cls._parser_properties, rest)
+        else:
+            stats = cls(length, port_no, duration_sec, duration_nsec,
+                        rx_packets, tx_packets, rx_bytes, tx_bytes,
+                        rx_dropped, tx_dropped, rx_errors, tx_errors,
+                        cls._parser_properties(rest))
+        return stats
+
+    @staticmethod
+    def _parser_properties(rest):
+        props = []
         while rest:
             p, rest = OFPPortStatsProp.parse(rest)
             props.append(p)
-        stats = cls(length, port_no, duration_sec, duration_nsec, rx_packets,
-                    tx_packets, rx_bytes, tx_bytes, rx_dropped, tx_dropped,
-                    rx_errors, tx_errors, props)
-        return stats
+        return props
 
 
 @_set_stats_type(ofproto.OFPMP_PORT_STATS, OFPPortStats)
@@ -3910,7 +3947,7 @@ class OFPPortStatsRequest(OFPMultipartRequest):
 @OFPMultipartReply.register_stats_type()
 @_set_stats_type(ofproto.OFPMP_PORT_STATS, OFPPortStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
-class OFPPortStatsReply(OFPMultipartReply):
+class OFPPortStatsReply(ofproto_parser.LazyDecodeMixin, OFPMultipartReply):
     """
     Port statistics reply message
 
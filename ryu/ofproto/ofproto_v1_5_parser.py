@@ -45,6 +45,11 @@ def _set_msg_type(msg_type):
     return _set_cls_msg_type
 
 
+def _match_length(buf, offset):
+    # The length field of ofp_match, without decoding the match itself
+    return struct.unpack_from('!HH', buf, offset)[1]
+
+
 def _register_parser(cls):
     '''class decorator to register msg parser'''
     assert cls.cls_msg_type is not None
@@ -783,8 +788,7 @@ class OFPMatch(StringifyMixin):
 
         fields = []
         while length > 0:
-            n, value, mask, field_len = ofproto.oxm_parse(buf, offset)
-            k, uv = ofproto.oxm_to_user(n, value, mask)
+            k, uv, field_len = ofproto.oxm_parse_to_user(buf, offset)
             fields.append((k, uv))
             offset += field_len
             length -= field_len
@@ -797,14 +801,10 @@ class OFPMatch(StringifyMixin):
         the buf.
         Returns the output length.
         """
-        fields = [ofproto.oxm_from_user(k, uv) for (k, uv)
-                  in self._fields2]
-
         hdr_pack_str = '!HH'
         field_offset = offset + struct.calcsize(hdr_pack_str)
-        for (n, value, mask) in fields:
-            field_offset += ofproto.oxm_serialize(n, value, mask, buf,
-                                                  field_offset)
+        field_offset += ofproto.oxm_serialize_fields(self._fields2, buf,
+                                                     field_offset)
 
         length = field_offset - offset
         msg_pack_into(hdr_pack_str, buf, offset, ofproto.OFPMT_OXM, length)
@@ -1397,7 +1397,7 @@ class OFPBundlePropExperimenter(OFPPropCommonExperimenter4ByteData):
 
 @_register_parser
 @_set_msg_type(ofproto.OFPT_PACKET_IN)
-class OFPPacketIn(MsgBase):
+class OFPPacketIn(ofproto_parser.LazyDecodeMixin, MsgBase):
     """
     Packet-In message
 
@@ -1474,10 +1474,15 @@ class OFPPacketIn(MsgBase):
             ofproto.OFP_PACKET_IN_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)
 
-        msg.match = OFPMatch.parser(msg.buf, ofproto.OFP_PACKET_IN_SIZE -
-                                    ofproto.OFP_MATCH_SIZE)
+        offset = ofproto.OFP_PACKET_IN_SIZE - ofproto.OFP_MATCH_SIZE
+        if ofproto_parser.is_lazy_decode():
+            msg._set_lazy('match', OFPMatch.parser, msg.buf, offset)
+            match_len = _match_length(msg.buf, offset)
+        else:
+            msg.match = OFPMatch.parser(msg.buf, offset)
+            match_len = msg.match.length
 
-        match_len = utils.round_up(msg.match.length, 8)
+        match_len = utils.round_up(match_len, 8)
         msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
                             ofproto.OFP_MATCH_SIZE + match_len + 2):]
 
@@ -1888,10 +1893,20 @@ class OFPMultipartReply(MsgBase):
         msg.type = type_
         msg.flags = flags
 
+        if (ofproto_parser.is_lazy_decode() and
+                issubclass(stats_type_cls, ofproto_parser.LazyDecodeMixin)):
+            msg._set_lazy('body', cls._parser_body, stats_type_cls,
+                          msg.buf, msg_len)
+        else:
+            msg.body = cls._parser_body(stats_type_cls, msg.buf, msg_len)
+        return msg
+
+    @staticmethod
+    def _parser_body(stats_type_cls, buf, msg_len):
         offset = ofproto.OFP_MULTIPART_REPLY_SIZE
         body = []
         while offset < msg_len:
-            b = stats_type_cls.cls_stats_body_cls.parser(msg.buf, offset)
+            b = stats_type_cls.cls_stats_body_cls.parser(buf, offset)
             offset_step = b.length if hasattr(b, 'length') else b.len
             if offset_step < 1:
                 raise exception.OFPMalformedMessage()
@@ -1899,10 +1914,8 @@ class OFPMultipartReply(MsgBase):
             offset += offset_step
 
         if stats_type_cls.cls_body_single_struct:
-            msg.body = body[0]
-        else:
-            msg.body = body
-        return msg
+            return body[0]
+        return body
 
 
 class OFPDescStats(ofproto_parser.namedtuple('OFPDescStats', (
@@ -3998,7 +4011,7 @@ class OFPFlowDesc(StringifyMixin):
         return flow_desc
 
 
-class OFPFlowStats(StringifyMixin):
+class OFPFlowStats(ofproto_parser.LazyDecodeMixin, StringifyMixin):
     def __init__(self, table_id=None, reason=None, priority=None,
                  match=None, stats=None, length=None):
         super(OFPFlowStats, self).__init__()
@@ -4018,14 +4031,22 @@ class OFPFlowStats(StringifyMixin):
             ofproto.OFP_FLOW_STATS_0_PACK_STR, buf, offset)
         offset += ofproto.OFP_FLOW_STATS_0_SIZE
 
-        flow_stats.match = OFPMatch.parser(buf, offset)
-        match_length = utils.round_up(flow_stats.match.length, 8)
+        if ofproto_parser.is_lazy_decode():
+            flow_stats._set_lazy('match', OFPMatch.parser, buf, offset)
+            match_length = _match_length(buf, offset)
+        else:
+            flow_stats.match = OFPMatch.parser(buf, offset)
+            match_length = flow_stats.match.length
+        match_length = utils.round_up(match_length, 8)
         offset += match_length
 
         stats_length = (flow_stats.length - (ofproto.OFP_FLOW_STATS_0_SIZE +
                                              match_length))
         if stats_length > 0:
-            flow_stats.stats = OFPStats.parser(buf, offset)
+            if ofproto_parser.is_lazy_decode():
+                flow_stats._set_lazy('stats', OFPStats.parser, buf, offset)
+            else:
+                flow_stats.stats = OFPStats.parser(buf, offset)
 
         return flow_stats
 
@@ -4191,7 +4212,7 @@ class OFPFlowStatsRequest(OFPFlowStatsRequestBase):
 @OFPMultipartReply.register_stats_type()
 @_set_stats_type(ofproto.OFPMP_FLOW_STATS, OFPFlowStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
-class OFPFlowStatsReply(OFPMultipartReply):
+class OFPFlowStatsReply(ofproto_parser.LazyDecodeMixin, OFPMultipartReply):
     """
     Individual flow statistics reply message
 
@@ -4450,7 +4471,7 @@ class OFPPortStatsPropExperimenter(OFPPropCommonExperimenter4ByteData):
     pass
 
 
-class OFPPortStats(StringifyMixin):
+class OFPPortStats(ofproto_parser.LazyDecodeMixin, StringifyMixin):
     def __init__(self, length=None, port_no=None, duration_sec=None,
                  duration_nsec=None, rx_packets=None, tx_packets=None,
                  rx_bytes=None, tx_bytes=None, rx_dropped=None,
@@ -4477,15 +4498,26 @@ class OFPPortStats(StringifyMixin):
          tx_packets, rx_bytes, tx_bytes, rx_dropped, tx_dropped,
          rx_errors, tx_errors) = struct.unpack_from(
             ofproto.OFP_PORT_STATS_PACK_STR, buf, offset)
-        props = []
         rest = buf[offset + ofproto.OFP_PORT_STATS_SIZE:offset + length]
+        if ofproto_parser.is_lazy_decode():
+            stats = cls(length, port_no, duration_sec, duration_nsec,
+                        rx_packets, tx_packets, rx_bytes, tx_bytes,
+                        rx_dropped, tx_dropped, rx_errors, tx_errors)
+            stats._set_lazy('properties', cls._parser_properties, rest)
+        else:
+            stats = cls(length, port_no, duration_sec, duration_nsec,
+                        rx_packets, tx_packets, rx_bytes, tx_bytes,
+                        rx_dropped, tx_dropped, rx_errors, tx_errors,
+                        cls._parser_properties(rest))
+        return stats
+
+    @staticmethod
+    def _parser_properties(rest):
+        props = []
         while rest:
             p, rest = OFPPortStatsProp.parse(rest)
             props.append(p)
-        stats = cls(length, port_no, duration_sec, duration_nsec, rx_packets,
-                    tx_packets, rx_bytes, tx_bytes, rx_dropped, tx_dropped,
-                    rx_errors, tx_errors, props)
-        return stats
+        return props
 
 
 @_set_stats_type(ofproto.OFPMP_PORT_STATS, OFPPortStats)
@@ -4528,7 +4560,7 @@ class OFPPortStatsRequest(OFPMultipartRequest):
 @OFPMultipartReply.register_stats_type()
 @_set_stats_type(ofproto.OFPMP_PORT_STATS, OFPPortStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
-class OFPPortStatsReply(OFPMultipartReply):
+class OFPPortStatsReply(ofproto_parser.LazyDecodeMixin, OFPMultipartReply):
     """
     Port statistics reply message
 
@@ -71,10 +71,13 @@ from ryu.ofproto.oxx_fields import (
     _to_user,
     _to_user_header,
     _field_desc,
+    _make_codecs,
     _normalize_user,
     _parse,
     _parse_header,
+    _parse_to_user,
     _serialize,
+    _serialize_fields,
     _serialize_header)
 from ryu.ofproto import ofproto_common
 
@@ -180,6 +183,8 @@ def generate(modname):
     oxx = 'oxm'
     name_to_field = dict((f.name, f) for f in mod.oxm_types)
     num_to_field = dict((f.num, f) for f in mod.oxm_types)
+    name_to_codec, header_to_codec = _make_codecs(name_to_field,
+                                                  num_to_field)
 
     # create functions by using oxx_fields module.
     add_attr('oxm_get_field_info_by_name',
@@ -204,6 +209,12 @@ def generate(modname):
              functools.partial(_serialize, oxx, mod))
     add_attr('oxm_serialize_header',
              functools.partial(_serialize_header, oxx, mod))
+    add_attr('oxm_parse_to_user',
+             functools.partial(_parse_to_user, oxx, mod, header_to_codec))
+    add_attr('oxm_serialize_fields',
+             functools.partial(_serialize_fields, oxx, mod, name_to_codec,
+                               {}))
+    add_attr('_oxm_field_codecs', header_to_codec)
 
     add_attr('oxm_to_jsondict', _to_jsondict)
     add_attr('oxm_from_jsondict', _from_jsondict)
@@ -24,6 +24,7 @@
 #   mask is None if no mask.
 
 import six
+import socket
 import struct
 
 from ryu.ofproto import ofproto_common
@@ -39,6 +40,29 @@ else:
 # This is transparently value for Experimenter class ID for OXM/OXS.
 OFPXXC_EXPERIMENTER = 0xffff
 
+_HDR = struct.Struct('!I')
+
+# struct format characters of integer fields which struct can pack and
+# unpack without going through the type descriptor.
+_INT_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+# Upper limit of the number of cached match shapes.
+_MAX_SHAPES = 1024
+
+# Upper limit of the number of cached from_user conversions per field.
+_MAX_CONVERSIONS = 4096
+
+
+def _mac_to_user(v):
+    return '%02x:%02x:%02x:%02x:%02x:%02x' % tuple(bytearray(v))
+
+
+# Faster equivalents of TypeDescr.to_user for the common address types.
+_FAST_TO_USER = {
+    type_desc.MacAddr: _mac_to_user,
+    type_desc.IPv4Addr: socket.inet_ntoa,
+}
+
 
 def _get_field_info_by_name(oxx, name_to_field, name):
     try:
@@ -263,3 +287,170 @@ def _serialize(oxx, mod, n, value, mask, buf, offset):
                       (n << 9) | (0 << 8) | (exp_hdr_len + value_len),
                       bytes(exp_hdr), value)
     return struct.calcsize(pack_str)
+
+
+class _FieldCodec(object):
+    """
+    Precompiled wire format of a fixed size OXM/OXS field.
+
+    Integer fields of 1, 2, 4 or 8 bytes are packed and unpacked by
+    struct directly.  Other fields are packed as byte strings and
+    converted by their type descriptor.
+    """
+
+    def __init__(self, field):
+        t = field.type
+        self.name = field.name
+        self.size = t.size
+        self.header = (field.num << 9) | t.size
+        self.header_w = (field.num << 9) | (1 << 8) | (t.size * 2)
+        fmt = None
+        if isinstance(t, type_desc.IntDescr):
+            fmt = _INT_FORMATS.get(t.size)
+        if fmt is not None:
+            self.max = (1 << (t.size * 8)) - 1
+            self.to_user = None
+            self.from_user = None
+        else:
+            fmt = '%ds' % t.size
+            self.to_user = _FAST_TO_USER.get(t, t.to_user)
+            self.from_user = self._cached_from_user
+            self._from_user = t.from_user
+            self._conversions = {}
+        self.fmt = fmt
+        self.struct = struct.Struct('!I' + fmt)
+        self.struct_w = struct.Struct('!I' + fmt + fmt)
+
+    def parse(self, buf, offset, masked):
+        to_user = self.to_user
+        if masked:
+            (_, v, m) = self.struct_w.unpack_from(buf, offset)
+            if to_user is None:
+                return (v, m)
+            return (to_user(v), to_user(m))
+        (_, v) = self.struct.unpack_from(buf, offset)
+        if to_user is None:
+            return v
+        return to_user(v)
+
+    def _cached_from_user(self, v):
+        # Text representations of addresses are expensive to convert and
+        # the same addresses tend to appear in many matches.
+        if not isinstance(v, six.string_types):
+            return self._from_user(v)
+        try:
+            return self._conversions[v]
+        except KeyError:
+            pass
+        b = self._from_user(v)
+        if len(self._conversions) >= _MAX_CONVERSIONS:
+            self._conversions.clear()
+        self._conversions[v] = b
+        return b
+
+    def values(self, user_value):
+        """
+        Returns a list of the header and the values to be packed or
+        None if user_value can not be packed by this codec.
+        """
+        if isinstance(user_value, (tuple, list)):
+            (value, mask) = user_value
+        else:
+            value = user_value
+            mask = None
+        from_user = self.from_user
+        if from_user is None:
+            if not 0 <= value <= self.max:
+                return None
+            if mask is None:
+                return [self.header, value]
+            if not 0 <= mask <= self.max:
+                return None
+            return [self.header_w, value, mask]
+        value = from_user(value)
+        if mask is not None:
+            mask = from_user(mask)
+        elif isinstance(value, tuple):
+            # CIDR notations with IPv[46]Addr.
+            value, mask = value
+        if len(value) != self.size:
+            return None
+        if mask is None:
+            return [self.header, value]
+        if len(mask) != self.size:
+            return None
+        return [self.header_w, value, mask]
+
+
+def _make_codecs(name_to_field, num_to_field):
+    """
+    Returns the precompiled codecs of the fixed size and non experimenter
+    fields keyed by field name and by TLV header.
+    The latter is a pair of the codec and whether the TLV has a mask.
+    """
+    name_to_codec = {}
+    header_to_codec = {}
+    for f in num_to_field.values():
+        if isinstance(f.num, tuple) or not hasattr(f.type, 'size'):
+            continue
+        codec = _FieldCodec(f)
+        header_to_codec[codec.header] = (codec, False)
+        header_to_codec[codec.header_w] = (codec, True)
+        if name_to_field.get(f.name) is f:
+            name_to_codec[f.name] = codec
+    return name_to_codec, header_to_codec
+
+
+def _parse_to_user(oxx, mod, header_to_codec, buf, offset):
+    (header, ) = _HDR.unpack_from(buf, offset)
+    try:
+        (codec, masked) = header_to_codec[header]
+    except KeyError:
+        (n, value, mask, field_len) = _parse(mod, buf, offset)
+        to_user = getattr(mod, oxx + '_to_user')
+        (k, uv) = to_user(n, value, mask)
+        return k, uv, field_len
+    return codec.name, codec.parse(buf, offset, masked), 4 + (header & 0xff)
+
+
+def _serialize_fields(oxx, mod, name_to_codec, shapes, fields, buf, offset):
+    """
+    Serializes a list of (name, user value) pairs into buf at offset
+    and returns the serialized length.
+
+    All the fields are packed by one struct.Struct compiled for the
+    sequence of the fields and masks, i.e. the shape, of the match and
+    cached.  Falls back to serializing field by field if some field
+    has no precompiled codec.
+    """
+    shape = []
+    args = []
+    for (k, uv) in fields:
+        codec = name_to_codec.get(k)
+        values = None if codec is None else codec.values(uv)
+        if values is None:
+            return _serialize_fields_slow(oxx, mod, fields, buf, offset)
+        shape.append((codec, len(values)))
+        args.extend(values)
+    shape = tuple(shape)
+    try:
+        st = shapes[shape]
+    except KeyError:
+        st = struct.Struct('!' + ''.join('I' + codec.fmt * (n - 1)
+                                         for (codec, n) in shape))
+        if len(shapes) < _MAX_SHAPES:
+            shapes[shape] = st
+    needed_len = offset + st.size
+    if len(buf) < needed_len:
+        buf += bytearray(needed_len - len(buf))
+    st.pack_into(buf, offset, *args)
+    return st.size
+
+
+def _serialize_fields_slow(oxx, mod, fields, buf, offset):
+    from_user = getattr(mod, oxx + '_from_user')
+    serialize = getattr(mod, oxx + '_serialize')
+    field_offset = offset
+    for (n, value, mask) in [from_user(k, uv) for (k, uv) in fields]:
+        field_offset += serialize(n, value, mask, buf, field_offset)
+    return field_offset - offset
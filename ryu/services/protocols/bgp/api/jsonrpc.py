@@ -13,19 +13,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import itertools
 
 from ryu.base import app_manager
 from ryu.lib import hub
 from ryu.app.wsgi import websocket, ControllerBase, WSGIApplication
 from ryu.app.wsgi import rpc_public, WebSocketRPCServer
+from ryu.app.wsgi import route, Response
 from ryu.services.protocols.bgp.api.base import call
 from ryu.services.protocols.bgp.api.base import PREFIX
 from ryu.services.protocols.bgp.rtconf.common import LOCAL_AS
 from ryu.services.protocols.bgp.rtconf.common import ROUTER_ID
 from ryu.services.protocols.bgp.rtconf import neighbors
+from ryu.services.protocols.bgp.utils.jsonlines import encode_json_lines
 
 bgp_instance_name = 'bgp_api_app'
 url = '/bgp/ws'
+rib_url = '/bgp/rib/{family}'
+
+# Maximum number of routes returned by a "rib.dump" call.
+RIB_DUMP_MAX_LIMIT = 1000
 
 
 class BgpWSJsonRpc(app_manager.RyuApp):
@@ -79,6 +86,21 @@ class BgpWSJsonRpc(app_manager.RyuApp):
         show['params'] = ['rib', family]
         return call('operator.show', **show)
 
+    @rpc_public('rib.dump')
+    def _dump_rib(self, family='ipv4', prefix=None, start_after=None,
+                  limit=RIB_DUMP_MAX_LIMIT):
+        """Returns a page of the routes of the RIB, and the value of
+        start_after to get the next page (None if this is the last one).
+        """
+        limit = min(limit, RIB_DUMP_MAX_LIMIT)
+        routes = list(itertools.islice(
+            call('operator.dump.rib', family=family, prefix=prefix,
+                 start_after=start_after), limit))
+        next_start = None
+        if len(routes) == limit and routes:
+            next_start = routes[-1]['prefix']
+        return {'routes': routes, 'start_after': next_start}
+
 
 class BgpWSJsonRpcController(ControllerBase):
     def __init__(self, req, link, data, **config):
@@ -90,3 +112,25 @@ class BgpWSJsonRpcController(ControllerBase):
     def _websocket_handler(self, ws):
         rpc_server = WebSocketRPCServer(ws, self.bgp_api_app)
         rpc_server.serve_forever()
+
+    @route('bgp', rib_url, methods=['GET'])
+    def _rib_handler(self, req, family, **kwargs):
+        """Streams the routes of the RIB as JSON Lines.
+
+        The "prefix", "start_after" and "limit" query parameters are
+        the ones of BGPSpeaker.rib_dump().
+        """
+        limit = req.GET.get('limit')
+        try:
+            routes = call('operator.dump.rib', family=family,
+                          prefix=req.GET.get('prefix'),
+                          start_after=req.GET.get('start_after'))
+            if limit is not None:
+                routes = itertools.islice(routes, int(limit))
+        except Exception as e:
+            return Response(status=400, text=str(e))
+
+        chunks = (chunk.encode('utf-8')
+                  for chunk in encode_json_lines(routes))
+        return Response(content_type='application/x-ndjson',
+                        app_iter=chunks)
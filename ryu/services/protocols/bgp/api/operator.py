@@ -74,3 +74,25 @@ def operator_set(**kwargs):
 @register(name="operator.clear")
 def operator_clear(**kwargs):
     return operator_run('clear', **kwargs)
+
+
+@register(name="operator.dump.rib")
+def operator_dump_rib(family, prefix=None, start_after=None):
+    return INTERNAL_API.iter_rib_routes(family, prefix=prefix,
+                                        start_after=start_after)
+
+
+@register(name="operator.dump.vrf")
+def operator_dump_vrf(route_dist, route_family, prefix=None,
+                      start_after=None):
+    return INTERNAL_API.iter_vrf_routes(route_dist, route_family,
+                                        prefix=prefix,
+                                        start_after=start_after)
+
+
+@register(name="operator.dump.neighbor")
+def operator_dump_neighbor(route_type, address, family='all',
+                           start_after=None):
+    return INTERNAL_API.iter_neighbor_routes(route_type, address,
+                                             addr_family=family,
+                                             start_after=start_after)
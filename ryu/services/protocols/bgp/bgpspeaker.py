@@ -16,6 +16,8 @@
 
 """
 
+import itertools
+
 import netaddr
 from ryu.lib import hub
 from ryu.lib import ip
@@ -71,6 +73,7 @@ from ryu.services.protocols.bgp.api.prefix import (
     FLOWSPEC_RULES,
     FLOWSPEC_ACTIONS)
 from ryu.services.protocols.bgp.model import ReceivedRoute
+from ryu.services.protocols.bgp.utils.jsonlines import encode_json_lines
 from ryu.services.protocols.bgp.rtconf.common import LOCAL_AS
 from ryu.services.protocols.bgp.rtconf.common import ROUTER_ID
 from ryu.services.protocols.bgp.rtconf.common import CLUSTER_ID
@@ -127,6 +130,8 @@ from ryu.services.protocols.bgp.rtconf.neighbors import (
     IS_ROUTE_REFLECTOR_CLIENT,
     DEFAULT_IS_NEXT_HOP_SELF,
     IS_NEXT_HOP_SELF,
+    DEFAULT_ADJ_RIB_IN,
+    ADJ_RIB_IN,
     CONNECT_MODE,
     LOCAL_ADDRESS,
     LOCAL_PORT,
@@ -163,6 +168,10 @@ FLOWSPEC_VLAN_RW_OUTER = BGPFlowSpecVlanActionCommunity.REWRITE_OUTER
 FLOWSPEC_TPID_TI = BGPFlowSpecTPIDActionCommunity.TI
 FLOWSPEC_TPID_TO = BGPFlowSpecTPIDActionCommunity.TO
 
+# Formats of the dump methods
+DUMP_FORMAT_DICT = 'dict'
+DUMP_FORMAT_JSON_LINES = 'jsonl'
+
 
 class EventPrefix(object):
     """
@@ -430,7 +439,8 @@ class BGPSpeaker(object):
                      is_next_hop_self=DEFAULT_IS_NEXT_HOP_SELF,
                      local_address=None,
                      local_port=None, local_as=None,
-                     connect_mode=DEFAULT_CONNECT_MODE):
+                     connect_mode=DEFAULT_CONNECT_MODE,
+                     adj_rib_in=DEFAULT_ADJ_RIB_IN):
         """ This method registers a new neighbor. The BGP speaker tries to
         establish a bgp session with the peer (accepts a connection
         from the peer and also tries to connect to it).
@@ -516,6 +526,12 @@ class BGPSpeaker(object):
         - CONNECT_MODE_ACTIVE         = 'active'
         - CONNECT_MODE_PASSIVE        = 'passive'
         - CONNECT_MODE_BOTH (default) = 'both'
+
+        ``adj_rib_in`` specifies whether the routes received from this
+        neighbor are kept in an Adj-RIB-In or not. Without Adj-RIB-In,
+        which saves memory, the neighbor is asked to send its routes
+        again (route refresh) when its in-bound filters are changed, and
+        the received routes are not shown.
         """
         bgp_neighbor = {
             neighbors.IP_ADDRESS: address,
@@ -527,6 +543,7 @@ class BGPSpeaker(object):
             IS_ROUTE_REFLECTOR_CLIENT: is_route_reflector_client,
             IS_NEXT_HOP_SELF: is_next_hop_self,
             CONNECT_MODE: connect_mode,
+            ADJ_RIB_IN: adj_rib_in,
             CAP_ENHANCED_REFRESH: enable_enhanced_refresh,
             CAP_FOUR_OCTET_AS_NUMBER: enable_four_octet_as_number,
             CAP_MBGP_IPV4: enable_ipv4,
@@ -1152,6 +1169,126 @@ class BGPSpeaker(object):
 
         return call('operator.show', **show)
 
+    @staticmethod
+    def _dump(symbol, limit, format, **kwargs):
+        if format not in (DUMP_FORMAT_DICT, DUMP_FORMAT_JSON_LINES):
+            raise ValueError('Invalid dump format: %s' % format)
+        routes = call(symbol, **kwargs)
+        if limit is not None:
+            routes = itertools.islice(routes, limit)
+        if format == DUMP_FORMAT_JSON_LINES:
+            return encode_json_lines(routes)
+        return routes
+
+    def rib_dump(self, family='ipv4', prefix=None, start_after=None,
+                 limit=None, format=DUMP_FORMAT_DICT):
+        """ This method returns an iterator over the routes of the RIB,
+        which are only built as they are consumed. Unlike rib_get(),
+        a full table can be dumped without building it all in memory.
+
+        ``family`` specifies the address family of the RIB
+        (e.g. 'ipv4', 'vpnv4', 'evpn', 'ipv4fs').
+
+        ``prefix`` restricts the dump to the routes covered by the given
+        prefix (e.g. '10.0.0.0/8'). It is supported for the 'ipv4', 'ipv6',
+        'vpnv4' and 'vpnv6' families only.
+
+        Routes are dumped in the order of their prefixes. ``start_after``
+        resumes a dump after the route whose 'prefix' it is, and ``limit``
+        specifies the maximum number of routes to dump. Together, they
+        allow to dump a RIB page by page.
+
+        ``format`` specifies the format of the routes.
+        This parameter must be one of the following.
+
+        - DUMP_FORMAT_DICT = 'dict' (default): the iterator yields a dict
+          per route, as in rib_get().
+        - DUMP_FORMAT_JSON_LINES = 'jsonl': the iterator yields strings
+          of several lines in the JSON Lines format, a route per line.
+        """
+        return self._dump('operator.dump.rib', limit, format,
+                          family=family, prefix=prefix,
+                          start_after=start_after)
+
+    def vrf_dump(self, route_dist, route_family='ipv4', prefix=None,
+                 start_after=None, limit=None, format=DUMP_FORMAT_DICT):
+        """ This method returns an iterator over the routes of a VRF.
+
+        ``route_dist`` specifies the route distinguisher of the VRF.
+
+        ``route_family`` specifies the route family of the VRF
+        ('ipv4', 'ipv6', 'evpn', ...).
+
+        See rib_dump() for the other parameters.
+        """
+        return self._dump('operator.dump.vrf', limit, format,
+                          route_dist=route_dist, route_family=route_family,
+                          prefix=prefix, start_after=start_after)
+
+    def neighbor_dump(self, route_type, address, family='all',
+                      start_after=None, limit=None,
+                      format=DUMP_FORMAT_DICT):
+        """ This method returns an iterator over the adj-RIB-in or
+        adj-RIB-out routes of a neighbor.
+
+        ``route_type`` must be one of the following.
+
+        - received-routes : paths received and not withdrawn by given peer
+        - sent-routes : paths sent and not withdrawn to given peer
+
+        ``address`` specifies the IP address of the peer.
+
+        ``family`` specifies the address family of the routes ('ipv4',
+        'ipv6', 'vpnv4', 'vpnv6' or 'all').
+
+        Routes are dumped in the order of their prefix strings, and
+        ``start_after`` is the 'formatted_nlri' of the path of a route.
+        See rib_dump() for the other parameters.
+        """
+        return self._dump('operator.dump.neighbor', limit, format,
+                          route_type=route_type, address=address,
+                          family=family, start_after=start_after)
+
+    def rib_lookup(self, address, family='ipv4', route_dist=None,
+                   format='json'):
+        """ This method returns the route of the longest prefix matching
+        the given address, like a forwarding lookup would do.
+
+        ``address`` specifies the IP address to look up. It can also be
+        a prefix (e.g. '10.0.0.0/24'), then the longest prefix covering
+        it is looked up.
+
+        ``family`` specifies the address family of the RIB.
+        This parameter must be one of the following.
+
+        - 'ipv4' (default)
+        - 'ipv6'
+        - 'vpnv4'
+        - 'vpnv6'
+
+        ``route_dist`` specifies a route distinguisher value.
+        With 'ipv4' or 'ipv6', the RIB of the VRF is looked up instead of
+        the global RIB. With 'vpnv4' or 'vpnv6', only the routes with this
+        route distinguisher are looked up.
+
+        ``format`` specifies the format of the response.
+        This parameter must be one of the following.
+
+        - 'json' (default)
+        - 'cli'
+
+        The response contains no route if none matches.
+        """
+        params = ['rib', 'lookup', family, address]
+        if route_dist is not None:
+            params.append(route_dist)
+        show = {
+            'params': params,
+            'format': format,
+        }
+
+        return call('operator.show', **show)
+
     def neighbor_get(self, route_type, address, format='json'):
         """ This method returns the BGP adj-RIB-in/adj-RIB-out information
         in a json format.
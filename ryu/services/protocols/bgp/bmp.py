@@ -17,12 +17,14 @@ from ryu.services.protocols.bgp.base import Activity
 from ryu.lib import hub
 from ryu.lib.packet import bmp
 from ryu.lib.packet import bgp
+from ryu.lib.packet import safi as subaddr_family
 import socket
 import logging
 from calendar import timegm
 from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
 from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
 from ryu.lib.packet.bgp import BGPUpdate
+from ryu.lib.packet.bgp import BGPPathAttributeMpReachNLRI
 from ryu.lib.packet.bgp import BGPPathAttributeMpUnreachNLRI
 
 LOG = logging.getLogger('bgpspeaker.bmp')
@@ -155,7 +157,8 @@ class BMPClient(Activity):
 
     def _construct_update(self, path):
         # Get copy of path's path attributes.
-        new_pathattr = [attr for attr in path.pathattr_map.values()]
+        pathattr_map = path.pathattr_map
+        new_pathattr = [attr for attr in pathattr_map.values()]
 
         if path.is_withdraw:
             if isinstance(path, Ipv4Path):
@@ -170,6 +173,18 @@ class BMPClient(Activity):
             if isinstance(path, Ipv4Path):
                 return BGPUpdate(nlri=[path.nlri],
                                  path_attributes=new_pathattr)
+            elif bgp.BGP_ATTR_TYPE_MP_REACH_NLRI not in pathattr_map:
+                # Interned path attributes have no MP_REACH_NLRI.
+                if path.route_family.safi in (subaddr_family.IP_FLOWSPEC,
+                                              subaddr_family.VPN_FLOWSPEC):
+                    next_hop = []
+                else:
+                    next_hop = path.nexthop
+                mpreach_attr = BGPPathAttributeMpReachNLRI(
+                    path.route_family.afi, path.route_family.safi,
+                    next_hop, [path.nlri]
+                )
+                new_pathattr.insert(0, mpreach_attr)
 
         return BGPUpdate(path_attributes=new_pathattr)
 
@@ -215,7 +230,7 @@ class BMPClient(Activity):
             msg = self._construct_peer_up_notification(peer)
             self._send(msg)
 
-            for path in peer._adj_rib_in.values():
+            for path in peer.adj_rib_in.values():
                 msg = self._construct_route_monitoring(peer, path)
                 self._send(msg)
 
@@ -1,4 +1,6 @@
 import logging
+import weakref
+
 import netaddr
 
 from ryu.services.protocols.bgp.base import SUPPORTED_GLOBAL_RF
@@ -11,6 +13,7 @@ from ryu.lib.packet.bgp import RF_RTC_UC
 from ryu.lib.packet.bgp import RouteTargetMembershipNLRI
 from ryu.services.protocols.bgp.utils.bgp \
     import clone_path_and_update_med_for_target_neighbor
+from ryu.services.protocols.bgp.utils.update_group import UpdateGroup
 LOG = logging.getLogger('bgpspeaker.core_managers.peer_manager')
 
 
@@ -30,6 +33,9 @@ class PeerManager(object):
         self._peer_to_rtfilter_map = {}
         self._neighbors_conf = neighbors_conf
 
+        # Update groups by outbound policy, kept while they have members.
+        self._update_groups = weakref.WeakValueDictionary()
+
     @property
     def iterpeers(self):
         return iter(self._peers.values())
@@ -50,6 +56,16 @@ class PeerManager(object):
         del self._peers[neigh_ip_address]
         self._core_service.on_peer_removed(peer)
 
+    def get_update_group(self, key):
+        """Returns the update group of the peers with the outbound policy
+        given by `key`.
+        """
+        group = self._update_groups.get(key)
+        if group is None:
+            group = UpdateGroup(key)
+            self._update_groups[key] = group
+        return group
+
     def get_by_addr(self, addr):
         return self._peers.get(str(netaddr.IPAddress(addr)))
 
@@ -39,6 +39,8 @@ from ryu.services.protocols.bgp.constants import VRF_TABLE
 from ryu.services.protocols.bgp.model import OutgoingRoute
 from ryu.services.protocols.bgp.processor import BPR_ONLY_PATH
 from ryu.services.protocols.bgp.processor import BPR_UNKNOWN
+from ryu.services.protocols.bgp.utils.pattrs import PathAttrSet
+from ryu.services.protocols.bgp.utils.radix import RadixTree
 
 
 LOG = logging.getLogger('bgpspeaker.info_base.base')
@@ -53,9 +55,17 @@ class Table(object):
     family. A table can be uniquely identified by (Route Family, Scope Id).
     """
     ROUTE_FAMILY = RF_IPv4_UC
+    # Address length of the IP prefixes stored in this table, if the
+    # destinations are indexed by prefix for longest prefix match.
+    PREFIX_INDEX_BITS = None
 
     def __init__(self, scope_id, core_service, signal_bus):
         self._destinations = dict()
+        # Radix trees of destinations, per route distinguisher for
+        # VPN tables (None for the others).  A prefix given with host bits
+        # set shares its node with the prefix without them, so each node
+        # holds a dict of table key -> destination.
+        self._prefix_index = {}
         # Scope in which this table exists.
         # If this table represents the VRF, then this could be a VPN ID.
         # For global/VPN tables this should be None
@@ -165,11 +175,21 @@ class Table(object):
         self._validate_nlri(nlri)
         dest = self._get_dest(nlri)
         if dest:
-            self._destinations.pop(dest)
+            self.delete_dest(dest)
         return dest
 
     def delete_dest(self, dest):
         del self._destinations[self._table_key(dest.nlri)]
+        if self.PREFIX_INDEX_BITS is not None:
+            scope = self._prefix_index_scope(dest.nlri)
+            index = self._prefix_index.get(scope)
+            dests = None if index is None else index.get(dest.nlri.prefix)
+            if dests is not None:
+                dests.pop(self._table_key(dest.nlri), None)
+                if not dests:
+                    del index[dest.nlri.prefix]
+                    if not index:
+                        del self._prefix_index[scope]
 
     def _validate_nlri(self, nlri):
         """Validated *nlri* is the type that this table stores/supports.
@@ -193,6 +213,16 @@ class Table(object):
         if dest is None:
             dest = self._create_dest(nlri)
             self._destinations[table_key] = dest
+            if self.PREFIX_INDEX_BITS is not None:
+                scope = self._prefix_index_scope(nlri)
+                index = self._prefix_index.get(scope)
+                if index is None:
+                    index = self._prefix_index[scope] = \
+                        RadixTree(self.PREFIX_INDEX_BITS)
+                dests = index.get(nlri.prefix)
+                if dests is None:
+                    dests = index[nlri.prefix] = {}
+                dests[table_key] = dest
         return dest
 
     def _get_dest(self, nlri):
@@ -200,6 +230,117 @@ class Table(object):
         dest = self._destinations.get(table_key)
         return dest
 
+    def _prefix_index_scope(self, nlri):
+        """Returns the key of the prefix index *nlri* belongs to."""
+        return None
+
+    def _split_table_key(self, table_key):
+        """Returns the key of the prefix index and the prefix of the
+        destination identified by *table_key*.
+        """
+        return None, table_key
+
+    def _get_prefix_indexes(self, route_dist=None, start_after=None):
+        # Returns the (index, start_after prefix) pairs to walk.
+        if self.PREFIX_INDEX_BITS is None:
+            raise ValueError('Table %s is not indexed by prefix' % self)
+        scope_after = prefix_after = None
+        if start_after is not None:
+            scope_after, prefix_after = self._split_table_key(start_after)
+        indexes = []
+        for scope, index in sorted(self._prefix_index.items(),
+                                   key=lambda item: item[0]):
+            if route_dist is not None and scope != route_dist:
+                continue
+            start = None
+            if start_after is not None:
+                if scope == scope_after:
+                    start = prefix_after
+                elif scope < scope_after:
+                    continue
+            indexes.append((index, start))
+        return indexes
+
+    def lookup(self, address, route_dist=None):
+        """Returns the destination of the longest prefix matching *address*
+        which has a best path, or None if there is no such destination.
+
+        *address* can also be a prefix 'address/length', then the longest
+        prefix covering it is looked up.  For VPN tables, *route_dist*
+        restricts the lookup to the given route distinguisher, otherwise
+        the most specific destination among all of them is returned.
+        """
+        found = None
+        found_len = -1
+        for index, _ in self._get_prefix_indexes(route_dist):
+            for prefix, dests in index.covering(address):
+                dest = next((dests[k] for k in sorted(dests)
+                             if dests[k].best_path is not None), None)
+                if dest is None:
+                    continue
+                prefix_len = int(prefix.split('/')[1])
+                if prefix_len > found_len:
+                    found, found_len = dest, prefix_len
+                break
+        return found
+
+    def covering_dests(self, prefix, route_dist=None):
+        """Yields the destinations of *prefix* and of the less specific
+        prefixes covering it, from the most specific one.
+        """
+        for index, _ in self._get_prefix_indexes(route_dist):
+            for dest in self._index_dests(index.covering(prefix)):
+                yield dest
+
+    def covered_dests(self, prefix, route_dist=None, start_after=None):
+        """Yields the destinations of *prefix* and of the more specific
+        prefixes it covers, in address order.  See sorted_values() for
+        *start_after*.
+        """
+        for index, start in self._get_prefix_indexes(route_dist,
+                                                     start_after):
+            items = index.covered(prefix, start, inclusive=True)
+            for dest in self._index_dests(items, index, start, start_after):
+                yield dest
+
+    def sorted_values(self, route_dist=None, start_after=None):
+        """Yields the destinations in address order (by route
+        distinguisher first for VPN tables).
+
+        If *start_after* is given, only the destinations after the one
+        whose nlri_str it is are yielded, so that a dump can be resumed
+        where it was left.  Tables which are not indexed by prefix are
+        ordered by nlri_str.
+        """
+        if self.PREFIX_INDEX_BITS is None:
+            for dest in sorted(self._destinations.values(),
+                               key=lambda dest: dest.nlri_str):
+                if (route_dist is not None and
+                        self._prefix_index_scope(dest.nlri) != route_dist):
+                    continue
+                if start_after is None or dest.nlri_str > start_after:
+                    yield dest
+            return
+
+        for index, start in self._get_prefix_indexes(route_dist,
+                                                     start_after):
+            items = index.items(start, inclusive=True)
+            for dest in self._index_dests(items, index, start, start_after):
+                yield dest
+
+    @staticmethod
+    def _index_dests(items, index=None, start=None, start_after=None):
+        # Yields the destinations of the (prefix, dests) items of a prefix
+        # index, by table key within a prefix.  The destinations of the
+        # *start* prefix up to the table key *start_after* are skipped.
+        if start is not None:
+            start = index.normalize(start)
+        for prefix, dests in items:
+            for table_key in sorted(dests):
+                if prefix == start and table_key <= start_after:
+                    continue
+                yield dests[table_key]
+
     def is_for_vrf(self):
         """Returns true if this table instance represents a VRF.
         """
@@ -311,6 +452,9 @@ class Destination(object):
         # Reason current best path was chosen as best path.
         self._best_path_reason = None
 
+        # Number of the known paths when the best path was selected.
+        self._best_path_known_count = 0
+
         # List of withdrawn paths.
         self._withdraw_list = []
 
@@ -489,6 +633,7 @@ class Destination(object):
             # it becomes best path.
             self._known_path_list.append(self._new_path_list[0])
             del(self._new_path_list[0])
+            self._best_path_known_count = 1
             return self._known_path_list[0], BPR_ONLY_PATH
 
         # If we have a new version of old/known path we use it and delete old
@@ -496,10 +641,11 @@ class Destination(object):
         self._remove_old_paths()
 
         # Collect all new paths into known paths.
-        self._known_path_list.extend(self._new_path_list)
+        new_paths = self._new_path_list
+        self._known_path_list.extend(new_paths)
 
         # Clear new paths as we copied them.
-        del(self._new_path_list[:])
+        self._new_path_list = []
 
         # If we do not have any paths to this destination, then we do not have
         # new best path.
@@ -507,7 +653,7 @@ class Destination(object):
             return None, BPR_UNKNOWN
 
         # Compute new best path
-        current_best_path, reason = self._compute_best_known_path()
+        current_best_path, reason = self._compute_best_known_path(new_paths)
         return current_best_path, reason
 
     def _remove_withdrawals(self):
@@ -590,9 +736,13 @@ class Destination(object):
                 LOG.debug('Implicit withdrawal of old path, since we have'
                           ' learned new path from same source: %s', old_path)
 
-    def _compute_best_known_path(self):
+    def _compute_best_known_path(self, new_paths=None):
         """Computes the best path among known paths.
 
+        If no known path has been removed since the current best path was
+        selected, only `new_paths` are compared with it, unless the result
+        may differ from the full selection (see `select_new_best_path`).
+
         Returns current best path among `known_paths`.
         """
         if not self._known_path_list:
@@ -600,22 +750,28 @@ class Destination(object):
             raise BgpProcessorError(desc='Need at-least one known path to'
                                     ' compute best path')
 
+        from ryu.services.protocols.bgp.processor import select_best_path
+        from ryu.services.protocols.bgp.processor import select_new_best_path
+        known_count = self._best_path_known_count
+        self._best_path_known_count = len(self._known_path_list)
+        best_path = self._best_path
+        if (new_paths is not None and best_path is not None and
+                known_count + len(new_paths) == len(self._known_path_list)
+                and any(path is best_path
+                        for path in self._known_path_list)):
+            if not new_paths:
+                return best_path, self._best_path_reason
+            best_path, reason = select_new_best_path(
+                self._core_service.asn, best_path, new_paths,
+                self._known_path_list)
+            if best_path is not None:
+                return best_path, reason
+
         # We pick the first path as current best path. This helps in breaking
         # tie between two new paths learned in one cycle for which best-path
         # calculation steps lead to tie.
-        current_best_path = self._known_path_list[0]
-        best_path_reason = BPR_ONLY_PATH
-        for next_path in self._known_path_list[1:]:
-            from ryu.services.protocols.bgp.processor import compute_best_path
-            # Compare next path with current best path.
-            new_best_path, reason = \
-                compute_best_path(self._core_service.asn, current_best_path,
-                                  next_path)
-            best_path_reason = reason
-            if new_best_path is not None:
-                current_best_path = new_best_path
-
-        return current_best_path, best_path_reason
+        return select_best_path(self._core_service.asn,
+                                self._known_path_list)
 
     def withdraw_uninteresting_paths(self, interested_rts):
         """Withdraws paths that are no longer interesting.
@@ -697,7 +853,8 @@ class Path(object):
     """
     __slots__ = ('_source', '_path_attr_map', '_nlri', '_source_version_num',
                  '_exported_from', '_nexthop', 'next_path', 'prev_path',
-                 '_is_withdraw', 'med_set_by_target_neighbor')
+                 '_is_withdraw', 'med_set_by_target_neighbor',
+                 'best_path_key')
     ROUTE_FAMILY = RF_IPv4_UC
 
     def __init__(self, source, nlri, src_ver_num, pattrs=None, nexthop=None,
@@ -712,6 +869,7 @@ class Path(object):
             - `src_ver_num`: (int) version number of *source* when this path
             was learned.
             - `pattrs`: (OrderedDict) various path attributes for this path.
+            If a PathAttrSet is given, it is shared instead of copied.
             - `nexthop`: (str) nexthop advertised for this path.
             - `is_withdraw`: (bool) True if this represents a withdrawal.
         """
@@ -741,7 +899,9 @@ class Path(object):
         self._source = source
 
         # Path attribute of this path.
-        if pattrs:
+        if isinstance(pattrs, PathAttrSet):
+            self._path_attr_map = pattrs
+        elif pattrs:
             self._path_attr_map = copy(pattrs)
         else:
             self._path_attr_map = OrderedDict()
@@ -765,6 +925,9 @@ class Path(object):
         # The Destination from which this path was exported, if any.
         self._exported_from = None
 
+        # Cached processor.BestPathKey of this path.
+        self.best_path_key = None
+
     @property
     def source_version_num(self):
         return self._source_version_num
@@ -791,6 +954,8 @@ class Path(object):
 
     @property
     def pathattr_map(self):
+        if isinstance(self._path_attr_map, PathAttrSet):
+            return OrderedDict(self._path_attr_map.items())
         return copy(self._path_attr_map)
 
     @property
@@ -807,7 +972,7 @@ class Path(object):
     def clone(self, for_withdrawal=False):
         pathattrs = None
         if not for_withdrawal:
-            pathattrs = self.pathattr_map
+            pathattrs = self._path_attr_map
         clone = self.__class__(
             self.source,
             self.nlri,
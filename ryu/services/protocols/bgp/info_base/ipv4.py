@@ -55,6 +55,7 @@ class Ipv4Table(Table):
     """
     ROUTE_FAMILY = RF_IPv4_UC
     VPN_DEST_CLASS = IPv4Dest
+    PREFIX_INDEX_BITS = 32
 
     def __init__(self, core_service, signal_bus):
         super(Ipv4Table, self).__init__(None, core_service, signal_bus)
@@ -55,6 +55,7 @@ class Ipv6Table(Table):
     """
     ROUTE_FAMILY = RF_IPv6_UC
     VPN_DEST_CLASS = IPv6Dest
+    PREFIX_INDEX_BITS = 128
 
     def __init__(self, core_service, signal_bus):
         super(Ipv6Table, self).__init__(None, core_service, signal_bus)
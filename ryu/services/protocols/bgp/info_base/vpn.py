@@ -48,6 +48,14 @@ class VpnTable(Table):
         """
         return vpn_nlri.route_dist + ':' + vpn_nlri.prefix
 
+    def _prefix_index_scope(self, vpn_nlri):
+        return vpn_nlri.route_dist
+
+    def _split_table_key(self, table_key):
+        # Route distinguishers are "admin:assigned".
+        admin, assigned, prefix = table_key.split(':', 2)
+        return admin + ':' + assigned, prefix
+
     def _create_dest(self, nlri):
         return self.VPN_DEST_CLASS(self, nlri)
 
@@ -73,7 +81,7 @@ class VpnPath(Path):
 
         pathattrs = None
         if not is_withdraw:
-            pathattrs = self.pathattr_map
+            pathattrs = self._path_attr_map
 
         vrf_path = self.VRF_PATH_CLASS(
             puid=self.VRF_PATH_CLASS.create_puid(
@@ -45,6 +45,7 @@ class Vpnv4Table(VpnTable):
     """
     ROUTE_FAMILY = RF_IPv4_VPN
     VPN_DEST_CLASS = Vpnv4Dest
+    PREFIX_INDEX_BITS = 32
 
 
 class Vpnv4Path(VpnPath):
@@ -45,6 +45,7 @@ class Vpnv6Table(VpnTable):
     """
     ROUTE_FAMILY = RF_IPv6_VPN
     VPN_DEST_CLASS = Vpnv6Dest
+    PREFIX_INDEX_BITS = 128
 
 
 class Vpnv6Path(VpnPath):
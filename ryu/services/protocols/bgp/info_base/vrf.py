@@ -579,7 +579,7 @@ class VrfPath(Path):
     def clone(self, for_withdrawal=False):
         pathattrs = None
         if not for_withdrawal:
-            pathattrs = self.pathattr_map
+            pathattrs = self._path_attr_map
 
         clone = self.__class__(
             self.puid,
@@ -612,7 +612,7 @@ class VrfPath(Path):
 
         pathattrs = None
         if not for_withdrawal:
-            pathattrs = self.pathattr_map
+            pathattrs = self._path_attr_map
 
         vpnv_path = self.VPN_PATH_CLASS(
             source=self.source,
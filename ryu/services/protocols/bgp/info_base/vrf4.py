@@ -53,6 +53,7 @@ class Vrf4Table(VrfTable):
     NLRI_CLASS = IPAddrPrefix
     VRF_PATH_CLASS = Vrf4Path
     VRF_DEST_CLASS = Vrf4Dest
+    PREFIX_INDEX_BITS = 32
 
 
 class Vrf4NlriImportMap(VrfNlriImportMap):
@@ -54,6 +54,7 @@ class Vrf6Table(VrfTable):
     NLRI_CLASS = IP6AddrPrefix
     VRF_PATH_CLASS = Vrf6Path
     VRF_DEST_CLASS = Vrf6Dest
+    PREFIX_INDEX_BITS = 128
 
 
 class Vrf6NlriImportMap(VrfNlriImportMap):
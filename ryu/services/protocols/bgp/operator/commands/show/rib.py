@@ -34,7 +34,8 @@ class Rib(RibBase):
     def __init__(self, *args, **kwargs):
         super(Rib, self).__init__(*args, **kwargs)
         self.subcommands = {
-            'all': self.All}
+            'all': self.All,
+            'lookup': self.Lookup}
 
     def action(self, params):
         if len(params) != 1 or params[0] not in self.supported_families:
@@ -79,3 +80,28 @@ class Rib(RibBase):
                 ret += 'Family: {0}\n'.format(family)
                 ret += cls._format_family(data)
             return ret
+
+    class Lookup(RibBase):
+        help_msg = 'show the route of the longest prefix matching address'
+        param_help_msg = '<address-family> <address> [<route-dist>]'
+        command = 'lookup'
+
+        def action(self, params):
+            if len(params) not in (2, 3):
+                return WrongParamResp()
+            from ryu.services.protocols.bgp.operator.internal_api \
+                import WrongParamError
+            try:
+                return CommandsResponse(
+                    STATUS_OK,
+                    self.api.lookup_rib_route(*params)
+                )
+            except WrongParamError as e:
+                return WrongParamResp(e)
+
+        @classmethod
+        def cli_resp_formatter(cls, resp):
+            if resp.status == STATUS_ERROR:
+                return RibBase.cli_resp_formatter(resp)
+            return cls._format_family_header() + \
+                cls._format_family(resp.value)
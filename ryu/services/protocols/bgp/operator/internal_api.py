@@ -82,7 +82,7 @@ class InternalApi(object):
     def _get_vrf_tables(self):
         return CORE_MANAGER.get_core_service().table_manager.get_vrf_tables()
 
-    def get_single_rib_routes(self, addr_family):
+    def _get_global_table(self, addr_family):
         rfs = {
             'ipv4': RF_IPv4_UC,
             'ipv6': RF_IPv6_UC,
@@ -102,13 +102,144 @@ class InternalApi(object):
 
         rf = rfs.get(addr_family)
         table_manager = self.get_core_service().table_manager
-        gtable = table_manager.get_global_table_by_route_family(rf)
+        return table_manager.get_global_table_by_route_family(rf)
+
+    def get_single_rib_routes(self, addr_family):
+        gtable = self._get_global_table(addr_family)
         if gtable is not None:
             return [self._dst_to_dict(dst)
                     for dst in sorted(gtable.values())]
         else:
             return []
 
+    def _iter_table_routes(self, table, prefix, start_after):
+        if table is None:
+            return iter([])
+        try:
+            if prefix is not None:
+                dests = table.covered_dests(prefix, start_after=start_after)
+            else:
+                dests = table.sorted_values(start_after=start_after)
+            # Let invalid parameters fail here rather than in the middle
+            # of the dump.
+            first = next(dests, None)
+        except ValueError as e:
+            raise WrongParamError(str(e))
+        if first is None:
+            return iter([])
+
+        def _iter():
+            yield self._dst_to_dict(first)
+            for dst in dests:
+                yield self._dst_to_dict(dst)
+
+        return _iter()
+
+    def iter_rib_routes(self, addr_family, prefix=None, start_after=None):
+        """Yields the routes of the global RIB of *addr_family* one by one,
+        in the order of their prefixes.
+
+        *prefix* restricts the routes to the ones covered by it (IP and
+        VPN families only).  If *start_after* is given, only the routes
+        after the one whose 'prefix' it is are yielded.
+        """
+        return self._iter_table_routes(self._get_global_table(addr_family),
+                                       prefix, start_after)
+
+    def iter_vrf_routes(self, vrf_id, vrf_rf, prefix=None, start_after=None):
+        """Same as iter_rib_routes() for the RIB of the given VRF."""
+        vrf = self._get_vrf_table(vrf_id, vrf_rf)
+        if not vrf:
+            raise WrongParamError('wrong vpn name %s' % str((vrf_id, vrf_rf)))
+        return self._iter_table_routes(vrf, prefix, start_after)
+
+    def iter_neighbor_routes(self, route_type, address, addr_family='all',
+                             start_after=None):
+        """Yields the routes received from ('received-routes') or sent to
+        ('sent-routes') the given neighbor one by one, in the order of
+        their prefix strings.
+
+        If *start_after* is given, only the routes after the one whose
+        prefix string it is are yielded.
+        """
+        from ryu.services.protocols.bgp.operator.views.bgp import \
+            ReceivedRouteDetailView
+        from ryu.services.protocols.bgp.operator.views.bgp import \
+            SentRouteDetailView
+
+        rfs = {
+            'ipv4': RF_IPv4_UC,
+            'ipv6': RF_IPv6_UC,
+            'vpnv4': RF_IPv4_VPN,
+            'vpnv6': RF_IPv6_VPN,
+            'all': None,
+        }
+        if addr_family not in rfs:
+            raise WrongParamError('wrong addr_family name')
+        rf = rfs[addr_family]
+        peer = self.get_core_service().peer_manager.get_by_addr(address)
+        if peer is None:
+            raise WrongParamError('Unknown neighbor: %s' % address)
+        if route_type == 'received-routes':
+            adj_rib, view = peer.adj_rib_in, ReceivedRouteDetailView
+        elif route_type == 'sent-routes':
+            adj_rib, view = peer.adj_rib_out, SentRouteDetailView
+        else:
+            raise WrongParamError('Unknown route type: %s' % route_type)
+
+        def _iter():
+            # Only the keys are copied, routes which went away in the
+            # meantime are skipped.
+            for nlri_str in sorted(adj_rib.keys()):
+                if start_after is not None and nlri_str <= start_after:
+                    continue
+                route = adj_rib.get(nlri_str)
+                if route is None or (rf is not None and
+                                     route.path.route_family != rf):
+                    continue
+                yield view(route).encode()
+
+        return _iter()
+
+    def lookup_rib_route(self, addr_family, address, route_dist=None):
+        """Returns the route of the longest prefix matching *address*.
+
+        For 'ipv4' and 'ipv6', *route_dist* selects the VRF to look up
+        instead of the global table.  For 'vpnv4' and 'vpnv6' it restricts
+        the lookup to the given route distinguisher.
+        """
+        rfs = {
+            'ipv4': RF_IPv4_UC,
+            'ipv6': RF_IPv6_UC,
+            'vpnv4': RF_IPv4_VPN,
+            'vpnv6': RF_IPv6_VPN,
+        }
+        if addr_family not in rfs:
+            raise WrongParamError('Unknown or unsupported family: %s' %
+                                  addr_family)
+
+        table_manager = self.get_core_service().table_manager
+        table_rd = None
+        if route_dist is not None and addr_family in ('ipv4', 'ipv6'):
+            table = table_manager.get_vrf_table(route_dist, addr_family)
+            if table is None:
+                raise WrongParamError('wrong vpn key %s' %
+                                      str((route_dist, addr_family)))
+        else:
+            table = table_manager.get_global_table_by_route_family(
+                rfs[addr_family])
+            table_rd = route_dist
+        if table is None:
+            return []
+
+        try:
+            dst = table.lookup(address, route_dist=table_rd)
+        except ValueError as e:
+            raise WrongParamError(str(e))
+        if dst is None:
+            return []
+        return [self._dst_to_dict(dst)]
+
     def _dst_to_dict(self, dst):
         ret = {'paths': [],
                'prefix': dst.nlri_str}
@@ -10,6 +10,11 @@ public. They will stay private and only "view" will access them
 """
 import logging
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
 from ryu.services.protocols.bgp.operator.views import fields
 
 LOG = logging.getLogger('bgpspeaker.operator.views.base')
@@ -171,7 +176,7 @@ class OperatorListView(OperatorAbstractView):
 
 class OperatorDictView(OperatorAbstractView):
     def __init__(self, obj, filter_func=None):
-        assert isinstance(obj, dict)
+        assert isinstance(obj, Mapping)
         obj = RdyToFlattenDict(obj)
         super(OperatorDictView, self).__init__(obj, filter_func)
 
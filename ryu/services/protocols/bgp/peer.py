@@ -38,12 +38,15 @@ from ryu.services.protocols.bgp.rtconf.neighbors import NeighborConfListener
 from ryu.services.protocols.bgp.rtconf.neighbors import CONNECT_MODE_PASSIVE
 from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
 from ryu.services.protocols.bgp.speaker import BgpProtocol
+from ryu.services.protocols.bgp.speaker import BGP_MAX_MSG_LEN
 from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
 from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
 from ryu.services.protocols.bgp.info_base.vpnv6 import Vpnv6Path
 from ryu.services.protocols.bgp.rtconf.vrfs import VRF_RF_IPV4, VRF_RF_IPV6
+from ryu.services.protocols.bgp.utils.adj_rib import AdjRib
 from ryu.services.protocols.bgp.utils import bgp as bgp_utils
 from ryu.services.protocols.bgp.utils.evtlet import EventletIOFactory
+from ryu.services.protocols.bgp.utils.pattrs import intern_pattrs
 from ryu.services.protocols.bgp.utils import stats
 from ryu.services.protocols.bgp.utils.validation import is_valid_old_asn
 
@@ -106,6 +109,10 @@ from ryu.lib.packet import safi as subaddr_family
 
 LOG = logging.getLogger('bgpspeaker.peer')
 
+# Maximum number of queued routes which are packed into update messages
+# at a time.
+UPDATE_PACKING_BATCH_SIZE = 1024
+
 
 def is_valid_state(state):
     """Returns True if given state is a valid bgp finite state machine state.
@@ -131,6 +138,8 @@ PeerCounterNames = namedtuple(
     ('RECV_PREFIXES',
      'RECV_UPDATES',
      'SENT_UPDATES',
+     'SENT_PREFIXES',
+     'SENT_PREFIX_UPDATES',
      'RECV_NOTIFICATION',
      'SENT_NOTIFICATION',
      'SENT_REFRESH',
@@ -140,6 +149,8 @@ PeerCounterNames = namedtuple(
     'recv_prefixes',
     'recv_updates',
     'sent_updates',
+    'sent_prefixes',
+    'sent_prefix_updates',
     'recv_notification',
     'sent_notification',
     'sent_refresh',
@@ -164,6 +175,8 @@ class PeerState(object):
             'recv_prefixes': 0,
             'recv_updates': 0,
             'sent_updates': 0,
+            'sent_prefixes': 0,
+            'sent_prefix_updates': 0,
             'recv_notification': 0,
             'sent_notification': 0,
             'sent_refresh': 0,
@@ -272,11 +285,19 @@ class PeerState(object):
         """
         uptime = time.time() - self._established_time \
             if self._established_time != 0 else -1
+        sent_prefixes = self.get_count(PeerCounterNames.SENT_PREFIXES)
+        sent_prefix_updates = self.get_count(
+            PeerCounterNames.SENT_PREFIX_UPDATES)
+        # Average number of prefixes per update message.
+        packing_ratio = (float(sent_prefixes) / sent_prefix_updates
+                         if sent_prefix_updates else 0.0)
         return {
             stats.UPDATE_MSG_IN: self.get_count(PeerCounterNames.RECV_UPDATES),
             stats.UPDATE_MSG_OUT: self.get_count(
                 PeerCounterNames.SENT_UPDATES
             ),
+            stats.PREFIX_OUT: sent_prefixes,
+            stats.UPDATE_PACKING_RATIO: packing_ratio,
             stats.TOTAL_MSG_IN: self.total_msg_recv,
             stats.TOTAL_MSG_OUT: self.total_msg_sent,
             stats.FMS_EST_TRANS: self.get_count(
@@ -305,6 +326,10 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
         Activity.__init__(self, name=peer_activity_name)
         Source.__init__(self, version_num=1)
         Sink.__init__(self)
+        # Withdrawals, sent before the other queued messages.
+        self.outgoing_withdraw_list = Sink.OutgoingMsgList()
+        # Queued announcements by route family and prefix.
+        self._queued_routes = {}
         # Add listener for configuration changes.
         NeighborConfListener.__init__(self, neigh_conf)
 
@@ -365,15 +390,22 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
         # out-bound filters
         self._out_filters = self._neigh_conf.out_filter
 
-        # Adj-rib-in
-        self._adj_rib_in = {}
+        # Adj-rib-in, None if not kept for this neighbor
+        if self._neigh_conf.adj_rib_in:
+            self._adj_rib_in = AdjRib(ReceivedRoute, self)
+        else:
+            self._adj_rib_in = None
 
         # Adj-rib-out
-        self._adj_rib_out = {}
+        self._adj_rib_out = AdjRib(SentRoute, self)
 
         # attribute maps
         self._attribute_maps = {}
 
+        # Update group of the peers with the same outbound policy, found
+        # on the first UPDATE sent with the current policy.
+        self._update_group = None
+
     @property
     def remote_as(self):
         return self._neigh_conf.remote_as
@@ -432,10 +464,14 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
     def out_filters(self, filters):
         self._out_filters = [f.clone() for f in filters]
         LOG.debug('set out-filter : %s', filters)
+        self._leave_update_group()
         self.on_update_out_filter()
 
     @property
     def adj_rib_in(self):
+        # An empty Adj-RIB-In if it is not kept.
+        if self._adj_rib_in is None:
+            return AdjRib(ReceivedRoute, self)
         return self._adj_rib_in
 
     @property
@@ -482,6 +518,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             _attr_maps[const.ATTR_MAPS_ORG_KEY].append(cloned)
 
         self._attribute_maps[key] = _attr_maps
+        self._leave_update_group()
         self.on_update_attribute_maps()
 
     def is_mpbgp_cap_valid(self, route_family):
@@ -571,6 +608,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
 
     def on_update_med(self, conf_evt):
         LOG.debug('on_update_med fired')
+        self._leave_update_group()
         if self._protocol is not None and self._protocol.started:
             negotiated_afs = self._protocol.negotiated_afs
             for af in negotiated_afs:
@@ -616,12 +654,15 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
 
     def on_update_in_filter(self):
         LOG.debug('on_update_in_filter fired')
-        for received_path in self._adj_rib_in.values():
-            LOG.debug('received_path: %s', received_path)
-            path = received_path.path
+        if self._adj_rib_in is None:
+            self._refresh_in_filter()
+            return
+
+        for path, filtered in self._adj_rib_in.paths():
+            LOG.debug('received_path: %s', path)
             nlri_str = path.nlri.formatted_nlri_str
             block, blocked_reason = self._apply_in_filter(path)
-            if block == received_path.filtered:
+            if block == filtered:
                 LOG.debug('block situation not changed: %s', block)
                 continue
             elif block:
@@ -632,18 +673,58 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                 # path was blocked, but mustn't be blocked by this update
                 LOG.debug('learn blocked %s because of in filter update',
                           nlri_str)
-            received_path.filtered = block
+            self._adj_rib_in.set_filtered(path.nlri, block)
             tm = self._core_service.table_manager
             tm.learn_path(path)
 
+    def _refresh_in_filter(self):
+        # Without Adj-RIB-In, the paths of this peer in the Loc-RIB which
+        # are blocked by the new filters are withdrawn, and the peer is
+        # asked to send its routes again for the ones which were blocked
+        # and no longer are.
+        tm = self._core_service.table_manager
+        for table in tm.global_tables.values():
+            for dest in list(table.values()):
+                for path in dest.known_path_list:
+                    if path.source is not self:
+                        continue
+                    block, blocked_reason = self._apply_in_filter(path)
+                    if block:
+                        LOG.debug('withdraw %s because of in filter update',
+                                  path.nlri.formatted_nlri_str)
+                        tm.learn_path(path.clone(for_withdrawal=True))
+        if self.in_established():
+            self.request_route_refresh()
+
+    def _received_path(self, path, block):
+        # Stores the path received from this peer into the Adj-RIB-In and
+        # notifies the listeners.
+        if self._adj_rib_in is not None:
+            received_route = self._adj_rib_in.add(path, block)
+        else:
+            received_route = ReceivedRoute(path, self, block)
+            if block:
+                # The path replaces the one previously learned, if any.
+                tm = self._core_service.table_manager
+                tm.learn_path(path.clone(for_withdrawal=True))
+        self._signal_bus.adj_rib_in_changed(self, received_route)
+
+    def _received_withdraw(self, w_path, block):
+        # Removes the path withdrawn by this peer from the Adj-RIB-In and
+        # notifies the listeners.
+        if self._adj_rib_in is not None:
+            if not self._adj_rib_in.remove(w_path.nlri):
+                return
+        received_route = ReceivedRoute(w_path, self, block)
+        self._signal_bus.adj_rib_in_changed(self, received_route)
+
     def on_update_out_filter(self):
         LOG.debug('on_update_out_filter fired')
-        for sent_path in self._adj_rib_out.values():
-            LOG.debug('sent_path: %s', sent_path)
-            path = sent_path.path
+        for path, filtered in self._adj_rib_out.paths():
+            LOG.debug('sent_path: %s', path)
             nlri_str = path.nlri.formatted_nlri_str
             block, blocked_reason = self._apply_out_filter(path)
-            if block == sent_path.filtered:
+            if block == filtered:
                 LOG.debug('block situation not changed: %s', block)
                 continue
             elif block:
@@ -657,15 +738,14 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                 outgoing_route = OutgoingRoute(path)
                 LOG.debug('send blocked %s because of out filter update',
                           nlri_str)
-            sent_path.filtered = block
+            self._adj_rib_out.set_filtered(path.nlri, block)
             self.enque_outgoing_msg(outgoing_route)
 
     def on_update_attribute_maps(self):
         # resend sent_route in case of filter matching
         LOG.debug('on_update_attribute_maps fired')
-        for sent_path in self._adj_rib_out.values():
-            LOG.debug('resend path: %s', sent_path)
-            path = sent_path.path
+        for path, _ in self._adj_rib_out.paths():
+            LOG.debug('resend path: %s', path)
             self.enque_outgoing_msg(OutgoingRoute(path))
 
     def __str__(self):
@@ -706,40 +786,145 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                               self._enqueue_eor_msg, rr_msg)
             LOG.debug('Enhanced RR max. EOR timer set.')
 
-    def _send_outgoing_route(self, outgoing_route):
-        """Constructs `Update` message from given `outgoing_route` and sends
-        it to peer.
+    def _send_outgoing_routes(self, outgoing_routes):
+        """Constructs `Update` messages from given `outgoing_routes` and
+        sends them to peer.
 
-        Also, checks if any policies prevent sending this message.
+        Prefixes with the same path attributes are packed into as few
+        `Update` messages as possible.
+        Also, checks if any policies prevent sending these messages.
         Populates Adj-RIB-out with corresponding `SentRoute`.
         """
+        packer = bgp_utils.UpdatePacker(BGP_MAX_MSG_LEN)
+        update_group = self._get_update_group()
+        pending_nlri = set()
+        updates = []
+        for outgoing_route in outgoing_routes:
+            path = outgoing_route.path
+            block, blocked_cause, encoded_update = update_group.encode(
+                path, self._encode_path)
+
+            nlri_str = outgoing_route.path.nlri.formatted_nlri_str
+            sent_route = self._adj_rib_out.add(outgoing_route.path, block)
+            self._signal_bus.adj_rib_out_changed(self, sent_route)
+
+            # Construct update message.
+            if not block:
+                # Packing must not reorder the updates of the same prefix.
+                if nlri_str in pending_nlri:
+                    updates.extend(packer.flush())
+                    pending_nlri.clear()
+                pending_nlri.add(nlri_str)
+                updates.extend(packer.add(encoded_update))
+            else:
+                LOG.debug('prefix : %s is not sent by filter : %s',
+                          path.nlri, blocked_cause)
+
+            # We have to create sent_route for every OutgoingRoute which is
+            # not a withdraw or was for route-refresh msg.
+            if (not outgoing_route.path.is_withdraw and
+                    not outgoing_route.for_route_refresh):
+                # Update the destination with new sent route.
+                tm = self._core_service.table_manager
+                tm.remember_sent_route(sent_route)
+        updates.extend(packer.flush())
 
-        path = outgoing_route.path
-        block, blocked_cause = self._apply_out_filter(path)
-
-        nlri_str = outgoing_route.path.nlri.formatted_nlri_str
-        sent_route = SentRoute(outgoing_route.path, self, block)
-        self._adj_rib_out[nlri_str] = sent_route
-        self._signal_bus.adj_rib_out_changed(self, sent_route)
-
-        # TODO(PH): optimized by sending several prefixes per update.
-        # Construct and send update message.
-        if not block:
-            update_msg = self._construct_update(outgoing_route)
+        for update_msg in updates:
+            if self._protocol is None:
+                break
             self._protocol.send(update_msg)
             # Collect update statistics.
             self.state.incr(PeerCounterNames.SENT_UPDATES)
-        else:
-            LOG.debug('prefix : %s is not sent by filter : %s',
-                      path.nlri, blocked_cause)
-
-        # We have to create sent_route for every OutgoingRoute which is
-        # not a withdraw or was for route-refresh msg.
-        if (not outgoing_route.path.is_withdraw and
-                not outgoing_route.for_route_refresh):
-            # Update the destination with new sent route.
-            tm = self._core_service.table_manager
-            tm.remember_sent_route(sent_route)
+            self.state.incr(PeerCounterNames.SENT_PREFIX_UPDATES)
+            self.state.incr(PeerCounterNames.SENT_PREFIXES,
+                            update_msg.prefix_count)
+
+    def _encode_path(self, path):
+        # Applies the out filters to `path` and encodes its UPDATE message.
+        # Called once per path for all the peers of the update group.
+        block, blocked_cause = self._apply_out_filter(path)
+        encoded_update = None
+        if not block:
+            encoded_update = bgp_utils.encode_update(
+                self._construct_update(OutgoingRoute(path)))
+        return block, blocked_cause, encoded_update
+
+    def _update_group_key(self):
+        # Everything but the path which the out filters and
+        # _construct_update() depend on.
+        attribute_maps = sorted(
+            (key, maps[const.ATTR_MAPS_ORG_KEY])
+            for key, maps in self._attribute_maps.items())
+        key = (self.is_route_server_client, repr(self._out_filters),
+               repr(attribute_maps))
+        if self.is_route_server_client:
+            # The path attributes are sent as they are.
+            return key
+        return key + (
+            self.is_route_reflector_client,
+            self.is_ebgp_peer(),
+            self.local_as,
+            self._neigh_conf.next_hop or self.host_bind_ip,
+            self._neigh_conf.is_next_hop_self,
+            self._neigh_conf.multi_exit_disc,
+            tuple(self._neigh_conf.soo_list or ()),
+            self.is_four_octet_as_number_cap_valid(),
+        )
+
+    def _get_update_group(self):
+        if self._update_group is None:
+            self._update_group = self._peer_manager.get_update_group(
+                self._update_group_key())
+            self._update_group.members.add(self)
+        return self._update_group
+
+    def _leave_update_group(self):
+        # Called when the outbound policy of this peer changes.
+        if self._update_group is not None:
+            self._update_group.members.discard(self)
+            self._update_group = None
+
+    @staticmethod
+    def _queued_route_key(path):
+        return path.route_family, path.nlri.formatted_nlri_str
+
+    def enque_outgoing_msg(self, msg):
+        """Enqueues `msg` to be sent to this peer.
+
+        Withdrawals are sent before the other queued messages, and cancel
+        the queued announcements of the same prefix.  The other messages
+        are sent in order, so that End-of-RIB markers follow the routes
+        queued before them.
+        """
+        if isinstance(msg, OutgoingRoute):
+            key = self._queued_route_key(msg.path)
+            if msg.path.is_withdraw:
+                for queued in self._queued_routes.pop(key, ()):
+                    self.outgoing_msg_list.remove(queued)
+                self.outgoing_withdraw_list.append(msg)
+                self.outgoing_msg_event.set()
+                self.messages_queued += 1
+                return
+            self._queued_routes.setdefault(key, []).append(msg)
+        super(Peer, self).enque_outgoing_msg(msg)
+
+    def clear_outgoing_msg_list(self):
+        super(Peer, self).clear_outgoing_msg_list()
+        self.outgoing_withdraw_list = Sink.OutgoingMsgList()
+        self._queued_routes = {}
+
+    def _pop_outgoing_msg(self):
+        outgoing_msg = self.outgoing_withdraw_list.pop_first()
+        if outgoing_msg is not None:
+            return outgoing_msg
+        outgoing_msg = self.outgoing_msg_list.pop_first()
+        if isinstance(outgoing_msg, OutgoingRoute):
+            key = self._queued_route_key(outgoing_msg.path)
+            queued = self._queued_routes[key]
+            queued.remove(outgoing_msg)
+            if not queued:
+                del self._queued_routes[key]
+        return outgoing_msg
 
     def _process_outgoing_msg_list(self):
         while True:
@@ -747,7 +932,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
 
             if self._protocol is not None:
                 # We pick the first outgoing msg. available and send it.
-                outgoing_msg = self.outgoing_msg_list.pop_first()
+                outgoing_msg = self._pop_outgoing_msg()
 
             # If we do not have any outgoing route, we wait.
             if outgoing_msg is None:
@@ -766,7 +951,19 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             if isinstance(outgoing_msg, BGPRouteRefresh):
                 self._send_outgoing_route_refresh_msg(outgoing_msg)
             elif isinstance(outgoing_msg, OutgoingRoute):
-                self._send_outgoing_route(outgoing_msg)
+                # Take the following routes too, to pack them into fewer
+                # update messages.
+                outgoing_routes = [outgoing_msg]
+                while len(outgoing_routes) < UPDATE_PACKING_BATCH_SIZE:
+                    outgoing_msg = self._pop_outgoing_msg()
+                    if outgoing_msg is None:
+                        break
+                    if not isinstance(outgoing_msg, OutgoingRoute):
+                        # Only OutgoingRoute are queued as withdrawals.
+                        self.outgoing_msg_list.prepend(outgoing_msg)
+                        break
+                    outgoing_routes.append(outgoing_msg)
+                self._send_outgoing_routes(outgoing_routes)
 
             # EOR are enqueued as plain Update messages.
             elif isinstance(outgoing_msg, BGPUpdate):
@@ -988,6 +1185,19 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                 new_pathattr.append(mpunreach_attr)
         elif self.is_route_server_client:
             nlri_list = [path.nlri]
+            if not isinstance(path, Ipv4Path):
+                # MP_REACH_NLRI is not a part of the path attributes.
+                if path.route_family.safi in (subaddr_family.IP_FLOWSPEC,
+                                              subaddr_family.VPN_FLOWSPEC):
+                    next_hop = []
+                else:
+                    next_hop = path.nexthop
+                new_pathattr.append(BGPPathAttributeMpReachNLRI(
+                    path.route_family.afi,
+                    path.route_family.safi,
+                    next_hop,
+                    nlri_list
+                ))
             new_pathattr.extend(pathattr_map.values())
         else:
             if self.is_route_reflector_client:
@@ -1186,7 +1396,9 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             if path_extcomm_attr:
                 # SOO list can be configured per VRF and/or per Neighbor.
                 # NeighborConf has this setting we add this to existing list.
-                communities = path_extcomm_attr.communities
+                # The path attributes are interned and shared by the paths,
+                # so the list is copied instead of being modified.
+                communities = list(path_extcomm_attr.communities)
                 if self._neigh_conf.soo_list:
                     # construct extended community
                     soo_list = self._neigh_conf.soo_list
@@ -1715,6 +1927,9 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             LOG.debug('Update message did not have any new MP_REACH_NLRIs.')
             return
 
+        # All the paths share the interned path attributes.
+        umsg_pattrs = intern_pattrs(umsg_pattrs)
+
         # Create path instances for each NLRI from the update message.
         for msg_nlri in msg_nlri_list:
             LOG.debug('NLRI: %s', msg_nlri)
@@ -1728,10 +1943,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
 
             block, blocked_cause = self._apply_in_filter(new_path)
 
-            nlri_str = new_path.nlri.formatted_nlri_str
-            received_route = ReceivedRoute(new_path, self, block)
-            self._adj_rib_in[nlri_str] = received_route
-            self._signal_bus.adj_rib_in_changed(self, received_route)
+            self._received_path(new_path, block)
 
             if not block:
                 # Update appropriate table with new paths.
@@ -1779,12 +1991,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
 
             block, blocked_cause = self._apply_in_filter(w_path)
 
-            received_route = ReceivedRoute(w_path, self, block)
-            nlri_str = w_nlri.formatted_nlri_str
-
-            if nlri_str in self._adj_rib_in:
-                del self._adj_rib_in[nlri_str]
-                self._signal_bus.adj_rib_in_changed(self, received_route)
+            self._received_withdraw(w_path, block)
 
             if not block:
                 # Update appropriate table with withdraws.
@@ -1792,7 +1999,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                 tm.learn_path(w_path)
             else:
                 LOG.debug('prefix : %s is blocked by in-bound filter: %s',
-                          nlri_str, blocked_cause)
+                          w_nlri, blocked_cause)
 
     def _extract_and_handle_mpbgp_new_paths(self, update_msg):
         """Extracts new paths advertised in the given update message's
@@ -1855,6 +2062,9 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             LOG.debug('Update message did not have any new MP_REACH_NLRIs.')
             return
 
+        # All the paths share the interned path attributes.
+        umsg_pattrs = intern_pattrs(umsg_pattrs)
+
         # Create path instances for each NLRI from the update message.
         for msg_nlri in msg_nlri_list:
             new_path = bgp_utils.create_path(
@@ -1867,10 +2077,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
 
             block, blocked_cause = self._apply_in_filter(new_path)
 
-            received_route = ReceivedRoute(new_path, self, block)
-            nlri_str = msg_nlri.formatted_nlri_str
-            self._adj_rib_in[nlri_str] = received_route
-            self._signal_bus.adj_rib_in_changed(self, received_route)
+            self._received_path(new_path, block)
 
             if not block:
                 if msg_rf == RF_RTC_UC \
@@ -1929,12 +2136,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             )
             block, blocked_cause = self._apply_in_filter(w_path)
 
-            received_route = ReceivedRoute(w_path, self, block)
-            nlri_str = w_nlri.formatted_nlri_str
-
-            if nlri_str in self._adj_rib_in:
-                del self._adj_rib_in[nlri_str]
-                self._signal_bus.adj_rib_in_changed(self, received_route)
+            self._received_withdraw(w_path, block)
 
             if not block:
                 # Update appropriate table with withdraws.
@@ -2327,6 +2529,7 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             self._sent_init_non_rtc_update = False
             # Clear sink.
             self.clear_outgoing_msg_list()
+            self._leave_update_group()
             # Un-schedule timers
             self._unschedule_sending_init_updates()
 
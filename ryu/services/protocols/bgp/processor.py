@@ -17,7 +17,9 @@
 """
 
 import logging
+import time
 
+from ryu.lib import ip
 from ryu.services.protocols.bgp.base import Activity
 from ryu.services.protocols.bgp.base import add_bgp_error_metadata
 from ryu.services.protocols.bgp.base import BGP_PROCESSOR_ERROR_CODE
@@ -62,8 +64,12 @@ class BgpProcessor(Activity):
     works to achieve the desired work flow.
     """
 
-    # Max. number of destinations processed per cycle.
-    MAX_DEST_PROCESSED_PER_CYCLE = 100
+    # Max. time in seconds spent on processing destinations per cycle.
+    MAX_PROCESSING_TIME_PER_CYCLE = 0.05
+
+    # Clock for the time budget above; monotonic so that it is not
+    # affected by changes of the wall clock.
+    _clock = staticmethod(getattr(time, 'monotonic', time.time))
 
     #
     # DestQueue
@@ -76,15 +82,15 @@ class BgpProcessor(Activity):
         next_attr_name='next_dest_to_process',
         prev_attr_name='prev_dest_to_process')
 
-    def __init__(self, core_service, work_units_per_cycle=None):
+    def __init__(self, core_service, time_per_cycle=None):
         Activity.__init__(self)
         # Back pointer to core service instance that created this processor.
         self._core_service = core_service
         self._dest_queue = BgpProcessor._DestQueue()
         self._rtdest_queue = BgpProcessor._DestQueue()
         self.dest_que_evt = EventletIOFactory.create_custom_event()
-        self.work_units_per_cycle =\
-            work_units_per_cycle or BgpProcessor.MAX_DEST_PROCESSED_PER_CYCLE
+        self.time_per_cycle =\
+            time_per_cycle or BgpProcessor.MAX_PROCESSING_TIME_PER_CYCLE
 
     def _run(self, *args, **kwargs):
         # Sit in tight loop, getting destinations from the queue and processing
@@ -108,15 +114,17 @@ class BgpProcessor(Activity):
                 self.pause(0)
 
     def _process_dest(self):
-        dest_processed = 0
         LOG.debug('Processing destination...')
-        while (dest_processed < self.work_units_per_cycle and
-               not self._dest_queue.is_empty()):
+        # We process destinations until the time for this cycle is used up,
+        # so that the batch size adapts to the cost of each destination.
+        deadline = self._clock() + self.time_per_cycle
+        while not self._dest_queue.is_empty():
             # We process the first destination in the queue.
             next_dest = self._dest_queue.pop_first()
             if next_dest:
                 next_dest.process()
-                dest_processed += 1
+            if self._clock() >= deadline:
+                break
 
     def _process_rtdest(self):
         LOG.debug('Processing RT NLRI destination...')
@@ -192,6 +200,93 @@ def _compare_by_version(path1, path2):
     return None
 
 
+def _get_origin_pref(origin):
+    if origin.value == BGP_ATTR_ORIGIN_IGP:
+        return 3
+    elif origin.value == BGP_ATTR_ORIGIN_EGP:
+        return 2
+    elif origin.value == BGP_ATTR_ORIGIN_INCOMPLETE:
+        return 1
+    else:
+        LOG.error('Invalid origin value encountered %s.', origin)
+        return 0
+
+
+def _get_router_id(bgp_id):
+    try:
+        return ip.ipv4_to_int(bgp_id)
+    except ValueError:
+        LOG.debug('Invalid bgp id given for conversion to integer value %s',
+                  bgp_id)
+        return None
+
+
+class BestPathKey(object):
+    """Values of a path which are compared by best path selection.
+
+    They are looked up once per path, see `get_best_path_key`.
+    """
+    __slots__ = ('local_asn', 'source', 'is_local', 'local_pref',
+                 'as_path_len', 'origin', 'med', 'asn', 'router_id',
+                 'local_router_id', 'cluster_list_len')
+
+    def __init__(self, local_asn, path):
+        self.local_asn = local_asn
+        source = path.source
+        self.source = source
+        self.is_local = source is None
+
+        local_pref = path.get_pattr(BGP_ATTR_TYPE_LOCAL_PREF)
+        self.local_pref = local_pref.value if local_pref else None
+
+        as_path = path.get_pattr(BGP_ATTR_TYPE_AS_PATH)
+        self.as_path_len = as_path.get_as_path_len() if as_path else None
+
+        origin = path.get_pattr(BGP_ATTR_TYPE_ORIGIN)
+        self.origin = _get_origin_pref(origin) if origin else None
+
+        # By default, a route that arrives with no MED value is treated as
+        # if it had a MED of 0, the most preferred value.
+        med = path.get_pattr(BGP_ATTR_TYPE_MULTI_EXIT_DISC)
+        self.med = med.value if med else 0
+
+        if source is None or source == VRF_TABLE:
+            self.asn = local_asn
+        else:
+            self.asn = source.remote_as
+
+        # The router ID of the path and of the local speaker, if known.
+        self.router_id = None
+        self.local_router_id = None
+        protocol = getattr(source, 'protocol', None)
+        if protocol is not None:
+            if protocol.sent_open_msg is not None:
+                self.local_router_id = _get_router_id(
+                    protocol.sent_open_msg.bgp_identifier)
+            if protocol.recv_open_msg is not None:
+                self.router_id = _get_router_id(
+                    protocol.recv_open_msg.bgp_identifier)
+        if source is not None:
+            originator_id = path.get_pattr(BGP_ATTR_TYPE_ORIGINATOR_ID)
+            if originator_id:
+                self.router_id = _get_router_id(originator_id.value)
+
+        cluster_list = path.get_pattr(BGP_ATTR_TYPE_CLUSTER_LIST)
+        self.cluster_list_len = len(cluster_list.value) if cluster_list else 0
+
+
+def get_best_path_key(local_asn, path):
+    """Returns the `BestPathKey` of given `path`.
+
+    The key is cached on the path as paths are immutable.
+    """
+    key = path.best_path_key
+    if key is None or key.local_asn != local_asn:
+        key = BestPathKey(local_asn, path)
+        path.best_path_key = key
+    return key
+
+
 def compute_best_path(local_asn, path1, path2):
     """Compares given paths and returns best path.
 
@@ -221,54 +316,92 @@ def compute_best_path(local_asn, path1, path2):
     11. Select the route received from the peer with the shorter
         CLUSTER_LIST length.
 
+    The steps are listed in `BEST_PATH_DECISION_STEPS`.
+
     Returns None if best-path among given paths cannot be computed else best
     path.
     Assumes paths from NC has source equal to None.
     """
-    best_path = None
-    best_path_reason = BPR_UNKNOWN
-
-    # Follow best path calculation algorithm steps.
-    if best_path is None:
-        best_path = _cmp_by_reachable_nh(path1, path2)
-        best_path_reason = BPR_REACHABLE_NEXT_HOP
-    if best_path is None:
-        best_path = _cmp_by_highest_wg(path1, path2)
-        best_path_reason = BPR_HIGHEST_WEIGHT
-    if best_path is None:
-        best_path = _cmp_by_local_pref(path1, path2)
-        best_path_reason = BPR_LOCAL_PREF
-    if best_path is None:
-        best_path = _cmp_by_local_origin(path1, path2)
-        best_path_reason = BPR_LOCAL_ORIGIN
-    if best_path is None:
-        best_path = _cmp_by_aspath(path1, path2)
-        best_path_reason = BPR_ASPATH
-    if best_path is None:
-        best_path = _cmp_by_origin(path1, path2)
-        best_path_reason = BPR_ORIGIN
-    if best_path is None:
-        best_path = _cmp_by_med(path1, path2)
-        best_path_reason = BPR_MED
-    if best_path is None:
-        best_path = _cmp_by_asn(local_asn, path1, path2)
-        best_path_reason = BPR_ASN
-    if best_path is None:
-        best_path = _cmp_by_igp_cost(path1, path2)
-        best_path_reason = BPR_IGP_COST
-    if best_path is None:
-        best_path = _cmp_by_router_id(local_asn, path1, path2)
-        best_path_reason = BPR_ROUTER_ID
-    if best_path is None:
-        best_path = _cmp_by_cluster_list(path1, path2)
-        best_path_reason = BPR_CLUSTER_LIST
+    key1 = get_best_path_key(local_asn, path1)
+    key2 = get_best_path_key(local_asn, path2)
+    best_key, best_path_reason = _compare_best_path_keys(key1, key2)
+    if best_key is key1:
+        return path1, best_path_reason
+    elif best_key is key2:
+        return path2, best_path_reason
+    return None, best_path_reason
+
+
+def select_best_path(local_asn, paths, best_path=None):
+    """Selects the best path among given `paths`.
+
+    If `best_path` is given, it is the best path among the paths which are
+    not in `paths` and the new best path is selected by comparing `paths`
+    with it only.  Otherwise the first path of `paths` is the initial
+    candidate, which helps in breaking tie between two paths for which
+    best-path calculation steps lead to tie.
+
+    Returns the best path and the reason it was chosen.
+    """
+    paths = iter(paths)
     if best_path is None:
-        best_path_reason = BPR_UNKNOWN
+        best_path = next(paths)
+    best_path_reason = BPR_ONLY_PATH
+    best_key = get_best_path_key(local_asn, best_path)
+    for path in paths:
+        key = get_best_path_key(local_asn, path)
+        new_best_key, best_path_reason = _compare_best_path_keys(best_key,
+                                                                 key)
+        if new_best_key is key:
+            best_path, best_key = path, key
+    return best_path, best_path_reason
+
+
+def select_new_best_path(local_asn, best_path, new_paths, known_paths):
+    """Selects the best path by comparing `new_paths` with `best_path` only.
+
+    `best_path` is the best path selected among `known_paths` but
+    `new_paths`, which are at the end of `known_paths`, and none of the
+    previously known paths has been removed since.
+
+    The result is the one of the full selection among `known_paths` only if
+    every comparison is decided by a step of `INCREMENTAL_DECISION_STEPS`
+    and the local preference is either on all of `known_paths` or on none,
+    so that the steps order the paths transitively.  Otherwise, for example
+    if the MED decides, which is not transitive with the other steps, None
+    is returned and the full selection must be done.
 
+    Returns the best path and the reason it was chosen, or (None, None).
+    """
+    has_local_pref = bool(get_best_path_key(local_asn, best_path).local_pref)
+    for path in known_paths:
+        if bool(get_best_path_key(local_asn, path).local_pref) != \
+                has_local_pref:
+            return None, None
+
+    best_path_reason = BPR_ONLY_PATH
+    best_key = get_best_path_key(local_asn, best_path)
+    for path in new_paths:
+        key = get_best_path_key(local_asn, path)
+        new_best_key, best_path_reason = _compare_best_path_keys(best_key,
+                                                                 key)
+        if best_path_reason not in INCREMENTAL_DECISION_STEPS:
+            return None, None
+        if new_best_key is key:
+            best_path, best_key = path, key
     return best_path, best_path_reason
 
 
-def _cmp_by_reachable_nh(path1, path2):
+def _compare_best_path_keys(key1, key2):
+    # Follow best path calculation algorithm steps.
+    for reason, compare in BEST_PATH_DECISION_STEPS:
+        best_key = compare(key1, key2)
+        if best_key is not None:
+            return best_key, reason
+    return None, BPR_UNKNOWN
+
+
+def _cmp_by_reachable_nh(key1, key2):
     """Compares given paths and selects best path based on reachable next-hop.
 
     If no path matches this criteria, return None.
@@ -278,7 +411,7 @@ def _cmp_by_reachable_nh(path1, path2):
     return None
 
 
-def _cmp_by_highest_wg(path1, path2):
+def _cmp_by_highest_wg(key1, key2):
     """Selects a path with highest weight.
 
     Weight is BGPS specific parameter. It is local to the router on which it
@@ -291,7 +424,7 @@ def _cmp_by_highest_wg(path1, path2):
     return None
 
 
-def _cmp_by_local_pref(path1, path2):
+def _cmp_by_local_pref(key1, key2):
     """Selects a path with highest local-preference.
 
     Unlike the weight attribute, which is only relevant to the local
@@ -302,23 +435,21 @@ def _cmp_by_local_pref(path1, path2):
     # TODO(PH): Revisit this when BGPS has concept of policy to be applied to
     # in-bound NLRIs.
     # Default local-pref values is 100
-    lp1 = path1.get_pattr(BGP_ATTR_TYPE_LOCAL_PREF)
-    lp2 = path2.get_pattr(BGP_ATTR_TYPE_LOCAL_PREF)
+    lp1 = key1.local_pref
+    lp2 = key2.local_pref
     if not (lp1 and lp2):
         return None
 
     # Highest local-preference value is preferred.
-    lp1 = lp1.value
-    lp2 = lp2.value
     if lp1 > lp2:
-        return path1
+        return key1
     elif lp2 > lp1:
-        return path2
+        return key2
     else:
         return None
 
 
-def _cmp_by_local_origin(path1, path2):
+def _cmp_by_local_origin(key1, key2):
     """Select locally originating path as best path.
 
     Locally originating routes are network routes, redistributed routes,
@@ -328,129 +459,93 @@ def _cmp_by_local_origin(path1, path2):
     Returns None if given paths have same source.
     """
     # If both paths are from same sources we cannot compare them here.
-    if path1.source == path2.source:
+    if key1.source == key2.source:
         return None
 
     # Here we consider prefix from NC as locally originating static route.
     # Hence it is preferred.
-    if path1.source is None:
-        return path1
+    if key1.is_local:
+        return key1
 
-    if path2.source is None:
-        return path2
+    if key2.is_local:
+        return key2
 
     return None
 
 
-def _cmp_by_aspath(path1, path2):
+def _cmp_by_aspath(key1, key2):
     """Calculated the best-paths by comparing as-path lengths.
 
     Shortest as-path length is preferred. If both path have same lengths,
     we return None.
     """
-    as_path1 = path1.get_pattr(BGP_ATTR_TYPE_AS_PATH)
-    as_path2 = path2.get_pattr(BGP_ATTR_TYPE_AS_PATH)
-    assert as_path1 and as_path2
-    l1 = as_path1.get_as_path_len()
-    l2 = as_path2.get_as_path_len()
+    l1 = key1.as_path_len
+    l2 = key2.as_path_len
     assert l1 is not None and l2 is not None
     if l1 > l2:
-        return path2
+        return key2
     elif l2 > l1:
-        return path1
+        return key1
     else:
         return None
 
 
-def _cmp_by_origin(path1, path2):
+def _cmp_by_origin(key1, key2):
     """Select the best path based on origin attribute.
 
     IGP is preferred over EGP; EGP is preferred over Incomplete.
     If both paths have same origin, we return None.
     """
-    def get_origin_pref(origin):
-        if origin.value == BGP_ATTR_ORIGIN_IGP:
-            return 3
-        elif origin.value == BGP_ATTR_ORIGIN_EGP:
-            return 2
-        elif origin.value == BGP_ATTR_ORIGIN_INCOMPLETE:
-            return 1
-        else:
-            LOG.error('Invalid origin value encountered %s.', origin)
-            return 0
-
-    origin1 = path1.get_pattr(BGP_ATTR_TYPE_ORIGIN)
-    origin2 = path2.get_pattr(BGP_ATTR_TYPE_ORIGIN)
+    origin1 = key1.origin
+    origin2 = key2.origin
     assert origin1 is not None and origin2 is not None
 
-    # If both paths have same origins
-    if origin1.value == origin2.value:
-        return None
-
-    # Translate origin values to preference.
-    origin1 = get_origin_pref(origin1)
-    origin2 = get_origin_pref(origin2)
     # Return preferred path.
     if origin1 == origin2:
         return None
     elif origin1 > origin2:
-        return path1
-    return path2
+        return key1
+    return key2
 
 
-def _cmp_by_med(path1, path2):
+def _cmp_by_med(key1, key2):
     """Select the path based with lowest MED value.
 
     If both paths have same MED, return None.
-    By default, a route that arrives with no MED value is treated as if it
-    had a MED of 0, the most preferred value.
     RFC says lower MED is preferred over higher MED value.
     """
-    def get_path_med(path):
-        med = path.get_pattr(BGP_ATTR_TYPE_MULTI_EXIT_DISC)
-        if not med:
-            return 0
-        return med.value
-
-    med1 = get_path_med(path1)
-    med2 = get_path_med(path2)
+    med1 = key1.med
+    med2 = key2.med
 
     if med1 == med2:
         return None
     elif med1 < med2:
-        return path1
-    return path2
+        return key1
+    return key2
 
 
-def _cmp_by_asn(local_asn, path1, path2):
+def _cmp_by_asn(key1, key2):
     """Select the path based on source (iBGP/eBGP) peer.
 
     eBGP path is preferred over iBGP. If both paths are from same kind of
     peers, return None.
     """
-    def get_path_source_asn(path):
-        asn = None
-        if path.source is None or path.source == VRF_TABLE:
-            asn = local_asn
-        else:
-            asn = path.source.remote_as
-        return asn
-
-    p1_asn = get_path_source_asn(path1)
-    p2_asn = get_path_source_asn(path2)
+    local_asn = key1.local_asn
+    p1_asn = key1.asn
+    p2_asn = key2.asn
     # If path1 is from ibgp peer and path2 is from ebgp peer.
     if (p1_asn == local_asn) and (p2_asn != local_asn):
-        return path2
+        return key2
 
     # If path2 is from ibgp peer and path1 is from ebgp peer,
     if (p2_asn == local_asn) and (p1_asn != local_asn):
-        return path1
+        return key1
 
     # If both paths are from ebgp or ibpg peers, we cannot decide.
     return None
 
 
-def _cmp_by_igp_cost(path1, path2):
+def _cmp_by_igp_cost(key1, key2):
     """Select the route with the lowest IGP cost to the next hop.
 
     Return None if igp cost is same.
@@ -459,7 +554,7 @@ def _cmp_by_igp_cost(path1, path2):
     return None
 
 
-def _cmp_by_router_id(local_asn, path1, path2):
+def _cmp_by_router_id(key1, key2):
     """Select the route received from the peer with the lowest BGP router ID.
 
     If both paths are eBGP paths, then we do not do any tie breaking, i.e we do
@@ -467,86 +562,83 @@ def _cmp_by_router_id(local_asn, path1, path2):
     RFC: http://tools.ietf.org/html/rfc5004
     We pick best path between two iBGP paths as usual.
     """
-    def get_asn(path_source):
-        if path_source is None:
-            return local_asn
-        else:
-            return path_source.remote_as
-
-    def get_router_id(path, local_bgp_id):
-        path_source = path.source
-        if path_source is None:
-            return local_bgp_id
-        else:
-            originator_id = path.get_pattr(BGP_ATTR_TYPE_ORIGINATOR_ID)
-            if originator_id:
-                return originator_id.value
-            return path_source.protocol.recv_open_msg.bgp_identifier
-
-    path_source1 = path1.source
-    path_source2 = path2.source
-
     # If both paths are from NC we have same router Id, hence cannot compare.
-    if path_source1 is None and path_source2 is None:
+    if key1.is_local and key2.is_local:
         return None
 
-    asn1 = get_asn(path_source1)
-    asn2 = get_asn(path_source2)
-
-    is_ebgp1 = asn1 != local_asn
-    is_ebgp2 = asn2 != local_asn
+    local_asn = key1.local_asn
+    is_ebgp1 = key1.asn != local_asn
+    is_ebgp2 = key2.asn != local_asn
     # If both paths are from eBGP peers, then according to RFC we need
     # not tie break using router id.
     if is_ebgp1 and is_ebgp2:
         return None
 
-    if ((is_ebgp1 is True and is_ebgp2 is False) or
-            (is_ebgp1 is False and is_ebgp2 is True)):
+    if is_ebgp1 != is_ebgp2:
         raise ValueError('This method does not support comparing ebgp with'
                          ' ibgp path')
 
     # At least one path is not coming from NC, so we get local bgp id.
-    if path_source1 is not None:
-        local_bgp_id = path_source1.protocol.sent_open_msg.bgp_identifier
-    else:
-        local_bgp_id = path_source2.protocol.sent_open_msg.bgp_identifier
-
-    # Get router ids.
-    router_id1 = get_router_id(path1, local_bgp_id)
-    router_id2 = get_router_id(path2, local_bgp_id)
+    router_id1 = key1.router_id
+    router_id2 = key2.router_id
+    if key1.is_local:
+        router_id1 = key2.local_router_id
+    if key2.is_local:
+        router_id2 = key1.local_router_id
 
     # If both router ids are same/equal we cannot decide.
     # This case is possible since router ids are arbitrary.
-    if router_id1 == router_id2:
+    if router_id1 is None or router_id2 is None or router_id1 == router_id2:
         return None
 
     # Select the path with lowest router Id.
-    from ryu.services.protocols.bgp.utils.bgp import from_inet_ptoi
-    if from_inet_ptoi(router_id1) < from_inet_ptoi(router_id2):
-        return path1
+    if router_id1 < router_id2:
+        return key1
     else:
-        return path2
+        return key2
 
 
-def _cmp_by_cluster_list(path1, path2):
+def _cmp_by_cluster_list(key1, key2):
     """Selects the route received from the peer with the shorter
     CLUSTER_LIST length. [RFC4456]
 
     The CLUSTER_LIST length is evaluated as zero if a route does not
     carry the CLUSTER_LIST attribute.
     """
-    def _get_cluster_list_len(path):
-        c_list = path.get_pattr(BGP_ATTR_TYPE_CLUSTER_LIST)
-        if c_list is None:
-            return 0
-        else:
-            return len(c_list.value)
-
-    c_list_len1 = _get_cluster_list_len(path1)
-    c_list_len2 = _get_cluster_list_len(path2)
+    c_list_len1 = key1.cluster_list_len
+    c_list_len2 = key2.cluster_list_len
     if c_list_len1 < c_list_len2:
-        return path1
+        return key1
     elif c_list_len1 > c_list_len2:
-        return path2
+        return key2
     else:
         return None
+
+
+# Steps of best path selection.  Each step compares the `BestPathKey` of two
+# paths and returns the key of the better path, or None if it cannot decide.
+BEST_PATH_DECISION_STEPS = [
+    (BPR_REACHABLE_NEXT_HOP, _cmp_by_reachable_nh),
+    (BPR_HIGHEST_WEIGHT, _cmp_by_highest_wg),
+    (BPR_LOCAL_PREF, _cmp_by_local_pref),
+    (BPR_LOCAL_ORIGIN, _cmp_by_local_origin),
+    (BPR_ASPATH, _cmp_by_aspath),
+    (BPR_ORIGIN, _cmp_by_origin),
+    (BPR_MED, _cmp_by_med),
+    (BPR_ASN, _cmp_by_asn),
+    (BPR_IGP_COST, _cmp_by_igp_cost),
+    (BPR_ROUTER_ID, _cmp_by_router_id),
+    (BPR_CLUSTER_LIST, _cmp_by_cluster_list),
+]
+
+# Steps ordering the paths transitively, i.e. a path preferred to another
+# by them is preferred to all the paths the other is preferred to.  The best
+# path is selected incrementally only if they decide, see
+# `select_new_best_path`.  The MED, the router ID (not compared between eBGP
+# paths) and the ties depend on which paths are compared.
+INCREMENTAL_DECISION_STEPS = frozenset([
+    BPR_LOCAL_PREF,
+    BPR_LOCAL_ORIGIN,
+    BPR_ASPATH,
+    BPR_ORIGIN,
+])
@@ -104,6 +104,7 @@ IS_ROUTE_REFLECTOR_CLIENT = 'is_route_reflector_client'
 CHECK_FIRST_AS = 'check_first_as'
 ATTRIBUTE_MAP = 'attribute_map'
 IS_NEXT_HOP_SELF = 'is_next_hop_self'
+ADJ_RIB_IN = 'adj_rib_in'
 CONNECT_MODE = 'connect_mode'
 CONNECT_MODE_ACTIVE = 'active'
 CONNECT_MODE_PASSIVE = 'passive'
@@ -134,6 +135,7 @@ DEFAULT_IS_ROUTE_SERVER_CLIENT = False
 DEFAULT_IS_ROUTE_REFLECTOR_CLIENT = False
 DEFAULT_CHECK_FIRST_AS = False
 DEFAULT_IS_NEXT_HOP_SELF = False
+DEFAULT_ADJ_RIB_IN = True
 DEFAULT_CONNECT_MODE = CONNECT_MODE_BOTH
 
 # Default value for *MAX_PREFIXES* setting is set to 0.
@@ -321,6 +323,14 @@ def validate_is_next_hop_self(is_next_hop_self):
     return is_next_hop_self
 
 
+@validate(name=ADJ_RIB_IN)
+def validate_adj_rib_in(adj_rib_in):
+    if not isinstance(adj_rib_in, bool):
+        raise ConfigValueError(desc='Invalid adj_rib_in(%s)' % adj_rib_in)
+
+    return adj_rib_in
+
+
 @validate(name=CONNECT_MODE)
 def validate_connect_mode(mode):
     if mode not in (CONNECT_MODE_ACTIVE,
@@ -358,7 +368,8 @@ class NeighborConf(ConfWithId, ConfWithStats):
                                    IS_ROUTE_SERVER_CLIENT,
                                    IS_ROUTE_REFLECTOR_CLIENT,
                                    CHECK_FIRST_AS,
-                                   IS_NEXT_HOP_SELF, CONNECT_MODE])
+                                   IS_NEXT_HOP_SELF, ADJ_RIB_IN,
+                                   CONNECT_MODE])
 
     def __init__(self, **kwargs):
         super(NeighborConf, self).__init__(**kwargs)
@@ -414,6 +425,8 @@ class NeighborConf(ConfWithId, ConfWithStats):
         self._settings[IS_NEXT_HOP_SELF] = compute_optional_conf(
             IS_NEXT_HOP_SELF,
             DEFAULT_IS_NEXT_HOP_SELF, **kwargs)
+        self._settings[ADJ_RIB_IN] = compute_optional_conf(
+            ADJ_RIB_IN, DEFAULT_ADJ_RIB_IN, **kwargs)
         self._settings[CONNECT_MODE] = compute_optional_conf(
             CONNECT_MODE, DEFAULT_CONNECT_MODE, **kwargs)
         self._settings[REMOTE_PORT] = compute_optional_conf(
@@ -655,6 +668,10 @@ class NeighborConf(ConfWithId, ConfWithStats):
     def is_next_hop_self(self):
         return self._settings[IS_NEXT_HOP_SELF]
 
+    @property
+    def adj_rib_in(self):
+        return self._settings[ADJ_RIB_IN]
+
     @property
     def connect_mode(self):
         return self._settings[CONNECT_MODE]
@@ -21,8 +21,8 @@ import socket
 import struct
 import traceback
 from socket import IPPROTO_TCP, TCP_NODELAY
-from eventlet import semaphore
 
+from ryu.lib import hub
 from ryu.lib.packet import bgp
 from ryu.lib.packet.bgp import AS_TRANS
 from ryu.lib.packet.bgp import BGPMessage
@@ -58,6 +58,11 @@ LOG = logging.getLogger('bgpspeaker.speaker')
 BGP_MIN_MSG_LEN = 19
 BGP_MAX_MSG_LEN = 4096
 
+# Size of the receive buffer.  A read can bring in many messages at once
+# during an initial table transfer, all of them are decoded before
+# yielding to the other green threads.
+_RECV_BUF_SIZE = 16 * BGP_MAX_MSG_LEN
+
 # Keep-alive singleton.
 _KEEP_ALIVE = BGPKeepAlive()
 
@@ -102,10 +107,16 @@ class BgpProtocol(Protocol, Activity):
         Activity.__init__(self, name=activity_name)
         # Initialize instance variables.
         self._peer = None
-        self._recv_buff = b''
+        # Messages are framed in a preallocated receive buffer: received
+        # bytes are written at _recv_tail and complete messages are parsed
+        # from _recv_head.  The partially received message is moved to
+        # the front only when it could no longer be completed in place.
+        self._recv_buff = bytearray(_RECV_BUF_SIZE)
+        self._recv_view = memoryview(self._recv_buff)
+        self._recv_head = self._recv_tail = 0
         self._socket = socket
         self._socket.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
-        self._sendlock = semaphore.Semaphore()
+        self._sendlock = hub.Semaphore()
         self._signal_bus = signal_bus
         self._holdtime = None
         self._keepalive = None
@@ -305,20 +316,47 @@ class BgpProtocol(Protocol, Activity):
         appropriate bgp message instance and calls handler.
 
         :Parameters:
-            - `next_bytes`: next set of bytes received from peer.
+            - `next_bytes`: next set of bytes received from peer, or None
+              if they were received directly into the receive buffer.
         """
-        # Append buffer with received bytes.
-        self._recv_buff += next_bytes
+        if next_bytes is None:
+            self._process_recv_buff()
+            return
 
+        # Append buffer with received bytes.
+        next_bytes = memoryview(next_bytes)
+        while len(next_bytes):
+            self._compact_recv_buff()
+            size = min(len(next_bytes), _RECV_BUF_SIZE - self._recv_tail)
+            self._recv_view[self._recv_tail:self._recv_tail + size] = \
+                next_bytes[:size]
+            self._recv_tail += size
+            next_bytes = next_bytes[size:]
+            self._process_recv_buff()
+
+    def _compact_recv_buff(self):
+        head = self._recv_head
+        tail = self._recv_tail
+        if head == tail:
+            self._recv_head = self._recv_tail = 0
+        elif _RECV_BUF_SIZE - head < BGP_MAX_MSG_LEN:
+            # Move the partially received message to the front.
+            self._recv_buff[:tail - head] = \
+                self._recv_view[head:tail].tobytes()
+            self._recv_head = 0
+            self._recv_tail = tail - head
+
+    def _process_recv_buff(self):
+        buf = self._recv_buff
         while True:
+            head = self._recv_head
             # If current buffer size is less then minimum bgp message size, we
             # return as we do not have a complete bgp message to work with.
-            if len(self._recv_buff) < BGP_MIN_MSG_LEN:
+            if self._recv_tail - head < BGP_MIN_MSG_LEN:
                 return
 
             # Parse message header into elements.
-            auth, length, ptype = BgpProtocol.parse_msg_header(
-                self._recv_buff[:BGP_MIN_MSG_LEN])
+            auth, length, ptype = struct.unpack_from('!16sHB', buf, head)
 
             # Check if we have valid bgp message marker.
             # We should get default marker since we are not supporting any
@@ -348,10 +386,12 @@ class BgpProtocol(Protocol, Activity):
                 raise bgp.BadLen(ptype, length)
 
             # If we have partial message we wait for rest of the message.
-            if len(self._recv_buff) < length:
+            if self._recv_tail - head < length:
                 return
-            msg, _, rest = BGPMessage.parser(self._recv_buff)
-            self._recv_buff = rest
+            # The parser copies the message out of the buffer.
+            msg, _, _ = BGPMessage.parser(
+                self._recv_view[head:head + length])
+            self._recv_head = head + length
 
             # If we have a valid bgp message we call message handler.
             self._handle_msg(msg)
@@ -551,15 +591,20 @@ class BgpProtocol(Protocol, Activity):
         """Sits in tight loop collecting data received from peer and
         processing it.
         """
-        required_len = BGP_MIN_MSG_LEN
         conn_lost_reason = "Connection lost as protocol is no longer active"
         try:
             while True:
-                next_bytes = self._socket.recv(required_len)
-                if len(next_bytes) == 0:
+                self._compact_recv_buff()
+                received = self._socket.recv_into(
+                    self._recv_view[self._recv_tail:])
+                if not received:
                     conn_lost_reason = 'Peer closed connection'
                     break
-                self.data_received(next_bytes)
+                self._recv_tail += received
+                self.data_received(None)
+                # All the messages of this read are handled, let the other
+                # green threads run even if more data is already waiting.
+                hub.sleep(0)
         except socket.error as err:
             conn_lost_reason = 'Connection to peer lost: %s.' % err
         except bgp.BgpExc as ex:
@@ -0,0 +1,156 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ Compact storage of the Adj-RIB-In and Adj-RIB-Out of a peer.
+
+ Each route is kept as a (path, filtered, timestamp) tuple.  The Path is
+ the one in the Loc-RIB (or sent to the peer) and references interned
+ path attributes (see utils.pattrs), so an entry costs little more than
+ the tuple.  IPv4 and IPv6 unicast routes are keyed by an integer made of
+ the prefix address and length instead of the prefix string.  The
+ ReceivedRoute or SentRoute objects are only built when a route is looked
+ up.
+"""
+
+import socket
+import struct
+import time
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from ryu.lib.packet.bgp import IP6AddrPrefix
+from ryu.lib.packet.bgp import IPAddrPrefix
+
+_UINT32 = struct.Struct('!I')
+_UINT64X2 = struct.Struct('!QQ')
+
+
+def _ipv4_key(addr, length):
+    return (_UINT32.unpack(socket.inet_pton(socket.AF_INET, addr))[0] << 8 |
+            length)
+
+
+def _ipv6_key(addr, length):
+    high, low = _UINT64X2.unpack(socket.inet_pton(socket.AF_INET6, addr))
+    return (high << 72) | (low << 8) | length
+
+
+class AdjRib(Mapping):
+    """Map of formatted NLRI string to ReceivedRoute or SentRoute.
+
+    *route_cls* is the class of the routes (ReceivedRoute or SentRoute)
+    and *peer* the peer they are received from or sent to.
+    """
+
+    def __init__(self, route_cls, peer):
+        self._route_cls = route_cls
+        self._peer = peer
+        # Entries of IPv4 and IPv6 unicast routes, by integer key, and of
+        # the other routes, by formatted NLRI string.
+        self._ipv4 = {}
+        self._ipv6 = {}
+        self._other = {}
+        # Routes learned at the same time share the timestamp object.
+        self._timestamp = 0
+
+    def _table_and_key(self, nlri):
+        nlri_type = type(nlri)
+        if nlri_type is IPAddrPrefix:
+            return self._ipv4, _ipv4_key(nlri.addr, nlri.length)
+        elif nlri_type is IP6AddrPrefix:
+            return self._ipv6, _ipv6_key(nlri.addr, nlri.length)
+        return self._other, nlri.formatted_nlri_str
+
+    def _table_and_str_key(self, nlri_str):
+        addr, _, length = nlri_str.partition('/')
+        try:
+            if ':' in addr:
+                return self._ipv6, _ipv6_key(addr, int(length))
+            return self._ipv4, _ipv4_key(addr, int(length))
+        except (socket.error, ValueError):
+            return self._other, nlri_str
+
+    def _now(self):
+        now = int(time.time())
+        if now != self._timestamp:
+            self._timestamp = now
+        return self._timestamp
+
+    def _route(self, entry):
+        path, filtered, timestamp = entry
+        return self._route_cls(path, self._peer, filtered,
+                               time.gmtime(timestamp))
+
+    def add(self, path, filtered=None):
+        """Stores *path* (replacing the route to the same NLRI, if any) and
+        returns the route object for it.
+        """
+        table, key = self._table_and_key(path.nlri)
+        entry = table[key] = (path, filtered, self._now())
+        return self._route(entry)
+
+    def remove(self, nlri):
+        """Removes the route to *nlri*.  Returns True if there was one."""
+        table, key = self._table_and_key(nlri)
+        return table.pop(key, None) is not None
+
+    def set_filtered(self, nlri, filtered):
+        """Updates the filtered flag of the route to *nlri*."""
+        table, key = self._table_and_key(nlri)
+        path, _, timestamp = table[key]
+        table[key] = (path, filtered, timestamp)
+
+    def clear(self):
+        self._ipv4.clear()
+        self._ipv6.clear()
+        self._other.clear()
+
+    def __getitem__(self, nlri_str):
+        table, key = self._table_and_str_key(nlri_str)
+        return self._route(table[key])
+
+    def __contains__(self, nlri_str):
+        table, key = self._table_and_str_key(nlri_str)
+        return key in table
+
+    def __len__(self):
+        return len(self._ipv4) + len(self._ipv6) + len(self._other)
+
+    def _entries(self):
+        # The tables may change while the caller iterates.
+        for table in (self._ipv4, self._ipv6, self._other):
+            for entry in list(table.values()):
+                yield entry
+
+    def __iter__(self):
+        for path, _, _ in self._entries():
+            yield path.nlri.formatted_nlri_str
+
+    def values(self):
+        for entry in self._entries():
+            yield self._route(entry)
+
+    def items(self):
+        for entry in self._entries():
+            yield entry[0].nlri.formatted_nlri_str, self._route(entry)
+
+    def paths(self):
+        """Yields (path, filtered) tuples without building route objects."""
+        for path, filtered, _ in self._entries():
+            yield path, filtered
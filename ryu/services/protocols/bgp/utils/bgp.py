@@ -17,12 +17,16 @@
  Utilities related to bgp data types and models.
 """
 import logging
+import struct
+from collections import namedtuple
+from collections import OrderedDict
 
 import netaddr
 
 from ryu.lib import ip
 from ryu.lib.packet.bgp import (
     BGPUpdate,
+    BGP_MSG_UPDATE,
     RF_IPv4_UC,
     RF_IPv6_UC,
     RF_IPv4_VPN,
@@ -36,6 +40,8 @@ from ryu.lib.packet.bgp import (
     RF_RTC_UC,
     RouteTargetMembershipNLRI,
     BGP_ATTR_TYPE_MULTI_EXIT_DISC,
+    BGP_ATTR_TYPE_MP_REACH_NLRI,
+    BGP_ATTR_TYPE_MP_UNREACH_NLRI,
     BGPPathAttributeMultiExitDisc,
     BGPPathAttributeMpUnreachNLRI,
     BGPPathAttributeAs4Path,
@@ -43,6 +49,7 @@ from ryu.lib.packet.bgp import (
     BGPPathAttributeUnknown,
     BGP_ATTR_FLAG_OPTIONAL,
     BGP_ATTR_FLAG_TRANSITIVE,
+    BGP_ATTR_FLAG_EXTENDED_LENGTH,
     BGPTwoOctetAsSpecificExtendedCommunity,
     BGPIPv4AddressSpecificExtendedCommunity,
     BGPFourOctetAsSpecificExtendedCommunity,
@@ -168,6 +175,158 @@ def create_end_of_rib_update():
 UPDATE_EOR = create_end_of_rib_update()
 
 
+# An UPDATE message split into its packing key and its serialized
+# prefixes.  The key is made of the kind of the prefixes ('nlri',
+# 'withdrawn', 'mp_reach' or 'mp_unreach'), of the MP_REACH_NLRI or
+# MP_UNREACH_NLRI attribute without the prefixes, and of the serialized
+# path attributes before and after it.
+EncodedUpdate = namedtuple('EncodedUpdate', ['key', 'prefixes'])
+
+_BGP_MARKER = b'\xff' * 16
+_BGP_HEADER = struct.Struct('!16sHB')
+_UINT16 = struct.Struct('!H')
+
+
+def encode_update(update):
+    """Returns the EncodedUpdate of the given `update` message.
+
+    UPDATE messages with the same key can be packed together by
+    `UpdatePacker`.
+    """
+    if update.nlri:
+        kind, prefixes = 'nlri', update.nlri
+    else:
+        kind, prefixes = 'withdrawn', update.withdrawn_routes
+    mp_head = b''
+    before = bytearray()
+    after = bytearray()
+    attrs = before
+    for attr in update.path_attributes:
+        if attr.type == BGP_ATTR_TYPE_MP_REACH_NLRI:
+            kind, prefixes = 'mp_reach', attr.nlri
+            next_hop = bytes(attr.serialize_next_hop())
+            mp_head = struct.pack('!HBB', attr.afi, attr.safi,
+                                  len(next_hop)) + next_hop + b'\0'
+            attrs = after
+        elif attr.type == BGP_ATTR_TYPE_MP_UNREACH_NLRI:
+            kind, prefixes = 'mp_unreach', attr.withdrawn_routes
+            mp_head = struct.pack('!HB', attr.afi, attr.safi)
+            attrs = after
+        else:
+            attrs += attr.serialize()
+    return EncodedUpdate((kind, mp_head, bytes(before), bytes(after)),
+                         [bytes(p.serialize()) for p in prefixes])
+
+
+class PackedUpdate(object):
+    """Serialized UPDATE message returned by `UpdatePacker`.
+
+    It can be sent as any other BGP message.
+    """
+    type = BGP_MSG_UPDATE
+
+    def __init__(self, buf, prefix_count):
+        self.buf = buf
+        # Number of prefixes advertised or withdrawn by this message.
+        self.prefix_count = prefix_count
+
+    def serialize(self):
+        return self.buf
+
+    def __str__(self):
+        return 'PackedUpdate(length: %d, prefix_count: %d)' % (
+            len(self.buf), self.prefix_count)
+
+
+def _packed_length(key):
+    # Length of the UPDATE message of the given key without prefixes.
+    kind, mp_head, before, after = key
+    length = _BGP_HEADER.size + 4 + len(before) + len(after)
+    if mp_head:
+        # Attribute header with extended length.
+        length += 4 + len(mp_head)
+    return length
+
+
+def _pack_update(key, prefixes):
+    kind, mp_head, before, after = key
+    prefix_bin = b''.join(prefixes)
+    if kind == 'nlri':
+        body = (b'\0\0' + _UINT16.pack(len(before)) + before + prefix_bin)
+    elif kind == 'withdrawn':
+        body = (_UINT16.pack(len(prefix_bin)) + prefix_bin +
+                _UINT16.pack(len(before)) + before)
+    else:
+        if kind == 'mp_reach':
+            attr_type = BGP_ATTR_TYPE_MP_REACH_NLRI
+        else:
+            attr_type = BGP_ATTR_TYPE_MP_UNREACH_NLRI
+        value = mp_head + prefix_bin
+        if len(value) > 255:
+            attr = struct.pack('!BBH', BGP_ATTR_FLAG_OPTIONAL |
+                               BGP_ATTR_FLAG_EXTENDED_LENGTH,
+                               attr_type, len(value))
+        else:
+            attr = struct.pack('!BBB', BGP_ATTR_FLAG_OPTIONAL,
+                               attr_type, len(value))
+        attrs = before + attr + value + after
+        body = b'\0\0' + _UINT16.pack(len(attrs)) + attrs
+    buf = _BGP_HEADER.pack(_BGP_MARKER, _BGP_HEADER.size + len(body),
+                           BGP_MSG_UPDATE) + body
+    return PackedUpdate(buf, len(prefixes))
+
+
+class UpdatePacker(object):
+    """Packs the prefixes of UPDATE messages with the same path attributes
+    into as few UPDATE messages as possible.
+
+    UPDATE messages (BGPUpdate or EncodedUpdate) are added one by one with
+    `add` and the resulting PackedUpdate messages are returned by `add`
+    when no more prefixes fit into them, or by `flush`.  The prefixes
+    are advertised or withdrawn either by NLRI/Withdrawn Routes fields
+    or by MP_REACH_NLRI/MP_UNREACH_NLRI attribute.  As the messages are
+    built from the serialized prefixes and path attributes, an
+    EncodedUpdate can be packed for several peers at no extra cost.
+
+    Parameters:
+        - `max_len`: (int) maximum length of BGP messages.
+    """
+
+    def __init__(self, max_len):
+        self.max_len = max_len
+        # Packing key -> [list of prefixes, message length]
+        self._groups = OrderedDict()
+
+    def add(self, update):
+        """Adds the given `update` and returns the list of UPDATE messages
+        which are ready to send.
+        """
+        if not isinstance(update, EncodedUpdate):
+            update = encode_update(update)
+        key, prefixes = update
+        length = sum(len(p) for p in prefixes)
+        ready = []
+        group = self._groups.get(key)
+        if group is not None:
+            if group[1] + length <= self.max_len:
+                group[0].extend(prefixes)
+                group[1] += length
+                return ready
+            ready.append(_pack_update(key, group[0]))
+            del self._groups[key]
+        self._groups[key] = [list(prefixes), _packed_length(key) + length]
+        return ready
+
+    def flush(self):
+        """Returns the list of all UPDATE messages added and not yet
+        returned.
+        """
+        ready = [_pack_update(key, group[0])
+                 for key, group in self._groups.items()]
+        self._groups.clear()
+        return ready
+
+
 def create_rt_extended_community(value, subtype=2):
     """
     Creates an instance of the BGP Route Target Community (if "subtype=2")
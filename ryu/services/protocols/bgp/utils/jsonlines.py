@@ -0,0 +1,47 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ Streaming JSON Lines (http://jsonlines.org/) encoder, used to dump
+ large RIBs without building the whole JSON document in memory.
+"""
+
+import json
+
+from ryu.lib import hub
+
+# Number of lines encoded per chunk.
+DEFAULT_LINES_PER_CHUNK = 256
+
+
+def encode_json_lines(items, lines_per_chunk=DEFAULT_LINES_PER_CHUNK):
+    """Encodes the items of iterable *items* as JSON Lines.
+
+    Yields strings of up to *lines_per_chunk* lines each, and lets the
+    other green threads run between chunks so that a large dump does not
+    block the hub.
+    """
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    lines = []
+    for item in items:
+        lines.append(encode(item))
+        if len(lines) >= lines_per_chunk:
+            lines.append('')
+            yield '\n'.join(lines)
+            lines = []
+            hub.sleep(0)
+    if lines:
+        lines.append('')
+        yield '\n'.join(lines)
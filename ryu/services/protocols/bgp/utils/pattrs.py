@@ -0,0 +1,144 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ Interning of path attributes.
+
+ Routes learned from peers mostly share a handful of distinct AS_PATH,
+ COMMUNITIES, NEXT_HOP, ... attributes.  Instead of every Path keeping its
+ own map of attribute objects, the attributes of a received UPDATE are
+ hash-consed into an immutable PathAttrSet which all the Paths sharing
+ the same attributes reference.
+
+ The pool only holds weak references, so an attribute (set) is released
+ as soon as the last Path referencing it is gone.
+"""
+
+import weakref
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_MP_REACH_NLRI
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_MP_UNREACH_NLRI
+
+# These attributes carry the NLRIs of an UPDATE rather than the attributes
+# of a route, so they are never part of an interned set.
+_NLRI_ATTR_TYPES = (BGP_ATTR_TYPE_MP_REACH_NLRI,
+                    BGP_ATTR_TYPE_MP_UNREACH_NLRI)
+
+
+class PathAttrSet(Mapping):
+    """Immutable map of attribute type to path attribute.
+
+    Instances are created by PathAttrPool; do not modify the attributes
+    they contain, they are shared among many paths.
+    """
+    __slots__ = ('_attrs', '_hash', '__weakref__')
+
+    def __init__(self, attrs):
+        self._attrs = dict(attrs)
+        self._hash = hash(tuple(id(attr) for _, attr in attrs))
+
+    def __getitem__(self, attr_type):
+        return self._attrs[attr_type]
+
+    def __iter__(self):
+        return iter(self._attrs)
+
+    def __len__(self):
+        return len(self._attrs)
+
+    def __contains__(self, attr_type):
+        return attr_type in self._attrs
+
+    def get(self, attr_type, default=None):
+        return self._attrs.get(attr_type, default)
+
+    def __eq__(self, other):
+        if isinstance(other, PathAttrSet):
+            return self is other or self._attrs == other._attrs
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return repr(self._attrs)
+
+
+class PathAttrPool(object):
+    """Pool of interned path attributes and path attribute sets.
+
+    Attributes are identified by their type and wire format, so equal
+    attributes received from different peers (or UPDATEs) end up as
+    a single object, and so do equal sets of attributes.
+    """
+
+    def __init__(self):
+        self._attrs = weakref.WeakValueDictionary()
+        self._sets = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self._sets)
+
+    @property
+    def attr_count(self):
+        return len(self._attrs)
+
+    def intern_attr(self, attr):
+        """Returns the interned path attribute equal to *attr*."""
+        key = (attr.type, bytes(attr.serialize()))
+        interned = self._attrs.get(key)
+        if interned is None:
+            self._attrs[key] = interned = attr
+        return interned
+
+    def intern(self, pattrs):
+        """Returns the interned PathAttrSet for the map of attribute type
+        to path attribute *pattrs*.
+
+        MP_REACH_NLRI and MP_UNREACH_NLRI attributes are left out.
+        """
+        if isinstance(pattrs, PathAttrSet):
+            return pattrs
+
+        attrs = [(attr_type, self.intern_attr(attr))
+                 for attr_type, attr in sorted(pattrs.items(),
+                                               key=lambda item: item[0])
+                 if attr_type not in _NLRI_ATTR_TYPES]
+        key = tuple(id(attr) for _, attr in attrs)
+        interned = self._sets.get(key)
+        if interned is None:
+            # The set keeps its attributes alive, so their ids are not
+            # reused as long as the key is in the pool.
+            self._sets[key] = interned = PathAttrSet(attrs)
+        return interned
+
+
+_POOL = PathAttrPool()
+
+
+def intern_pattrs(pattrs):
+    """Interns *pattrs* into the pool shared by all BGP speakers.
+
+    See PathAttrPool.intern.
+    """
+    return _POOL.intern(pattrs)
@@ -0,0 +1,277 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ Compressed binary radix (Patricia) tree of IP prefixes.
+
+ Used to index the destinations of IP and VPN tables so that longest
+ prefix match, covering (less specific) and covered (more specific) prefix
+ queries take time proportional to the prefix length instead of a scan
+ of the whole table.
+"""
+
+from ryu.lib import ip
+
+
+class _Node(object):
+    __slots__ = ('key', 'length', 'value', 'has_value', 'children')
+
+    def __init__(self, key, length):
+        self.key = key
+        self.length = length
+        self.value = None
+        self.has_value = False
+        self.children = [None, None]
+
+
+class RadixTree(object):
+    """Map of IP prefix to value with longest prefix match.
+
+    *bits* is the address length, 32 for IPv4 and 128 for IPv6.
+    Prefixes are given as 'address/length' strings and addresses as
+    'address' strings (a bare address is treated as a host prefix).
+    Iteration is in address order, a prefix coming before the more
+    specific prefixes it covers.
+    """
+
+    def __init__(self, bits):
+        if bits == 32:
+            self._to_int, self._to_str = ip.ipv4_to_int, ip.ipv4_to_str
+        elif bits == 128:
+            self._to_int, self._to_str = ip.ipv6_to_int, ip.ipv6_to_str
+        else:
+            raise ValueError('Invalid address length: %s' % bits)
+        self.bits = bits
+        self._root = _Node(0, 0)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, prefix):
+        return self._find(*self._parse(prefix)) is not None
+
+    def _parse(self, prefix):
+        addr, _, length = prefix.partition('/')
+        length = int(length) if length else self.bits
+        if not 0 <= length <= self.bits:
+            raise ValueError('Invalid prefix length: %s' % prefix)
+        try:
+            key = self._to_int(addr)
+        except Exception:
+            raise ValueError('Invalid prefix: %s' % prefix)
+        return self._mask(key, length), length
+
+    def _mask(self, key, length):
+        shift = self.bits - length
+        return (key >> shift) << shift
+
+    def _bit(self, key, pos):
+        return (key >> (self.bits - 1 - pos)) & 1
+
+    def _common_len(self, key1, key2, length):
+        diff = key1 ^ key2
+        if not diff:
+            return length
+        return min(self.bits - diff.bit_length(), length)
+
+    def _matches(self, node, key):
+        # True if *key* falls within the prefix of *node*.
+        return self._common_len(node.key, key, node.length) == node.length
+
+    def _find(self, key, length):
+        node = self._root
+        while node is not None and node.length < length:
+            node = node.children[self._bit(key, node.length)]
+        if (node is not None and node.length == length and
+                node.key == key and node.has_value):
+            return node
+        return None
+
+    def _walk(self, node, start_after=None, inclusive=False):
+        # Pre-order traversal: a prefix, then the lower half of the
+        # prefixes it covers, then the upper half.  This is the order of
+        # (address, length), so the subtrees which are before *start_after*
+        # can be skipped altogether.
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if start_after is not None:
+                last = node.key | ((1 << (self.bits - node.length)) - 1)
+                if last < start_after[0]:
+                    continue
+                position = (node.key, node.length)
+                if node.has_value and (
+                        position > start_after or
+                        (inclusive and position == start_after)):
+                    yield node
+            elif node.has_value:
+                yield node
+            for child in reversed(node.children):
+                if child is not None:
+                    stack.append(child)
+
+    def _format(self, node):
+        return '%s/%d' % (self._to_str(node.key), node.length)
+
+    def normalize(self, prefix):
+        """Returns *prefix* as it is stored in the tree, i.e. with the
+        host bits of the address cleared.
+        """
+        key, length = self._parse(prefix)
+        return '%s/%d' % (self._to_str(key), length)
+
+    def get(self, prefix, default=None):
+        node = self._find(*self._parse(prefix))
+        if node is None:
+            return default
+        return node.value
+
+    def __getitem__(self, prefix):
+        node = self._find(*self._parse(prefix))
+        if node is None:
+            raise KeyError(prefix)
+        return node.value
+
+    def __setitem__(self, prefix, value):
+        key, length = self._parse(prefix)
+        node = self._root
+        while True:
+            if node.length == length:
+                break
+            bit = self._bit(key, node.length)
+            child = node.children[bit]
+            if child is None:
+                child = node.children[bit] = _Node(key, length)
+                node = child
+                break
+            common = self._common_len(key, child.key,
+                                      min(length, child.length))
+            if common == child.length:
+                node = child
+                continue
+            # Insert a new node between node and child, holding either
+            # the new prefix or the common part of both prefixes.
+            glue = _Node(self._mask(key, common), common)
+            node.children[bit] = glue
+            glue.children[self._bit(child.key, common)] = child
+            if common == length:
+                node = glue
+            else:
+                node = glue.children[self._bit(key, common)] = \
+                    _Node(key, length)
+            break
+        if not node.has_value:
+            node.has_value = True
+            self._count += 1
+        node.value = value
+
+    def __delitem__(self, prefix):
+        key, length = self._parse(prefix)
+        path = [self._root]
+        node = self._root
+        while node.length < length:
+            node = node.children[self._bit(key, node.length)]
+            if node is None:
+                raise KeyError(prefix)
+            path.append(node)
+        if node.length != length or node.key != key or not node.has_value:
+            raise KeyError(prefix)
+
+        node.value = None
+        node.has_value = False
+        self._count -= 1
+
+        # Remove the nodes which no longer hold a prefix nor branch.
+        while len(path) > 1:
+            node = path.pop()
+            parent = path[-1]
+            if node.has_value:
+                break
+            children = [c for c in node.children if c is not None]
+            if len(children) == 2:
+                break
+            index = parent.children.index(node)
+            parent.children[index] = children[0] if children else None
+
+    def pop(self, prefix, default=None):
+        try:
+            value = self[prefix]
+        except KeyError:
+            return default
+        del self[prefix]
+        return value
+
+    def items(self, start_after=None, inclusive=False):
+        """Yields (prefix, value) tuples in address order.
+
+        If *start_after* is given, only the prefixes after it are
+        yielded, so that a walk can be resumed from the last prefix seen.
+        If *inclusive* is True, *start_after* itself is yielded too.
+        """
+        if start_after is not None:
+            start_after = self._parse(start_after)
+        for node in self._walk(self._root, start_after, inclusive):
+            yield self._format(node), node.value
+
+    def values(self, start_after=None, inclusive=False):
+        """Yields values in address order.  See items()."""
+        if start_after is not None:
+            start_after = self._parse(start_after)
+        for node in self._walk(self._root, start_after, inclusive):
+            yield node.value
+
+    def __iter__(self):
+        for node in self._walk(self._root):
+            yield self._format(node)
+
+    def covering(self, prefix):
+        """Yields (prefix, value) tuples for *prefix* and all the less
+        specific prefixes covering it, from the most specific one.
+        """
+        key, length = self._parse(prefix)
+        found = []
+        node = self._root
+        while (node is not None and node.length <= length and
+               self._matches(node, key)):
+            if node.has_value:
+                found.append(node)
+            if node.length == length:
+                break
+            node = node.children[self._bit(key, node.length)]
+        for node in reversed(found):
+            yield self._format(node), node.value
+
+    def covered(self, prefix, start_after=None, inclusive=False):
+        """Yields (prefix, value) tuples for *prefix* and all the more
+        specific prefixes it covers, in address order.  See items() for
+        *start_after* and *inclusive*.
+        """
+        if start_after is not None:
+            start_after = self._parse(start_after)
+        key, length = self._parse(prefix)
+        node = self._root
+        while node is not None and node.length < length:
+            node = node.children[self._bit(key, node.length)]
+        if node is None or self._common_len(node.key, key, length) < length:
+            return
+        for node in self._walk(node, start_after, inclusive):
+            yield self._format(node), node.value
+
+    def longest_match(self, address, default=None):
+        """Returns the value of the longest prefix matching *address*."""
+        for _, value in self.covering(address):
+            return value
+        return default
@@ -0,0 +1,69 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ Update groups of peers with the same outbound policy.
+
+ The out filters and the UPDATE message of a path only depend on the
+ path and on the outbound policy of the peer it is sent to.  Peers with
+ the same policy share an UpdateGroup, which keeps the result for the
+ recently sent paths, so that the policy is applied and the UPDATE
+ message built and serialized once for all the members.
+"""
+
+import weakref
+from collections import OrderedDict
+
+# Default number of paths whose result is kept by an update group.
+UPDATE_GROUP_CACHE_SIZE = 16384
+
+
+class UpdateGroup(object):
+    """Group of the peers whose outbound policy is given by *key*.
+
+    The results of the last *cache_size* encoded paths are kept.
+    """
+
+    def __init__(self, key, cache_size=UPDATE_GROUP_CACHE_SIZE):
+        self.key = key
+        self.cache_size = cache_size
+        self.members = weakref.WeakSet()
+        # id(path) -> (path, result)
+        self._cache = OrderedDict()
+
+    def encode(self, path, encoder):
+        """Returns ``encoder(path)``, calling *encoder* only if the result
+        for *path* is not known yet.
+        """
+        entry = self._cache.get(id(path))
+        # The path is referenced by the entry, so its id can not be reused
+        # while the entry is cached.
+        if entry is not None and entry[0] is path:
+            return entry[1]
+        result = encoder(path)
+        self._cache[id(path)] = (path, result)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __str__(self):
+        return 'UpdateGroup(members: %d, cached paths: %d)' % (
+            len(self.members), len(self._cache))
@@ -0,0 +1,137 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the generic BGP parser with ryu.lib.packet.bgp_fastpath.
+
+The BGP UPDATE messages of the BGP4MP records of MRT dumps (plain or
+bzip2 compressed) are decoded by both parsers and the time taken by
+each is reported.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bgp_update_decode \\
+        --repeat 5 ryu/tests/packet_data/mrt/updates.20161101.0000.bz2
+"""
+
+from __future__ import print_function
+
+import argparse
+import bz2
+import os
+import struct
+import time
+
+from ryu.lib.packet import bgp
+from ryu.lib.packet import bgp_fastpath
+
+
+DEFAULT_MRT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '../packet_data/mrt/updates.20161101.0000.bz2')
+
+_MRT_HEADER = struct.Struct('!IHHI')
+_MRT_TYPE_BGP4MP = 16
+_MRT_TYPE_BGP4MP_ET = 17
+_BGP4MP_MESSAGE = 1
+_BGP4MP_MESSAGE_AS4 = 4
+_BGP_HEADER = struct.Struct('!16sHB')
+
+
+def read_updates(path):
+    """Returns a list of (message, as4) tuples for the BGP UPDATE messages
+    of the BGP4MP MESSAGE(_AS4) records of the MRT dump *path*.
+    """
+    opener = bz2.BZ2File if path.endswith('.bz2') else open
+    with opener(path, 'rb') as f:
+        data = f.read()
+
+    updates = []
+    offset = 0
+    while offset + _MRT_HEADER.size <= len(data):
+        _, mrt_type, subtype, length = _MRT_HEADER.unpack_from(data, offset)
+        offset += _MRT_HEADER.size
+        body = data[offset:offset + length]
+        offset += length
+        if mrt_type == _MRT_TYPE_BGP4MP_ET:
+            body = body[4:]  # microsecond timestamp
+        elif mrt_type != _MRT_TYPE_BGP4MP:
+            continue
+        if subtype == _BGP4MP_MESSAGE_AS4:
+            as4 = True
+            pos = 8
+        elif subtype == _BGP4MP_MESSAGE:
+            as4 = False
+            pos = 4
+        else:
+            continue
+        # Skips the interface index, AFI and the peer/local addresses.
+        afi, = struct.unpack_from('!H', body, pos + 2)
+        pos += 4 + (8 if afi == 1 else 32)
+        _, msg_len, msg_type = _BGP_HEADER.unpack_from(body, pos)
+        if msg_type == bgp.BGP_MSG_UPDATE:
+            updates.append((body[pos:pos + msg_len], as4))
+    return updates
+
+
+def _generic(buf, as4):
+    # The generic parser always decodes 4 octets AS numbers in AS_PATH.
+    return bgp.BGPMessage.parser(buf)
+
+
+def _fast(buf, as4):
+    return bgp_fastpath.parse_update(buf, as4)
+
+
+def bench(decoder, updates, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for buf, as4 in updates:
+            decoder(buf, as4)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the generic and the fast path BGP UPDATE '
+                    'decoders.')
+    parser.add_argument('files', nargs='*', default=[DEFAULT_MRT_FILE],
+                        help='MRT dumps with BGP4MP records')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of runs, the best one is reported')
+    args = parser.parse_args()
+
+    updates = []
+    for path in args.files:
+        updates.extend(read_updates(path))
+    fallback = sum(1 for buf, as4 in updates
+                   if bgp_fastpath.parse_update(buf, as4).msg is not None)
+    print('%d UPDATE messages, %d decoded by the generic parser' % (
+        len(updates), fallback))
+
+    results = []
+    for name, decoder in (('generic', _generic), ('fastpath', _fast)):
+        elapsed = bench(decoder, updates, args.repeat)
+        results.append(elapsed)
+        print('%-10s %.3f s, %d messages/s' % (
+            name, elapsed, len(updates) / elapsed))
+    print('speedup    %.1fx' % (results[0] / results[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares ryu.lib.packet.packet_utils.checksum with the previous
+implementation, summing an array of native 16-bit words, and the
+incremental update of a checksum with its full computation.
+
+Usage::
+
+    python -m ryu.tests.benchmark.checksum --number 20000
+"""
+
+from __future__ import print_function
+
+import argparse
+import array
+import os
+import socket
+import timeit
+
+import six
+
+from ryu.lib.packet import packet_utils
+
+
+DEFAULT_SIZES = [20, 64, 576, 1500, 9000]
+
+
+def array_checksum(data):
+    data = six.binary_type(data)    # input can be bytearray.
+    if len(data) % 2:
+        data += b'\x00'
+
+    s = sum(array.array('H', data))
+    s = (s & 0xffff) + (s >> 16)
+    s += (s >> 16)
+    return socket.ntohs(~s & 0xffff)
+
+
+def bench(func, number):
+    # Best of 3, in microseconds per call.
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the Internet checksum implementations.')
+    parser.add_argument('sizes', nargs='*', type=int, default=DEFAULT_SIZES,
+                        help='data sizes in bytes')
+    parser.add_argument('--number', type=int, default=20000,
+                        help='number of calls per run')
+    args = parser.parse_args()
+
+    print('%6s %10s %10s %8s' % ('bytes', 'array us', 'new us', 'speedup'))
+    for size in args.sizes:
+        data = os.urandom(size)
+        assert array_checksum(data) == packet_utils.checksum(data)
+        old = bench(lambda: array_checksum(data), args.number)
+        new = bench(lambda: packet_utils.checksum(data), args.number)
+        print('%6d %10.2f %10.2f %7.1fx' % (size, old, new, old / new))
+
+    # Rewrite of the TTL and protocol of an IPv4 header and of an address
+    # covered by the checksum of a TCP segment.
+    for name, size, old_bytes, new_bytes in (
+            ('IPv4 TTL', 20, b'\x40\x11', b'\x3f\x11'),
+            ('TCP address', 1500, b'\xc0\x00\x02\x01', b'\xc6\x33\x64\x01')):
+        data = os.urandom(size)
+        csum = packet_utils.checksum(data)
+        full = bench(lambda: packet_utils.checksum(data), args.number)
+        incremental = bench(
+            lambda: packet_utils.checksum_update(csum, old_bytes, new_bytes),
+            args.number)
+        print('%-12s full %.2f us, incremental %.2f us' % (
+            name, full, incremental))
+
+
+if __name__ == '__main__':
+    main()
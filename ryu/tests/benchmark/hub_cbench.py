@@ -0,0 +1,218 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the hub backends under cbench style load.
+
+For each hub type, ryu-manager is started with ryu.app.cbench and a
+number of emulated OpenFlow 1.0 switches send packet-in messages to it,
+counting the flow-mod responses like "cbench" does.  In the throughput
+mode each switch keeps a window of outstanding packet-ins, in the latency
+mode only one.
+
+Usage::
+
+    python -m ryu.tests.benchmark.hub_cbench \\
+        --hubs eventlet,asyncio --switches 16 --duration 10
+"""
+
+import argparse
+import os
+import selectors
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+
+OFP_VERSION = 0x01
+OFPT_HELLO = 0
+OFPT_ECHO_REQUEST = 2
+OFPT_ECHO_REPLY = 3
+OFPT_FEATURES_REQUEST = 5
+OFPT_FEATURES_REPLY = 6
+OFPT_PACKET_IN = 10
+OFPT_FLOW_MOD = 14
+
+_HEADER = struct.Struct('!BBHI')
+
+
+def _msg(msg_type, body=b'', xid=0):
+    return _HEADER.pack(OFP_VERSION, msg_type, _HEADER.size + len(body),
+                        xid) + body
+
+
+def _packet_in(dpid, seq):
+    src = struct.pack('!HI', dpid & 0xffff, seq & 0xffffffff)
+    frame = (b'\x80\x00\x00\x00\x00\x01' + src + b'\x08\x00' +
+             b'\x00' * 46)
+    body = struct.pack('!IHHBx', 0xffffffff, len(frame), 1, 0) + frame
+    return _msg(OFPT_PACKET_IN, body, seq & 0xffffffff)
+
+
+class _Switch(object):
+    def __init__(self, dpid, addr, window):
+        self.dpid = dpid
+        self.window = window
+        self.sock = socket.create_connection(addr)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(False)
+        self.buf = b''
+        self.ready = False
+        self.seq = 0
+        self.responses = 0
+        self.outbuf = _msg(OFPT_HELLO)
+
+    def _send_packet_ins(self, count):
+        pkts = []
+        for _ in range(count):
+            self.seq += 1
+            pkts.append(_packet_in(self.dpid, self.seq))
+        self.outbuf += b''.join(pkts)
+
+    def on_read(self):
+        data = self.sock.recv(65536)
+        if not data:
+            raise EOFError('connection closed by the controller')
+        buf = self.buf + data
+        offset = 0
+        flow_mods = 0
+        while len(buf) - offset >= _HEADER.size:
+            _, msg_type, msg_len, xid = _HEADER.unpack_from(buf, offset)
+            if len(buf) - offset < msg_len:
+                break
+            if msg_type == OFPT_FLOW_MOD:
+                flow_mods += 1
+            elif msg_type == OFPT_FEATURES_REQUEST:
+                body = struct.pack('!QIB3xII', self.dpid, 256, 1, 0, 0)
+                self.outbuf += _msg(OFPT_FEATURES_REPLY, body, xid)
+            elif msg_type == OFPT_ECHO_REQUEST:
+                self.outbuf += _msg(OFPT_ECHO_REPLY,
+                                    buf[offset + _HEADER.size:
+                                        offset + msg_len], xid)
+            offset += msg_len
+        self.buf = buf[offset:]
+        if flow_mods:
+            self.responses += flow_mods
+            if self.ready:
+                self._send_packet_ins(flow_mods)
+
+    def start(self):
+        self.ready = True
+        self._send_packet_ins(self.window)
+
+    def flush(self):
+        if self.outbuf:
+            sent = self.sock.send(self.outbuf)
+            self.outbuf = self.outbuf[sent:]
+
+
+def _wait_port(addr, proc, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('ryu-manager exited with %d' % proc.returncode)
+        try:
+            socket.create_connection(addr).close()
+            return
+        except socket.error:
+            time.sleep(0.1)
+    raise RuntimeError('ryu-manager did not start listening')
+
+
+def run(hub_type, switches, window, duration, warmup, port):
+    env = dict(os.environ, RYU_HUB_TYPE=hub_type)
+    cmd = [sys.executable, '-m', 'ryu.cmd.manager',
+           '--ofp-tcp-listen-port', str(port), 'ryu.app.cbench']
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+    try:
+        addr = ('127.0.0.1', port)
+        _wait_port(addr, proc)
+        sel = selectors.DefaultSelector()
+        sws = [_Switch(dpid, addr, window)
+               for dpid in range(1, switches + 1)]
+        for sw in sws:
+            sel.register(sw.sock, selectors.EVENT_READ, sw)
+
+        # Let the controller complete the handshakes before the load.
+        start = time.time()
+        while time.time() - start < 1:
+            for key, _ in sel.select(0.01):
+                key.data.on_read()
+            for sw in sws:
+                sw.flush()
+        for sw in sws:
+            sw.start()
+
+        results = []
+        start = time.time()
+        mark = start + warmup
+        counted = 0
+        while True:
+            for key, _ in sel.select(0.01):
+                key.data.on_read()
+            for sw in sws:
+                sw.flush()
+            now = time.time()
+            if now >= mark:
+                total = sum(sw.responses for sw in sws)
+                if mark > start + warmup:
+                    results.append(total - counted)
+                counted = total
+                if len(results) == duration:
+                    break
+                mark += 1
+        for sw in sws:
+            sw.sock.close()
+        return results
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare hub backends under cbench style load.')
+    parser.add_argument('--hubs', default='eventlet,asyncio',
+                        help='comma separated hub types to compare')
+    parser.add_argument('--switches', type=int, default=16,
+                        help='number of emulated switches')
+    parser.add_argument('--duration', type=int, default=10,
+                        help='number of one second measurements')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='seconds to ignore at the beginning')
+    parser.add_argument('--mode', choices=('throughput', 'latency'),
+                        default='throughput')
+    parser.add_argument('--window', type=int, default=64,
+                        help='outstanding packet-ins per switch '
+                             'in the throughput mode')
+    parser.add_argument('--port', type=int, default=16653)
+    args = parser.parse_args()
+
+    window = args.window if args.mode == 'throughput' else 1
+    print('%s mode, %d switches, %d x 1s' % (args.mode, args.switches,
+                                             args.duration))
+    for hub_type in args.hubs.split(','):
+        results = run(hub_type, args.switches, window, args.duration,
+                      args.warmup, args.port)
+        print('%-10s min/max/avg: %d/%d/%.2f responses/s' % (
+            hub_type, min(results), max(results),
+            float(sum(results)) / len(results)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from nose.tools import eq_
+
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller import handler
+
+
+class EventTest(event.EventBase):
+    pass
+
+
+class _App(app_manager.RyuApp):
+    def __init__(self, name):
+        super(_App, self).__init__()
+        self.name = name
+        self.received = []
+
+    def dispatch(self):
+        # Runs the handlers of the queued events without the event thread.
+        self.is_active = False
+        self._event_loop()
+        self.is_active = True
+
+
+class Test_HandlerCache(unittest.TestCase):
+    """Test the caches of RyuApp.get_handlers() and get_observers()
+    """
+
+    def setUp(self):
+        self.source = _App('test_source')
+        self.observer = _App('test_observer')
+        for app in (self.source, self.observer):
+            app_manager.register_app(app)
+
+    def tearDown(self):
+        for name in ('test_source', 'test_observer'):
+            app_manager.SERVICE_BRICKS.pop(name, None)
+
+    def _send(self, state=handler.MAIN_DISPATCHER):
+        ev = EventTest()
+        self.source.send_event_to_observers(ev, state)
+        self.observer.dispatch()
+        return ev
+
+    def _handler(self, ev):
+        self.observer.received.append(ev)
+
+    def test_register_observer(self):
+        self.observer.register_handler(EventTest, self._handler)
+        self._send()
+        eq_([], self.observer.received)
+
+        self.source.register_observer(EventTest, 'test_observer',
+                                      set([handler.MAIN_DISPATCHER]))
+        ev = self._send()
+        eq_([ev], self.observer.received)
+
+        # An observer of another state does not receive the event.
+        self._send(handler.CONFIG_DISPATCHER)
+        eq_([ev], self.observer.received)
+
+        self.source.unregister_observer(EventTest, 'test_observer')
+        self._send()
+        eq_([ev], self.observer.received)
+
+    def test_register_handler(self):
+        self.source.register_observer(EventTest, 'test_observer')
+        self._send()
+        eq_([], self.observer.received)
+
+        @handler.set_ev_cls(EventTest, handler.MAIN_DISPATCHER)
+        def _handler(ev):
+            self.observer.received.append(ev)
+
+        self.observer.register_handler(EventTest, _handler)
+        ev = self._send()
+        eq_([ev], self.observer.received)
+
+        # The handler is not called in a state it does not declare.
+        self._send(handler.CONFIG_DISPATCHER)
+        eq_([ev], self.observer.received)
+
+        self.observer.unregister_handler(EventTest, _handler)
+        self._send()
+        eq_([ev], self.observer.received)
+
+    def test_uninstantiate(self):
+        app_mgr = app_manager.AppManager()
+        app_mgr.applications['test_observer'] = self.observer
+        self.source.register_observer(EventTest, 'test_observer')
+        self.observer.register_handler(EventTest, self._handler)
+        ev = self._send()
+        eq_([ev], self.observer.received)
+        eq_(['test_observer'],
+            self.source.get_observers(ev, handler.MAIN_DISPATCHER))
+
+        app_mgr.uninstantiate('test_observer')
+        eq_([], self.source.get_observers(ev, handler.MAIN_DISPATCHER))
+
+        # The app registered again under the same name is not observing.
+        app_manager.register_app(_App('test_observer'))
+        eq_([], self.source.get_observers(ev, handler.MAIN_DISPATCHER))
@@ -19,13 +19,6 @@ import unittest
 import mock
 from nose.tools import eq_, raises
 
-try:
-    # Python 3
-    from imp import reload
-except ImportError:
-    # Python 2
-    pass
-
 from ryu.cmd.manager import main
 
 
@@ -54,13 +47,17 @@ class Test_Manager(unittest.TestCase):
 
     @staticmethod
     def _reset_globals():
-        # hack to reset globals like SERVICE_BRICKS.
+        # Resets globals like SERVICE_BRICKS in place, as reloading the
+        # modules would leave the RyuApp subclasses imported by the other
+        # tests derived from a stale RyuApp.
         # assumption: this is the only test which actually starts RyuApp.
-        import ryu.base.app_manager
-        import ryu.ofproto.ofproto_protocol
+        from ryu.base import app_manager
+        from ryu.ofproto import ofproto_protocol
 
-        reload(ryu.base.app_manager)
-        reload(ryu.ofproto.ofproto_protocol)
+        app_manager.SERVICE_BRICKS.clear()
+        app_manager.AppManager._instance = None
+        ofproto_protocol._supported_versions = set(
+            ofproto_protocol._versions.keys())
 
     @mock.patch('sys.argv', new=['ryu-manager', '--verbose',
                                  'ryu.tests.unit.cmd.dummy_app'])
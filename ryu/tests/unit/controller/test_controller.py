@@ -35,6 +35,7 @@ from ryu.base import app_manager  # To suppress cyclic import
 from ryu.controller import controller
 from ryu.controller import handler
 from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_3
 from ryu.ofproto import ofproto_v1_3_parser
 from ryu.ofproto import ofproto_v1_2_parser
 from ryu.ofproto import ofproto_v1_0_parser
@@ -76,6 +77,21 @@ class TestUtils(unittest.TestCase):
         controller._split_addr('::1:6653')
 
 
+class SocketMock(mock.MagicMock):
+    """
+    Socket mock which returns the given data split at random boundaries
+    """
+    buf = bytearray()
+    random = None
+
+    def recv_into(self, buffer, nbytes=0):
+        nbytes = nbytes or len(buffer)
+        size = min(self.random.randint(1, nbytes), len(self.buf))
+        buffer[:size] = self.buf[:size]
+        self.buf = self.buf[size:]
+        return size
+
+
 class Test_Datapath(unittest.TestCase):
     """
     Test cases for controller.Datapath
@@ -142,17 +158,6 @@ class Test_Datapath(unittest.TestCase):
             json_data_file = os.path.join(json_dir, msg + '.json')
             expected_json.append(json.load(open(json_data_file)))
 
-        # Prepare mock for socket
-        class SocketMock(mock.MagicMock):
-            buf = bytearray()
-            random = None
-
-            def recv(self, bufsize):
-                size = self.random.randint(1, bufsize)
-                out = self.buf[:size]
-                self.buf = self.buf[size:]
-                return out
-
         # Prepare mock
         ofp_brick_mock = mock.MagicMock(spec=app_manager.RyuApp)
         app_manager_mock.lookup_service_brick.return_value = ofp_brick_mock
@@ -181,6 +186,124 @@ class Test_Datapath(unittest.TestCase):
             self.assertEqual(kwargs, {})
         self.assertEqual(expected_json, output_json)
 
+    @mock.patch("ryu.base.app_manager", spec=app_manager)
+    def test_recv_loop_buffer_wrap(self, app_manager_mock):
+        # Prepare test data which is much larger than the receive buffer
+        # so that partially received messages are moved to its front.
+        this_dir = os.path.dirname(sys.modules[__name__].__file__)
+        packet_data_file = os.path.join(
+            this_dir, '../../packet_data/of13/4-4-ofp_packet_in.packet')
+        packet_data = open(packet_data_file, 'rb').read()
+        msg_count = (3 * controller._RECV_BUF_SIZE) // len(packet_data) + 1
+
+        # Prepare mock
+        ofp_brick_mock = mock.MagicMock(spec=app_manager.RyuApp)
+        app_manager_mock.lookup_service_brick.return_value = ofp_brick_mock
+        sock_mock = SocketMock()
+        sock_mock.buf = bytearray(packet_data * msg_count)
+        sock_mock.random = random.Random('Ryu SDN Framework')
+        addr_mock = mock.MagicMock()
+
+        # Prepare test target
+        dp = controller.Datapath(sock_mock, addr_mock)
+        dp.set_state(handler.MAIN_DISPATCHER)
+        ofp_brick_mock.reset_mock()
+
+        # Test
+        dp._recv_loop()
+
+        # Assert calls
+        msgs = [args[0].msg for args, _ in
+                ofp_brick_mock.send_event_to_observers.call_args_list
+                if hasattr(args[0], 'msg')]
+        eq_(msg_count, len(msgs))
+        for msg in msgs:
+            self.assertTrue(
+                isinstance(msg, ofproto_v1_3_parser.OFPPacketIn))
+            eq_(packet_data, msg.buf)
+
+    def test_send_loop_coalesce(self):
+        with mock.patch('ryu.controller.controller.Datapath.set_state'):
+            sock_mock = mock.Mock()
+            addr_mock = mock.Mock()
+            dp = controller.Datapath(sock_mock, addr_mock)
+            dp.state = handler.MAIN_DISPATCHER
+
+            bufs = [b'\x04\x00\x00\x08\x00\x00\x00%c' % i
+                    for i in range(5)]
+            for buf in bufs[:-1]:
+                dp.send(buf)
+            dp.send(bufs[-1], close_socket=True)
+
+            dp._send_loop()
+
+            sock_mock.sendall.assert_called_once_with(b''.join(bufs))
+            eq_(1, dp.send_stats['flushes'])
+            eq_(len(bufs), dp.send_stats['msgs'])
+            eq_(len(bufs), dp.send_stats['last_flush_msgs'])
+            eq_(8 * len(bufs), dp.send_stats['bytes'])
+            eq_(0, dp.send_stats['blocked'])
+            eq_(None, dp.send_q)
+
+    def _test_send_batch(self, reply_type):
+        with mock.patch('ryu.controller.controller.Datapath.set_state'):
+            sock_mock = mock.Mock()
+            addr_mock = mock.Mock()
+            dp = controller.Datapath(sock_mock, addr_mock)
+            dp.set_version(ofproto_v1_3.OFP_VERSION)
+            parser = dp.ofproto_parser
+
+            msgs = [parser.OFPFlowMod(dp, priority=i,
+                                      match=parser.OFPMatch(in_port=i))
+                    for i in range(3)]
+            future = dp.send_batch(msgs)
+
+            # All the messages and the trailing barrier are queued as
+            # one buffer.
+            eq_(1, dp.send_q.qsize())
+            buf, close_socket = dp.send_q.get()
+            eq_(set(msg.xid for msg in msgs), future.xids)
+            barrier = parser.OFPBarrierRequest(dp)
+            barrier.set_xid(future.barrier_xid)
+            barrier.serialize()
+            eq_(b''.join(msg.buf for msg in msgs) + barrier.buf, buf)
+            eq_(False, future.done())
+
+            if reply_type is None:
+                return dp, future, None
+            elif reply_type == ofproto_v1_3.OFPT_ERROR:
+                reply = parser.OFPErrorMsg(dp)
+                xid = msgs[1].xid
+            else:
+                reply = parser.OFPBarrierReply(dp)
+                xid = future.barrier_xid
+            reply.set_headers(ofproto_v1_3.OFP_VERSION, reply_type, 0, xid)
+            dp._complete_batch(reply)
+            return dp, future, reply
+
+    def test_send_batch_barrier_reply(self):
+        dp, future, reply = self._test_send_batch(
+            ofproto_v1_3.OFPT_BARRIER_REPLY)
+        eq_(True, future.wait(timeout=0))
+        eq_(True, future.succeeded())
+        eq_(reply, future.reply)
+        eq_({}, dp._barrier_futures)
+
+    def test_send_batch_error(self):
+        dp, future, reply = self._test_send_batch(ofproto_v1_3.OFPT_ERROR)
+        eq_(True, future.wait(timeout=0))
+        eq_(False, future.succeeded())
+        eq_([reply], future.errors)
+        # Still waiting for the barrier reply to collect further errors
+        eq_([future.barrier_xid], list(dp._barrier_futures))
+
+    def test_send_batch_cancel(self):
+        dp, future, _ = self._test_send_batch(None)
+        eq_(False, future.done())
+        dp._cancel_batches()
+        eq_(True, future.done())
+        eq_(False, future.succeeded())
+
 
 class TestOpenFlowController(unittest.TestCase):
     """
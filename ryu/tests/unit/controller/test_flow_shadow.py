@@ -0,0 +1,187 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import flow_shadow
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+ofp = ofproto_v1_3
+parser = ofproto_v1_3_parser
+
+
+class Test_FlowShadow(unittest.TestCase):
+    """ Test case for ryu.controller.flow_shadow
+    """
+
+    def setUp(self):
+        self.app = flow_shadow.FlowShadow()
+        self.dp = mock.Mock()
+        self.dp.id = 1
+        self.dp.ofproto = ofp
+        self.dp.ofproto_parser = parser
+        self.dp.send_msg.side_effect = lambda msg: msg.serialize()
+        self.dp.set_xid.side_effect = lambda msg: msg.set_xid(100)
+
+    def _flow_mod(self, command=ofp.OFPFC_ADD, priority=10, port=1,
+                  table_id=0, cookie=0, **kwargs):
+        actions = [parser.OFPActionOutput(port)]
+        inst = [parser.OFPInstructionActions(ofp.OFPIT_APPLY_ACTIONS,
+                                             actions)]
+        return parser.OFPFlowMod(self.dp, command=command, priority=priority,
+                                 table_id=table_id, cookie=cookie,
+                                 out_port=ofp.OFPP_ANY,
+                                 out_group=ofp.OFPG_ANY,
+                                 match=parser.OFPMatch(**kwargs),
+                                 instructions=inst)
+
+    def _stats(self, priority=10, port=1, cookie=0, **kwargs):
+        actions = [parser.OFPActionOutput(port)]
+        inst = [parser.OFPInstructionActions(ofp.OFPIT_APPLY_ACTIONS,
+                                             actions)]
+        return parser.OFPFlowStats(table_id=0, priority=priority,
+                                   idle_timeout=0, hard_timeout=0, flags=0,
+                                   cookie=cookie,
+                                   match=parser.OFPMatch(**kwargs),
+                                   instructions=inst)
+
+    def _reply(self, body, flags=0):
+        msg = parser.OFPFlowStatsReply(self.dp, body=body, flags=flags)
+        msg.xid = 100
+        self.app.flow_stats_reply_handler(
+            ofp_event.EventOFPFlowStatsReply(msg))
+
+    def test_record(self):
+        shadow = self.app
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=1))
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=2))
+        shadow.send_flow_mod(self.dp, self._flow_mod(
+            in_port=2, eth_dst='00:00:00:00:00:01'))
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=3, priority=20))
+        table = shadow.get_table(1)
+        eq_(4, len(table))
+
+        # Overwrite by add
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=1, port=5))
+        eq_(4, len(table))
+
+        # Non-strict modify applies to the entries with in_port=2
+        shadow.send_flow_mod(self.dp, self._flow_mod(
+            command=ofp.OFPFC_MODIFY, in_port=2, port=7))
+        in_port = ofp.OFPXMT_OFB_IN_PORT | (ofp.OFPXMC_OPENFLOW_BASIC << 7)
+        ports = [flow_shadow._outputs(ofp, e.instructions)[0]
+                 for e in table.values()
+                 if e.match[in_port] == (b'\x00\x00\x00\x02', None)]
+        eq_([set([7]), set([7])], ports)
+
+        # Strict delete
+        shadow.send_flow_mod(self.dp, self._flow_mod(
+            command=ofp.OFPFC_DELETE_STRICT, priority=20, in_port=3))
+        eq_(3, len(table))
+
+        # Non-strict delete of all
+        shadow.send_flow_mod(self.dp, self._flow_mod(
+            command=ofp.OFPFC_DELETE, table_id=ofp.OFPTT_ALL))
+        eq_(0, len(table))
+
+    def test_flow_removed(self):
+        self.app.send_flow_mod(self.dp, self._flow_mod(in_port=1))
+        msg = parser.OFPFlowRemoved(self.dp, priority=10, table_id=0,
+                                    match=parser.OFPMatch(in_port=1))
+        self.app.flow_removed_handler(ofp_event.EventOFPFlowRemoved(msg))
+        eq_(0, len(self.app.get_table(1)))
+
+    def _reconnect(self):
+        ev = ofp_event.EventOFPStateChange(self.dp)
+        ev.state = handler.MAIN_DISPATCHER
+        self.app.state_change_handler(ev)
+        req = self.dp.send_msg.call_args[0][0]
+        ok_(isinstance(req, parser.OFPFlowStatsRequest))
+        return req
+
+    def test_reconcile(self):
+        shadow = self.app
+        shadow.cookie = 0x100
+        shadow.cookie_mask = 0xff00
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=1, cookie=0x100))
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=2, cookie=0x101))
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=3, cookie=0x102))
+        # Out of the cookie space
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=5))
+
+        req = self._reconnect()
+        eq_((0x100, 0xff00), (req.cookie, req.cookie_mask))
+
+        observer = mock.Mock()
+        with mock.patch.object(shadow, 'send_event_to_observers', observer):
+            # Unchanged, modified and unknown entries streamed in two parts
+            self._reply([self._stats(in_port=1, cookie=0x100),
+                         self._stats(in_port=2, port=9, cookie=0x101)],
+                        flags=ofp.OFPMPF_REPLY_MORE)
+            self._reply([self._stats(in_port=4, cookie=0x103)])
+
+        msgs = [m for c in self.dp.send_batch.call_args_list
+                for m in c[0][0]]
+        eq_([ofp.OFPFC_ADD, ofp.OFPFC_DELETE_STRICT, ofp.OFPFC_ADD],
+            [m.command for m in msgs])
+        eq_(2, msgs[0].match['in_port'])
+        eq_(4, msgs[1].match['in_port'])
+        eq_(3, msgs[2].match['in_port'])
+
+        ev = observer.call_args[0][0]
+        ok_(isinstance(ev, flow_shadow.EventFlowShadowReconciled))
+        eq_((1, 1, 1), (ev.added, ev.modified, ev.deleted))
+
+    def test_reconcile_without_cookie(self):
+        # The flow entries installed by the other applications (e.g. the
+        # table-miss flow entry) are left alone.
+        shadow = self.app
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=1))
+        shadow.send_flow_mod(self.dp, self._flow_mod(in_port=2))
+
+        req = self._reconnect()
+        eq_((0, 0), (req.cookie, req.cookie_mask))
+
+        observer = mock.Mock()
+        with mock.patch.object(shadow, 'send_event_to_observers', observer):
+            self._reply([self._stats(in_port=1),
+                         self._stats(priority=0),
+                         self._stats(in_port=3, cookie=0x100)])
+
+        msgs = [m for c in self.dp.send_batch.call_args_list
+                for m in c[0][0]]
+        eq_([ofp.OFPFC_ADD], [m.command for m in msgs])
+        eq_(2, msgs[0].match['in_port'])
+        ev = observer.call_args[0][0]
+        eq_((1, 0, 0), (ev.added, ev.modified, ev.deleted))
+
+    def test_no_reconcile_without_shadow(self):
+        ev = ofp_event.EventOFPStateChange(self.dp)
+        ev.state = handler.MAIN_DISPATCHER
+        self.app.state_change_handler(ev)
+        eq_(0, self.dp.send_msg.call_count)
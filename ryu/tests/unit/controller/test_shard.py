@@ -0,0 +1,139 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import socket
+import unittest
+
+from nose.tools import eq_
+
+from ryu.base import app_manager  # To suppress cyclic import
+from ryu.controller import handler
+from ryu.controller import shard
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+hub.patch()
+
+
+class _LocalApp(app_manager.RyuApp):
+    pass
+
+
+class _GlobalApp(app_manager.RyuApp):
+    OFP_SHARDING = shard.SHARD_GLOBAL
+
+
+class Test_shard(unittest.TestCase):
+    """
+    Test cases for ryu.controller.shard, with two workers emulated in
+    this process.
+    """
+
+    def setUp(self):
+        self.pairs = [socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+                      for _ in range(2)]
+        self._saved = (shard._worker_index, shard._worker_count,
+                       shard._channels, shard._inbox)
+        shard._worker_count = 2
+        shard._channels = [send_sock for _, send_sock in self.pairs]
+
+    def tearDown(self):
+        (shard._worker_index, shard._worker_count,
+         shard._channels, shard._inbox) = self._saved
+        shard._remote_datapaths.clear()
+        shard._local_datapaths.clear()
+        for pair in self.pairs:
+            for sock in pair:
+                sock.close()
+
+    def _become(self, index):
+        shard._worker_index = index
+        shard._inbox = self.pairs[index][0]
+
+    def test_owner(self):
+        eq_(0, shard.owner(0x10))
+        eq_(1, shard.owner(0x11))
+
+    def test_is_app_runnable(self):
+        self._become(0)
+        eq_(True, shard.is_app_runnable(_LocalApp))
+        eq_(True, shard.is_app_runnable(_GlobalApp))
+        self._become(1)
+        eq_(True, shard.is_app_runnable(_LocalApp))
+        eq_(False, shard.is_app_runnable(_GlobalApp))
+
+    def test_handoff(self):
+        self._become(0)
+        conn, peer = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        datapath = mock.Mock()
+        datapath.socket = conn
+        datapath.ofproto = ofproto_v1_3
+        datapath.address = ('127.0.0.1', 12345)
+
+        # Owned by this worker
+        eq_(False, shard.handoff(datapath, 0x10, b'features'))
+
+        eq_(True, shard.handoff(datapath, 0x11, b'features'))
+        conn.close()
+
+        self._become(1)
+        msg, fds = shard._recv()
+        eq_((shard._MSG_DATAPATH, socket.AF_UNIX, ofproto_v1_3.OFP_VERSION,
+             ('127.0.0.1', 12345), b'features'), msg)
+        eq_(1, len(fds))
+
+        # The connection is usable in the new owner.
+        adopted = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM,
+                                fileno=fds[0])
+        peer.sendall(b'hello')
+        eq_(b'hello', adopted.recv(5))
+        adopted.close()
+        peer.close()
+
+    def test_forward_to_global_apps(self):
+        # Worker 1 reports its datapath to worker 0.
+        self._become(1)
+        datapath = mock.Mock()
+        datapath.id = 0x11
+        datapath.ofproto = ofproto_v1_3
+        datapath.address = ('127.0.0.1', 12345)
+        shard.forward_state(datapath, handler.MAIN_DISPATCHER)
+        eq_(datapath, shard._local_datapaths[0x11])
+
+        self._become(0)
+        msg, fds = shard._recv()
+        eq_([], fds)
+        with mock.patch('ryu.controller.shard._send_to_global_apps') as m:
+            shard._handle_state(fds, *msg[1:])
+            ev, state = m.call_args[0]
+        remote = shard._remote_datapaths[0x11]
+        eq_(remote, ev.datapath)
+        eq_(handler.MAIN_DISPATCHER, state)
+        eq_(handler.MAIN_DISPATCHER, remote.state)
+        eq_(1, remote.worker)
+
+        # A message sent by a global application in worker 0 is sent by
+        # the owner.
+        barrier = ofproto_v1_3_parser.OFPBarrierRequest(remote)
+        remote.send_msg(barrier)
+        self._become(1)
+        msg, fds = shard._recv()
+        shard._handle_send(fds, *msg[1:])
+        datapath.send.assert_called_once_with(barrier.buf)
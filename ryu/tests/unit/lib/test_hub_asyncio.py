@@ -0,0 +1,238 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import os
+import socket
+import struct
+import subprocess
+import sys
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+import ryu
+from ryu.app import wsgi
+from ryu.lib import hub
+hub.patch()
+
+
+ASYNCIO_HUB = hub.HUB_TYPE in ('asyncio', 'uvloop')
+
+
+class _WsController(wsgi.ControllerBase):
+    @wsgi.route('hello', '/hello', methods=['GET'])
+    def hello(self, req, **_kwargs):
+        return wsgi.Response(status=200, body='hello')
+
+    @wsgi.websocket('echo', '/echo')
+    def echo(self, ws):
+        while True:
+            msg = ws.wait()
+            if msg is None:
+                break
+            ws.send(msg.upper())
+
+
+@unittest.skipUnless(ASYNCIO_HUB, 'asyncio hub is not selected')
+class Test_hub_asyncio(unittest.TestCase):
+    """ Test case for ryu.lib.hub with RYU_HUB_TYPE=asyncio
+    """
+
+    def test_queue(self):
+        q = hub.Queue(2)
+        result = []
+
+        def _consumer():
+            while True:
+                item = q.get()
+                if item is None:
+                    break
+                result.append(item)
+
+        with hub.Timeout(2):
+            t = hub.spawn(_consumer)
+            for i in range(10):
+                q.put(i)
+            q.put(None)
+            hub.joinall([t])
+        eq_(list(range(10)), result)
+
+    def test_queue_nowait(self):
+        q = hub.Queue(1)
+        q.put(1, block=False)
+        ok_(q.full())
+        self.assertRaises(Exception, q.put, 2, False)
+        eq_(1, q.get(block=False))
+        self.assertRaises(hub.QueueEmpty, q.get, False)
+        self.assertRaises(hub.QueueEmpty, q.get, True, 0.1)
+
+    def test_semaphore(self):
+        sem = hub.BoundedSemaphore(1)
+        ok_(sem.acquire())
+        ok_(not sem.acquire(blocking=False))
+        hub.spawn_after(0.1, sem.release)
+        with hub.Timeout(1):
+            ok_(sem.acquire())
+        sem.release()
+        self.assertRaises(ValueError, sem.release)
+
+    def test_spawn_after_cancel(self):
+        result = []
+        t = hub.spawn_after(0.1, result.append, 1)
+        t.cancel()
+        hub.joinall([t])
+        hub.sleep(0.2)
+        eq_([], result)
+
+    def test_link(self):
+        result = []
+        t = hub.spawn(lambda: 1)
+        t.link(lambda gt, x: result.append((gt.wait(), x)), 2)
+        hub.joinall([t])
+        eq_([(1, 2)], result)
+
+    @raises(hub.Timeout)
+    def test_wait_read(self):
+        s1, s2 = socket.socketpair()
+        try:
+            with hub.Timeout(0.1):
+                hub.wait_read(s2.fileno())
+        finally:
+            s1.close()
+            s2.close()
+
+    def test_stream_server_client(self):
+        def _echo(sock, addr):
+            while True:
+                data = sock.recv(100)
+                if not data:
+                    break
+                sock.sendall(data)
+            sock.close()
+
+        server = hub.StreamServer(('127.0.0.1', 0), _echo)
+        t = hub.spawn(server.serve_forever)
+        try:
+            client = hub.StreamClient(server.server.getsockname(),
+                                      timeout=1)
+            sock = client.connect()
+            data = b'x' * 1000000
+            sock.sendall(data)
+            received = bytearray()
+            with hub.Timeout(5):
+                while len(received) < len(data):
+                    received += sock.recv(65536)
+            eq_(data, received)
+            sock.settimeout(0.1)
+            self.assertRaises(socket.timeout, sock.recv, 1)
+            sock.close()
+        finally:
+            hub.kill(t)
+            server.server.close()
+
+    @unittest.skipUnless(hasattr(socket, 'SO_REUSEPORT'),
+                         'SO_REUSEPORT is not supported')
+    def test_stream_server_reuse_port(self):
+        # Several workers listen on the same port, as with eventlet.
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        servers = []
+        try:
+            for _ in range(2):
+                servers.append(hub.StreamServer(('127.0.0.1', port), None))
+            for server in servers:
+                eq_(port, server.server.getsockname()[1])
+                ok_(server.server.getsockopt(socket.SOL_SOCKET,
+                                             socket.SO_REUSEPORT))
+        finally:
+            for server in servers:
+                server.server.close()
+
+    def _http(self, port, request):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(request)
+        return sock
+
+    def test_wsgi_websocket(self):
+        app = wsgi.WSGIApplication()
+        app.register(_WsController)
+        server = hub.WSGIServer(('127.0.0.1', 0), app)
+        port = server.server.getsockname()[1]
+        t = hub.spawn(server.serve_forever)
+        try:
+            with hub.Timeout(5):
+                sock = self._http(port, b'GET /hello HTTP/1.0\r\n\r\n')
+                resp = b''
+                while True:
+                    data = sock.recv(4096)
+                    if not data:
+                        break
+                    resp += data
+                sock.close()
+                ok_(resp.startswith(b'HTTP/1.0 200 OK'))
+                ok_(resp.endswith(b'\r\n\r\nhello'))
+
+                key = base64.b64encode(os.urandom(16))
+                sock = self._http(port, b'GET /echo HTTP/1.1\r\n'
+                                        b'Upgrade: websocket\r\n'
+                                        b'Connection: Upgrade\r\n'
+                                        b'Sec-WebSocket-Version: 13\r\n'
+                                        b'Sec-WebSocket-Key: ' + key +
+                                        b'\r\n\r\n')
+                resp = b''
+                while not resp.endswith(b'\r\n\r\n'):
+                    resp += sock.recv(1)
+                ok_(resp.startswith(b'HTTP/1.1 101'))
+
+                # A masked text frame
+                mask = b'\x01\x02\x03\x04'
+                payload = bytes(bytearray(
+                    c ^ mask[i % 4] for i, c in enumerate(b'hello')))
+                sock.sendall(b'\x81\x85' + mask + payload)
+                eq_(b'\x81\x05HELLO', sock.recv(7))
+
+                # Close
+                sock.sendall(b'\x88\x80' + mask)
+                eq_(b'\x88\x02' + struct.pack('!H', 1000), sock.recv(4))
+                sock.close()
+        finally:
+            hub.kill(t)
+            server.server.close()
+
+
+@unittest.skipIf(ASYNCIO_HUB, 'asyncio hub is already selected')
+class Test_hub_asyncio_subprocess(unittest.TestCase):
+    """ Runs the hub tests with RYU_HUB_TYPE=asyncio in a subprocess
+    """
+
+    def test_hub(self):
+        topdir = os.path.dirname(os.path.dirname(ryu.__file__))
+        env = dict(os.environ, RYU_HUB_TYPE='asyncio')
+        env['PYTHONPATH'] = os.pathsep.join(
+            [topdir] + [p for p in [env.get('PYTHONPATH')] if p])
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'unittest',
+             'ryu.tests.unit.lib.test_hub',
+             'ryu.tests.unit.lib.test_hub_asyncio'],
+            cwd=topdir, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        output, _ = proc.communicate()
+        eq_(0, proc.returncode, output.decode('utf-8', 'replace'))
@@ -19,8 +19,11 @@ import bz2
 import io
 import logging
 import os
+import shutil
 import struct
+import subprocess
 import sys
+import tempfile
 import unittest
 
 try:
@@ -31,6 +34,7 @@ except ImportError:
 from nose.tools import eq_
 from nose.tools import ok_
 
+import ryu
 from ryu.lib import addrconv
 from ryu.lib import mrtlib
 from ryu.lib.packet import bgp
@@ -824,3 +828,139 @@ class TestMrtlibBgp4MpMrtRecord(unittest.TestCase):
         output = record.serialize()
 
         eq_(buf, output)
+
+
+def _record_type(record):
+    return record.type, record.subtype
+
+
+def _raise_value_error(record):
+    raise ValueError(record.type)
+
+
+class TestMrtlibMmapReader(unittest.TestCase):
+    """
+    Test case for ryu.lib.mrtlib.MmapReader.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.files = {}
+        for f in ['rib.20161101.0000_pick', 'updates.20161101.0000']:
+            path = os.path.join(self.tmpdir, f)
+            with open(path, 'wb') as output_file:
+                output_file.write(bz2.BZ2File(
+                    os.path.join(MRT_DATA_DIR, f + '.bz2'), 'rb').read())
+            self.files[f] = path
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _read(self, path, **kwargs):
+        reader = mrtlib.MmapReader(path, **kwargs)
+        records = [record.serialize() for record in reader]
+        reader.close()
+        return records
+
+    def test_reader(self):
+        for path in self.files.values():
+            expected = [record.serialize() for record in
+                        mrtlib.Reader(open(path, 'rb'))]
+            eq_(expected, self._read(path))
+
+            reader = mrtlib.MmapReader(path)
+            eq_(len(expected), len(reader.index()))
+            chunks = reader.chunks(3)
+            reader.close()
+            eq_(0, chunks[0][0])
+            eq_(os.path.getsize(path), chunks[-1][1])
+            records = []
+            for start, end in chunks:
+                records.extend(self._read(path, start=start, end=end))
+            eq_(expected, records)
+
+    def test_empty(self):
+        path = os.path.join(self.tmpdir, 'empty')
+        open(path, 'wb').close()
+        reader = mrtlib.MmapReader(path)
+        eq_([], list(reader))
+        eq_([], reader.chunks(4))
+        reader.close()
+
+    def test_filter_bgp4mp(self):
+        path = self.files['updates.20161101.0000']
+        records = list(mrtlib.Reader(open(path, 'rb')))
+
+        eq_([], self._read(path, types=[mrtlib.MrtRecord.TYPE_TABLE_DUMP_V2]))
+
+        peers = ['202.249.2.86', '2001:200:0:fe00::9d4:0']
+        expected = [record.serialize() for record in records
+                    if record.message.peer_ip in peers]
+        ok_(expected)
+        eq_(expected, self._read(path, peers=peers))
+
+        def _prefixes(record):
+            msg = record.message.bgp_message
+            nlri = msg.nlri + msg.withdrawn_routes
+            for attr in msg.path_attributes:
+                if isinstance(attr, bgp.BGPPathAttributeMpReachNLRI):
+                    nlri += attr.nlri
+                elif isinstance(attr, bgp.BGPPathAttributeMpUnreachNLRI):
+                    nlri += attr.withdrawn_routes
+            return [n.prefix for n in nlri]
+
+        expected = [record.serialize() for record in records
+                    if [p for p in _prefixes(record)
+                        if p.startswith('1.') or p.startswith('2a00:')]]
+        ok_(expected)
+        eq_(expected, self._read(path, prefixes=['1.0.0.0/8', '2a00::/16']))
+
+    def test_filter_table_dump_v2(self):
+        path = self.files['rib.20161101.0000_pick']
+
+        # Peer 202.249.2.169 is in both RIB records, 202.249.2.83 in none.
+        eq_(3, len(self._read(path, peers=['202.249.2.169'])))
+        eq_(1, len(self._read(path, peers=['202.249.2.83'])))
+        # The PEER_INDEX_TABLE is found for the chunks after it too.
+        eq_(2, len(self._read(path, start=135, peers=['202.249.2.169'])))
+
+        records = list(mrtlib.MmapReader(path, prefixes=['1.0.5.0/24']))
+        eq_([mrtlib.TableDump2MrtRecord.SUBTYPE_PEER_INDEX_TABLE,
+             mrtlib.TableDump2MrtRecord.SUBTYPE_RIB_IPV4_UNICAST],
+            [record.subtype for record in records])
+        eq_('1.0.5.0/24', records[1].message.prefix.prefix)
+
+    def test_map_records(self):
+        path = self.files['updates.20161101.0000']
+        expected = [_record_type(record) for record in
+                    mrtlib.Reader(open(path, 'rb'))]
+        eq_(expected, list(mrtlib.map_records(path, _record_type,
+                                              processes=2)))
+
+    def test_map_records_error(self):
+        path = self.files['updates.20161101.0000']
+        self.assertRaises(ValueError, list, mrtlib.map_records(
+            path, _raise_value_error, processes=2))
+
+    def test_map_records_with_hub_patch(self):
+        # The worker processes are not deadlocked by green threads.
+        path = self.files['updates.20161101.0000']
+        topdir = os.path.dirname(os.path.dirname(ryu.__file__))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [topdir] + [p for p in [env.get('PYTHONPATH')] if p])
+        script = '\n'.join([
+            'from ryu.lib import hub',
+            'hub.patch()',
+            'from ryu.lib import mrtlib',
+            'from ryu.tests.unit.lib import test_mrtlib',
+            'with hub.Timeout(60):',
+            '    print(len(list(mrtlib.map_records(',
+            '        %r, test_mrtlib._record_type, processes=2))))' % path,
+        ])
+        proc = subprocess.Popen(
+            [sys.executable, '-c', script], cwd=topdir, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, error = proc.communicate()
+        eq_(0, proc.returncode, error.decode('utf-8', 'replace'))
+        eq_(len(list(mrtlib.Reader(open(path, 'rb')))), int(output))
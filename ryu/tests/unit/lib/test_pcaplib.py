@@ -17,8 +17,10 @@ from __future__ import print_function
 
 import logging
 import os
+import shutil
 import struct
 import sys
+import tempfile
 import unittest
 
 try:
@@ -27,10 +29,17 @@ except ImportError:
     from unittest import mock  # Python 3
 
 from nose.tools import eq_
+from nose.tools import ok_
 from nose.tools import raises
 
 from ryu.utils import binary_str
 from ryu.lib import pcaplib
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import in_proto
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import udp
 
 LOG = logging.getLogger(__name__)
 
@@ -228,3 +237,251 @@ class Test_pcaplib_Writer(unittest.TestCase):
         expected_buf = b'hoge'  # b'hogehoge'[:snaplen]
         eq_(expected_buf, f.buf)
         eq_(snaplen, len(f.buf))
+
+
+def _udp_frame(dst_port, payload=b''):
+    pkt = packet.Packet(protocols=[
+        ethernet.ethernet(ethertype=ether_types.ETH_TYPE_IP),
+        ipv4.ipv4(proto=in_proto.IPPROTO_UDP,
+                  src='192.0.2.1', dst='192.0.2.2'),
+        udp.udp(src_port=12345, dst_port=dst_port),
+        payload])
+    pkt.serialize()
+    return bytes(pkt.data)
+
+
+def _pcapng_block(endian, block_type, body):
+    body += b'\x00' * (-len(body) % 4)
+    block_len = len(body) + 12
+    return (struct.pack(endian + 'II', block_type, block_len) + body +
+            struct.pack(endian + 'I', block_len))
+
+
+class Test_pcaplib_MmapReader(unittest.TestCase):
+    """
+    Test case for pcaplib.MmapReader class
+    """
+
+    expected_outputs = Test_pcaplib_Reader.expected_outputs
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, buf):
+        path = os.path.join(self.dir, 'test.pcap')
+        with open(path, 'wb') as f:
+            f.write(buf)
+        return path
+
+    @staticmethod
+    def _read(path, **kwargs):
+        reader = pcaplib.MmapReader(path, **kwargs)
+        outputs = [(ts, bytes(buf)) for ts, buf in reader]
+        reader.close()
+        return outputs
+
+    def test_with_big_endian(self):
+        eq_(self.expected_outputs, self._read(
+            os.path.join(PCAP_PACKET_DATA_DIR, 'big_endian.pcap')))
+
+    def test_with_little_endian(self):
+        eq_(self.expected_outputs, self._read(
+            os.path.join(PCAP_PACKET_DATA_DIR, 'little_endian.pcap')))
+
+    def test_as_reader(self):
+        path = os.path.join(PCAP_PACKET_DATA_DIR, 'big_endian.pcap')
+        reader = pcaplib.MmapReader(path)
+        eq_('pcap', reader.format)
+        eq_(1, reader.network)
+        eq_(list(pcaplib.Reader(open(path, 'rb'))),
+            [(ts, bytes(buf)) for ts, buf in reader])
+        reader.close()
+
+    def test_with_nsec(self):
+        buf = (pcaplib.MAGIC_NUMBER_NSEC_IDENTICAL +
+               struct.pack('>HHIIII', 2, 4, 0, 0, 65535, 1) +
+               struct.pack('>IIII', 10, 500000000, 4, 4) + b'data')
+        eq_([(10.5, b'data')], self._read(self._write(buf)))
+
+    def test_with_truncated_packet(self):
+        path = os.path.join(PCAP_PACKET_DATA_DIR, 'little_endian.pcap')
+        buf = open(path, 'rb').read()
+        eq_(self.expected_outputs[:1], self._read(self._write(buf[:-1])))
+
+    @raises(struct.error)
+    def test_with_invalid_file(self):
+        pcaplib.MmapReader(self._write(b'\xff' * 24))
+
+    def test_with_pcapng(self):
+        frame = _udp_frame(53)
+        buf = (
+            # Big endian section
+            _pcapng_block('>', pcaplib.PCAPNG_BLOCK_SHB, struct.pack(
+                '>IHHq', pcaplib.PCAPNG_BYTE_ORDER_MAGIC, 1, 0, -1)) +
+            # Ethernet interface with nanosecond resolution
+            _pcapng_block('>', pcaplib.PCAPNG_BLOCK_IDB, struct.pack(
+                '>HHIHHB3xHH', 1, 0, 0, pcaplib.PCAPNG_OPT_IF_TSRESOL, 1, 9,
+                pcaplib.PCAPNG_OPT_ENDOFOPT, 0)) +
+            _pcapng_block('>', 0x80000001, b'custom') +
+            _pcapng_block('>', pcaplib.PCAPNG_BLOCK_EPB, struct.pack(
+                '>IIIII', 0, 0, 1500000000, len(frame), len(frame)) + frame) +
+            # Little endian section, with the timestamps in microseconds
+            _pcapng_block('<', pcaplib.PCAPNG_BLOCK_SHB, struct.pack(
+                '<IHHq', pcaplib.PCAPNG_BYTE_ORDER_MAGIC, 1, 0, -1)) +
+            _pcapng_block('<', pcaplib.PCAPNG_BLOCK_IDB, struct.pack(
+                '<HHI', 1, 0, 5)) +
+            _pcapng_block('<', pcaplib.PCAPNG_BLOCK_IDB, struct.pack(
+                '<HHI', 101, 0, 0)) +
+            _pcapng_block('<', pcaplib.PCAPNG_BLOCK_EPB, struct.pack(
+                '<IIIII', 1, 0, 2500000, 3, 3) + b'raw') +
+            # Truncated to the snapshot length of the first interface
+            _pcapng_block('<', pcaplib.PCAPNG_BLOCK_SPB, struct.pack(
+                '<I', 7) + b'simple'))
+        path = self._write(buf)
+
+        reader = pcaplib.MmapReader(path)
+        eq_('pcapng', reader.format)
+        eq_([(1.5, frame), (2.5, b'raw'), (0.0, b'simpl')],
+            [(ts, bytes(buf)) for ts, buf in reader])
+        eq_(1, reader.network)
+        reader.close()
+
+        # Only the Ethernet frames can match.
+        eq_([(1.5, frame)], self._read(path, match={'l4_dst': 53}))
+        eq_([], self._read(path, match={'l4_dst': 54}))
+
+    def test_with_match(self):
+        path = os.path.join(self.dir, 'test.pcap')
+        writer = pcaplib.FileWriter(path)
+        frames = [_udp_frame(port) for port in (53, 67, 123, 53)]
+        for i, frame in enumerate(frames):
+            writer.write_pkt(frame, ts=i)
+        writer.write_pkt(b'\x00' * 13, ts=4)
+        writer.close()
+
+        eq_([(0, frames[0]), (3, frames[3])],
+            self._read(path, match={'l4_dst': 53}))
+        eq_([(0, frames[0]), (1, frames[1]), (3, frames[3])],
+            self._read(path, match={'l4_dst': [53, 67],
+                                    'ip_dst': '192.0.2.2',
+                                    'vlan_vid': None}))
+        eq_([], self._read(path, match={'ip_proto': in_proto.IPPROTO_TCP}))
+
+    @raises(ValueError)
+    def test_with_unknown_field(self):
+        pcaplib.MmapReader(
+            os.path.join(PCAP_PACKET_DATA_DIR, 'big_endian.pcap'),
+            match={'unknown': 1})
+
+    def test_batches(self):
+        path = os.path.join(self.dir, 'test.pcap')
+        writer = pcaplib.FileWriter(path)
+        for i in range(10):
+            writer.write_pkt(b'%d' % i, ts=i)
+        writer.close()
+
+        reader = pcaplib.MmapReader(path)
+        batches = list(reader.batches(4))
+        eq_([4, 4, 2], [len(batch) for batch in batches])
+        eq_((9, b'9'), (batches[2][1][0], bytes(batches[2][1][1])))
+        del batches
+        reader.close()
+
+    @raises(struct.error)
+    def test_with_empty_file(self):
+        pcaplib.MmapReader(self._write(b''))
+
+
+class Test_pcaplib_FileWriter(unittest.TestCase):
+    """
+    Test case for pcaplib.FileWriter class
+    """
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'test.pcap')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_as_writer(self):
+        # The same file as the one written by Writer
+        for file_name in ('big_endian.pcap', 'little_endian.pcap'):
+            expected_buf = open(os.path.join(
+                PCAP_PACKET_DATA_DIR, file_name), 'rb').read()
+            if expected_buf[:4] != pcaplib.PcapFileHdr().serialize()[:4]:
+                continue
+            w = pcaplib.FileWriter(self.path)
+            w.write_pkt(b'test_data_1', ts=(0x1234 + (0x5678 / 1e6)))
+            w.write_pkt(bytearray(b'test_data_2'),
+                        ts=(0x2345 + (0x6789 / 1e6)))
+            w.close()
+            eq_(expected_buf, open(self.path, 'rb').read())
+
+    def test_with_longer_buf(self):
+        w = pcaplib.FileWriter(self.path, snaplen=4)
+        w.write_pkt(b'hogehoge', ts=1.25)
+        w.close()
+        hdr, buf = pcaplib.PcapPktHdr.parser(
+            open(self.path, 'rb').read()[pcaplib.PcapFileHdr.FILE_HDR_SIZE:],
+            sys.byteorder)
+        eq_((1, 250000, 4, 8),
+            (hdr.ts_sec, hdr.ts_usec, hdr.incl_len, hdr.orig_len))
+        eq_(b'hoge', buf)
+
+    def test_flush_size(self):
+        w = pcaplib.FileWriter(self.path, flush_size=100)
+        size = os.path.getsize(self.path)
+        eq_(pcaplib.PcapFileHdr.FILE_HDR_SIZE, size)
+        w.write_pkt(b'x' * 50, ts=0)
+        eq_(size, os.path.getsize(self.path))
+        w.write_pkt(b'x' * 50, ts=0)
+        eq_(size + 2 * (16 + 50), os.path.getsize(self.path))
+        data = bytearray(b'y' * 10)
+        w.write_pkt(data, ts=0)
+        data[:] = b'z' * 10
+        w.close()
+        eq_([b'x' * 50, b'x' * 50, b'y' * 10],
+            [bytes(buf) for _, buf in pcaplib.Reader(open(self.path, 'rb'))])
+
+    def test_with_pcapng(self):
+        w = pcaplib.FileWriter(self.path, snaplen=10, pcapng=True)
+        w.write_pkt(b'test_data_1', ts=1.5)
+        w.write_pkt(memoryview(b'test'), ts=0x123456789)
+        w.close()
+
+        reader = pcaplib.MmapReader(self.path)
+        eq_('pcapng', reader.format)
+        eq_([(1.5, b'test_data_'), (0x123456789, b'test')],
+            [(ts, bytes(buf)) for ts, buf in reader])
+        reader.close()
+
+    def test_rotation(self):
+        w = pcaplib.FileWriter(self.path, flush_size=0, max_bytes=100,
+                               backup_count=2)
+        for i in range(7):
+            # 24 + 2 * (16 + 20) < 100 < 24 + 3 * (16 + 20)
+            w.write_pkt(b'%020d' % i, ts=i)
+        w.close()
+
+        def _read(path):
+            return [int(buf) for _, buf in pcaplib.Reader(open(path, 'rb'))]
+
+        eq_([6], _read(self.path))
+        eq_([4, 5], _read(self.path + '.1'))
+        eq_([2, 3], _read(self.path + '.2'))
+        ok_(not os.path.exists(self.path + '.3'))
+
+    def test_rotation_without_backup(self):
+        w = pcaplib.FileWriter(self.path, max_bytes=100, pcapng=True)
+        for i in range(5):
+            w.write_pkt(b'%020d' % i, ts=i)
+        w.close()
+
+        reader = pcaplib.MmapReader(self.path)
+        eq_([b'%020d' % 4], [bytes(buf) for _, buf in reader])
+        reader.close()
+        eq_(['test.pcap'], os.listdir(self.dir))
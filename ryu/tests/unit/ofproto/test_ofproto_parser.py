@@ -24,7 +24,11 @@ import struct
 from ryu import exception
 
 from ryu.ofproto import ofproto_common, ofproto_parser
+from ryu.ofproto import ofproto_protocol
 from ryu.ofproto import ofproto_v1_0, ofproto_v1_0_parser
+from ryu.ofproto import ofproto_v1_3, ofproto_v1_3_parser
+from ryu.ofproto import ofproto_v1_4, ofproto_v1_4_parser
+from ryu.ofproto import ofproto_v1_5, ofproto_v1_5_parser
 
 import logging
 LOG = logging.getLogger(__name__)
@@ -242,3 +246,97 @@ class TestMsgStrAttr(unittest.TestCase):
         str_ = str_.rsplit()
         eq_('check', str_[0])
         eq_('msg_str_attr_test', str_[1])
+
+
+class TestFlowModTemplate(unittest.TestCase):
+    """ Test case for ofproto_parser.FlowModTemplate
+    """
+
+    def _flow_mod(self, ofp, parser, in_port, eth_dst, ipv4_dst, out_port,
+                  **kwargs):
+        dp = ofproto_protocol.ProtocolDesc(version=ofp.OFP_VERSION)
+        match = parser.OFPMatch(in_port=in_port, eth_type=0x0800,
+                                eth_dst=eth_dst,
+                                ipv4_dst=(ipv4_dst, '255.255.255.0'))
+        actions = [parser.OFPActionSetField(vlan_vid=0x1003),
+                   parser.OFPActionOutput(out_port)]
+        inst = [parser.OFPInstructionActions(ofp.OFPIT_APPLY_ACTIONS,
+                                             actions)]
+        return parser.OFPFlowMod(dp, match=match, instructions=inst,
+                                 **kwargs)
+
+    def _test_stamp(self, ofp, parser):
+        template = ofproto_parser.FlowModTemplate(
+            self._flow_mod(ofp, parser, 1, '00:00:00:00:00:00', '10.0.0.0',
+                           1, priority=10))
+        msg = template.stamp(cookie=0x1234, idle_timeout=30,
+                             match={'in_port': 3,
+                                    'eth_dst': 'aa:bb:cc:dd:ee:ff',
+                                    'ipv4_dst': ('10.0.1.0',
+                                                 '255.255.255.0')},
+                             output=4)
+        msg.set_xid(7)
+        msg.serialize()
+
+        expected = self._flow_mod(ofp, parser, 3, 'aa:bb:cc:dd:ee:ff',
+                                  '10.0.1.0', 4, priority=10,
+                                  cookie=0x1234, idle_timeout=30)
+        expected.set_xid(7)
+        expected.serialize()
+        eq_(expected.buf, msg.buf)
+        eq_(len(msg.buf), msg.msg_len)
+
+        # The template itself is not modified.
+        msg2 = template.stamp()
+        msg2.serialize()
+        eq_(template._buf, msg2.buf)
+
+    def test_stamp_v13(self):
+        self._test_stamp(ofproto_v1_3, ofproto_v1_3_parser)
+
+    def test_stamp_v14(self):
+        self._test_stamp(ofproto_v1_4, ofproto_v1_4_parser)
+
+    def test_stamp_v15(self):
+        self._test_stamp(ofproto_v1_5, ofproto_v1_5_parser)
+
+    def test_stamp_invalid(self):
+        template = ofproto_parser.FlowModTemplate(
+            self._flow_mod(ofproto_v1_3, ofproto_v1_3_parser, 1,
+                           '00:00:00:00:00:00', '10.0.0.0', 1))
+        assert_raises(ValueError, template.stamp, importance=1)
+        assert_raises(ValueError, template.stamp, table_id=0x100)
+        assert_raises(ValueError, template.stamp, match={'tcp_dst': 80})
+        assert_raises(ValueError, template.stamp,
+                      match={'in_port': (1, 0xff)})
+        assert_raises(ValueError, template.stamp,
+                      match={'ipv4_dst': '10.0.0.1'})
+        assert_raises(ValueError, template.stamp, output=[1, 2])
+
+    def test_stamp_out_of_range(self):
+        template = ofproto_parser.FlowModTemplate(
+            self._flow_mod(ofproto_v1_3, ofproto_v1_3_parser, 1,
+                           '00:00:00:00:00:00', '10.0.0.0', 1))
+        assert_raises(ValueError, template.stamp,
+                      match={'in_port': 0x100000000})
+        assert_raises(ValueError, template.stamp, match={'in_port': -1})
+        assert_raises(ValueError, template.stamp,
+                      match={'eth_type': 0x10800})
+        assert_raises(ValueError, template.stamp, output=0x100000000)
+        assert_raises(ValueError, template.stamp, output=-1)
+        # Values of a wrong type.
+        assert_raises(ValueError, template.stamp, match={'in_port': 'x'})
+        assert_raises(ValueError, template.stamp, match={'in_port': 1.5})
+        assert_raises(ValueError, template.stamp, match={'eth_dst': 'x'})
+        assert_raises(ValueError, template.stamp, output=['x'])
+        # The template is left as it was.
+        msg = template.stamp()
+        msg.serialize()
+        eq_(template._buf, msg.buf)
+
+    def test_version(self):
+        dp = ofproto_protocol.ProtocolDesc(version=ofproto_v1_0.OFP_VERSION)
+        assert_raises(ValueError, ofproto_parser.FlowModTemplate,
+                      ofproto_v1_0_parser.OFPFlowMod(
+                          dp, ofproto_v1_0_parser.OFPMatch(), 0, 0, 0, 0, 0,
+                          0, 0, 0, []))
@@ -17,6 +17,7 @@
 import unittest
 
 import ryu.ofproto.ofproto_v1_3 as ofp
+from ryu.ofproto import oxx_fields
 
 
 class Test_OXM(unittest.TestCase):
@@ -33,6 +34,17 @@ class Test_OXM(unittest.TestCase):
         (f, uv) = ofp.oxm_to_user(n, v, m)
         self.assertEqual(user, (f, uv))
 
+    def _test_encode_fields(self, user, on_wire):
+        buf = bytearray()
+        l = ofp.oxm_serialize_fields([user], buf, 0)
+        self.assertEqual(len(on_wire), l)
+        self.assertEqual(on_wire, buf)
+
+    def _test_decode_to_user(self, user, on_wire):
+        (f, uv, l) = ofp.oxm_parse_to_user(on_wire, 0)
+        self.assertEqual(len(on_wire), l)
+        self.assertEqual(user, (f, uv))
+
     def _test_encode_header(self, user, on_wire):
         f = user
         n = ofp.oxm_from_user_header(f)
@@ -49,6 +61,8 @@ class Test_OXM(unittest.TestCase):
     def _test(self, user, on_wire, header_bytes):
         self._test_encode(user, on_wire)
         self._test_decode(user, on_wire)
+        self._test_encode_fields(user, on_wire)
+        self._test_decode_to_user(user, on_wire)
         if isinstance(user[1], tuple):  # has mask?
             return
         user_header = user[0]
@@ -186,3 +200,55 @@ class Test_OXM(unittest.TestCase):
             b'fugafuga'
         )
         self._test(user, on_wire, 4)
+
+    def test_fields(self):
+        fields = [
+            ('in_port', 1),
+            ('eth_dst', 'aa:bb:cc:dd:ee:ff'),
+            ('eth_type', 0x0800),
+            ('ip_proto', 6),
+            ('ipv4_src', ('192.0.2.1', '255.255.255.0')),
+            ('ipv4_dst', '192.0.2.2'),
+            ('tcp_src', 1234),
+            ('tcp_dst', 80),
+            ('_dp_hash', 0x12345678),
+        ]
+        # with and without a field which has no precompiled codec
+        for fields_ in (fields[:-1], fields):
+            on_wire = bytearray()
+            for f in fields_:
+                (n, v, m) = ofp.oxm_from_user(*f)
+                ofp.oxm_serialize(n, v, m, on_wire, len(on_wire))
+
+            buf = bytearray(b'\x00' * 2)
+            l = ofp.oxm_serialize_fields(fields_, buf, 2)
+            self.assertEqual(len(on_wire), l)
+            self.assertEqual(on_wire, buf[2:])
+
+            offset = 2
+            decoded = []
+            while offset < len(buf):
+                (f, uv, l) = ofp.oxm_parse_to_user(buf, offset)
+                decoded.append((f, uv))
+                offset += l
+            self.assertEqual(fields_, decoded)
+
+    def test_fields_out_of_range(self):
+        # Values which do not fit the field are left to the generic path.
+        in_port = [f for f in ofp.oxm_types if f.name == 'in_port'][0]
+        codec = oxx_fields._FieldCodec(in_port)
+        self.assertEqual([codec.header, 1], codec.values(1))
+        self.assertEqual(None, codec.values(0x100000000))
+        self.assertEqual(None, codec.values(-1))
+        self.assertEqual(None, codec.values((1, 0x100000000)))
+
+        for f in [('in_port', 0x100000000), ('in_port', -1),
+                  ('eth_type', (0x0800, 0x10000))]:
+            on_wire = bytearray()
+            (n, v, m) = ofp.oxm_from_user(*f)
+            ofp.oxm_serialize(n, v, m, on_wire, 0)
+
+            buf = bytearray()
+            l = ofp.oxm_serialize_fields([f], buf, 0)
+            self.assertEqual(len(on_wire), l)
+            self.assertEqual(on_wire, buf)
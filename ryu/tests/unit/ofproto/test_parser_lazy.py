@@ -0,0 +1,94 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_4
+from ryu.ofproto import ofproto_v1_5
+
+
+PACKET_DATA_DIR = os.path.join(
+    os.path.dirname(sys.modules[__name__].__file__), '../../packet_data')
+
+# (version, file, attributes decoded lazily)
+LAZY_MSGS = [
+    (ofproto_v1_3, 'of13/4-4-ofp_packet_in.packet', ['match']),
+    (ofproto_v1_3, 'of13/4-12-ofp_flow_stats_reply.packet', ['body']),
+    (ofproto_v1_3, 'of13/4-30-ofp_port_stats_reply.packet', ['body']),
+    (ofproto_v1_4, 'of14/5-4-ofp_packet_in.packet', ['match']),
+    (ofproto_v1_4, 'of14/5-12-ofp_flow_stats_reply.packet', ['body']),
+    (ofproto_v1_4, 'of14/5-30-ofp_port_stats_reply.packet', ['body']),
+    (ofproto_v1_5, 'of15/libofproto-OFP15-packet_in.packet', ['match']),
+    (ofproto_v1_5, 'of15/libofproto-OFP15-flow_stats_reply.packet',
+     ['body']),
+    (ofproto_v1_5, 'of15/libofproto-OFP15-port_stats_reply.packet',
+     ['body']),
+]
+
+
+class Test_Parser_Lazy(unittest.TestCase):
+    """ Test case for lazy decoding of OpenFlow messages
+    """
+
+    def tearDown(self):
+        ofproto_parser.set_lazy_decode(False)
+
+    def _parse(self, ofp, name, lazy):
+        ofproto_parser.set_lazy_decode(lazy)
+        dp = ofproto_protocol.ProtocolDesc(version=ofp.OFP_VERSION)
+        with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+            buf = f.read()
+        version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+        return ofproto_parser.msg(dp, version, msg_type, msg_len, xid, buf)
+
+    def test_lazy_decode(self):
+        for ofp, name, attrs in LAZY_MSGS:
+            eager = self._parse(ofp, name, False)
+            lazy = self._parse(ofp, name, True)
+
+            for attr in attrs:
+                ok_(attr not in lazy.__dict__, '%s: %s' % (name, attr))
+                ok_(attr in dir(lazy), '%s: %s' % (name, attr))
+            eq_(eager.data if hasattr(eager, 'data') else None,
+                lazy.data if hasattr(lazy, 'data') else None)
+
+            # Accessing the attributes decodes them.
+            eq_(eager.to_jsondict(), lazy.to_jsondict())
+            for attr in attrs:
+                ok_(attr in lazy.__dict__, '%s: %s' % (name, attr))
+
+    def test_lazy_decode_str(self):
+        for ofp, name, _ in LAZY_MSGS:
+            eager = self._parse(ofp, name, False)
+            lazy = self._parse(ofp, name, True)
+            eq_(str(eager), str(lazy))
+
+    def test_lazy_flow_stats(self):
+        for ofp, name, _ in LAZY_MSGS:
+            if 'flow_stats' not in name:
+                continue
+            msg = self._parse(ofp, name, True)
+            for stats in msg.body:
+                ok_('match' not in stats.__dict__)
+                ok_(stats.match.length > 0)
+                ok_('match' in stats.__dict__)
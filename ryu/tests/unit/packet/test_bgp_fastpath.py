@@ -0,0 +1,177 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import struct
+import sys
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib.packet import afi
+from ryu.lib.packet import bgp
+from ryu.lib.packet import bgp_fastpath
+from ryu.lib.packet import safi
+from ryu.tests.benchmark import bgp_update_decode
+
+
+LOG = logging.getLogger(__name__)
+
+MRT_DATA_DIR = os.path.join(
+    os.path.dirname(sys.modules[__name__].__file__), '../../packet_data/mrt/')
+
+
+def _as_path(value):
+    # 4 octets AS numbers, as negotiated between 4 octets AS speakers.
+    return bgp.BGPPathAttributeAsPath(value, as_pack_str='!I')
+
+
+def _update(path_attributes, nlri=None, withdrawn_routes=None):
+    msg = bgp.BGPUpdate(path_attributes=path_attributes,
+                        nlri=nlri or [],
+                        withdrawn_routes=withdrawn_routes or [])
+    return bytes(msg.serialize())
+
+
+class Test_bgp_fastpath(unittest.TestCase):
+    """ Test case for ryu.lib.packet.bgp_fastpath
+    """
+
+    def _check_generic(self, buf, as4=True):
+        # Compares the fast path with the result of the generic parser.
+        update = bgp_fastpath.parse_update(buf, as4)
+        msg, _, _ = bgp.BGPMessage.parser(buf)
+        eq_(update._replace(msg=None),
+            bgp_fastpath._from_update(msg, as4)._replace(msg=None))
+        return update
+
+    def test_mrt_updates(self):
+        updates = bgp_update_decode.read_updates(
+            os.path.join(MRT_DATA_DIR, 'updates.20161101.0000.bz2'))
+        ok_(updates)
+        for buf, as4 in updates:
+            update = self._check_generic(buf, as4)
+            eq_(None, update.msg)
+
+    def test_ipv4(self):
+        buf = _update(
+            [bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_EGP),
+             _as_path([[65001, 65002], {65004, 65003}]),
+             bgp.BGPPathAttributeNextHop('10.0.0.1'),
+             bgp.BGPPathAttributeMultiExitDisc(100),
+             bgp.BGPPathAttributeLocalPref(200),
+             bgp.BGPPathAttributeCommunities([0xfde80001, 0xfde80002]),
+             bgp.BGPPathAttributeOriginatorId('10.0.0.2')],
+            nlri=[bgp.IPAddrPrefix(24, '10.1.2.0'),
+                  bgp.IPAddrPrefix(0, '0.0.0.0')],
+            withdrawn_routes=[bgp.IPAddrPrefix(32, '10.1.3.1')])
+        update = self._check_generic(buf)
+        eq_(bgp_fastpath.Update(
+            withdrawn=['10.1.3.1/32'],
+            nlri=['10.1.2.0/24', '0.0.0.0/0'],
+            origin=bgp.BGP_ATTR_ORIGIN_EGP,
+            as_path=(65001, 65002, (65003, 65004)),
+            next_hop='10.0.0.1',
+            med=100,
+            local_pref=200,
+            communities=(0xfde80001, 0xfde80002),
+            mp_next_hop=None,
+            mp_nlri=[],
+            mp_withdrawn=[],
+            msg=None), update)
+
+        # Buffers other than bytes.
+        eq_(update, bgp_fastpath.parse_update(memoryview(buf)))
+        eq_(update, bgp_fastpath.parse_update(bytearray(buf)))
+
+    def test_ipv6(self):
+        buf = _update(
+            [bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+             _as_path([[65001]]),
+             bgp.BGPPathAttributeMpReachNLRI(
+                 afi.IP6, safi.UNICAST, ['2001:db8::1', 'fe80::1'],
+                 [bgp.IP6AddrPrefix(48, '2001:db8:1::'),
+                  bgp.IP6AddrPrefix(128, '2001:db8::2')]),
+             bgp.BGPPathAttributeMpUnreachNLRI(
+                 afi.IP6, safi.UNICAST,
+                 [bgp.IP6AddrPrefix(64, '2001:db8:2::')])])
+        update = self._check_generic(buf)
+        eq_(None, update.msg)
+        eq_('2001:db8::1', update.mp_next_hop)
+        eq_(['2001:db8:1::/48', '2001:db8::2/128'], update.mp_nlri)
+        eq_(['2001:db8:2::/64'], update.mp_withdrawn)
+
+    def test_fallback(self):
+        # VPNv4 routes are decoded by the generic parser.
+        buf = _update(
+            [bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+             _as_path([[65001]]),
+             bgp.BGPPathAttributeMpReachNLRI(
+                 afi.IP, safi.MPLS_VPN, '10.0.0.1',
+                 [bgp.LabelledVPNIPAddrPrefix(24, '10.1.2.0', [100],
+                                              route_dist='65000:1')])])
+        update = bgp_fastpath.parse_update(buf)
+        ok_(isinstance(update.msg, bgp.BGPUpdate))
+        eq_((65001,), update.as_path)
+        eq_([], update.mp_nlri)
+
+        # Errors are the ones of the generic parser.
+        buf = bytearray(_update([_as_path([[65001]])]))
+        buf[-6] = 3  # AS_CONFED_SEQUENCE
+        self.assertRaises(struct.error, bgp_fastpath.parse_update,
+                          bytes(buf))
+
+    def test_malformed_length(self):
+        # Attributes of a wrong length are left to the generic parser.
+        def _raw_update(attrs):
+            body = struct.pack('!HH', 0, len(attrs)) + attrs
+            return (b'\xff' * 16 +
+                    struct.pack('!HB', 19 + len(body), bgp.BGP_MSG_UPDATE) +
+                    body)
+
+        origin = b'\x40\x01\x01\x00'
+        for attrs in [b'\x40\x01\x00' + b'\x80\x04\x02\x00\x02',
+                      origin + b'\x80\x04\x02\x00\x02',
+                      origin + b'\x40\x05\x02\x00\x02',
+                      origin + b'\x80\x0f\x02\x00\x02']:
+            self.assertRaises(struct.error, bgp_fastpath.parse_update,
+                              _raw_update(attrs))
+
+        update = bgp_fastpath.parse_update(
+            _raw_update(origin + b'\xc0\x08\x03\x00\x00\x01'))
+        ok_(isinstance(update.msg, bgp.BGPUpdate))
+
+    def test_as4_path(self):
+        # 2 octets AS_PATH with AS_TRANS, merged with AS4_PATH.
+        buf = _update(
+            [bgp.BGPPathAttributeAsPath([[65001, 23456, 23456]],
+                                        as_pack_str='!H'),
+             bgp.BGPPathAttributeAs4Path([[400000, 400001]])])
+        update = bgp_fastpath.parse_update(buf, as4=False)
+        ok_(update.msg is not None)
+        eq_((65001, 400000, 400001), update.as_path)
+
+        # Only the AS_PATH is used between 4 octets AS speakers.
+        update = bgp_fastpath.parse_update(
+            _update([_as_path([[65001, 400000]])]))
+        eq_(None, update.msg)
+        eq_((65001, 400000), update.as_path)
+
+    @raises(ValueError)
+    def test_not_update(self):
+        bgp_fastpath.parse_update(bytes(bgp.BGPKeepAlive().serialize()))
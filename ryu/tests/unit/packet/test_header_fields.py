@@ -0,0 +1,223 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+
+import six
+from nose.tools import eq_
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import header_fields
+from ryu.lib.packet import icmp
+from ryu.lib.packet import icmpv6
+from ryu.lib.packet import in_proto
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import lldp
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+LOG = logging.getLogger(__name__)
+
+DST_MAC = 'aa:aa:aa:aa:aa:aa'
+SRC_MAC = '08:60:6e:7f:74:e7'
+
+
+def _serialize(*protocols):
+    pkt = packet.Packet()
+    for p in protocols:
+        pkt.add_protocol(p)
+    pkt.serialize()
+    return six.binary_type(pkt.data)
+
+
+def _eth(ethertype):
+    return ethernet.ethernet(DST_MAC, SRC_MAC, ethertype)
+
+
+def _frames():
+    """Returns the list of the (frame, expected HeaderFields) tuples."""
+    return [
+        (_serialize(_eth(ether_types.ETH_TYPE_IP),
+                    ipv4.ipv4(proto=in_proto.IPPROTO_TCP,
+                              src='192.0.2.1', dst='192.0.2.2'),
+                    tcp.tcp(src_port=12345, dst_port=80), b'payload'),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_IP, None,
+             '192.0.2.1', '192.0.2.2', in_proto.IPPROTO_TCP, 12345, 80,
+             None, None, None)),
+        # With IPv4 options
+        (_serialize(_eth(ether_types.ETH_TYPE_8021Q),
+                    vlan.vlan(vid=10, ethertype=ether_types.ETH_TYPE_IP),
+                    ipv4.ipv4(proto=in_proto.IPPROTO_UDP,
+                              src='192.0.2.1', dst='192.0.2.2',
+                              header_length=6,
+                              option=b'\x01\x01\x01\x01'),
+                    udp.udp(src_port=68, dst_port=67)),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_IP, 10,
+             '192.0.2.1', '192.0.2.2', in_proto.IPPROTO_UDP, 68, 67,
+             None, None, None)),
+        (_serialize(_eth(ether_types.ETH_TYPE_8021AD),
+                    vlan.svlan(vid=100, ethertype=ether_types.ETH_TYPE_8021Q),
+                    vlan.vlan(vid=10, ethertype=ether_types.ETH_TYPE_ARP),
+                    arp.arp_ip(arp.ARP_REQUEST, SRC_MAC, '192.0.2.1',
+                               '00:00:00:00:00:00', '192.0.2.2')),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_ARP, 100,
+             None, None, None, None, None,
+             arp.ARP_REQUEST, '192.0.2.1', '192.0.2.2')),
+        (_serialize(_eth(ether_types.ETH_TYPE_IP),
+                    ipv4.ipv4(proto=in_proto.IPPROTO_ICMP,
+                              src='192.0.2.1', dst='192.0.2.2'),
+                    icmp.icmp(icmp.ICMP_ECHO_REQUEST, 0, 0,
+                              icmp.echo(1, 1, b'ping'))),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_IP, None,
+             '192.0.2.1', '192.0.2.2', in_proto.IPPROTO_ICMP,
+             icmp.ICMP_ECHO_REQUEST, 0, None, None, None)),
+        # Not the first fragment
+        (_serialize(_eth(ether_types.ETH_TYPE_IP),
+                    ipv4.ipv4(proto=in_proto.IPPROTO_UDP, offset=185,
+                              src='192.0.2.1', dst='192.0.2.2'),
+                    b'\x00\x01\x00\x02\x00\x03\x00\x04'),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_IP, None,
+             '192.0.2.1', '192.0.2.2', in_proto.IPPROTO_UDP, None, None,
+             None, None, None)),
+        # With a Hop-by-Hop Options header
+        (_serialize(_eth(ether_types.ETH_TYPE_IPV6),
+                    ipv6.ipv6(nxt=in_proto.IPPROTO_HOPOPTS,
+                              src='2001:db8::1', dst='ff02::1:ff00:2',
+                              ext_hdrs=[ipv6.hop_opts(
+                                  nxt=in_proto.IPPROTO_ICMPV6,
+                                  data=[ipv6.option(5, 2, b'\x00\x00'),
+                                        ipv6.option(1, 0)])]),
+                    icmpv6.icmpv6(icmpv6.ND_NEIGHBOR_SOLICIT, 0, 0,
+                                  icmpv6.nd_neighbor(dst='2001:db8::2'))),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_IPV6, None,
+             '2001:db8::1', 'ff02::1:ff00:2', in_proto.IPPROTO_ICMPV6,
+             icmpv6.ND_NEIGHBOR_SOLICIT, 0, None, None, None)),
+        (_serialize(_eth(ether_types.ETH_TYPE_IPV6),
+                    ipv6.ipv6(nxt=in_proto.IPPROTO_FRAGMENT,
+                              src='2001:db8::1', dst='2001:db8::2',
+                              ext_hdrs=[ipv6.fragment(
+                                  nxt=in_proto.IPPROTO_TCP)]),
+                    tcp.tcp(src_port=179, dst_port=54321)),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_IPV6, None,
+             '2001:db8::1', '2001:db8::2', in_proto.IPPROTO_TCP, 179, 54321,
+             None, None, None)),
+        (_serialize(_eth(ether_types.ETH_TYPE_IPV6),
+                    ipv6.ipv6(nxt=in_proto.IPPROTO_FRAGMENT,
+                              src='2001:db8::1', dst='2001:db8::2',
+                              ext_hdrs=[ipv6.fragment(
+                                  nxt=in_proto.IPPROTO_TCP, offset=100)]),
+                    b'\x00' * 8),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_IPV6, None,
+             '2001:db8::1', '2001:db8::2', in_proto.IPPROTO_TCP, None, None,
+             None, None, None)),
+        (_serialize(_eth(ether_types.ETH_TYPE_LLDP),
+                    lldp.lldp([lldp.ChassisID(
+                        subtype=lldp.ChassisID.SUB_LOCALLY_ASSIGNED,
+                        chassis_id=b'dpid:1'),
+                        lldp.PortID(subtype=lldp.PortID.SUB_PORT_COMPONENT,
+                                    port_id=b'\x00\x01'),
+                        lldp.TTL(ttl=120), lldp.End()])),
+         header_fields.HeaderFields(
+             DST_MAC, SRC_MAC, ether_types.ETH_TYPE_LLDP, None,
+             None, None, None, None, None, None, None, None)),
+    ]
+
+
+class Test_header_fields(unittest.TestCase):
+    """ Test case for ryu.lib.packet.header_fields
+    """
+
+    def test_extract(self):
+        for data, expected in _frames():
+            eq_(expected, header_fields.extract(data))
+            eq_(expected, header_fields.extract(bytearray(data)))
+            eq_(expected, header_fields.extract(memoryview(data)))
+
+    def test_extract_as_packet(self):
+        # The same values as the ones decoded by packet.Packet.
+        data, _ = _frames()[0]
+        fields = header_fields.extract(data)
+        pkt = packet.Packet(data)
+        eth = pkt.get_protocol(ethernet.ethernet)
+        ip = pkt.get_protocol(ipv4.ipv4)
+        l4 = pkt.get_protocol(tcp.tcp)
+        eq_((eth.dst, eth.src, eth.ethertype),
+            (fields.eth_dst, fields.eth_src, fields.eth_type))
+        eq_((ip.src, ip.dst, ip.proto),
+            (fields.ip_src, fields.ip_dst, fields.ip_proto))
+        eq_((l4.src_port, l4.dst_port), (fields.l4_src, fields.l4_dst))
+
+    def test_extract_truncated(self):
+        data, expected = _frames()[0]
+        eq_(None, header_fields.extract(data[:13]))
+        eq_(expected._replace(ip_src=None, ip_dst=None, ip_proto=None,
+                              l4_src=None, l4_dst=None),
+            header_fields.extract(data[:14 + 19]))
+        eq_(expected._replace(l4_src=None, l4_dst=None),
+            header_fields.extract(data[:14 + 20 + 3]))
+        eq_(expected, header_fields.extract(data[:14 + 20 + 4]))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_extract_batch(self):
+        frames = _frames()
+        data = [d for d, _ in frames]
+        data.insert(1, b'\x00' * 13)
+        array = header_fields.extract_batch(data)
+        eq_(len(data), len(array))
+        eq_(0, array[1]['eth_type'])
+
+        array = numpy.delete(array, 1)
+        eq_([0xaaaaaaaaaaaa] * len(frames), list(array['eth_dst']))
+        eq_([0x08606e7f74e7] * len(frames), list(array['eth_src']))
+        for row, (_, expected) in zip(array, frames):
+            eq_(expected.eth_type, row['eth_type'])
+            for name in ('vlan_vid', 'ip_proto', 'l4_src', 'l4_dst',
+                         'arp_op'):
+                value = getattr(expected, name)
+                eq_(-1 if value is None else value, row[name])
+            for name in ('ip_src', 'ip_dst'):
+                value = getattr(expected, name)
+                if value is None:
+                    value = '::'
+                elif ':' not in value:
+                    value = '::ffff:' + value
+                eq_(ipv6.ipv6(src=value).serialize(b'', None)[8:24],
+                    row[name].tobytes())
+
+        eq_(0, array[0]['arp_spa'])
+        eq_(0xc0000201, array[2]['arp_spa'])
+        eq_(0xc0000202, array[2]['arp_tpa'])
+
+        eq_(0, len(header_fields.extract_batch([])))
@@ -1551,3 +1551,56 @@ class TestPacket(unittest.TestCase):
         ok_(isinstance(pkt.protocols[0], ethernet.ethernet))
         ok_(isinstance(pkt.protocols[1], ipv4.ipv4))
         ok_(isinstance(pkt.protocols[2], udp.udp))
+
+    def _ipv4_tcp_data(self):
+        e = ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP)
+        i = ipv4.ipv4(proto=inet.IPPROTO_TCP, src=self.src_ip,
+                      dst=self.dst_ip)
+        t = tcp.tcp(self.src_port, self.dst_port)
+        pkt = e / i / t / self.payload
+        pkt.serialize()
+        return six.binary_type(pkt.data)
+
+    def test_partial_parse(self):
+        data = self._ipv4_tcp_data()
+        full = packet.Packet(data)
+        eq_(4, len(full))
+
+        pkt = packet.Packet(data, stop_at=(ipv4.ipv4, arp.arp))
+        eq_(3, len(pkt))
+        eq_(self.dst_ip, pkt.get_protocol(ipv4.ipv4).dst)
+        eq_(None, pkt.get_protocol(tcp.tcp))
+        # The rest is kept as payload.
+        eq_(data[14 + 20:], pkt[2])
+
+        pkt = packet.Packet(data, max_depth=1)
+        eq_(2, len(pkt))
+        eq_(self.src_mac, pkt.get_protocol(ethernet.ethernet).src)
+        eq_(data[14:], pkt[1])
+
+        pkt = packet.Packet(data, max_depth=0)
+        eq_([data], pkt.protocols)
+
+    def test_packet_view(self):
+        data = self._ipv4_tcp_data()
+        full = packet.Packet(data)
+        pkt = packet.PacketView(bytearray(data))
+        ok_(isinstance(pkt, packet.Packet))
+
+        # Only the headers up to IPv4 are decoded.
+        eq_(self.dst_ip, pkt.get_protocol(ipv4.ipv4).dst)
+        eq_(2, len(pkt._protocols))
+        eq_(self.src_mac, pkt[0].src)
+
+        eq_(self.dst_port, pkt.get_protocol(tcp.tcp).dst_port)
+        eq_(None, pkt.get_protocol(udp.udp))
+        eq_(str(full.protocols[:3]), str(pkt.protocols[:3]))
+        ok_(isinstance(pkt[3], memoryview))
+        eq_(self.payload, pkt[3].tobytes())
+        eq_(4, len(pkt))
+        ok_(tcp.tcp in pkt)
+        eq_([type(p) for p in full], [type(p) for p in pkt][:3] + [bytes])
+
+        # Trailing padding is ignored.
+        pkt = packet.PacketView(data + b'\x00' * 16)
+        eq_(4, len(pkt.protocols))
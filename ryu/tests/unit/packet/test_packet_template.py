@@ -0,0 +1,177 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+
+import six
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import in_proto
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import packet_template
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_PacketTemplate(unittest.TestCase):
+    """ Test case for ryu.lib.packet.packet_template.PacketTemplate
+    """
+
+    def setUp(self):
+        self.fields = {
+            'eth_dst': 'aa:aa:aa:aa:aa:aa',
+            'eth_src': '08:60:6e:7f:74:e7',
+            'vid': 10,
+            'ip_src': '192.0.2.1',
+            'ip_dst': '192.0.2.2',
+            'ip6_src': '2001:db8::1',
+            'ip6_dst': '2001:db8::2',
+            'ttl': 64,
+            'id': 1,
+            'l4_src': 12345,
+            'l4_dst': 80,
+            'payload': b'0123456789',
+        }
+
+    def _ipv4_udp(self):
+        f = self.fields
+        return [ethernet.ethernet(f['eth_dst'], f['eth_src'],
+                                  ether_types.ETH_TYPE_8021Q),
+                vlan.vlan(pcp=5, vid=f['vid'],
+                          ethertype=ether_types.ETH_TYPE_IP),
+                ipv4.ipv4(proto=in_proto.IPPROTO_UDP, ttl=f['ttl'],
+                          identification=f['id'],
+                          src=f['ip_src'], dst=f['ip_dst']),
+                udp.udp(src_port=f['l4_src'], dst_port=f['l4_dst']),
+                f['payload']]
+
+    def _ipv6_tcp(self):
+        f = self.fields
+        return [ethernet.ethernet(f['eth_dst'], f['eth_src'],
+                                  ether_types.ETH_TYPE_IPV6),
+                ipv6.ipv6(nxt=in_proto.IPPROTO_TCP, hop_limit=f['ttl'],
+                          src=f['ip6_src'], dst=f['ip6_dst']),
+                tcp.tcp(src_port=f['l4_src'], dst_port=f['l4_dst'],
+                        seq=1, bits=tcp.TCP_SYN),
+                f['payload']]
+
+    @staticmethod
+    def _serialize(protocols):
+        pkt = packet.Packet(protocols=protocols)
+        pkt.serialize()
+        return six.binary_type(pkt.data)
+
+    def _test_setters(self, build, setters):
+        template = packet_template.PacketTemplate(
+            packet.Packet(protocols=build()))
+        eq_(self._serialize(build()), template.data)
+        for setter, name, value in setters:
+            getattr(template, setter)(value)
+            self.fields[name] = value
+            eq_(self._serialize(build()), template.data)
+
+    def test_ipv4_udp(self):
+        self._test_setters(self._ipv4_udp, [
+            ('set_eth_dst', 'eth_dst', '12:34:56:78:9a:bc'),
+            ('set_eth_src', 'eth_src', '00:00:5e:00:53:01'),
+            ('set_vlan_vid', 'vid', 4000),
+            ('set_ip_src', 'ip_src', '198.51.100.10'),
+            ('set_ip_dst', 'ip_dst', '203.0.113.254'),
+            ('set_ip_ttl', 'ttl', 1),
+            ('set_ip_id', 'id', 0xfedc),
+            ('set_l4_src', 'l4_src', 68),
+            ('set_l4_dst', 'l4_dst', 67),
+            ('set_payload', 'payload', b'9876543210'),
+            # Odd length
+            ('set_payload', 'payload', b'abcdefghijk'),
+            ('set_payload', 'payload', b'ABCDEFGHIJK'),
+            ('set_payload', 'payload', b'x' * 1000),
+        ])
+
+    def test_ipv6_tcp(self):
+        self._test_setters(self._ipv6_tcp, [
+            ('set_eth_dst', 'eth_dst', '12:34:56:78:9a:bc'),
+            ('set_ip_src', 'ip6_src', 'fe80::1'),
+            ('set_ip_dst', 'ip6_dst', '2001:db8:ffff::ffff'),
+            ('set_ip_ttl', 'ttl', 255),
+            ('set_l4_src', 'l4_src', 179),
+            ('set_l4_dst', 'l4_dst', 65535),
+            ('set_payload', 'payload', b''),
+            ('set_payload', 'payload', b'x' * 101),
+        ])
+
+    def test_arp(self):
+        def build():
+            f = self.fields
+            return [ethernet.ethernet(f['eth_dst'], f['eth_src'],
+                                      ether_types.ETH_TYPE_ARP),
+                    arp.arp_ip(arp.ARP_REQUEST, f['eth_src'], f['ip_src'],
+                               '00:00:00:00:00:00', f['ip_dst'])]
+
+        self._test_setters(build, [
+            ('set_arp_src_ip', 'ip_src', '198.51.100.1'),
+            ('set_arp_dst_ip', 'ip_dst', '198.51.100.2'),
+        ])
+        template = packet_template.PacketTemplate(
+            packet.Packet(protocols=build()))
+        template.set_arp_src_mac('12:34:56:78:9a:bc')
+        template.set_arp_dst_mac('ff:ff:ff:ff:ff:ff')
+        a = packet.Packet(template.data).get_protocol(arp.arp)
+        eq_('12:34:56:78:9a:bc', a.src_mac)
+        eq_('ff:ff:ff:ff:ff:ff', a.dst_mac)
+
+    def test_padding(self):
+        # The frame is padded to 60 bytes by the ethernet serializer.
+        self.fields['payload'] = b''
+        template = packet_template.PacketTemplate(
+            packet.Packet(protocols=self._ipv4_udp()))
+        eq_(60, len(template.data))
+        eq_(b'', template.payload)
+        template.set_payload(b'x' * 20)
+        eq_(b'x' * 20, template.payload)
+        eq_(18 + 20 + 8 + 20, len(template.data))
+        template.set_payload(b'y')
+        eq_(60, len(template.data))
+        self.fields['payload'] = b'y'
+        eq_(self._serialize(self._ipv4_udp()), template.data)
+
+    def test_udp_without_checksum(self):
+        template = packet_template.PacketTemplate(
+            packet.Packet(protocols=self._ipv4_udp()))
+        # No UDP checksum, which is kept zero.
+        template.data[18 + 20 + 6:18 + 20 + 8] = b'\x00\x00'
+        template.set_ip_dst('198.51.100.1')
+        template.set_l4_dst(53)
+        template.set_payload(b'z' * 30)
+        u = packet.Packet(template.data).get_protocol(udp.udp)
+        eq_(0, u.csum)
+        eq_(8 + 30, u.total_length)
+
+    @raises(ValueError)
+    def test_missing_header(self):
+        template = packet_template.PacketTemplate(
+            packet.Packet(protocols=self._ipv6_tcp()))
+        template.set_vlan_vid(1)
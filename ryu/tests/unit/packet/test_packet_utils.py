@@ -0,0 +1,114 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import struct
+import unittest
+
+from nose.tools import eq_
+
+from ryu.lib.packet import in_proto
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet_utils
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _reference_checksum(data):
+    # Straightforward RFC1071 implementation.
+    data = bytearray(data)
+    if len(data) % 2:
+        data.append(0)
+    s = 0
+    for i in range(0, len(data), 2):
+        s += data[i] << 8 | data[i + 1]
+        s = (s & 0xffff) + (s >> 16)
+    return ~s & 0xffff
+
+
+class Test_checksum(unittest.TestCase):
+    """ Test case for ryu.lib.packet.packet_utils checksum functions
+    """
+
+    def setUp(self):
+        self.random = random.Random(1)
+
+    def _random_bytes(self, length):
+        return bytes(bytearray(self.random.randrange(256)
+                               for _ in range(length)))
+
+    def test_checksum(self):
+        for length in range(64):
+            data = self._random_bytes(length)
+            eq_(_reference_checksum(data), packet_utils.checksum(data))
+            eq_(_reference_checksum(data),
+                packet_utils.checksum(bytearray(data)))
+
+    def test_checksum_special(self):
+        for data in (b'', b'\x00' * 20, b'\x00', b'\xff\xff',
+                     b'\xff\xff\x00\x00', b'\xff',
+                     b'\x12\x34\xed\xcb', b'\x12\x34\xed'):
+            eq_(_reference_checksum(data), packet_utils.checksum(data))
+
+    def test_checksum_verify(self):
+        data = bytearray(self._random_bytes(20))
+        data[10:12] = b'\x00\x00'
+        csum = packet_utils.checksum(data)
+        struct.pack_into('!H', data, 10, csum)
+        eq_(0, packet_utils.checksum(data))
+
+    def test_checksum_update(self):
+        for _ in range(1000):
+            data = bytearray(self._random_bytes(
+                self.random.randrange(2, 64, 2)))
+            csum = packet_utils.checksum(data)
+            offset = self.random.randrange(0, len(data), 2)
+            length = self.random.randrange(2, len(data) - offset + 1, 2)
+            old = bytes(data[offset:offset + length])
+            new = self._random_bytes(length)
+            data[offset:offset + length] = new
+            if any(data):
+                eq_(packet_utils.checksum(data),
+                    packet_utils.checksum_update(csum, old, new))
+
+    def test_checksum_update_ttl(self):
+        # Decrements the TTL of an IPv4 header.
+        ip = ipv4.ipv4(ttl=64, proto=in_proto.IPPROTO_UDP,
+                       src='192.0.2.1', dst='192.0.2.2', total_length=28)
+        hdr = ip.serialize(b'', None)
+        eq_(0, packet_utils.checksum(hdr))
+        csum, = struct.unpack_from('!H', hdr, 10)
+        # TTL and protocol
+        csum = packet_utils.checksum_update(csum, b'\x40\x11', b'\x3f\x11')
+        ip.ttl = 63
+        hdr = ip.serialize(b'', None)
+        eq_(struct.unpack_from('!H', hdr, 10)[0], csum)
+
+    def test_checksum_ip(self):
+        payload = self._random_bytes(21)
+        for ip, pseudo_header in (
+                (ipv4.ipv4(proto=in_proto.IPPROTO_UDP,
+                           src='192.0.2.1', dst='192.0.2.2'),
+                 b'\xc0\x00\x02\x01\xc0\x00\x02\x02\x00\x11\x00\x15'),
+                (ipv6.ipv6(nxt=in_proto.IPPROTO_UDP,
+                           src='2001:db8::1', dst='2001:db8::2'),
+                 b'\x20\x01\x0d\xb8' + b'\x00' * 11 + b'\x01' +
+                 b'\x20\x01\x0d\xb8' + b'\x00' * 11 + b'\x02' +
+                 b'\x00\x00\x00\x15\x00\x00\x00\x11')):
+            eq_(_reference_checksum(pseudo_header + payload),
+                packet_utils.checksum_ip(ip, len(payload), payload))
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import unittest
 import logging
 try:
@@ -20,6 +21,7 @@ try:
 except ImportError:
     from unittest import mock  # Python 3
 
+from nose.tools import eq_
 from nose.tools import raises
 
 from ryu.services.protocols.bgp import bgpspeaker
@@ -1086,3 +1088,55 @@ class Test_BGPSpeaker(unittest.TestCase):
         # Check
         mock_call.assert_called_with(
             'flowspec.del_local', **expected_kwargs)
+
+    @mock.patch(
+        'ryu.services.protocols.bgp.bgpspeaker.BGPSpeaker.__init__',
+        mock.MagicMock(return_value=None))
+    @mock.patch('ryu.services.protocols.bgp.bgpspeaker.call')
+    def test_rib_lookup(self, mock_call):
+        # Test
+        speaker = bgpspeaker.BGPSpeaker(65000, '10.0.0.1')
+        speaker.rib_lookup('10.1.2.3')
+
+        # Check
+        mock_call.assert_called_with(
+            'operator.show', params=['rib', 'lookup', 'ipv4', '10.1.2.3'],
+            format='json')
+
+        # Test
+        speaker.rib_lookup('10.1.2.3', family='vpnv4',
+                           route_dist='65000:100', format='cli')
+
+        # Check
+        mock_call.assert_called_with(
+            'operator.show',
+            params=['rib', 'lookup', 'vpnv4', '10.1.2.3', '65000:100'],
+            format='cli')
+
+    @mock.patch(
+        'ryu.services.protocols.bgp.bgpspeaker.BGPSpeaker.__init__',
+        mock.MagicMock(return_value=None))
+    @mock.patch('ryu.services.protocols.bgp.bgpspeaker.call')
+    def test_rib_dump(self, mock_call):
+        # Prepare test data
+        routes = [{'prefix': '10.0.%d.0/24' % i, 'paths': []}
+                  for i in range(3)]
+        mock_call.side_effect = lambda *args, **kwargs: iter(routes)
+
+        # Test
+        speaker = bgpspeaker.BGPSpeaker(65000, '10.0.0.1')
+        eq_(routes[:2], list(speaker.rib_dump(
+            prefix='10.0.0.0/16', start_after='10.0.0.0/8', limit=2)))
+
+        # Check
+        mock_call.assert_called_with(
+            'operator.dump.rib', family='ipv4', prefix='10.0.0.0/16',
+            start_after='10.0.0.0/8')
+
+        # Test
+        chunks = list(speaker.rib_dump(
+            format=bgpspeaker.DUMP_FORMAT_JSON_LINES))
+
+        # Check
+        eq_(routes, [json.loads(line)
+                     for line in ''.join(chunks).splitlines()])
@@ -21,13 +21,25 @@ except ImportError:
     from unittest import mock  # Python 3
 
 from nose.tools import eq_
+from nose.tools import ok_
 
 from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import base
 from ryu.services.protocols.bgp import peer
+from ryu.services.protocols.bgp.core_managers.peer_manager import PeerManager
+from ryu.services.protocols.bgp.info_base.base import PrefixFilter
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.model import OutgoingRoute
+from ryu.services.protocols.bgp.utils.pattrs import intern_pattrs
 
 
 LOG = logging.getLogger(__name__)
 
+PATTRS = {
+    bgp.BGP_ATTR_TYPE_ORIGIN:
+    bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+}
+
 
 class Test_Peer(unittest.TestCase):
     """
@@ -373,3 +385,108 @@ class Test_Peer(unittest.TestCase):
         self._test_extract_and_reconstruct_as_path(
             path_attributes, ex_as_path_value,
             ex_aggregator_as_number, ex_aggregator_addr)
+
+    @mock.patch.object(
+        peer.Peer, '__init__', mock.MagicMock(return_value=None))
+    def test_outgoing_withdrawals_first(self):
+        _peer = peer.Peer(None, None, None, None, None)
+        base.Sink.__init__(_peer)
+        _peer.clear_outgoing_msg_list()
+
+        def _route(prefix, is_withdraw=False):
+            nlri = bgp.IPAddrPrefix(24, prefix)
+            return OutgoingRoute(Ipv4Path(
+                None, nlri, 0, pattrs=PATTRS, nexthop='10.0.0.1',
+                is_withdraw=is_withdraw))
+
+        queued = [
+            _route('10.1.1.0'),
+            _route('10.1.2.0'),
+            bgp.BGPUpdate(),  # End-of-RIB
+            _route('10.1.3.0'),
+            _route('10.1.1.0', is_withdraw=True),
+        ]
+        for msg in queued:
+            _peer.enque_outgoing_msg(msg)
+
+        # The announcement of 10.1.1.0/24 is cancelled by its withdrawal.
+        for msg in [queued[4], queued[1], queued[2], queued[3], None]:
+            eq_(msg, _peer._pop_outgoing_msg())
+        eq_({}, _peer._queued_routes)
+
+    @mock.patch.object(
+        peer.Peer, '__init__', mock.MagicMock(return_value=None))
+    def test_update_group(self):
+        peer_manager = PeerManager(mock.MagicMock(), None)
+        peers = []
+        for _ in range(3):
+            _peer = peer.Peer(None, None, None, None, None)
+            _peer._neigh_conf = mock.MagicMock(is_route_server_client=True)
+            _peer._peer_manager = peer_manager
+            _peer._out_filters = [
+                PrefixFilter('10.1.0.0/16', PrefixFilter.POLICY_DENY)]
+            _peer._attribute_maps = {}
+            _peer._update_group = None
+            _peer._adj_rib_out = mock.MagicMock()
+            peers.append(_peer)
+
+        group = peers[0]._get_update_group()
+        eq_([group] * 3, [_peer._get_update_group() for _peer in peers])
+        # Same prefix, other policy.
+        peers[2].out_filters = [
+            PrefixFilter('10.1.0.0/16', PrefixFilter.POLICY_PERMIT)]
+        ok_(group is not peers[2]._get_update_group())
+        eq_(set(peers[:2]), set(group.members))
+
+        # The UPDATE message of a path is built once for the group.
+        path = Ipv4Path(None, bgp.IPAddrPrefix(24, '10.2.1.0'), 0,
+                        pattrs=PATTRS, nexthop='10.0.0.1')
+        with mock.patch.object(peer.Peer, '_construct_update',
+                               return_value=bgp.BGPUpdate(
+                                   withdrawn_routes=[path.nlri])) as m:
+            results = [_peer._get_update_group().encode(
+                path, _peer._encode_path) for _peer in peers]
+        eq_(2, m.call_count)
+        eq_(results[0], results[1])
+        eq_(False, results[0][0])
+        eq_(1, len(results[0][2].prefixes))
+
+    @mock.patch.object(
+        peer.Peer, '__init__', mock.MagicMock(return_value=None))
+    def test_construct_update_soo(self):
+        _peer = peer.Peer(None, None, None, None, None)
+        _peer._neigh_conf = mock.MagicMock(
+            is_route_server_client=False, is_route_reflector_client=False,
+            soo_list=['65000:1', '10.0.0.1:2'], multi_exit_disc=None)
+        _peer._common_conf = mock.MagicMock(local_as=65000)
+        _peer._attribute_maps = {}
+        _peer.is_ebgp_peer = mock.MagicMock(return_value=True)
+        _peer.is_four_octet_as_number_cap_valid = mock.MagicMock(
+            return_value=True)
+
+        rt = bgp.BGPTwoOctetAsSpecificExtendedCommunity(
+            subtype=0x02, as_number=65001, local_administrator=100)
+        pattrs = intern_pattrs({
+            bgp.BGP_ATTR_TYPE_ORIGIN:
+            bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+            bgp.BGP_ATTR_TYPE_AS_PATH:
+            bgp.BGPPathAttributeAsPath([[65001]]),
+            bgp.BGP_ATTR_TYPE_EXTENDED_COMMUNITIES:
+            bgp.BGPPathAttributeExtendedCommunities(communities=[rt]),
+        })
+        extcomm = pattrs[bgp.BGP_ATTR_TYPE_EXTENDED_COMMUNITIES]
+        path = Ipv4Path(None, bgp.IPAddrPrefix(24, '10.2.1.0'), 0,
+                        pattrs=pattrs, nexthop='10.0.0.1')
+
+        # The same path sent twice gets the SOO communities once, and
+        # the interned attribute shared with the other paths is kept.
+        for _ in range(2):
+            update = _peer._construct_update(OutgoingRoute(path))
+            eq_([(2, 65001, 100), (3, 65000, 1), (3, '10.0.0.1', 2)],
+                [(c.subtype, getattr(c, 'as_number', None) or
+                  c.ipv4_address, c.local_administrator)
+                 for c in update.get_path_attr(
+                     bgp.BGP_ATTR_TYPE_EXTENDED_COMMUNITIES).communities])
+        eq_([rt], extcomm.communities)
+        ok_(extcomm is path.get_pattr(
+            bgp.BGP_ATTR_TYPE_EXTENDED_COMMUNITIES))
@@ -0,0 +1,222 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import processor
+from ryu.services.protocols.bgp.info_base.ipv4 import IPv4Dest
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+
+
+LOG = logging.getLogger(__name__)
+
+LOCAL_ASN = 65000
+
+
+def _peer(remote_as, router_id):
+    peer = mock.MagicMock()
+    peer.version_num = 1
+    peer.remote_as = remote_as
+    peer.protocol.sent_open_msg.bgp_identifier = '10.0.0.1'
+    peer.protocol.recv_open_msg.bgp_identifier = router_id
+    return peer
+
+
+def _path(source, as_path=None, local_pref=None, med=None,
+          origin=bgp.BGP_ATTR_ORIGIN_IGP):
+    pattrs = {
+        bgp.BGP_ATTR_TYPE_ORIGIN: bgp.BGPPathAttributeOrigin(origin),
+        bgp.BGP_ATTR_TYPE_AS_PATH: bgp.BGPPathAttributeAsPath(
+            [as_path or []]),
+    }
+    if local_pref is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_LOCAL_PREF] = \
+            bgp.BGPPathAttributeLocalPref(local_pref)
+    if med is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+            bgp.BGPPathAttributeMultiExitDisc(med)
+    return Ipv4Path(source, bgp.IPAddrPrefix(24, '192.168.0.0'), 1,
+                    pattrs=pattrs, nexthop='10.0.0.2')
+
+
+class Test_BestPath(unittest.TestCase):
+    """ Test case for best path selection in
+    ryu.services.protocols.bgp.processor
+    """
+
+    def _test_compute_best_path(self, path1, path2, best, reason):
+        eq_((best, reason),
+            processor.compute_best_path(LOCAL_ASN, path1, path2))
+
+    def test_local_pref(self):
+        path1 = _path(_peer(LOCAL_ASN, '10.0.0.2'), [1, 2], local_pref=200)
+        path2 = _path(_peer(LOCAL_ASN, '10.0.0.3'), [1], local_pref=100)
+        self._test_compute_best_path(path1, path2, path1,
+                                     processor.BPR_LOCAL_PREF)
+
+    def test_local_origin(self):
+        path1 = _path(_peer(65001, '10.0.0.2'))
+        path2 = _path(None)
+        self._test_compute_best_path(path1, path2, path2,
+                                     processor.BPR_LOCAL_ORIGIN)
+
+    def test_as_path(self):
+        path1 = _path(_peer(65001, '10.0.0.2'), [65001, 1])
+        path2 = _path(_peer(65002, '10.0.0.3'), [65002])
+        self._test_compute_best_path(path1, path2, path2,
+                                     processor.BPR_ASPATH)
+
+    def test_origin(self):
+        path1 = _path(_peer(65001, '10.0.0.2'), [65001],
+                      origin=bgp.BGP_ATTR_ORIGIN_INCOMPLETE)
+        path2 = _path(_peer(65002, '10.0.0.3'), [65002],
+                      origin=bgp.BGP_ATTR_ORIGIN_EGP)
+        self._test_compute_best_path(path1, path2, path2,
+                                     processor.BPR_ORIGIN)
+
+    def test_med(self):
+        path1 = _path(_peer(65001, '10.0.0.2'), [65001], med=10)
+        path2 = _path(_peer(65002, '10.0.0.3'), [65002])
+        self._test_compute_best_path(path1, path2, path2, processor.BPR_MED)
+
+    def test_asn(self):
+        path1 = _path(_peer(LOCAL_ASN, '10.0.0.2'), [65001])
+        path2 = _path(_peer(65002, '10.0.0.3'), [65002])
+        self._test_compute_best_path(path1, path2, path2, processor.BPR_ASN)
+
+    def test_router_id(self):
+        path1 = _path(_peer(LOCAL_ASN, '10.0.0.20'), [65001])
+        path2 = _path(_peer(LOCAL_ASN, '10.0.0.3'), [65002])
+        self._test_compute_best_path(path1, path2, path2,
+                                     processor.BPR_ROUTER_ID)
+
+    def test_ebgp_no_router_id(self):
+        path1 = _path(_peer(65001, '10.0.0.20'), [65001])
+        path2 = _path(_peer(65002, '10.0.0.3'), [65002])
+        self._test_compute_best_path(path1, path2, None,
+                                     processor.BPR_UNKNOWN)
+
+    def test_key_cached(self):
+        path = _path(_peer(65001, '10.0.0.2'), [65001])
+        key = processor.get_best_path_key(LOCAL_ASN, path)
+        ok_(key is processor.get_best_path_key(LOCAL_ASN, path))
+        eq_(1, key.as_path_len)
+        ok_(key is not processor.get_best_path_key(65001, path))
+
+    def test_select_best_path(self):
+        paths = [_path(_peer(65001, '10.0.0.2'), [65001, 1, 2]),
+                 _path(_peer(65002, '10.0.0.3'), [65002]),
+                 _path(_peer(65003, '10.0.0.4'), [65003, 1])]
+        eq_((paths[1], processor.BPR_ASPATH),
+            processor.select_best_path(LOCAL_ASN, paths))
+
+        # Only the new paths are compared with the given best path.
+        new_path = _path(_peer(65004, '10.0.0.5'), [65004], med=10)
+        eq_((paths[1], processor.BPR_MED),
+            processor.select_best_path(LOCAL_ASN, [new_path], paths[1]))
+        new_path = _path(_peer(65004, '10.0.0.5'), [])
+        eq_((new_path, processor.BPR_ASPATH),
+            processor.select_best_path(LOCAL_ASN, [new_path], paths[1]))
+
+    def _med_cycle(self):
+        # a is preferred to c by LOCAL_PREF, c to b and b to a by MED, as
+        # LOCAL_PREF is not compared when b does not have it.
+        a = _path(_peer(65001, '10.0.0.2'), [65001], local_pref=200, med=20)
+        b = _path(_peer(65002, '10.0.0.3'), [65002], med=10)
+        c = _path(_peer(65003, '10.0.0.4'), [65003], local_pref=100, med=5)
+        d = _path(_peer(65004, '10.0.0.5'), [65004], med=30)
+        return a, b, c, d
+
+    def test_select_new_best_path(self):
+        a, b, c, d = self._med_cycle()
+        known = [c, a, b, d]
+        best, _ = processor.select_best_path(LOCAL_ASN, known[:3])
+        ok_(best is b)
+        eq_((None, None),
+            processor.select_new_best_path(LOCAL_ASN, best, [d], known))
+
+        # Decided by AS_PATH, which orders the paths transitively, and
+        # none of the paths has LOCAL_PREF.
+        e = _path(_peer(65005, '10.0.0.6'), [])
+        eq_((e, processor.BPR_ASPATH),
+            processor.select_new_best_path(LOCAL_ASN, b, [e], [b, d, e]))
+        eq_((None, None),
+            processor.select_new_best_path(LOCAL_ASN, b, [e], [a, b, e]))
+
+    def test_incremental_and_full_selection(self):
+        # Incremental selection in a destination selects the same best path
+        # as the full selection.
+        a, b, c, d = self._med_cycle()
+        table = mock.MagicMock(route_family=bgp.RF_IPv4_UC)
+        table.core_service.asn = LOCAL_ASN
+        dest = IPv4Dest(table, a.nlri)
+
+        def _process():
+            best, _ = dest._process_paths()
+            dest._best_path = best
+            eq_(processor.select_best_path(LOCAL_ASN,
+                                           dest.known_path_list)[0], best)
+            return best
+
+        for path in (c, a, b):
+            dest.add_new_path(path)
+        ok_(_process() is b)
+
+        # Once a is withdrawn, c is preferred to b by the MED.
+        dest.add_withdraw(a.clone(for_withdrawal=True))
+        dest.add_new_path(d)
+        ok_(_process() is c)
+
+        e = _path(_peer(65005, '10.0.0.6'), [])
+        dest.add_new_path(e)
+        ok_(_process() is e)
+
+
+class Test_BgpProcessor(unittest.TestCase):
+    """ Test case for ryu.services.protocols.bgp.processor.BgpProcessor
+    """
+
+    def test_process_dest_time_budget(self):
+        bgp_processor = processor.BgpProcessor(mock.MagicMock(),
+                                               time_per_cycle=0.01)
+        processed = []
+
+        class _Dest(object):
+            route_family = bgp.RF_IPv4_UC
+
+            def __init__(self, i):
+                self.i = i
+
+            def process(self):
+                processed.append(self.i)
+
+        for i in range(5):
+            bgp_processor.enqueue(_Dest(i))
+
+        with mock.patch.object(bgp_processor, '_clock',
+                               side_effect=[0, 0, 0, 0.02]):
+            bgp_processor._process_dest()
+        eq_([0, 1, 2], processed)
+        bgp_processor._process_dest()
+        eq_([0, 1, 2, 3, 4], processed)
@@ -0,0 +1,107 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import speaker
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _updates(count):
+    msgs = []
+    for i in range(count):
+        msgs.append(bgp.BGPUpdate(
+            path_attributes=[
+                bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+                bgp.BGPPathAttributeAsPath([[65001]]),
+                bgp.BGPPathAttributeNextHop('10.0.0.1'),
+            ],
+            nlri=[bgp.IPAddrPrefix(24, '10.%d.%d.0' % (i // 256, i % 256))]))
+    return msgs
+
+
+class _Socket(object):
+    # Returns the given data in reads of at most read_size bytes.
+
+    def __init__(self, data, read_size):
+        self._data = memoryview(data)
+        self._read_size = read_size
+
+    def recv_into(self, buf):
+        size = min(len(buf), len(self._data), self._read_size)
+        buf[:size] = self._data[:size]
+        self._data = self._data[size:]
+        return size
+
+
+class Test_BgpProtocol(unittest.TestCase):
+    """ Test case for ryu.services.protocols.bgp.speaker.BgpProtocol
+    """
+
+    def setUp(self):
+        sock = mock.MagicMock()
+        sock.getpeername.return_value = ('10.0.0.2', 179)
+        sock.getsockname.return_value = ('10.0.0.1', 12345)
+        self.protocol = speaker.BgpProtocol(sock, mock.MagicMock())
+        self.received = []
+        self.protocol._handle_msg = self.received.append
+
+    def _check_received(self, msgs):
+        eq_([bytes(msg.serialize()) for msg in msgs],
+            [bytes(msg.serialize()) for msg in self.received])
+
+    def test_data_received(self):
+        msgs = _updates(1000) + [bgp.BGPKeepAlive()]
+        data = b''.join(bytes(msg.serialize()) for msg in msgs)
+        # Feed the data in pieces which do not match message boundaries.
+        for i in range(0, len(data), 777):
+            self.protocol.data_received(data[i:i + 777])
+        self._check_received(msgs)
+
+        # Larger than the receive buffer at once.
+        del self.received[:]
+        self.protocol.data_received(data)
+        self._check_received(msgs)
+        eq_(0, self.protocol._recv_tail - self.protocol._recv_head)
+
+    def test_recv_loop(self):
+        msgs = _updates(1000)
+        data = b''.join(bytes(msg.serialize()) for msg in msgs)
+        for read_size in (1, 100, 5000, len(data)):
+            del self.received[:]
+            self.protocol._socket = _Socket(data, read_size)
+            self.protocol.connection_lost = mock.MagicMock()
+            with mock.patch.object(speaker.hub, 'sleep'):
+                self.protocol._recv_loop()
+            self._check_received(msgs)
+            self.protocol.connection_lost.assert_called_once_with(
+                'Peer closed connection')
+
+    @raises(bgp.NotSync)
+    def test_invalid_marker(self):
+        data = bytearray(bgp.BGPKeepAlive().serialize())
+        data[0] = 0
+        self.protocol.data_received(bytes(data))
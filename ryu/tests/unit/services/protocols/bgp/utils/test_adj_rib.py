@@ -0,0 +1,163 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import peer
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Path
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
+from ryu.services.protocols.bgp.model import ReceivedRoute
+from ryu.services.protocols.bgp.utils.adj_rib import AdjRib
+
+
+LOG = logging.getLogger(__name__)
+
+PATTRS = {
+    bgp.BGP_ATTR_TYPE_ORIGIN:
+    bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+}
+
+
+def _paths(source):
+    return [
+        Ipv4Path(source, bgp.IPAddrPrefix(24, '10.1.2.0'), 0,
+                 pattrs=PATTRS, nexthop='10.0.0.1'),
+        Ipv4Path(source, bgp.IPAddrPrefix(16, '10.1.0.0'), 0,
+                 pattrs=PATTRS, nexthop='10.0.0.1'),
+        Ipv6Path(source, bgp.IP6AddrPrefix(48, '2001:db8:1::'), 0,
+                 pattrs=PATTRS, nexthop='2001:db8::1'),
+        Vpnv4Path(source, bgp.LabelledVPNIPAddrPrefix(
+            24, '10.1.2.0', [100], route_dist='65000:1'), 0,
+            pattrs=PATTRS, nexthop='10.0.0.1'),
+    ]
+
+
+class Test_AdjRib(unittest.TestCase):
+    """ Test case for ryu.services.protocols.bgp.utils.adj_rib
+    """
+
+    def setUp(self):
+        self.peer = mock.MagicMock()
+        self.rib = AdjRib(ReceivedRoute, self.peer)
+        self.paths = _paths(self.peer)
+
+    def test_add(self):
+        for path in self.paths:
+            route = self.rib.add(path, path.nlri.length == 16)
+            ok_(isinstance(route, ReceivedRoute))
+            eq_(path, route.path)
+            eq_(self.peer, route.received_peer)
+        eq_(len(self.paths), len(self.rib))
+
+        nlri_strs = ['10.1.2.0/24', '10.1.0.0/16', '2001:db8:1::/48',
+                     '65000:1:10.1.2.0/24']
+        eq_(sorted(nlri_strs), sorted(self.rib.keys()))
+        for path, nlri_str in zip(self.paths, nlri_strs):
+            ok_(nlri_str in self.rib)
+            route = self.rib[nlri_str]
+            eq_(path, route.path)
+            eq_(path.nlri.length == 16, route.filtered)
+            eq_(6, len(route.timestamp[:6]))
+        eq_(None, self.rib.get('10.1.3.0/24'))
+        ok_('65000:2:10.1.2.0/24' not in self.rib)
+        eq_(dict((k, v.path) for k, v in self.rib.items()),
+            dict(zip(nlri_strs, self.paths)))
+
+        # Replaces the route to the same prefix.
+        path = Ipv4Path(self.peer, bgp.IPAddrPrefix(24, '10.1.2.0'), 1,
+                        pattrs=PATTRS, nexthop='10.0.0.2')
+        self.rib.add(path)
+        eq_(len(self.paths), len(self.rib))
+        eq_(path, self.rib['10.1.2.0/24'].path)
+
+    def test_remove(self):
+        for path in self.paths:
+            self.rib.add(path)
+        for path in self.paths:
+            ok_(self.rib.remove(path.nlri))
+            ok_(not self.rib.remove(path.nlri))
+        eq_(0, len(self.rib))
+        eq_([], list(self.rib))
+
+    def test_set_filtered(self):
+        for path in self.paths:
+            self.rib.add(path, False)
+        self.rib.set_filtered(self.paths[2].nlri, True)
+        eq_([False, False, True, False],
+            [filtered for _, filtered in self.rib.paths()])
+
+    @raises(KeyError)
+    def test_set_filtered_missing(self):
+        self.rib.set_filtered(self.paths[0].nlri, True)
+
+
+class Test_PeerWithoutAdjRibIn(unittest.TestCase):
+    """ Test case for the peer.Peer not keeping an Adj-RIB-In
+    """
+
+    @mock.patch.object(
+        peer.Peer, '__init__', mock.MagicMock(return_value=None))
+    def setUp(self):
+        self.peer = peer.Peer(None, None, None, None, None)
+        self.peer._adj_rib_in = None
+        self.peer._core_service = mock.MagicMock()
+        self.peer._signal_bus = mock.MagicMock()
+        self.peer.version_num = 0
+        self.tm = self.peer._core_service.table_manager
+
+    def test_received_path(self):
+        path = _paths(self.peer)[0]
+        self.peer._received_path(path, False)
+        eq_(1, self.peer._signal_bus.adj_rib_in_changed.call_count)
+        eq_(0, self.tm.learn_path.call_count)
+        eq_(0, len(self.peer.adj_rib_in))
+
+        # A blocked path withdraws the one previously learned.
+        self.peer._received_path(path, True)
+        eq_(1, self.tm.learn_path.call_count)
+        withdraw = self.tm.learn_path.call_args[0][0]
+        ok_(withdraw.is_withdraw)
+        eq_(path.nlri, withdraw.nlri)
+
+    def test_in_filter_update(self):
+        paths = _paths(self.peer)
+        dest = mock.MagicMock(known_path_list=paths[:2])
+        table = mock.MagicMock()
+        table.values.return_value = [dest]
+        self.tm.global_tables = {bgp.RF_IPv4_UC: table}
+        self.peer._in_filters = []
+        self.peer.in_established = mock.MagicMock(return_value=True)
+        self.peer.request_route_refresh = mock.MagicMock()
+
+        # Only 10.1.2.0/24 is blocked by the new filter.
+        self.peer._apply_in_filter = lambda path: (
+            path.nlri.length == 24, None)
+        self.peer.on_update_in_filter()
+        eq_(1, self.tm.learn_path.call_count)
+        withdraw = self.tm.learn_path.call_args[0][0]
+        ok_(withdraw.is_withdraw)
+        eq_(paths[0].nlri, withdraw.nlri)
+        self.peer.request_route_refresh.assert_called_once_with()
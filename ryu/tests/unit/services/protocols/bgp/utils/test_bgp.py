@@ -17,8 +17,9 @@
 import logging
 import unittest
 
-from nose.tools import eq_, raises
+from nose.tools import eq_, ok_, raises
 
+from ryu.lib.packet import bgp
 from ryu.lib.packet.bgp import (
     BGPFlowSpecTrafficRateCommunity,
     BGPFlowSpecTrafficActionCommunity,
@@ -32,6 +33,8 @@ from ryu.services.protocols.bgp.core import BgpCoreError
 from ryu.services.protocols.bgp.utils.bgp import create_v4flowspec_actions
 from ryu.services.protocols.bgp.utils.bgp import create_v6flowspec_actions
 from ryu.services.protocols.bgp.utils.bgp import create_l2vpnflowspec_actions
+from ryu.services.protocols.bgp.utils.bgp import encode_update
+from ryu.services.protocols.bgp.utils.bgp import UpdatePacker
 
 
 LOG = logging.getLogger(__name__)
@@ -209,3 +212,80 @@ class Test_Utils_BGP(unittest.TestCase):
         }
         expected_communities = []
         self._test_create_l2vpnflowspec_actions(actions, expected_communities)
+
+    def _ipv4_update(self, i, med=0):
+        pattrs = [
+            bgp.BGPPathAttributeOrigin(value=bgp.BGP_ATTR_ORIGIN_IGP),
+            bgp.BGPPathAttributeAsPath(value=[[65001]]),
+            bgp.BGPPathAttributeNextHop(value='10.0.0.1'),
+            bgp.BGPPathAttributeMultiExitDisc(value=med),
+        ]
+        nlri = bgp.IPAddrPrefix(24, '10.%d.%d.0' % (i // 256, i % 256))
+        return bgp.BGPUpdate(path_attributes=pattrs, nlri=[nlri])
+
+    def _ipv6_update(self, i):
+        nlri = bgp.IP6AddrPrefix(64, '2001:db8:%x::' % i)
+        pattrs = [
+            bgp.BGPPathAttributeMpReachNLRI(
+                afi=bgp.RF_IPv6_UC.afi, safi=bgp.RF_IPv6_UC.safi,
+                next_hop='2001:db8::1', nlri=[nlri]),
+            bgp.BGPPathAttributeOrigin(value=bgp.BGP_ATTR_ORIGIN_IGP),
+            bgp.BGPPathAttributeAsPath(value=[[65001]]),
+        ]
+        return bgp.BGPUpdate(path_attributes=pattrs)
+
+    def test_update_packer(self):
+        packer = UpdatePacker(4096)
+        ready = []
+        for i in range(2000):
+            ready.extend(packer.add(self._ipv4_update(i, med=i % 2)))
+            ready.extend(packer.add(self._ipv6_update(i)))
+        ready.extend(packer.add(
+            bgp.BGPUpdate(withdrawn_routes=[bgp.IPAddrPrefix(8, '20.0.0.0')])))
+        ready.extend(packer.flush())
+        eq_([], packer.flush())
+
+        prefixes = {'ipv4': [], 'ipv6': [], 'withdrawn': []}
+        for update in ready:
+            buf = update.serialize()
+            ok_(len(buf) <= 4096)
+            msg, _, _ = bgp.BGPMessage.parser(bytes(buf))
+            mp_reach = msg.get_path_attr(bgp.BGP_ATTR_TYPE_MP_REACH_NLRI)
+            if mp_reach:
+                prefixes['ipv6'].extend(n.prefix for n in mp_reach.nlri)
+            elif msg.nlri:
+                # Only the prefixes with the same MED are packed together.
+                med = msg.get_path_attr(bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC)
+                eq_(set([med.value]),
+                    set(int(n.prefix.split('.')[2]) % 2 for n in msg.nlri))
+                prefixes['ipv4'].extend(n.prefix for n in msg.nlri)
+            else:
+                prefixes['withdrawn'].extend(
+                    n.prefix for n in msg.withdrawn_routes)
+
+        eq_(2000, len(set(prefixes['ipv4'])))
+        eq_(2000, len(set(prefixes['ipv6'])))
+        eq_(['20.0.0.0/8'], prefixes['withdrawn'])
+        # 4 bytes per IPv4 prefix and 9 bytes per IPv6 prefix.
+        ok_(len(ready) <= 2 + 2 + 5 + 1)
+
+    def test_encode_update(self):
+        updates = [
+            self._ipv4_update(1),
+            self._ipv6_update(1),
+            bgp.BGPUpdate(withdrawn_routes=[bgp.IPAddrPrefix(8, '20.0.0.0')]),
+            bgp.BGPUpdate(path_attributes=[
+                bgp.BGPPathAttributeMpUnreachNLRI(
+                    afi=bgp.RF_IPv6_UC.afi, safi=bgp.RF_IPv6_UC.safi,
+                    withdrawn_routes=[bgp.IP6AddrPrefix(64, '2001:db8::')])]),
+        ]
+        for update in updates:
+            encoded = encode_update(update)
+            eq_(1, len(encoded.prefixes))
+            # The same encoded update can be packed several times.
+            for _ in range(2):
+                packer = UpdatePacker(4096)
+                ready = packer.add(encoded) + packer.flush()
+                eq_(1, len(ready))
+                eq_(1, ready[0].prefix_count)
+                eq_(bytes(update.serialize()), bytes(ready[0].serialize()))
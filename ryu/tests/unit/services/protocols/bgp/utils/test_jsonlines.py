@@ -0,0 +1,43 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import unittest
+
+from nose.tools import eq_
+
+from ryu.services.protocols.bgp.utils.jsonlines import encode_json_lines
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_JsonLines(unittest.TestCase):
+    """ Test case for ryu.services.protocols.bgp.utils.jsonlines
+    """
+
+    def test_encode_json_lines(self):
+        items = [{'prefix': '10.0.%d.0/24' % i, 'paths': []}
+                 for i in range(5)]
+        chunks = list(encode_json_lines(iter(items), lines_per_chunk=2))
+        eq_(3, len(chunks))
+        for chunk in chunks:
+            eq_('\n', chunk[-1])
+        eq_(items, [json.loads(line)
+                    for line in ''.join(chunks).splitlines()])
+
+    def test_encode_json_lines_empty(self):
+        eq_([], list(encode_json_lines([])))
@@ -0,0 +1,111 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import logging
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.utils.pattrs import PathAttrPool
+from ryu.services.protocols.bgp.utils.pattrs import PathAttrSet
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _update_pattrs(as_path=None, communities=None):
+    # Parses an UPDATE like the peer does, to get fresh attribute objects.
+    pattrs = [
+        bgp.BGPPathAttributeOrigin(value=bgp.BGP_ATTR_ORIGIN_IGP),
+        bgp.BGPPathAttributeAsPath(value=as_path or [[65001, 65002]]),
+        bgp.BGPPathAttributeNextHop(value='10.0.0.1'),
+        bgp.BGPPathAttributeCommunities(communities=communities or [100]),
+    ]
+    buf = bgp.BGPUpdate(path_attributes=pattrs,
+                        nlri=[bgp.IPAddrPrefix(24, '192.168.0.0')]).serialize()
+    msg, _, _ = bgp.BGPMessage.parser(buf)
+    return msg.pathattr_map
+
+
+class Test_PathAttrPool(unittest.TestCase):
+    """ Test case for ryu.services.protocols.bgp.utils.pattrs
+    """
+
+    def setUp(self):
+        self.pool = PathAttrPool()
+
+    def test_intern_same(self):
+        pattrs1 = _update_pattrs()
+        pattrs2 = _update_pattrs()
+        ok_(pattrs1[bgp.BGP_ATTR_TYPE_AS_PATH] is not
+            pattrs2[bgp.BGP_ATTR_TYPE_AS_PATH])
+
+        set1 = self.pool.intern(pattrs1)
+        set2 = self.pool.intern(pattrs2)
+        ok_(isinstance(set1, PathAttrSet))
+        ok_(set1 is set2)
+        ok_(set1 is self.pool.intern(set1))
+        eq_(1, len(self.pool))
+        eq_(4, self.pool.attr_count)
+        eq_(sorted(pattrs1.keys()), list(set1.keys()))
+
+    def test_intern_different(self):
+        set1 = self.pool.intern(_update_pattrs(communities=[100]))
+        set2 = self.pool.intern(_update_pattrs(communities=[200]))
+        ok_(set1 is not set2)
+        ok_(set1 != set2)
+        eq_(2, len(self.pool))
+        # Only COMMUNITIES differs.
+        eq_(5, self.pool.attr_count)
+        ok_(set1[bgp.BGP_ATTR_TYPE_AS_PATH] is
+            set2[bgp.BGP_ATTR_TYPE_AS_PATH])
+
+    def test_intern_excludes_mp_reach_nlri(self):
+        pattrs = _update_pattrs()
+        pattrs[bgp.BGP_ATTR_TYPE_MP_REACH_NLRI] = \
+            bgp.BGPPathAttributeMpReachNLRI(
+                afi=bgp.RF_IPv6_UC.afi, safi=bgp.RF_IPv6_UC.safi,
+                next_hop='2001:db8::1',
+                nlri=[bgp.IP6AddrPrefix(64, '2001:db8:1::')])
+        pattr_set = self.pool.intern(pattrs)
+        ok_(bgp.BGP_ATTR_TYPE_MP_REACH_NLRI not in pattr_set)
+        ok_(pattr_set is self.pool.intern(_update_pattrs()))
+
+    def test_release(self):
+        pattr_set = self.pool.intern(_update_pattrs())
+        eq_(1, len(self.pool))
+        del pattr_set
+        gc.collect()
+        eq_(0, len(self.pool))
+        eq_(0, self.pool.attr_count)
+
+    def test_path(self):
+        pattr_set = self.pool.intern(_update_pattrs())
+        path = Ipv4Path(None, bgp.IPAddrPrefix(24, '192.168.0.0'), 0,
+                        pattrs=pattr_set, nexthop='10.0.0.1')
+        ok_(path.get_pattr(bgp.BGP_ATTR_TYPE_AS_PATH) is
+            pattr_set[bgp.BGP_ATTR_TYPE_AS_PATH])
+        ok_(path.clone().get_pattr(bgp.BGP_ATTR_TYPE_AS_PATH) is
+            pattr_set[bgp.BGP_ATTR_TYPE_AS_PATH])
+
+        # pathattr_map is still a copy which can be modified.
+        pathattr_map = path.pathattr_map
+        del pathattr_map[bgp.BGP_ATTR_TYPE_AS_PATH]
+        ok_(bgp.BGP_ATTR_TYPE_AS_PATH in pattr_set)
+        eq_(dict(pattr_set), dict(path.pathattr_map))
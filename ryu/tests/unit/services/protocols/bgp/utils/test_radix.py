@@ -0,0 +1,274 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import netaddr
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Table
+from ryu.services.protocols.bgp.info_base.ipv4fs import IPv4FlowSpecTable
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Table
+from ryu.services.protocols.bgp.utils.radix import RadixTree
+
+
+LOG = logging.getLogger(__name__)
+
+PATTRS = {
+    bgp.BGP_ATTR_TYPE_ORIGIN:
+    bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+}
+
+PREFIXES = [
+    '0.0.0.0/0',
+    '10.0.0.0/8',
+    '10.1.0.0/16',
+    '10.1.2.0/24',
+    '10.1.3.0/24',
+    '10.128.0.0/9',
+    '192.168.0.0/24',
+    '192.168.0.1/32',
+]
+
+
+class Test_RadixTree(unittest.TestCase):
+    """ Test case for ryu.services.protocols.bgp.utils.radix
+    """
+
+    def setUp(self):
+        self.tree = RadixTree(32)
+        for prefix in PREFIXES:
+            self.tree[prefix] = prefix
+
+    def test_get(self):
+        eq_(len(PREFIXES), len(self.tree))
+        for prefix in PREFIXES:
+            eq_(prefix, self.tree[prefix])
+        ok_('10.1.0.0/16' in self.tree)
+        # Host bits are ignored.
+        eq_('10.1.0.0/16', self.tree.get('10.1.2.3/16'))
+        ok_('10.0.0.0/16' not in self.tree)
+        ok_('10.0.0.0/7' not in self.tree)
+        eq_(None, self.tree.get('11.0.0.0/8'))
+
+    @raises(KeyError)
+    def test_getitem_missing(self):
+        self.tree['10.1.0.0/17']
+
+    @raises(ValueError)
+    def test_invalid_prefix(self):
+        self.tree['10.0.0.0/33'] = None
+
+    def test_iter(self):
+        eq_(PREFIXES, list(self.tree))
+        eq_(PREFIXES, list(self.tree.values()))
+
+    def test_start_after(self):
+        for i, prefix in enumerate(PREFIXES):
+            eq_(PREFIXES[i + 1:], list(self.tree.values(prefix)))
+        eq_(PREFIXES[3:], [p for p, _ in self.tree.items('10.1.1.0/24')])
+        eq_(['10.1.3.0/24'],
+            [p for p, _ in self.tree.covered('10.1.0.0/16', '10.1.2.0/24')])
+        eq_(PREFIXES[3:], list(self.tree.values('10.1.2.0/24',
+                                                inclusive=True)))
+        eq_(PREFIXES[3:], list(self.tree.values('10.1.1.0/24',
+                                                inclusive=True)))
+        eq_(['10.1.2.0/24', '10.1.3.0/24'],
+            [p for p, _ in self.tree.covered('10.1.0.0/16', '10.1.2.0/24',
+                                             inclusive=True)])
+
+    def test_normalize(self):
+        eq_('10.1.0.0/16', self.tree.normalize('10.1.2.3/16'))
+        eq_('10.1.2.3/32', self.tree.normalize('10.1.2.3'))
+
+    def test_longest_match(self):
+        eq_('10.1.2.0/24', self.tree.longest_match('10.1.2.3'))
+        eq_('10.1.0.0/16', self.tree.longest_match('10.1.4.1'))
+        eq_('10.128.0.0/9', self.tree.longest_match('10.200.0.1'))
+        eq_('192.168.0.1/32', self.tree.longest_match('192.168.0.1'))
+        eq_('192.168.0.0/24', self.tree.longest_match('192.168.0.2'))
+        eq_('0.0.0.0/0', self.tree.longest_match('11.0.0.1'))
+        eq_('10.1.0.0/16', self.tree.longest_match('10.1.0.0/20'))
+
+    def test_covering(self):
+        eq_(['10.1.2.0/24', '10.1.0.0/16', '10.0.0.0/8', '0.0.0.0/0'],
+            [p for p, _ in self.tree.covering('10.1.2.0/24')])
+        eq_(['10.0.0.0/8', '0.0.0.0/0'],
+            [p for p, _ in self.tree.covering('10.64.0.0/10')])
+
+    def test_covered(self):
+        eq_(['10.1.0.0/16', '10.1.2.0/24', '10.1.3.0/24'],
+            [p for p, _ in self.tree.covered('10.1.0.0/16')])
+        eq_(['10.1.2.0/24', '10.1.3.0/24'],
+            [p for p, _ in self.tree.covered('10.1.0.0/20')])
+        eq_([], list(self.tree.covered('10.1.4.0/24')))
+        eq_(PREFIXES, [p for p, _ in self.tree.covered('0.0.0.0/0')])
+
+    def test_delete(self):
+        for prefix in ['0.0.0.0/0', '10.1.0.0/16', '192.168.0.0/24']:
+            del self.tree[prefix]
+        eq_(len(PREFIXES) - 3, len(self.tree))
+        eq_(None, self.tree.longest_match('11.0.0.1'))
+        eq_('10.0.0.0/8', self.tree.longest_match('10.1.4.1'))
+        eq_('10.1.3.0/24', self.tree.pop('10.1.3.0/24'))
+        eq_(None, self.tree.pop('10.1.3.0/24'))
+
+        for prefix in list(self.tree):
+            del self.tree[prefix]
+        eq_(0, len(self.tree))
+        eq_([None, None], self.tree._root.children)
+
+    def test_random(self):
+        rand = random.Random(0)
+        tree = RadixTree(32)
+        prefixes = set()
+        for _ in range(500):
+            prefix = str(netaddr.IPNetwork(
+                '%s/%d' % (netaddr.IPAddress(rand.getrandbits(32)),
+                           rand.randint(0, 32))).cidr)
+            tree[prefix] = prefix
+            prefixes.add(prefix)
+        eq_(len(prefixes), len(tree))
+
+        networks = [netaddr.IPNetwork(p) for p in prefixes]
+        for _ in range(200):
+            addr = netaddr.IPAddress(rand.getrandbits(32))
+            matches = [n for n in networks if addr in n]
+            expected = max(matches, key=lambda n: n.prefixlen) \
+                if matches else None
+            eq_(str(expected) if expected else None,
+                tree.longest_match(str(addr)))
+
+        for prefix in sorted(prefixes)[::2]:
+            del tree[prefix]
+            prefixes.remove(prefix)
+        eq_(sorted(prefixes), sorted(tree))
+
+    def test_ipv6(self):
+        tree = RadixTree(128)
+        tree['2001:db8::/32'] = 1
+        tree['2001:db8:1::/48'] = 2
+        eq_(2, tree.longest_match('2001:db8:1::1'))
+        eq_(1, tree.longest_match('2001:db8:2::1'))
+        eq_(None, tree.longest_match('2001:db9::1'))
+        eq_([('2001:db8::/32', 1), ('2001:db8:1::/48', 2)],
+            list(tree.items()))
+
+
+class Test_TablePrefixIndex(unittest.TestCase):
+    """ Test case for the prefix index of
+    ryu.services.protocols.bgp.info_base.base.Table
+    """
+
+    def _insert(self, table, nlri):
+        path = Ipv4Path(None, nlri, 0, pattrs=PATTRS,
+                        nexthop='10.0.0.1')
+        dest = table.insert(path)
+        dest._best_path = path
+        return dest
+
+    def test_ipv4_table(self):
+        table = Ipv4Table(mock.MagicMock(), mock.MagicMock())
+        dests = {}
+        for prefix in PREFIXES:
+            addr, length = prefix.split('/')
+            dests[prefix] = self._insert(
+                table, bgp.IPAddrPrefix(int(length), addr))
+
+        eq_(dests['10.1.2.0/24'], table.lookup('10.1.2.3'))
+        eq_(dests['0.0.0.0/0'], table.lookup('11.0.0.1'))
+        eq_([dests[p] for p in PREFIXES], list(table.sorted_values()))
+        eq_([dests['10.1.0.0/16'], dests['10.0.0.0/8'], dests['0.0.0.0/0']],
+            list(table.covering_dests('10.1.0.0/16')))
+        eq_([dests['10.1.2.0/24'], dests['10.1.3.0/24']],
+            list(table.covered_dests('10.1.0.0/20')))
+
+        # Destinations without a best path are skipped.
+        dests['10.1.2.0/24']._best_path = None
+        eq_(dests['10.1.0.0/16'], table.lookup('10.1.2.3'))
+
+        table.delete_dest(dests['10.1.0.0/16'])
+        eq_(dests['10.0.0.0/8'], table.lookup('10.1.2.3'))
+        table.delete_dest_by_nlri(bgp.IPAddrPrefix(8, '10.0.0.0'))
+        eq_(dests['0.0.0.0/0'], table.lookup('10.1.2.3'))
+
+    def test_host_bits(self):
+        # Prefixes with host bits set are distinct destinations sharing
+        # a node of the index.
+        table = Ipv4Table(mock.MagicMock(), mock.MagicMock())
+        dest1 = self._insert(table, bgp.IPAddrPrefix(24, '10.0.0.1'))
+        dest0 = self._insert(table, bgp.IPAddrPrefix(24, '10.0.0.0'))
+        dest2 = self._insert(table, bgp.IPAddrPrefix(25, '10.0.0.2'))
+
+        eq_([dest0, dest1, dest2], list(table.sorted_values()))
+        eq_([dest1, dest2], list(table.sorted_values(
+            start_after='10.0.0.0/24')))
+        eq_([dest2], list(table.sorted_values(start_after='10.0.0.1/24')))
+        eq_([dest0, dest1, dest2], list(table.covered_dests('10.0.0.0/16')))
+        eq_([dest1, dest2], list(table.covered_dests(
+            '10.0.0.0/16', start_after='10.0.0.0/24')))
+        eq_([dest2, dest0, dest1], list(table.covering_dests('10.0.0.3')))
+        eq_(dest0, table.lookup('10.0.0.200'))
+
+        dest0._best_path = None
+        eq_(dest1, table.lookup('10.0.0.200'))
+
+        table.delete_dest(dest1)
+        eq_(None, table.lookup('10.0.0.200'))
+        eq_([dest0, dest2], list(table.sorted_values()))
+        table.delete_dest(dest0)
+        eq_([dest2], list(table.sorted_values()))
+        eq_(dest2, table.lookup('10.0.0.3'))
+
+    def _insert_vpn(self, table, route_dist, length, addr):
+        nlri = bgp.LabelledVPNIPAddrPrefix(length, addr, [100],
+                                           route_dist=route_dist)
+        path = Vpnv4Path(None, nlri, 0, pattrs=PATTRS,
+                         nexthop='10.0.0.1')
+        dest = table.insert(path)
+        dest._best_path = path
+        return dest
+
+    def test_vpnv4_table(self):
+        table = Vpnv4Table(mock.MagicMock(), mock.MagicMock())
+        dest1 = self._insert_vpn(table, '65000:1', 16, '10.1.0.0')
+        dest2 = self._insert_vpn(table, '65000:2', 24, '10.1.2.0')
+
+        eq_(dest1, table.lookup('10.1.2.3', route_dist='65000:1'))
+        eq_(dest2, table.lookup('10.1.2.3', route_dist='65000:2'))
+        eq_(dest2, table.lookup('10.1.2.3'))
+        eq_(None, table.lookup('10.1.2.3', route_dist='65000:3'))
+        eq_([dest1, dest2], list(table.sorted_values()))
+        eq_([dest2], list(table.sorted_values(
+            start_after='65000:1:10.1.0.0/16')))
+        eq_([dest2], list(table.sorted_values(
+            start_after='65000:1:10.2.0.0/16')))
+        eq_([dest1], list(table.sorted_values(route_dist='65000:1')))
+
+    @raises(ValueError)
+    def test_not_indexed(self):
+        table = IPv4FlowSpecTable(mock.MagicMock(), mock.MagicMock())
+        table.lookup('10.0.0.1')
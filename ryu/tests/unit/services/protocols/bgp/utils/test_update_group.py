@@ -0,0 +1,51 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+
+from nose.tools import eq_
+
+from ryu.services.protocols.bgp.utils.update_group import UpdateGroup
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_UpdateGroup(unittest.TestCase):
+    """ Test case for ryu.services.protocols.bgp.utils.update_group
+    """
+
+    def test_encode(self):
+        group = UpdateGroup('key', cache_size=2)
+        encoded = []
+
+        def _encoder(path):
+            encoded.append(path)
+            return len(encoded)
+
+        paths = [object() for _ in range(3)]
+        eq_([1, 2, 1, 2], [group.encode(p, _encoder)
+                           for p in paths[:2] + paths[:2]])
+        eq_(paths[:2], encoded)
+
+        # The first path is evicted by the third one.
+        eq_(3, group.encode(paths[2], _encoder))
+        eq_(2, group.encode(paths[1], _encoder))
+        eq_(4, group.encode(paths[0], _encoder))
+        eq_(2, len(group))
+
+        group.clear()
+        eq_(0, len(group))
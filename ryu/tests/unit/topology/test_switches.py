@@ -0,0 +1,81 @@
+# Copyright (C) 2026 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import packet
+from ryu.ofproto import ofproto_v1_3
+from ryu.topology import switches
+
+
+def _arp(src, src_ip):
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet(ethertype=ether_types.ETH_TYPE_ARP,
+                                       dst='ff:ff:ff:ff:ff:ff', src=src))
+    pkt.add_protocol(arp.arp(src_mac=src, src_ip=src_ip,
+                             dst_ip='10.0.0.254'))
+    pkt.serialize()
+    return bytes(pkt.data)
+
+
+def _tagged(data, vid=10):
+    # Inserts an 802.1Q tag after the MAC addresses.
+    return data[:12] + b'\x81\x00' + bytes(bytearray([0, vid])) + data[12:]
+
+
+class Test_HostDiscovery(unittest.TestCase):
+    """ Test case for the host discovery of ryu.topology.switches
+    """
+
+    def setUp(self):
+        self.app = switches.Switches()
+        self.port = mock.MagicMock()
+        self.app._get_port = mock.MagicMock(return_value=self.port)
+        self.app.send_event_to_observers = mock.MagicMock()
+
+    def _packet_in(self, data):
+        msg = mock.MagicMock(data=data, match={'in_port': 1})
+        msg.datapath.id = 1
+        msg.datapath.ofproto = ofproto_v1_3
+        self.app.host_discovery_packet_in_handler(mock.MagicMock(msg=msg))
+
+    def test_arp(self):
+        self._packet_in(_arp('00:00:00:00:00:01', '10.0.0.1'))
+        eq_(['10.0.0.1'], self.app.hosts['00:00:00:00:00:01'].ipv4)
+
+    def test_vlan_arp(self):
+        # Only the outer ethertype is looked at, so the host is learnt
+        # but not its address.
+        self._packet_in(_tagged(_arp('00:00:00:00:00:02', '10.0.0.2')))
+        eq_([], self.app.hosts['00:00:00:00:00:02'].ipv4)
+
+    def test_lldp(self):
+        data = switches.LLDPPacket.lldp_packet(1, 2, '00:00:00:00:00:03',
+                                               120)
+        self._packet_in(data)
+        ok_('00:00:00:00:00:03' not in self.app.hosts)
+
+        self._packet_in(_tagged(data))
+        ok_('00:00:00:00:00:03' in self.app.hosts)
@@ -32,6 +32,7 @@ from ryu.lib.dpid import dpid_to_str, str_to_dpid
 from ryu.lib.port_no import port_no_to_str
 from ryu.lib.packet import packet, ethernet
 from ryu.lib.packet import lldp, ether_types
+from ryu.lib.packet import header_fields
 from ryu.ofproto.ether import ETH_TYPE_LLDP
 from ryu.ofproto.ether import ETH_TYPE_CFM
 from ryu.ofproto import nx_match
@@ -833,10 +834,16 @@ class Switches(app_manager.RyuApp):
     @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
     def host_discovery_packet_in_handler(self, ev):
         msg = ev.msg
-        eth, pkt_type, pkt_data = ethernet.ethernet.parser(msg.data)
+        fields = header_fields.extract(msg.data)
+        if fields is None:
+            return
+        # fields.eth_type is the one after the VLAN tags, but only the
+        # outer ethertype is looked at, i.e. VLAN tagged frames are
+        # neither ignored nor used to update the host addresses.
+        eth_type = fields.eth_type if fields.vlan_vid is None else None
 
         # ignore lldp and cfm packets
-        if eth.ethertype in (ETH_TYPE_LLDP, ETH_TYPE_CFM):
+        if eth_type in (ETH_TYPE_LLDP, ETH_TYPE_CFM):
             return
 
         datapath = msg.datapath
@@ -857,7 +864,7 @@ class Switches(app_manager.RyuApp):
         if not self._is_edge_port(port):
             return
 
-        host_mac = eth.src
+        host_mac = fields.eth_src
         host = Host(host_mac, port)
 
         if host_mac not in self.hosts:
@@ -871,20 +878,17 @@ class Switches(app_manager.RyuApp):
             self.send_event_to_observers(ev)
 
         # arp packet, update ip address
-        if eth.ethertype == ether_types.ETH_TYPE_ARP:
-            arp_pkt, _, _ = pkt_type.parser(pkt_data)
-            self.hosts.update_ip(host, ip_v4=arp_pkt.src_ip)
+        if eth_type == ether_types.ETH_TYPE_ARP:
+            self.hosts.update_ip(host, ip_v4=fields.arp_spa)
 
         # ipv4 packet, update ipv4 address
-        elif eth.ethertype == ether_types.ETH_TYPE_IP:
-            ipv4_pkt, _, _ = pkt_type.parser(pkt_data)
-            self.hosts.update_ip(host, ip_v4=ipv4_pkt.src)
+        elif eth_type == ether_types.ETH_TYPE_IP:
+            self.hosts.update_ip(host, ip_v4=fields.ip_src)
 
         # ipv6 packet, update ipv6 address
-        elif eth.ethertype == ether_types.ETH_TYPE_IPV6:
+        elif eth_type == ether_types.ETH_TYPE_IPV6:
             # TODO: need to handle NDP
-            ipv6_pkt, _, _ = pkt_type.parser(pkt_data)
-            self.hosts.update_ip(host, ip_v6=ipv6_pkt.src)
+            self.hosts.update_ip(host, ip_v6=fields.ip_src)
 
     def send_lldp_packet(self, port):
         try: